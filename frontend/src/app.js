@@ -1,5 +1,5 @@
-import { init } from './data.js';
-import { addRoute, startRouter } from './router.js';
+import { init, loadDeployments, loadTestRuns, refresh } from './data.js';
+import { addRoute, startRouter, getHash, render } from './router.js';
 import { renderOverview, bindOverviewInteractions } from './pages/overview.js';
 import { renderCluster, bindClusterInteractions } from './pages/cluster.js';
 import { renderService } from './pages/service.js';
@@ -41,24 +41,44 @@ function bindGlobalSearch() {
   });
 }
 
+// Bootstrap holds each cluster-region's recent attempts only — fetch the
+// page's older ones in the background and re-render once they arrive
+function loadOlder(hash, scope) {
+  loadDeployments(scope)
+    .then((added) => {
+      if (added && getHash() === hash) render();
+    })
+    .catch((err) => console.warn('[app] Older deployments unavailable:', err.message));
+}
+
 addRoute(/^#\/$/, () => { mount(renderOverview()); bindOverviewInteractions(); });
 addRoute(/^#\/$/, () => { mount(renderOverview()); bindOverviewInteractions(); });
 addRoute(/^#\/?$/, () => { mount(renderOverview()); bindOverviewInteractions(); });
 
-addRoute(/^#\/clusters\/([^/?]+)\/?(\?.*)?$/, ({ match }) => {
+addRoute(/^#\/clusters\/([^/?]+)\/?(\?.*)?$/, ({ hash, match }) => {
   const clusterId = decodeURIComponent(match[1]);
   mount(renderCluster({ clusterId }));
   bindClusterInteractions({ clusterId });
+  loadOlder(hash, { clusterId });
 });
 
-addRoute(/^#\/services\/([^/]+)\/?$/, ({ match }) => {
+addRoute(/^#\/services\/([^/]+)\/?$/, ({ hash, match }) => {
   const serviceId = decodeURIComponent(match[1]);
   mount(renderService({ serviceId }));
+  loadOlder(hash, { serviceId });
 });
 
-addRoute(/^#\/builds\/([^/]+)\/?$/, ({ match }) => {
+addRoute(/^#\/builds\/([^/]+)\/?$/, ({ hash, match }) => {
   const attemptId = decodeURIComponent(match[1]);
-  mount(renderBuild({ attemptId }));
+  // Full test runs are only needed here — fetched per attempt on drill-down
+  loadTestRuns(attemptId)
+    .catch((err) => {
+      console.warn('[app] Test runs unavailable:', err.message);
+      return [];
+    })
+    .then((runs) => {
+      if (getHash() === hash) mount(renderBuild({ attemptId, runs }));
+    });
 });
 
 addRoute(/^#\/analytics\/?$/, () => {
@@ -75,9 +95,22 @@ addRoute(/^#\/versions\/?$/, () => {
   bindVersionsInteractions();
 });
 
+// Poll for changes and re-render the current page when any arrive
+const REFRESH_MS = window.MCQ_REFRESH_MS ?? 60000;
+
+function pollChanges() {
+  refresh()
+    .then((applied) => {
+      if (applied) render();
+    })
+    .catch((err) => console.warn('[app] Refresh failed:', err.message))
+    .finally(() => setTimeout(pollChanges, REFRESH_MS));
+}
+
 // Load all JSON data, then start the router
 init().then(() => {
   startRouter();
+  if (REFRESH_MS > 0) setTimeout(pollChanges, REFRESH_MS);
 }).catch((err) => {
   document.getElementById('app').innerHTML =
     `<div class="p-8 text-red-400">Failed to load dashboard data: ${err.message}</div>`;
@@ -1,15 +1,25 @@
 /* ── data.js — loads all dashboard data from the Dashboard API ─────
  *
  *  API endpoints (Dashboard API Gateway):
+ *    GET /v1/qcd/bootstrap         → clusters + services + promotions + scorecards
+ *                                    + metadata + currentState + recent failures
+ *                                    + recent deploymentAttempts (used by init)
  *    GET /v1/qcd/clusters          → clusters, clusterRegions, clusterRegionRoles, currentRunning
  *    GET /v1/qcd/services          → services
- *    GET /v1/qcd/deployments       → deploymentAttempts
- *    GET /v1/qcd/test-runs         → testRuns
- *    GET /v1/qcd/cluster-test-runs → clusterTestRuns
+ *    GET /v1/qcd/deployments       → deploymentAttempts (paged via nextCursor), each
+ *                                    with a per-suite testSummary (older attempts of one
+ *                                    cluster or service, see loadDeployments)
+ *    GET /v1/qcd/test-runs         → testRuns (per attempt, on drill-down — see loadTestRuns)
+ *    GET /v1/qcd/cluster-test-runs → clusterTestRuns + complete (false when the scan
+ *                                    stopped at its item cap, see clusterTestRunsComplete)
  *    GET /v1/qcd/promotions        → promotions
- *    GET /v1/qcd/jira-tickets      → jiraTickets
+ *    GET /v1/qcd/jira-tickets      → jiraTickets (one service's version range, see fetchJiraTickets)
  *    GET /v1/qcd/scorecards        → scorecardWeights, scorecards
  *    GET /v1/qcd/metadata          → suiteMeta, statusMeta
+ *    GET /v1/qcd/analytics         → daily rollups (fetched on demand, see fetchAnalytics)
+ *    GET /v1/qcd/current-state     → latest attempt + runs per (cluster, service)
+ *    GET /v1/qcd/failures          → FAILED/ROLLBACK attempts + failing test runs
+ *    GET /v1/qcd/changes           → changes since bootstrap's changesToken (see refresh)
  *
  *  Set window.MCQ_API_BASE to override the API URL.
  *  Falls back to sample-data/ JSON files if API is unreachable.
@@ -28,12 +38,18 @@ export let currentRunning = {};
 export let deploymentAttempts = [];
 export let testRuns = [];
 export let clusterTestRuns = [];
+// False when the API capped the cluster test-run scan (older runs missing)
+export let clusterTestRunsComplete = true;
 export let promotions = [];
 export let jiraTickets = {};
 export let scorecardWeights = {};
 export let scorecards = {};
 export let suiteMeta = {};
 export let statusMeta = {};
+// { clusterId: { serviceId: { attempt, tests: { suiteType: run } } } }
+export let currentState = {};
+// Newest failing attempts (FAILED/ROLLBACK) and test runs (failed > 0)
+export let failures = { deploymentAttempts: [], testRuns: [] };
 
 // Derived lookup (populated after services load)
 export let appIdToServiceId = {};
@@ -67,12 +83,117 @@ export function getClusterRegion(clusterRegionId) {
   };
 }
 
+// Latest attempt + newest run per suite for one cluster-region/service
+export function getCurrentState(clusterId, serviceId) {
+  return currentState[clusterId]?.[serviceId] || null;
+}
+
+// Newest run summary per suite for one attempt: { suiteType: { passed, failed, total, ... } }
+export function attemptTests(attempt) {
+  return attempt?.testSummary || {};
+}
+
+// Every summarized run as { attemptId, suiteType, ...summary } that matches `pred`
+export function summarizedRuns(pred) {
+  const runs = [];
+  for (const a of deploymentAttempts) {
+    for (const [suiteType, summary] of Object.entries(attemptTests(a))) {
+      const run = { attemptId: a.id, suiteType, ...summary };
+      if (pred(run)) runs.push(run);
+    }
+  }
+  return runs;
+}
+
+// Same shape as the CURRENT items qcd-processor maintains — used when
+// running from static JSON (one pass, instead of per render)
+function deriveCurrentState(attempts) {
+  const state = {};
+  for (const a of attempts) {
+    const row = (state[a.clusterId] ||= {});
+    const prev = row[a.serviceId];
+    if (!prev || a.startedAt >= prev.attempt.startedAt) {
+      row[a.serviceId] = { attempt: a, tests: attemptTests(a) };
+    }
+  }
+  return state;
+}
+
+// Same shape as GET /v1/qcd/failures — used when running from static JSON
+function deriveFailures(attempts, runs) {
+  const newest = (key) => (x, y) => (x[key] < y[key] ? 1 : -1);
+  return {
+    deploymentAttempts: attempts
+      .filter((a) => a.status === 'FAILED' || a.status === 'ROLLBACK')
+      .sort(newest('startedAt')),
+    testRuns: runs.filter((t) => t.failed > 0).sort(newest('executedAt')),
+  };
+}
+
+// Same shape as the testSummary qcd-processor keeps on deployment items
+function attachTestSummaries(attempts, runs) {
+  const byAttempt = new Map(attempts.map((a) => [a.id, (a.testSummary = {})]));
+  for (const r of runs) {
+    const summary = byAttempt.get(r.attemptId);
+    if (!summary) continue;
+    const prev = summary[r.suiteType];
+    if (!prev || r.executedAt >= prev.executedAt) {
+      const { passed, failed, total, durationSec, executedAt } = r;
+      summary[r.suiteType] = { passed, failed, total, durationSec, executedAt };
+    }
+  }
+}
+
 // ── Fetch helpers ───────────────────────────────────────────
 
+// Last ETag + parsed body per path; revalidated with If-None-Match
+const _etagCache = new Map();
+
 async function fetchAPI(path) {
-  const res = await fetch(`${API_BASE}${path}`);
+  const cached = _etagCache.get(path);
+  const res = await fetch(`${API_BASE}${path}`, {
+    headers: cached ? { 'If-None-Match': cached.etag } : {},
+  });
+  if (res.status === 304 && cached) return cached.data;
   if (!res.ok) throw new Error(`API ${path}: ${res.status}`);
-  return res.json();
+  const data = await res.json();
+  const etag = res.headers.get('ETag');
+  if (etag) _etagCache.set(path, { etag, data });
+  return data;
+}
+
+// format=columns body ({ field: [values] }) → array of objects
+function fromColumns(columns) {
+  const fields = Object.keys(columns || {});
+  const n = fields.length ? columns[fields[0]].length : 0;
+  const rows = new Array(n);
+  for (let i = 0; i < n; i++) {
+    const row = {};
+    for (const f of fields) {
+      if (columns[f][i] !== null) row[f] = columns[f][i];
+    }
+    rows[i] = row;
+  }
+  return rows;
+}
+
+// Follow nextCursor until the last page; concatenates `key` across pages.
+// Pages are requested as format=columns and decoded to objects. complete
+// is false if any page said the API stopped short of every item.
+async function fetchAllPages(path, key) {
+  const items = [];
+  let complete = true;
+  let cursor = null;
+  do {
+    const sep = path.includes('?') ? '&' : '?';
+    const page = await fetchAPI(cursor
+      ? `${path}${sep}format=columns&cursor=${encodeURIComponent(cursor)}`
+      : `${path}${sep}format=columns`);
+    items.push(...fromColumns(page[key]));
+    complete = complete && page.complete !== false;
+    cursor = page.nextCursor;
+  } while (cursor);
+  return { [key]: items, complete };
 }
 
 async function loadJSON(path) {
@@ -84,49 +205,65 @@ async function loadJSON(path) {
 // ── init() — call once before rendering ─────────────────────
 
 let _initialized = false;
+let _fromAPI = false;
+let _changesToken = null;
+// False when bootstrap truncated some cluster-region's attempts; older
+// ones are then loaded per cluster or service by loadDeployments()
+let _deploymentsComplete = true;
+// clusterId → oldest startedAt bootstrap returned for it (its window)
+let _windowStart = {};
+// Scope ("<clusterId>#<serviceId>") → in-flight or finished load
+const _deploymentScopes = new Map();
 
 export async function init() {
   if (_initialized) return;
 
   try {
-    // Try loading from API first
+    // Try loading from API first — bootstrap covers everything except
+    // the cluster test-run collection in a single invocation. It carries
+    // the newest attempts per cluster-region; pages render from those
+    // and loadDeployments() fetches older ones for the scope they show.
+    // Per-attempt runs are not loaded up front: attempts carry a
+    // testSummary, and loadTestRuns() fetches full runs on drill-down.
+    // Jira tickets are fetched per version range by fetchJiraTickets().
     const [
-      clustersData,
-      servicesData,
-      deploymentsData,
-      testRunsData,
+      bootData,
       clusterTestRunsData,
-      promotionsData,
-      jiraData,
-      scorecardData,
-      metaData,
     ] = await Promise.all([
-      fetchAPI('/v1/qcd/clusters'),
-      fetchAPI('/v1/qcd/services'),
-      fetchAPI('/v1/qcd/deployments'),
-      fetchAPI('/v1/qcd/test-runs'),
-      fetchAPI('/v1/qcd/cluster-test-runs'),
-      fetchAPI('/v1/qcd/promotions'),
-      fetchAPI('/v1/qcd/jira-tickets'),
-      fetchAPI('/v1/qcd/scorecards'),
-      fetchAPI('/v1/qcd/metadata'),
+      fetchAPI('/v1/qcd/bootstrap'),
+      fetchAllPages('/v1/qcd/cluster-test-runs', 'clusterTestRuns'),
     ]);
 
-    clusters = clustersData.clusters || [];
-    clusterRegions = clustersData.clusterRegions || [];
-    clusterRegionRoles = clustersData.clusterRegionRoles || {};
-    currentRunning = clustersData.currentRunning || {};
-    services = servicesData.services || [];
-    deploymentAttempts = deploymentsData.deploymentAttempts || [];
-    testRuns = testRunsData.testRuns || [];
+    clusters = bootData.clusters || [];
+    clusterRegions = bootData.clusterRegions || [];
+    clusterRegionRoles = bootData.clusterRegionRoles || {};
+    currentRunning = bootData.currentRunning || {};
+    services = bootData.services || [];
+    deploymentAttempts = bootData.deploymentAttempts || [];
+    _deploymentsComplete = bootData.deploymentsComplete !== false;
+    _windowStart = {};
+    for (const a of deploymentAttempts) {
+      const start = _windowStart[a.clusterId];
+      if (!start || a.startedAt < start) _windowStart[a.clusterId] = a.startedAt;
+    }
+    _deploymentScopes.clear();
+    testRuns = [];
     clusterTestRuns = clusterTestRunsData.clusterTestRuns || [];
-    promotions = promotionsData.promotions || [];
-    jiraTickets = jiraData.jiraTickets || {};
-    scorecardWeights = scorecardData.scorecardWeights || {};
-    scorecards = scorecardData.scorecards || {};
-    suiteMeta = metaData.suiteMeta || {};
-    statusMeta = metaData.statusMeta || {};
+    clusterTestRunsComplete = clusterTestRunsData.complete;
+    if (!clusterTestRunsComplete) {
+      console.warn(`[data] Cluster test runs truncated at ${clusterTestRuns.length}`);
+    }
+    promotions = bootData.promotions || [];
+    jiraTickets = {};
+    scorecardWeights = bootData.scorecardWeights || {};
+    scorecards = bootData.scorecards || {};
+    suiteMeta = bootData.suiteMeta || {};
+    statusMeta = bootData.statusMeta || {};
+    currentState = bootData.currentState || deriveCurrentState(deploymentAttempts);
+    failures = bootData.failures || deriveFailures(deploymentAttempts, summarizedRuns(() => true));
+    _changesToken = bootData.changesToken || null;
 
+    _fromAPI = true;
     console.log('[data] Loaded from API');
   } catch (apiErr) {
     console.warn('[data] API not available, falling back to static JSON:', apiErr.message);
@@ -164,12 +301,16 @@ export async function init() {
     deploymentAttempts = deploymentsData.deploymentAttempts;
     testRuns = testRunsData.testRuns;
     clusterTestRuns = clusterTestRunsData.clusterTestRuns;
+    clusterTestRunsComplete = true;
     promotions = promotionsData.promotions;
     jiraTickets = jiraData.jiraTickets;
     scorecardWeights = scorecardData.scorecardWeights;
     scorecards = scorecardData.scorecards;
     suiteMeta = metaData.suiteMeta;
     statusMeta = metaData.statusMeta;
+    attachTestSummaries(deploymentAttempts, testRuns);
+    currentState = deriveCurrentState(deploymentAttempts);
+    failures = deriveFailures(deploymentAttempts, testRuns);
 
     console.log('[data] Loaded from static JSON files');
   }
@@ -181,3 +322,223 @@ export async function init() {
 
   _initialized = true;
 }
+
+// ── refresh() — apply changes since the last load ──────────
+// Polls /v1/qcd/changes and patches the module-level collections in
+// place. Returns the number of changes applied (0 in static mode).
+// An expired token or a "*" change falls back to a full init().
+
+export async function refresh() {
+  if (!_fromAPI || !_changesToken) return 0;
+  let applied = 0;
+  let more = true;
+  while (more) {
+    const qs = new URLSearchParams({ since: _changesToken });
+    const res = await fetch(`${API_BASE}/v1/qcd/changes?${qs}`);
+    if (res.status === 410) return reload();
+    if (!res.ok) throw new Error(`API /v1/qcd/changes: ${res.status}`);
+    const page = await res.json();
+    if (page.changes.some((c) => c.entity === '*')) return reload();
+    for (const change of page.changes) applyChange(change);
+    applied += page.changes.length;
+    if (page.changes.length) {
+      const newest = (key) => (x, y) => (x[key] < y[key] ? 1 : -1);
+      failures.deploymentAttempts.sort(newest('startedAt'));
+      failures.testRuns.sort(newest('executedAt'));
+    }
+    _changesToken = page.nextToken;
+    more = page.more;
+  }
+  return applied;
+}
+
+async function reload() {
+  _initialized = false;
+  await init();
+  return 1;
+}
+
+// Insert or replace `item` in `list` by `field` (removes it when item is null)
+function upsertBy(list, field, value, item) {
+  const i = list.findIndex((x) => x[field] === value);
+  if (i >= 0 && item) list[i] = item;
+  else if (i >= 0) list.splice(i, 1);
+  else if (item) list.push(item);
+}
+
+// Key sk/pk → the id the frontend indexes by, for deleted items
+function keyId(key) {
+  return key.pk.split('#').slice(1).join('#');
+}
+
+// Remove the run stored under `key` (pk <prefix>#<owner>, sk
+// <suiteType>#<executedAt>) from `list`; runs carry no key, only fields
+function removeRun(list, key, ownerField) {
+  const owner = keyId(key);
+  const i = list.findIndex(
+    (r) => r[ownerField] === owner && `${r.suiteType}#${r.executedAt}` === key.sk,
+  );
+  if (i >= 0) list.splice(i, 1);
+}
+
+function applyChange({ entity, key, item }) {
+  switch (entity) {
+    case 'clusters':
+    case 'clusterRegions':
+    case 'services':
+    case 'promotions': {
+      const lists = { clusters, clusterRegions, services, promotions };
+      upsertBy(lists[entity], 'id', item?.id ?? keyId(key), item);
+      if (entity === 'services') {
+        appIdToServiceId = Object.fromEntries(
+          services.filter((s) => s.appId).map((s) => [s.appId, s.id]),
+        );
+      }
+      break;
+    }
+    case 'clusterRegionRoles':
+      clusterRegionRoles = item?.roles || {};
+      break;
+    case 'suiteMeta':
+      suiteMeta = item?.data || {};
+      break;
+    case 'statusMeta':
+      statusMeta = item?.data || {};
+      break;
+    case 'currentRunning':
+      if (item) currentRunning[item.clusterRegionId] = item.versions || {};
+      else delete currentRunning[keyId(key)];
+      break;
+    case 'deploymentAttempts': {
+      const id = item?.id ?? key.sk.split('#').slice(1).join('#');
+      upsertBy(deploymentAttempts, 'id', id, item);
+      const failing = item && (item.status === 'FAILED' || item.status === 'ROLLBACK');
+      upsertBy(failures.deploymentAttempts, 'id', id, failing ? item : null);
+      break;
+    }
+    case 'testRuns':
+      if (item) {
+        if (testRuns.length) upsertBy(testRuns, 'id', item.id, item);
+        upsertBy(failures.testRuns, 'id', item.id, item.failed > 0 ? item : null);
+      } else {
+        removeRun(testRuns, key, 'attemptId');
+        removeRun(failures.testRuns, key, 'attemptId');
+      }
+      break;
+    case 'clusterTestRuns':
+      if (item) upsertBy(clusterTestRuns, 'id', item.id, item);
+      else removeRun(clusterTestRuns, key, 'clusterId');
+      break;
+    case 'scorecardWeights':
+      scorecardWeights = item || {};
+      break;
+    case 'scorecards': {
+      const svc = item?.serviceId ?? keyId(key);
+      if (item) {
+        const { serviceId, ...scores } = item;
+        scorecards[svc] = scores;
+      } else {
+        delete scorecards[svc];
+      }
+      break;
+    }
+    case 'currentState':
+      if (item) {
+        (currentState[item.clusterId] ||= {})[item.serviceId] = {
+          attempt: item.attempt || {},
+          tests: item.tests || {},
+        };
+      }
+      break;
+    default:
+      break;
+  }
+}
+
+// ── loadDeployments() — older attempts of one cluster or service ─
+// Pages /v1/qcd/deployments for the scope, from where bootstrap's window
+// ends (the latest window start among the scope's cluster-regions, so no
+// scope has a gap), and merges new attempts into deploymentAttempts.
+// Each scope is fetched once per init(); resolves to the number of
+// attempts added (0 for later calls, in static mode or when bootstrap
+// was complete).
+
+export function loadDeployments({ clusterId, serviceId } = {}) {
+  if (!_fromAPI || _deploymentsComplete) return Promise.resolve(0);
+  const scope = `${clusterId || ''}#${serviceId || ''}`;
+  const loading = _deploymentScopes.get(scope);
+  if (loading) return loading.then(() => 0);
+  const load = fetchOlderDeployments(clusterId, serviceId).catch((err) => {
+    _deploymentScopes.delete(scope);
+    throw err;
+  });
+  _deploymentScopes.set(scope, load);
+  return load;
+}
+
+async function fetchOlderDeployments(clusterId, serviceId) {
+  const starts = clusterId ? [_windowStart[clusterId]] : Object.values(_windowStart);
+  const until = starts.reduce((max, s) => (s && (!max || s > max) ? s : max), null);
+  const qs = new URLSearchParams({
+    ...(clusterId ? { clusterId } : {}),
+    ...(serviceId ? { serviceId } : {}),
+  });
+  // sk is <startedAt>#<id>: the suffix keeps attempts that share `until`
+  if (until) qs.set('until', `${until}#\uffff`);
+  const page = await fetchAllPages(`/v1/qcd/deployments?${qs}`, 'deploymentAttempts');
+  const known = new Set(deploymentAttempts.map((a) => a.id));
+  const added = page.deploymentAttempts.filter((a) => !known.has(a.id));
+  deploymentAttempts.push(...added);
+  return added.length;
+}
+
+// ── loadTestRuns() — full runs for one attempt (drill-down) ─
+
+export async function loadTestRuns(attemptId) {
+  if (!_fromAPI) return testRuns.filter((t) => t.attemptId === attemptId);
+  const qs = new URLSearchParams({ attemptId });
+  const data = await fetchAPI(`/v1/qcd/test-runs?${qs}`);
+  return data.testRuns || [];
+}
+
+// ── fetchJiraTickets() — one service's tickets between versions ─
+// Tickets with fromVersion < version <= toVersion (semver), oldest
+// version first. The API answers the range from serviceVersion-index;
+// static mode filters the sample tickets the same way.
+
+export async function fetchJiraTickets(serviceId, fromVersion, toVersion) {
+  if (!_fromAPI) {
+    const low = versionSort(fromVersion);
+    const high = versionSort(toVersion);
+    return (jiraTickets[serviceId] || [])
+      .map((t) => [versionSort(t.version), t])
+      .filter(([v]) => v && v > low && v <= high)
+      .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+      .map(([, t]) => t);
+  }
+  const qs = new URLSearchParams({ serviceId, fromVersion, toVersion });
+  const data = await fetchAPI(`/v1/qcd/jira-tickets?${qs}`);
+  return data.jiraTickets?.[serviceId] || [];
+}
+
+// Semver → zero-padded sort key (matches the API's versionSort), or null
+function versionSort(version) {
+  const m = String(version).match(/^(\d+)\.(\d+)\.(\d+)$/);
+  return m ? m.slice(1).map((p) => String(Number(p)).padStart(6, '0')).join('.') : null;
+}
+
+// ── fetchAnalytics() — server-side daily rollups ────────────
+// Returns { days: [...] } or null when running from static JSON. Throws
+// when the API fails: testRuns is not loaded in API mode, so there is
+// nothing to recompute the rollups from.
+
+export async function fetchAnalytics(serviceId = 'ALL', clusterId = 'ALL') {
+  if (!_fromAPI) return null;
+  const qs = new URLSearchParams({ serviceId, clusterId });
+  try {
+    return await fetchAPI(`/v1/qcd/analytics?${qs}`);
+  } catch (err) {
+    console.warn('[data] Analytics rollups unavailable:', err.message);
+    throw err;
+  }
+}
@@ -4,8 +4,9 @@ import {
   deploymentAttempts,
   testRuns,
   getClusterRegion,
+  fetchAnalytics,
 } from '../data.js';
-import { layout, sectionCard } from '../ui.js';
+import { layout, sectionCard, emptyState } from '../ui.js';
 
 /* ───────────────────────── helpers ───────────────────────── */
 
@@ -13,18 +14,9 @@ function toDay(iso) {
   return iso ? iso.slice(0, 10) : null;
 }
 
-function daysFrom(attempts) {
-  const set = new Set();
-  for (const a of attempts) {
-    const d = toDay(a.startedAt);
-    if (d) set.add(d);
-  }
-  return Array.from(set).sort();
-}
-
-function durationMin(a) {
+function durationSec(a) {
   if (!a.startedAt || !a.endedAt) return null;
-  return (Date.parse(a.endedAt) - Date.parse(a.startedAt)) / 60000;
+  return (Date.parse(a.endedAt) - Date.parse(a.startedAt)) / 1000;
 }
 
 function filterAttempts(serviceId, clusterId) {
@@ -40,6 +32,44 @@ function filterTestRuns(attempts) {
   return testRuns.filter((t) => ids.has(t.attemptId));
 }
 
+/* Per-day rows in the same shape as GET /v1/qcd/analytics `days`.
+ * Only used in static sample-data mode; in API mode the rollups come
+ * from /v1/qcd/analytics or the page shows an error. */
+function rollupDays(filteredAttempts, filteredRuns) {
+  const byDay = {};
+  const dayOf = new Map();
+
+  for (const a of filteredAttempts) {
+    const d = toDay(a.startedAt);
+    if (!d) continue;
+    dayOf.set(a.id, d);
+    const row = byDay[d] ||= {
+      day: d, attempts: 0, success: 0, failed: 0, rollback: 0,
+      leadTimeSumSec: 0, leadTimeCount: 0, tests: {},
+    };
+    row.attempts += 1;
+    if (a.status === 'SUCCESS' || a.status === 'LIVE') row.success += 1;
+    else if (a.status === 'FAILED') row.failed += 1;
+    else if (a.status === 'ROLLBACK') row.rollback += 1;
+
+    const dur = durationSec(a);
+    if (dur !== null) {
+      row.leadTimeSumSec += dur;
+      row.leadTimeCount += 1;
+    }
+  }
+
+  for (const t of filteredRuns) {
+    const d = dayOf.get(t.attemptId);
+    if (!d) continue;
+    const suite = byDay[d].tests[t.suiteType] ||= { passed: 0, total: 0 };
+    suite.passed += t.passed;
+    suite.total += t.total;
+  }
+
+  return Object.values(byDay).sort((x, y) => x.day.localeCompare(y.day));
+}
+
 const COLORS = {
   success: 'rgba(52,211,153,0.8)',
   failed: 'rgba(251,113,133,0.8)',
@@ -53,64 +83,30 @@ const COLORS = {
 
 /* ───────────────── 1. Build Attempts Over Time ──────────── */
 
-function buildAttemptsData(filteredAttempts) {
-  const days = daysFrom(filteredAttempts);
-  const successByDay = {};
-  const failedByDay = {};
-  const rollbackByDay = {};
-
-  for (const a of filteredAttempts) {
-    const d = toDay(a.startedAt);
-    if (!d) continue;
-    if (a.status === 'SUCCESS' || a.status === 'LIVE') successByDay[d] = (successByDay[d] || 0) + 1;
-    else if (a.status === 'FAILED') failedByDay[d] = (failedByDay[d] || 0) + 1;
-    else if (a.status === 'ROLLBACK') rollbackByDay[d] = (rollbackByDay[d] || 0) + 1;
-  }
-
+function buildAttemptsData(days) {
   return {
-    labels: days,
+    labels: days.map((r) => r.day),
     datasets: [
-      { label: 'Success', data: days.map((d) => successByDay[d] || 0), backgroundColor: COLORS.success, borderColor: COLORS.success, borderWidth: 1 },
-      { label: 'Failed', data: days.map((d) => failedByDay[d] || 0), backgroundColor: COLORS.failed, borderColor: COLORS.failed, borderWidth: 1 },
-      { label: 'Rollback', data: days.map((d) => rollbackByDay[d] || 0), backgroundColor: COLORS.rollback, borderColor: COLORS.rollback, borderWidth: 1 },
+      { label: 'Success', data: days.map((r) => r.success), backgroundColor: COLORS.success, borderColor: COLORS.success, borderWidth: 1 },
+      { label: 'Failed', data: days.map((r) => r.failed), backgroundColor: COLORS.failed, borderColor: COLORS.failed, borderWidth: 1 },
+      { label: 'Rollback', data: days.map((r) => r.rollback), backgroundColor: COLORS.rollback, borderColor: COLORS.rollback, borderWidth: 1 },
     ],
   };
 }
 
 /* ───────────────── 2. Test Pass Rates Over Time ─────────── */
 
-function testPassRateData(filteredAttempts, filteredRuns) {
-  const days = daysFrom(filteredAttempts);
-  const attemptMap = new Map(filteredAttempts.map((a) => [a.id, a]));
-
-  const suiteTypes = ['FUNCTIONAL', 'SANITY', 'REGRESSION'];
-  const rateByDaySuite = {};
-  for (const st of suiteTypes) rateByDaySuite[st] = {};
-
-  for (const t of filteredRuns) {
-    const attempt = attemptMap.get(t.attemptId);
-    if (!attempt) continue;
-    const d = toDay(attempt.startedAt);
-    if (!d) continue;
-    if (!rateByDaySuite[t.suiteType]) continue;
-
-    if (!rateByDaySuite[t.suiteType][d]) {
-      rateByDaySuite[t.suiteType][d] = { passed: 0, total: 0 };
-    }
-    rateByDaySuite[t.suiteType][d].passed += t.passed;
-    rateByDaySuite[t.suiteType][d].total += t.total;
-  }
-
+function testPassRateData(days) {
   function rateArray(st) {
-    return days.map((d) => {
-      const r = rateByDaySuite[st]?.[d];
+    return days.map((row) => {
+      const r = row.tests[st];
       if (!r || r.total === 0) return null;
       return +((r.passed / r.total) * 100).toFixed(1);
     });
   }
 
   return {
-    labels: days,
+    labels: days.map((r) => r.day),
     datasets: [
       { label: 'Functional %', data: rateArray('FUNCTIONAL'), borderColor: COLORS.functional, backgroundColor: 'transparent', tension: 0.3, pointRadius: 3 },
       { label: 'Sanity %', data: rateArray('SANITY'), borderColor: COLORS.sanity, backgroundColor: 'transparent', tension: 0.3, pointRadius: 3 },
@@ -121,31 +117,13 @@ function testPassRateData(filteredAttempts, filteredRuns) {
 
 /* ──────────── 3. Deployment Frequency & Lead Time ────────── */
 
-function deployFreqLeadTimeData(filteredAttempts) {
-  const days = daysFrom(filteredAttempts);
-
-  const countByDay = {};
-  const durationSumByDay = {};
-  const durationCountByDay = {};
-
-  for (const a of filteredAttempts) {
-    const d = toDay(a.startedAt);
-    if (!d) continue;
-    countByDay[d] = (countByDay[d] || 0) + 1;
-
-    const dur = durationMin(a);
-    if (dur !== null) {
-      durationSumByDay[d] = (durationSumByDay[d] || 0) + dur;
-      durationCountByDay[d] = (durationCountByDay[d] || 0) + 1;
-    }
-  }
-
+function deployFreqLeadTimeData(days) {
   return {
-    labels: days,
+    labels: days.map((r) => r.day),
     datasets: [
       {
         label: 'Deploys / day',
-        data: days.map((d) => countByDay[d] || 0),
+        data: days.map((r) => r.attempts),
         backgroundColor: COLORS.frequency,
         borderColor: COLORS.frequency,
         borderWidth: 1,
@@ -155,10 +133,9 @@ function deployFreqLeadTimeData(filteredAttempts) {
       },
       {
         label: 'Avg lead time (min)',
-        data: days.map((d) => {
-          const c = durationCountByDay[d];
-          if (!c) return null;
-          return +((durationSumByDay[d] || 0) / c).toFixed(1);
+        data: days.map((r) => {
+          if (!r.leadTimeCount) return null;
+          return +(r.leadTimeSumSec / r.leadTimeCount / 60).toFixed(1);
         }),
         borderColor: COLORS.leadTime,
         backgroundColor: 'transparent',
@@ -207,7 +184,9 @@ export function renderAnalytics() {
       </div>
     </div>
 
-    <div class="grid grid-cols-1 gap-6">
+    <div id="analyticsError" class="hidden mb-6"></div>
+
+    <div id="analyticsCharts" class="grid grid-cols-1 gap-6">
       ${sectionCard({
         title: 'Build Attempts Over Time',
         right: '<span class="text-xs text-slate-400">Stacked bar — per day</span>',
@@ -266,21 +245,60 @@ function destroyCharts() {
   chart3?.destroy(); chart3 = null;
 }
 
-function createCharts(serviceId, clusterId) {
+async function loadDays(serviceId, clusterId) {
+  const rollup = await fetchAnalytics(serviceId, clusterId);
+  if (rollup) return rollup.days;
+  const filteredAttempts = filterAttempts(serviceId, clusterId);
+  return rollupDays(filteredAttempts, filterTestRuns(filteredAttempts));
+}
+
+// In API mode a failed rollup fetch replaces the charts with an error
+// state; the local testRuns are empty there, so recomputed charts would
+// show every pass rate as zero.
+function showError(err) {
+  const box = document.getElementById('analyticsError');
+  const charts = document.getElementById('analyticsCharts');
+  box?.classList.toggle('hidden', !err);
+  charts?.classList.toggle('hidden', Boolean(err));
+  if (!err) return;
+  if (box) {
+    box.innerHTML = emptyState({
+      title: 'Analytics unavailable',
+      description: `The analytics rollups could not be loaded (${err.message}). Try again later.`,
+    });
+  }
+  const label = document.getElementById('analyticsLabel');
+  if (label) label.textContent = '';
+}
+
+let renderSeq = 0;
+
+async function createCharts(serviceId, clusterId) {
   const Chart = window.Chart;
   if (!Chart) return;
 
-  destroyCharts();
+  // Drop stale responses when filters change mid-fetch
+  const seq = ++renderSeq;
+  let days;
+  let error = null;
+  try {
+    days = await loadDays(serviceId, clusterId);
+  } catch (err) {
+    error = err;
+  }
+  if (seq !== renderSeq) return;
 
-  const filteredAttempts = filterAttempts(serviceId, clusterId);
-  const filteredRuns = filterTestRuns(filteredAttempts);
+  destroyCharts();
+  showError(error);
+  if (error) return;
+  const attemptCount = days.reduce((n, r) => n + r.attempts, 0);
 
   // Update label
   const label = document.getElementById('analyticsLabel');
   if (label) {
     const svcName = serviceId === 'ALL' ? 'All services' : services.find((s) => s.id === serviceId)?.name || serviceId;
     const clName = clusterId === 'ALL' ? 'All cluster-regions' : (getClusterRegion(clusterId)?.name || clusterId);
-    label.textContent = `Showing: ${svcName} · ${clName} (${filteredAttempts.length} attempts)`;
+    label.textContent = `Showing: ${svcName} · ${clName} (${attemptCount} attempts)`;
   }
 
   // 1. Build Attempts (stacked bar)
@@ -288,7 +306,7 @@ function createCharts(serviceId, clusterId) {
   if (ctx1) {
     chart1 = new Chart(ctx1, {
       type: 'bar',
-      data: buildAttemptsData(filteredAttempts),
+      data: buildAttemptsData(days),
       options: {
         ...chartDefaults,
         scales: {
@@ -305,7 +323,7 @@ function createCharts(serviceId, clusterId) {
   if (ctx2) {
     chart2 = new Chart(ctx2, {
       type: 'line',
-      data: testPassRateData(filteredAttempts, filteredRuns),
+      data: testPassRateData(days),
       options: {
         ...chartDefaults,
         scales: {
@@ -327,7 +345,7 @@ function createCharts(serviceId, clusterId) {
   if (ctx3) {
     chart3 = new Chart(ctx3, {
       type: 'bar',
-      data: deployFreqLeadTimeData(filteredAttempts),
+      data: deployFreqLeadTimeData(days),
       options: {
         ...chartDefaults,
         scales: {
@@ -2,7 +2,6 @@ import {
   deploymentAttempts,
   services,
   clusters,
-  testRuns,
   suiteMeta,
   statusMeta,
 } from '../data.js';
@@ -58,7 +57,7 @@ function testTable(runs) {
   `;
 }
 
-export function renderBuild({ attemptId }) {
+export function renderBuild({ attemptId, runs = [] }) {
   const attempt = attemptById(attemptId);
   if (!attempt) {
     return layout({
@@ -73,7 +72,6 @@ export function renderBuild({ attemptId }) {
   const cluster = clusters.find((c) => c.id === attempt.clusterId);
   const meta = statusMeta[attempt.status] || { label: attempt.status, tone: 'slate' };
 
-  const runs = testRuns.filter((t) => t.attemptId === attempt.id);
   const content = `
     <div class="flex flex-col gap-4">
       ${sectionCard({
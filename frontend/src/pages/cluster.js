@@ -3,9 +3,11 @@ import {
   services,
   currentRunning,
   deploymentAttempts,
-  testRuns,
   clusterTestRuns,
+  clusterTestRunsComplete,
   statusMeta,
+  getCurrentState,
+  attemptTests,
 } from '../data.js';
 import { layout, sectionCard, badge, pillButton, fmtDate, emptyState } from '../ui.js';
 
@@ -86,9 +88,8 @@ function recentAttemptsTable(clusterId, statusFilter = 'ALL') {
   return `<div class="rounded-xl border border-slate-800 bg-slate-900/30 p-2">${rows.join('')}</div>`;
 }
 
-function ftBadge(attemptId) {
-  const runs = testRuns.filter((t) => t.attemptId === attemptId);
-  const func = runs.find((r) => r.suiteType === 'FUNCTIONAL');
+function ftBadge(attempt) {
+  const func = attemptTests(attempt).FUNCTIONAL;
   if (func) {
     const label = func.failed > 0
       ? `FT ${func.passed}/${func.total} (${func.failed} failed)`
@@ -98,9 +99,8 @@ function ftBadge(attemptId) {
   return badge({ label: 'FT —', tone: 'slate', subtle: true });
 }
 
-function nightlyBadge(attemptId) {
-  const runs = testRuns.filter((t) => t.attemptId === attemptId);
-  const reg = runs.find((r) => r.suiteType === 'REGRESSION');
+function nightlyBadge(attempt) {
+  const reg = attemptTests(attempt).REGRESSION;
   if (reg) {
     const label = reg.failed > 0
       ? `${reg.passed}/${reg.total} (${reg.failed} failed)`
@@ -118,9 +118,8 @@ function hasCanary(clusterId) {
   return String(clusterId).startsWith('aquila-');
 }
 
-function canaryBadge(attemptId) {
-  const runs = testRuns.filter((t) => t.attemptId === attemptId);
-  const canary = runs.find((r) => r.suiteType === 'CANARY');
+function canaryBadge(attempt) {
+  const canary = attemptTests(attempt).CANARY;
   if (canary) {
     const label = canary.failed > 0
       ? `${canary.passed}/${canary.total} (${canary.failed} failed)`
@@ -181,15 +180,15 @@ function servicesTable(clusterId, statusFilter) {
 
             <div class="col-span-12 md:col-span-2">
               <div class="text-xs text-slate-400">FT Results</div>
-              ${latest ? ftBadge(latest.id) : `<div class="text-sm text-slate-500">—</div>`}
+              ${latest ? ftBadge(latest) : `<div class="text-sm text-slate-500">—</div>`}
             </div>
 
             ${showNightly ? `<div class="col-span-12 md:col-span-2">
               <div class="text-xs text-slate-400">Nightly Regression</div>
-              ${latest ? nightlyBadge(latest.id) : `<div class="text-sm text-slate-500">—</div>`}
+              ${latest ? nightlyBadge(latest) : `<div class="text-sm text-slate-500">—</div>`}
             </div>` : showCanary ? `<div class="col-span-12 md:col-span-2">
               <div class="text-xs text-slate-400">Canary</div>
-              ${latest ? canaryBadge(latest.id) : `<div class="text-sm text-slate-500">—</div>`}
+              ${latest ? canaryBadge(latest) : `<div class="text-sm text-slate-500">—</div>`}
             </div>` : `<div class="col-span-12 md:col-span-2">
               <div class="text-xs text-slate-400">—</div>
               <div class="text-sm text-slate-500">N/A</div>
@@ -228,14 +227,14 @@ function attemptsList(attempts) {
         </div>
         <div class="col-span-12 md:col-span-3">
           <div class="text-xs text-slate-400">FT</div>
-          ${ftBadge(a.id)}
+          ${ftBadge(a)}
         </div>
         ${showNightlyCol ? `<div class="col-span-12 md:col-span-3">
           <div class="text-xs text-slate-400">Nightly</div>
-          ${nightlyBadge(a.id)}
+          ${nightlyBadge(a)}
         </div>` : showCanaryCol ? `<div class="col-span-12 md:col-span-3">
           <div class="text-xs text-slate-400">Canary</div>
-          ${canaryBadge(a.id)}
+          ${canaryBadge(a)}
         </div>` : ''}
         <div class="col-span-12 md:col-span-2 text-xs text-slate-400 text-right">
           ${fmtDate(a.startedAt)}
@@ -321,10 +320,7 @@ function canarySummary(clusterId) {
 
   for (const s of services) {
     if (!running[s.id]) continue;
-    const attempts = attemptsFor(clusterId, s.id);
-    const latest = attempts.length ? attempts[attempts.length - 1] : null;
-    if (!latest) continue;
-    const canary = testRuns.find((t) => t.attemptId === latest.id && t.suiteType === 'CANARY');
+    const canary = getCurrentState(clusterId, s.id)?.tests.CANARY;
     if (canary) {
       totalTests += canary.total;
       totalPassed += canary.passed;
@@ -374,10 +370,7 @@ function nightlySummary(clusterId) {
   for (const s of services) {
     if (!running[s.id]) continue;
     servicesTotal++;
-    const attempts = attemptsFor(clusterId, s.id);
-    const latest = attempts.length ? attempts[attempts.length - 1] : null;
-    if (!latest) continue;
-    const reg = testRuns.find((t) => t.attemptId === latest.id && t.suiteType === 'REGRESSION');
+    const reg = getCurrentState(clusterId, s.id)?.tests.REGRESSION;
     if (reg) baseTotal += reg.total;
   }
   if (baseTotal === 0) return '';
@@ -418,6 +411,7 @@ function nightlySummary(clusterId) {
     ${collapsibleSuiteCard('Nightly Regression', healthLabel, healthTone, latest, nightlyRuns, expandId, true)}
     ${collapsibleSuiteCard('Solution Tests', ...clusterSuiteData(clusterId, 'SOLUTION'), `suite:${clusterId}:solution`, false)}
     ${collapsibleSuiteCard('System Tests', ...clusterSuiteData(clusterId, 'SYSTEM'), `suite:${clusterId}:system`, false)}
+    ${clusterTestRunsComplete ? '' : '<div class="text-xs text-slate-500">Cluster test runs were capped by the API; older runs may be missing.</div>'}
   `;
 }
 
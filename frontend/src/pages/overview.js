@@ -4,19 +4,17 @@ import {
   services,
   currentRunning,
   deploymentAttempts,
-  testRuns,
   clusterTestRuns,
   jiraTickets,
   statusMeta,
   suiteMeta,
+  currentState,
+  getCurrentState,
+  failures,
   getClusterRegion,
 } from '../data.js';
 import { layout, sectionCard, keyValueGrid, badge, emptyState } from '../ui.js';
 
-function attemptsForCluster(clusterId) {
-  return deploymentAttempts.filter((a) => a.clusterId === clusterId);
-}
-
 function parseSemver(v) {
   const m = String(v).match(/^(\d+)\.(\d+)\.(\d+)$/);
   if (!m) return null;
@@ -36,31 +34,9 @@ function cmpSemver(a, b) {
 }
 
 function summarizeCluster(clusterId) {
-  const attempts = attemptsForCluster(clusterId);
-
   // Snapshot view: summarize by the *latest* attempt per service for this cluster-region.
   // This prevents old historical failures/rollbacks from flagging the cluster as Attention.
-  const latestByService = new Map();
-
-  for (const a of attempts) {
-    const prev = latestByService.get(a.serviceId);
-    if (!prev) {
-      latestByService.set(a.serviceId, a);
-      continue;
-    }
-
-    const v = cmpSemver(a.buildVersion, prev.buildVersion);
-    if (v > 0) {
-      latestByService.set(a.serviceId, a);
-      continue;
-    }
-
-    if (v === 0 && String(a.startedAt) > String(prev.startedAt)) {
-      latestByService.set(a.serviceId, a);
-    }
-  }
-
-  const latestAttempts = Array.from(latestByService.values());
+  const latestAttempts = Object.values(currentState[clusterId] || {}).map((c) => c.attempt);
   const total = latestAttempts.length;
   const success = latestAttempts.filter((a) => a.status === 'SUCCESS' || a.status === 'LIVE').length;
   const rollback = latestAttempts.filter((a) => a.status === 'ROLLBACK').length;
@@ -102,12 +78,7 @@ function canaryOverview(clusterId) {
 
   for (const s of services) {
     if (!running[s.id]) continue;
-    const attempts = attemptsForCluster(clusterId)
-      .filter((a) => a.serviceId === s.id)
-      .sort((a, b) => (a.startedAt > b.startedAt ? 1 : -1));
-    const latest = attempts.length ? attempts[attempts.length - 1] : null;
-    if (!latest) continue;
-    const canary = testRuns.find((t) => t.attemptId === latest.id && t.suiteType === 'CANARY');
+    const canary = getCurrentState(clusterId, s.id)?.tests.CANARY;
     if (canary) {
       totalTests += canary.total;
       totalPassed += canary.passed;
@@ -358,13 +329,13 @@ function renderJiraResults(serviceId, fromVer, toVer) {
 }
 
 function riskRows() {
-  const rollbacks = deploymentAttempts
+  const rollbacks = failures.deploymentAttempts
     .filter((a) => a.status === 'ROLLBACK')
     .slice(0, 5)
     .map((a) => riskRow(a, 'Rollback'));
 
-  const nightliesFailed = testRuns
-    .filter((t) => (t.suiteType === 'REGRESSION' || t.suiteType === 'SANITY') && t.failed > 0)
+  const nightliesFailed = failures.testRuns
+    .filter((t) => t.suiteType === 'REGRESSION' || t.suiteType === 'SANITY')
     .slice(0, 5)
     .map((t) => nightlyRiskRow(t));
 
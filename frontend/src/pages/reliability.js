@@ -1,15 +1,15 @@
-import { deploymentAttempts, services, testRuns, statusMeta, suiteMeta } from '../data.js';
+import { deploymentAttempts, services, failures, statusMeta, suiteMeta } from '../data.js';
 import { layout, sectionCard, badge, fmtDate, emptyState } from '../ui.js';
 
 function topRollbacks() {
-  return deploymentAttempts
+  return failures.deploymentAttempts
     .filter((a) => a.status === 'ROLLBACK')
     .sort((a, b) => (a.endedAt < b.endedAt ? 1 : -1));
 }
 
 function failingNightlies() {
-  return testRuns
-    .filter((t) => (t.suiteType === 'REGRESSION' || t.suiteType === 'SANITY') && t.failed > 0)
+  return failures.testRuns
+    .filter((t) => t.suiteType === 'REGRESSION' || t.suiteType === 'SANITY')
     .sort((a, b) => (a.executedAt < b.executedAt ? 1 : -1));
 }
 
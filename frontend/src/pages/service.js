@@ -3,8 +3,8 @@ import {
   services,
   currentRunning,
   deploymentAttempts,
-  testRuns,
   statusMeta,
+  attemptTests,
   getClusterRegion,
 } from '../data.js';
 import { layout, sectionCard, badge, fmtDate, emptyState } from '../ui.js';
@@ -60,10 +60,7 @@ function allAttemptsTable(serviceId) {
   const rows = attempts.slice(0, 50).map((a) => {
     const meta = statusMeta[a.status] || { label: a.status, tone: 'slate' };
     const cluster = getClusterRegion(a.clusterId);
-    const runs = testRuns.filter((t) => t.attemptId === a.id);
-    const functional = runs.find((r) => r.suiteType === 'FUNCTIONAL');
-    const sanity = runs.find((r) => r.suiteType === 'SANITY');
-    const regression = runs.find((r) => r.suiteType === 'REGRESSION');
+    const { FUNCTIONAL: functional, SANITY: sanity, REGRESSION: regression } = attemptTests(a);
 
     const gates = [
       functional
@@ -119,11 +116,7 @@ function allAttemptsTable(serviceId) {
 
 function attemptRow(a) {
   const meta = statusMeta[a.status] || { label: a.status, tone: 'slate' };
-  const runs = testRuns.filter((t) => t.attemptId === a.id);
-
-  const func = runs.find((r) => r.suiteType === 'FUNCTIONAL');
-  const reg = runs.find((r) => r.suiteType === 'REGRESSION');
-  const san = runs.find((r) => r.suiteType === 'SANITY');
+  const { FUNCTIONAL: func, REGRESSION: reg, SANITY: san } = attemptTests(a);
 
   const gates = [
     func
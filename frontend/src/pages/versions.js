@@ -1,7 +1,7 @@
 import {
   services,
   currentRunning,
-  jiraTickets,
+  fetchJiraTickets,
 } from '../data.js';
 import { layout, sectionCard, badge } from '../ui.js';
 
@@ -12,18 +12,6 @@ function parseSemver(v) {
   return [Number(m[1]), Number(m[2]), Number(m[3])];
 }
 
-function cmpSemver(a, b) {
-  const pa = parseSemver(a);
-  const pb = parseSemver(b);
-  if (!pa && !pb) return String(a).localeCompare(String(b));
-  if (!pa) return -1;
-  if (!pb) return 1;
-  for (let i = 0; i < 3; i++) {
-    if (pa[i] !== pb[i]) return pa[i] - pb[i];
-  }
-  return 0;
-}
-
 /* ── Version matrix row ────────────────────────────────────── */
 function pipelineRow(serviceId) {
   const svc = services.find((s) => s.id === serviceId);
@@ -120,14 +108,7 @@ function jiraComparePanel() {
   `;
 }
 
-function renderJiraResults(serviceId, fromVer, toVer) {
-  const tickets = jiraTickets[serviceId] || [];
-  const matched = tickets.filter((t) => {
-    const v = cmpSemver(t.version, fromVer);
-    const v2 = cmpSemver(t.version, toVer);
-    return v > 0 && v2 <= 0;
-  });
-
+function renderJiraResults(fromVer, toVer, matched) {
   if (!matched.length) {
     return `<div class="text-sm text-slate-400 py-3">No Jira tickets found between v${fromVer} and v${toVer}.</div>`;
   }
@@ -160,6 +141,21 @@ function renderJiraResults(serviceId, fromVer, toVer) {
   `;
 }
 
+// Fetch the tickets in (fromVer, toVer] and render them into resultsDiv
+async function showJiraResults(resultsDiv, serviceId, fromVer, toVer) {
+  if (!parseSemver(fromVer) || !parseSemver(toVer)) {
+    resultsDiv.innerHTML = '<div class="text-sm text-rose-400 py-2">Versions must be in major.minor.patch form.</div>';
+    return;
+  }
+  resultsDiv.innerHTML = '<div class="text-sm text-slate-400 py-3">Loading tickets…</div>';
+  try {
+    const matched = await fetchJiraTickets(serviceId, fromVer, toVer);
+    resultsDiv.innerHTML = renderJiraResults(fromVer, toVer, matched);
+  } catch (err) {
+    resultsDiv.innerHTML = `<div class="text-sm text-rose-400 py-2">Could not load Jira tickets: ${err.message}</div>`;
+  }
+}
+
 /* ── Page render ───────────────────────────────────────────── */
 export function renderVersions() {
   const content = `
@@ -233,7 +229,7 @@ export function bindVersionsInteractions() {
         return;
       }
 
-      resultsDiv.innerHTML = renderJiraResults(serviceId, fromVer, toVer);
+      showJiraResults(resultsDiv, serviceId, fromVer, toVer);
     });
   }
 
@@ -265,7 +261,7 @@ export function bindVersionsInteractions() {
       const toVer = document.getElementById('jiraTo')?.value?.trim();
       const resultsDiv = document.getElementById('jiraResults');
       if (resultsDiv && fromVer && toVer) {
-        resultsDiv.innerHTML = renderJiraResults(svcId, fromVer, toVer);
+        showJiraResults(resultsDiv, svcId, fromVer, toVer);
       }
     });
   });
@@ -6,36 +6,246 @@ Routes:
   GET /v1/health
   GET /v1/qcd/clusters        → clusters, clusterRegions, clusterRegionRoles, currentRunning
   GET /v1/qcd/services        → services list
-  GET /v1/qcd/deployments     → deployment attempts
-  GET /v1/qcd/test-runs       → per-attempt test runs
+  GET /v1/qcd/deployments     → deployment attempts (paginated: limit, cursor, since, until)
+  GET /v1/qcd/test-runs       → per-attempt test runs (attemptId, suiteType, since, until)
   GET /v1/qcd/cluster-test-runs → cluster-level test runs
   GET /v1/qcd/scorecards      → weights + per-service scores
   GET /v1/qcd/promotions      → promotion records
-  GET /v1/qcd/jira-tickets    → jira tickets per service
+  GET /v1/qcd/jira-tickets    → jira tickets per service; with serviceId, fromVersion
+                                and toVersion, only tickets in (from, to], by version
   GET /v1/qcd/metadata        → suiteMeta + statusMeta
+  GET /v1/qcd/analytics       → daily rollups per (service, cluster)
+  GET /v1/qcd/current-state   → latest attempt + per-suite runs per (cluster, service)
+  GET /v1/qcd/failures        → FAILED/ROLLBACK attempts + failing test runs, newest first
+  GET /v1/qcd/changes         → change records after a token (since), with current items
+  GET /v1/qcd/history         → archived (TTL-expired) items of one kind over a day window
+  GET /v1/qcd/bootstrap       → clusters + services + metadata + scorecards
+                                + promotions + current state + recent failures
+                                + recent deployments + changesToken, in one call
+
+Collection routes (deployments, test-runs, cluster-test-runs, failures) also
+accept fields=a,b,c (read via ProjectionExpression) and format=columns
+(one array per field instead of one object per item).
 """
 
+import base64
+import gzip
+import hashlib
+import heapq
 import json
 import os
 import logging
+import re
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
 import boto3
 from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.transform import TransformationInjector
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+
+from mcq_common import (
+    INTERNAL_ATTRIBUTES, SCAN_MAX_SEGMENTS, Metrics, batch_get, scan_bounded, strip_keys,
+)
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource("dynamodb")
+# Bootstrap fans out on a thread pool; each task builds its own Table
+# from this resource, so all threads share one (thread-safe) client.
+BOOTSTRAP_WORKERS = int(os.environ.get("BOOTSTRAP_WORKERS", "10"))
+BOOTSTRAP_DEPLOYMENTS_PER_CLUSTER = int(
+    os.environ.get("BOOTSTRAP_DEPLOYMENTS_PER_CLUSTER", "200")
+)
+BOOTSTRAP_FAILURES = int(os.environ.get("BOOTSTRAP_FAILURES", "50"))
+
+# Full-table scans run as parallel segments (mcq_common.scan_iter);
+# SCAN_MAX_ITEMS bounds how many items a single scan may return; routes
+# that scan say whether they stopped there with complete.
+SCAN_MAX_ITEMS = int(os.environ.get("SCAN_MAX_ITEMS", "100000"))
+
+# BatchGetItem UnprocessedKeys and throttling errors are retried with
+# full-jitter backoff, up to DYNAMODB_MAX_ATTEMPTS tries
+DYNAMODB_MAX_ATTEMPTS = int(os.environ.get("DYNAMODB_MAX_ATTEMPTS", "6"))
+
+dynamodb = boto3.resource(
+    "dynamodb",
+    config=Config(max_pool_connections=BOOTSTRAP_WORKERS + SCAN_MAX_SEGMENTS),
+)
+s3 = boto3.client("s3", config=Config(max_pool_connections=BOOTSTRAP_WORKERS))
+
+
+class NumberDeserializer(TypeDeserializer):
+    """
+    Deserialize N attributes straight to int/float instead of Decimal,
+    so response bodies need no per-value encoder callback.
+    """
+
+    def _deserialize_n(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            number = float(value)
+            return int(number) if number.is_integer() else number
+
+
+# Swap the resource's output transform for one using NumberDeserializer;
+# inputs (keys, conditions) still go through the stock serializer.
+dynamodb.meta.client.meta.events.unregister(
+    "after-call.dynamodb", unique_id="dynamodb-attr-value-output",
+)
+dynamodb.meta.client.meta.events.register(
+    "after-call.dynamodb",
+    TransformationInjector(deserializer=NumberDeserializer()).inject_attribute_value_output,
+    unique_id="dynamodb-attr-value-output",
+)
 
 PLATFORM_TABLE = os.environ.get("PLATFORM_TABLE", "mcq-platform")
 DEPLOYMENTS_TABLE = os.environ.get("DEPLOYMENTS_TABLE", "mcq-deployments")
 TEST_RESULTS_TABLE = os.environ.get("TEST_RESULTS_TABLE", "mcq-test-results")
 SCORECARDS_TABLE = os.environ.get("SCORECARDS_TABLE", "mcq-scorecards")
+ANALYTICS_TABLE = os.environ.get("ANALYTICS_TABLE", "mcq-analytics")
+
+# Wildcard used in rollup keys for "all services" / "all clusters"
+ROLLUP_ALL = "*"
+
+# Shard count of suiteShard-index — must match qcd-processor
+TEST_RUN_SHARDS = int(os.environ.get("TEST_RUN_SHARDS", "8"))
+# Shard count of failures-index per kind — must match qcd-processor
+FAILURE_SHARDS = int(os.environ.get("FAILURE_SHARDS", "4"))
+
+# Upper bound for "anything after this prefix" in a range-key condition
+PREFIX_END = "\uffff"
+
+# fields= projection: attribute names a client may request
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+MAX_FIELDS = 32
+
+# Jira version ranges: semver parts zero-padded to this width form the
+# versionSort range key of serviceVersion-index — must match qcd-processor
+SEMVER = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
+VERSION_SORT_WIDTH = 6
+
+# Change feed (see "Change Feed" below). CHANGE_LOG_TTL_DAYS must match
+# qcd-processor; CHANGES_SETTLE_SECONDS is how far reads trail the clock
+CHANGE_LOG_TTL_DAYS = int(os.environ.get("CHANGE_LOG_TTL_DAYS", "7"))
+CHANGES_SETTLE_SECONDS = int(os.environ.get("CHANGES_SETTLE_SECONDS", "5"))
+CHANGES_MAX_ITEMS = int(os.environ.get("CHANGES_MAX_ITEMS", "1000"))
+CHANGE_ALL = "*"
+# Change-log partitions (CHANGELOG#<n>) — must match qcd-processor
+CHANGE_LOG_SHARDS = int(os.environ.get("CHANGE_LOG_SHARDS", "8"))
+
+# Change-log entity → table holding the items it names
+CHANGE_ENTITY_TABLES = {
+    "clusters": PLATFORM_TABLE,
+    "clusterRegions": PLATFORM_TABLE,
+    "clusterRegionRoles": PLATFORM_TABLE,
+    "services": PLATFORM_TABLE,
+    "currentRunning": PLATFORM_TABLE,
+    "promotions": PLATFORM_TABLE,
+    "suiteMeta": PLATFORM_TABLE,
+    "statusMeta": PLATFORM_TABLE,
+    "deploymentAttempts": DEPLOYMENTS_TABLE,
+    "testRuns": TEST_RESULTS_TABLE,
+    "clusterTestRuns": TEST_RESULTS_TABLE,
+    "scorecardWeights": SCORECARDS_TABLE,
+    "scorecards": SCORECARDS_TABLE,
+    "jiraTickets": SCORECARDS_TABLE,
+    "currentState": ANALYTICS_TABLE,
+}
+
+# Cold archive written by qcd-processor (s3://bucket/prefix or a local
+# directory); /v1/qcd/history reads at most HISTORY_MAX_DAYS partitions
+ARCHIVE_URI = os.environ.get("ARCHIVE_URI", "")
+HISTORY_MAX_DAYS = int(os.environ.get("HISTORY_MAX_DAYS", "92"))
+
+# kind -> (response key, date attribute, attributes identifying a record)
+HISTORY_KINDS = {
+    "deployments": ("deploymentAttempts", "startedAt", ("id",)),
+    "test-runs": ("testRuns", "executedAt", ("attemptId", "suiteType", "executedAt")),
+    "cluster-test-runs": ("clusterTestRuns", "executedAt", ("clusterId", "suiteType", "executedAt")),
+}
+HISTORY_FILTERS = ("clusterId", "serviceId", "attemptId", "suiteType")
+
+# Page size bounds for paginated routes
+DEFAULT_PAGE_LIMIT = int(os.environ.get("DEFAULT_PAGE_LIMIT", "500"))
+MAX_PAGE_LIMIT = int(os.environ.get("MAX_PAGE_LIMIT", "1000"))
+
+# Key attributes of a LastEvaluatedKey when paging a table (pk/sk) or
+# one of these indexes — a cursor must carry exactly those
+TABLE_KEYS = ("pk", "sk")
+INDEX_KEYS = {
+    "clusterId-index": ("clusterId", "sk"),
+    "serviceId-index": ("serviceId", "sk"),
+}
+
+
+# Warm-container response cache (see "Response Cache" below)
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "128"))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", "300"))
+
+# Response compression, negotiated from Accept-Encoding; bodies smaller
+# than COMPRESS_MIN_BYTES are sent as is
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", "6"))
+CONTENT_ENCODINGS = ("gzip", "deflate")
+
+# Data-version counters bumped by qcd-processor (platform table)
+DATA_VERSION_KEY = {"pk": "CONFIG#dataVersion", "sk": "META"}
+
+# Versioned routes → data-version categories their responses depend on.
+# Every route here gets an ETag; those in CACHED_ROUTES are also held in
+# the response cache (the large per-item collections are not).
+ROUTE_DEPENDENCIES = {
+    "/v1/qcd/clusters": ("platform",),
+    "/v1/qcd/services": ("platform",),
+    "/v1/qcd/promotions": ("platform",),
+    "/v1/qcd/metadata": ("platform",),
+    "/v1/qcd/scorecards": ("scorecards",),
+    "/v1/qcd/jira-tickets": ("scorecards",),
+    "/v1/qcd/deployments": ("deployments",),
+    "/v1/qcd/test-runs": ("testResults",),
+    "/v1/qcd/cluster-test-runs": ("testResults",),
+    "/v1/qcd/analytics": ("analytics",),
+    "/v1/qcd/current-state": ("analytics",),
+    "/v1/qcd/failures": ("deployments", "testResults"),
+    "/v1/qcd/bootstrap": ("platform", "scorecards", "deployments", "testResults", "analytics"),
+}
+# Response shapes change with the code, so ETags also cover a source hash
+with open(__file__, "rb") as _source:
+    CODE_VERSION = hashlib.sha256(_source.read()).hexdigest()[:12]
+
+# Every path handler serves; telemetry reports anything else as "unmatched"
+ROUTES = {"/v1/health", "/v1/qcd/history", "/v1/qcd/changes", *ROUTE_DEPENDENCIES}
+
+CACHED_ROUTES = {
+    "/v1/qcd/clusters",
+    "/v1/qcd/services",
+    "/v1/qcd/promotions",
+    "/v1/qcd/metadata",
+    "/v1/qcd/scorecards",
+    "/v1/qcd/analytics",
+    "/v1/qcd/current-state",
+    "/v1/qcd/failures",
+    "/v1/qcd/bootstrap",
+}
+
+
+class BadRequestError(ValueError):
+    """Raised by route helpers for invalid query parameters (→ HTTP 400)."""
 
 
 class DecimalEncoder(json.JSONEncoder):
-    """Handle DynamoDB Decimal types."""
+    """
+    Handle any Decimal that did not come through NumberDeserializer
+    (table reads are already int/float, so this is rarely called).
+    """
 
     def default(self, obj):
         if isinstance(obj, Decimal):
@@ -46,63 +256,98 @@ class DecimalEncoder(json.JSONEncoder):
 
 
 def handler(event, context):
-    """Main API handler — routes based on path."""
+    """Main API handler — routes, with one telemetry record per request."""
+    path = event.get("rawPath", "")
+    _metrics.start(path if path in ROUTES else "unmatched")
+    response = None
+    try:
+        response = _route(event)
+        return response
+    finally:
+        _metrics.emit(
+            context,
+            {"ResponseBytes": (len(response["body"]) if response else 0, "Bytes")},
+            statusCode=response["statusCode"] if response else 500,
+        )
+
+
+def _route(event):
+    """Dispatch on path; errors become 400/500 responses."""
     try:
         path = event.get("rawPath", "")
         query = event.get("queryStringParameters") or {}
+        headers = event.get("headers") or {}
 
         # QCD routes
         if path == "/v1/health":
             return _response(200, {"status": "healthy", "service": "mcq-dashboard"})
 
         elif path == "/v1/qcd/clusters":
-            return _qcd_clusters(query)
+            return _versioned(path, query, headers, _qcd_clusters)
 
         elif path == "/v1/qcd/services":
-            return _qcd_services(query)
+            return _versioned(path, query, headers, _qcd_services)
 
         elif path == "/v1/qcd/deployments":
-            return _qcd_deployments(query)
+            return _versioned(path, query, headers, _qcd_deployments)
 
         elif path == "/v1/qcd/test-runs":
-            return _qcd_test_runs(query)
+            return _versioned(path, query, headers, _qcd_test_runs)
 
         elif path == "/v1/qcd/cluster-test-runs":
-            return _qcd_cluster_test_runs(query)
+            return _versioned(path, query, headers, _qcd_cluster_test_runs)
 
         elif path == "/v1/qcd/scorecards":
-            return _qcd_scorecards(query)
+            return _versioned(path, query, headers, _qcd_scorecards)
 
         elif path == "/v1/qcd/promotions":
-            return _qcd_promotions(query)
+            return _versioned(path, query, headers, _qcd_promotions)
 
         elif path == "/v1/qcd/jira-tickets":
-            return _qcd_jira_tickets(query)
+            return _versioned(path, query, headers, _qcd_jira_tickets)
 
         elif path == "/v1/qcd/metadata":
-            return _qcd_metadata(query)
+            return _versioned(path, query, headers, _qcd_metadata)
+
+        elif path == "/v1/qcd/analytics":
+            return _versioned(path, query, headers, _qcd_analytics)
+
+        elif path == "/v1/qcd/current-state":
+            return _versioned(path, query, headers, _qcd_current_state)
+
+        elif path == "/v1/qcd/failures":
+            return _versioned(path, query, headers, _qcd_failures)
+
+        elif path == "/v1/qcd/bootstrap":
+            return _versioned(path, query, headers, _qcd_bootstrap)
+
+        elif path == "/v1/qcd/history":
+            # Reads the archive, not the tables, so it is not versioned
+            return _compress(_qcd_history(query), _accepted_encoding(headers))
+
+        elif path == "/v1/qcd/changes":
+            # Polled with a moving token, so neither versioned nor cached
+            return _compress(_qcd_changes(query), _accepted_encoding(headers))
 
         else:
             return _response(404, {"error": f"Route not found: {path}"})
 
+    except BadRequestError as e:
+        return _response(400, {"error": str(e)})
+
     except Exception as e:
         logger.exception("Unhandled error in dashboard API")
         return _response(500, {"error": "Internal server error"})
 
-
-# ── QCD Routes ───────────────────────────────────────────────
+    finally:
+        if _cache.hits or _cache.misses:
+            logger.info(
+                f"Response cache: hits={_cache.hits} misses={_cache.misses} "
+                f"entries={len(_cache.entries)} bytes={_cache.bytes}"
+            )
 
 
-def _scan_all(table, **kwargs):
-    """Paginated scan that returns all items."""
-    items = []
-    response = table.scan(**kwargs)
-    items.extend(response.get("Items", []))
-    while "LastEvaluatedKey" in response:
-        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
-        response = table.scan(**kwargs)
-        items.extend(response.get("Items", []))
-    return items
+# ── QCD Routes ───────────────────────────────────────────────
 
 
 def _query_all(table, **kwargs):
@@ -117,44 +362,169 @@ def _query_all(table, **kwargs):
     return items
 
 
-def _strip_keys(item):
-    """Remove DynamoDB pk/sk/itemType from response items."""
-    return {k: v for k, v in item.items() if k not in ("pk", "sk", "itemType")}
+def _query_page(table, query, partition=None, **kwargs):
+    """
+    Single page query/scan driven by the `limit` and `cursor` query params.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    Falls back to a Scan when no KeyConditionExpression is given.
+    partition ({attribute: value}) is the queried partition, which a
+    cursor must stay in.
+    """
+    kwargs["Limit"] = _parse_limit(query)
+    cursor = query.get("cursor")
+    if cursor:
+        key_names = set(TABLE_KEYS)
+        if "IndexName" in kwargs:
+            key_names.update(INDEX_KEYS[kwargs["IndexName"]])
+        key = _decode_cursor(cursor)
+        if set(key) != key_names or not all(isinstance(v, str) for v in key.values()) \
+                or any(key[name] != value for name, value in (partition or {}).items()):
+            raise BadRequestError("Invalid cursor")
+        kwargs["ExclusiveStartKey"] = key
+
+    if "KeyConditionExpression" in kwargs:
+        response = table.query(**kwargs)
+    else:
+        response = table.scan(**kwargs)
 
+    next_cursor = None
+    if "LastEvaluatedKey" in response:
+        next_cursor = _encode_cursor(response["LastEvaluatedKey"])
+    return response.get("Items", []), next_cursor
 
-def _qcd_clusters(query):
-    """Return clusters, clusterRegions, clusterRegionRoles, currentRunning."""
-    table = dynamodb.Table(PLATFORM_TABLE)
 
-    # Use itemType-index GSI to fetch by type
-    clusters = []
-    for item in _query_all(
-        table, IndexName="itemType-index",
-        KeyConditionExpression=Key("itemType").eq("CLUSTER"),
-    ):
-        clusters.append(_strip_keys(item))
+def _parse_limit(query, default=DEFAULT_PAGE_LIMIT):
+    """Validate the `limit` query param against `default`/MAX_PAGE_LIMIT."""
+    raw = query.get("limit")
+    if raw is None or raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise BadRequestError(f"Invalid limit: {raw}")
+    if limit < 1:
+        raise BadRequestError(f"Invalid limit: {raw}")
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def _encode_cursor(last_evaluated_key):
+    """Wrap a DynamoDB LastEvaluatedKey as an opaque URL-safe token."""
+    raw = json.dumps(last_evaluated_key, cls=DecimalEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """
+    Inverse of _encode_cursor — raises BadRequestError when the token is
+    not an encoded JSON object. Callers check the object's keys.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise BadRequestError("Invalid cursor")
+    if not isinstance(key, dict):
+        raise BadRequestError("Invalid cursor")
+    return key
+
+
+def _sk_range(since, until):
+    """
+    Key condition on sk (<startedAt>#<id>) for a [since, until) window.
+    `since` is inclusive; `until` is exclusive because every sk carries a
+    '#<id>' suffix and therefore sorts after the bare timestamp.
+    """
+    if since and until:
+        return Key("sk").between(since, until)
+    if since:
+        return Key("sk").gte(since)
+    if until:
+        return Key("sk").lt(until)
+    return None
+
+
+def _parse_fields(query):
+    """
+    Validate `fields=a,b,c` → ordered list of attribute names, or None
+    when absent. Storage-only attributes are never selectable.
+    """
+    raw = query.get("fields")
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    if not fields or len(fields) > MAX_FIELDS:
+        raise BadRequestError(f"Invalid fields: {raw}")
+    for name in fields:
+        if not FIELD_NAME.match(name) or name in INTERNAL_ATTRIBUTES:
+            raise BadRequestError(f"Invalid field: {name}")
+    return fields
+
+
+def _projection(fields, *required):
+    """
+    ProjectionExpression kwargs that read `fields` plus any attributes
+    the route itself needs (`required`); {} when no fields were given.
+    """
+    if fields is None:
+        return {}
+    names = list(dict.fromkeys([*fields, *required]))
+    return {
+        "ProjectionExpression": ", ".join(f"#p{i}" for i in range(len(names))),
+        "ExpressionAttributeNames": {f"#p{i}": name for i, name in enumerate(names)},
+    }
 
-    cluster_regions = []
-    for item in _query_all(
+
+def _collection(items, fields, query):
+    """
+    Response encoding of a collection: stripped items, narrowed to
+    `fields` if given; with format=columns, one array per field.
+    """
+    if fields is None:
+        rows = [strip_keys(i) for i in items]
+    else:
+        rows = [{f: i[f] for f in fields if f in i} for i in items]
+
+    fmt = query.get("format") or "rows"
+    if fmt == "rows":
+        return rows
+    if fmt != "columns":
+        raise BadRequestError(f"Invalid format: {fmt}")
+    columns = fields or list(dict.fromkeys(k for row in rows for k in row))
+    return {c: [row.get(c) for row in rows] for c in columns}
+
+
+def _load_item_type(item_type):
+    """All platform items of one itemType via the itemType-index GSI."""
+    table = dynamodb.Table(PLATFORM_TABLE)
+    return _query_all(
         table, IndexName="itemType-index",
-        KeyConditionExpression=Key("itemType").eq("CLUSTER_REGION"),
-    ):
-        cluster_regions.append(_strip_keys(item))
+        KeyConditionExpression=Key("itemType").eq(item_type),
+    )
+
+
+def _load_config(pk):
+    """Single CONFIG#<key> item from the platform table ({} if absent)."""
+    table = dynamodb.Table(PLATFORM_TABLE)
+    return table.get_item(Key={"pk": pk, "sk": "META"}).get("Item", {})
+
+
+def _current_running(items):
+    """Fold RUNNING items into {clusterRegionId: {serviceId: version}}."""
+    return {item.get("clusterRegionId", ""): item.get("versions", {})
+            for item in items}
+
+
+def _qcd_clusters(query):
+    """Return clusters, clusterRegions, clusterRegionRoles, currentRunning."""
+    clusters = [strip_keys(i) for i in _load_item_type("CLUSTER")]
+    cluster_regions = [strip_keys(i) for i in _load_item_type("CLUSTER_REGION")]
 
     # Cluster region roles from config item
-    roles_item = table.get_item(
-        Key={"pk": "CONFIG#clusterRegionRoles", "sk": "META"}
-    ).get("Item", {})
+    roles_item = _load_config("CONFIG#clusterRegionRoles")
     cluster_region_roles = roles_item.get("roles", {})
 
     # Current running versions
-    current_running = {}
-    for item in _query_all(
-        table, IndexName="itemType-index",
-        KeyConditionExpression=Key("itemType").eq("RUNNING"),
-    ):
-        cr_id = item.get("clusterRegionId", "")
-        current_running[cr_id] = item.get("versions", {})
+    current_running = _current_running(_load_item_type("RUNNING"))
 
     return _response(200, {
         "clusters": clusters,
@@ -166,127 +536,217 @@ def _qcd_clusters(query):
 
 def _qcd_services(query):
     """Return services list."""
-    table = dynamodb.Table(PLATFORM_TABLE)
-
-    services = []
-    for item in _query_all(
-        table, IndexName="itemType-index",
-        KeyConditionExpression=Key("itemType").eq("SERVICE"),
-    ):
-        services.append(_strip_keys(item))
-
+    services = [strip_keys(i) for i in _load_item_type("SERVICE")]
     return _response(200, {"services": services})
 
 
 def _qcd_deployments(query):
-    """Return deployment attempts. Optional filters: clusterId, serviceId."""
+    """
+    Return one page of deployment attempts. With clusterId and/or
+    serviceId the page is a Query, newest first; with neither it is a
+    Scan page and unordered.
+    Optional filters: clusterId, serviceId, since/until (ISO-8601 startedAt).
+    Pagination: limit (default DEFAULT_PAGE_LIMIT), cursor (from nextCursor).
+    """
     table = dynamodb.Table(DEPLOYMENTS_TABLE)
     cluster_id = query.get("clusterId")
     service_id = query.get("serviceId")
+    sk_cond = _sk_range(query.get("since"), query.get("until"))
+    fields = _parse_fields(query)
+    projection = _projection(fields)
 
     if cluster_id and service_id:
         # Direct pk query
-        pk = f"{cluster_id}#{service_id}"
-        items = _query_all(
-            table,
-            KeyConditionExpression=Key("pk").eq(pk),
-            ScanIndexForward=False,
-        )
+        partition = {"pk": f"{cluster_id}#{service_id}"}
+        kwargs = {}
     elif cluster_id:
-        items = _query_all(
-            table, IndexName="clusterId-index",
-            KeyConditionExpression=Key("clusterId").eq(cluster_id),
-            ScanIndexForward=False,
-        )
+        partition = {"clusterId": cluster_id}
+        kwargs = {"IndexName": "clusterId-index"}
     elif service_id:
-        items = _query_all(
-            table, IndexName="serviceId-index",
-            KeyConditionExpression=Key("serviceId").eq(service_id),
+        partition = {"serviceId": service_id}
+        kwargs = {"IndexName": "serviceId-index"}
+    else:
+        partition = None
+        kwargs = {}
+
+    if partition is not None:
+        ((name, value),) = partition.items()
+        key_cond = Key(name).eq(value)
+        if sk_cond is not None:
+            key_cond = key_cond & sk_cond
+        items, next_cursor = _query_page(
+            table, query, partition,
+            KeyConditionExpression=key_cond,
             ScanIndexForward=False,
+            **projection,
+            **kwargs,
         )
     else:
-        items = _scan_all(table)
+        # No partition to target — page through a scan, bounded by limit
+        if sk_cond is not None:
+            kwargs["FilterExpression"] = _sk_filter(query.get("since"), query.get("until"))
+        items, next_cursor = _query_page(table, query, **projection, **kwargs)
+
+    return _response(200, {
+        "deploymentAttempts": _collection(items, fields, query),
+        "nextCursor": next_cursor,
+    })
 
-    attempts = [_strip_keys(i) for i in items]
-    return _response(200, {"deploymentAttempts": attempts})
+
+def _sk_filter(since, until):
+    """FilterExpression counterpart of _sk_range for scans."""
+    if since and until:
+        return Attr("sk").between(since, until)
+    if since:
+        return Attr("sk").gte(since)
+    return Attr("sk").lt(until)
 
 
 def _qcd_test_runs(query):
-    """Return per-attempt test runs. Optional filter: attemptId, suiteType."""
+    """
+    Return per-attempt test runs. Optional filters: attemptId, suiteType,
+    since/until (ISO-8601 executedAt; since inclusive, until exclusive).
+    suiteType alone scatter-gathers the suiteShard-index shards and
+    returns runs in executedAt order. complete is False if the scan
+    without filters stopped at SCAN_MAX_ITEMS.
+    """
     table = dynamodb.Table(TEST_RESULTS_TABLE)
     attempt_id = query.get("attemptId")
     suite_type = query.get("suiteType")
+    since, until = query.get("since"), query.get("until")
+    fields = _parse_fields(query)
+    # executedAt drives the `until` cut-off and the shard merge
+    projection = _projection(fields, "executedAt")
 
     if attempt_id:
-        pk = f"ATTEMPT#{attempt_id}"
+        key_cond = Key("pk").eq(f"ATTEMPT#{attempt_id}")
+        kwargs = dict(projection)
         if suite_type:
-            items = _query_all(
-                table,
-                KeyConditionExpression=Key("pk").eq(pk) & Key("sk").begins_with(f"{suite_type}#"),
-            )
-        else:
-            items = _query_all(
-                table,
-                KeyConditionExpression=Key("pk").eq(pk),
-            )
+            key_cond &= _prefixed_range("sk", f"{suite_type}#", since, until)
+        elif since or until:
+            kwargs["FilterExpression"] = _executed_filter(since, until)
+        items = _query_all(table, KeyConditionExpression=key_cond, **kwargs)
+        complete = True
     elif suite_type:
-        items = _query_all(
-            table, IndexName="suiteType-index",
-            KeyConditionExpression=Key("suiteType").eq(suite_type),
-        )
+        items = _query_suite_shards(suite_type, since, until, projection)
+        complete = True
     else:
         # All test runs (ATTEMPT# prefix only)
-        items = _scan_all(
-            table,
-            FilterExpression=Attr("pk").begins_with("ATTEMPT#"),
+        filter_expr = Attr("pk").begins_with("ATTEMPT#")
+        if since or until:
+            filter_expr &= _executed_filter(since, until)
+        items, complete = scan_bounded(dynamodb, table, SCAN_MAX_ITEMS,
+                                       FilterExpression=filter_expr, **projection)
+
+    if until:
+        items = [i for i in items if i.get("executedAt", "") < until]
+    return _response(200, {"testRuns": _collection(items, fields, query), "complete": complete})
+
+
+def _query_suite_shards(suite_type, since, until, projection):
+    """
+    Query every <suiteType>#<n> shard of suiteShard-index in parallel
+    and merge the (individually executedAt-sorted) results in order.
+    """
+    range_cond = _prefixed_range("executedAt", "", since, until)
+
+    def query_shard(shard):
+        key_cond = Key("suiteShard").eq(f"{suite_type}#{shard}")
+        if range_cond is not None:
+            key_cond &= range_cond
+        return _query_all(
+            dynamodb.Table(TEST_RESULTS_TABLE), IndexName="suiteShard-index",
+            KeyConditionExpression=key_cond,
+            **{k: dict(v) if isinstance(v, dict) else v for k, v in projection.items()},
         )
 
-    runs = [_strip_keys(i) for i in items]
-    return _response(200, {"testRuns": runs})
+    with ThreadPoolExecutor(max_workers=min(TEST_RUN_SHARDS, BOOTSTRAP_WORKERS)) as pool:
+        shards = list(pool.map(query_shard, range(TEST_RUN_SHARDS)))
+    return list(heapq.merge(*shards, key=lambda i: i.get("executedAt", "")))
+
+
+def _prefixed_range(name, prefix, since, until):
+    """
+    Key condition for <prefix><timestamp> range keys over [since, until].
+    DynamoDB has no exclusive bound with a lower bound, so callers drop
+    items equal to `until` afterwards. One-sided ranges stay inside the
+    prefix (PREFIX_END sorts after any timestamp), so they never reach
+    keys of a neighbouring prefix.
+    """
+    if since and until:
+        return Key(name).between(prefix + since, prefix + until)
+    if since:
+        return Key(name).between(prefix + since, prefix + PREFIX_END) if prefix else Key(name).gte(since)
+    if until:
+        return Key(name).between(prefix, prefix + until) if prefix else Key(name).lt(until)
+    return Key(name).begins_with(prefix) if prefix else None
+
+
+def _executed_filter(since, until):
+    """FilterExpression counterpart of _prefixed_range on executedAt."""
+    if since and until:
+        return Attr("executedAt").between(since, until)
+    if since:
+        return Attr("executedAt").gte(since)
+    return Attr("executedAt").lt(until)
 
 
 def _qcd_cluster_test_runs(query):
-    """Return cluster-level test runs. Optional filter: clusterId."""
+    """
+    Return cluster-level test runs. Optional filter: clusterId.
+    complete is False if the scan without it stopped at SCAN_MAX_ITEMS.
+    """
     table = dynamodb.Table(TEST_RESULTS_TABLE)
     cluster_id = query.get("clusterId")
+    fields = _parse_fields(query)
+    projection = _projection(fields)
 
     if cluster_id:
         pk = f"CLUSTER#{cluster_id}"
         items = _query_all(
             table,
             KeyConditionExpression=Key("pk").eq(pk),
+            **projection,
         )
+        complete = True
     else:
-        items = _scan_all(
-            table,
+        items, complete = scan_bounded(
+            dynamodb, table, SCAN_MAX_ITEMS,
             FilterExpression=Attr("pk").begins_with("CLUSTER#"),
+            **projection,
         )
 
-    runs = [_strip_keys(i) for i in items]
-    return _response(200, {"clusterTestRuns": runs})
+    return _response(200, {
+        "clusterTestRuns": _collection(items, fields, query),
+        "complete": complete,
+    })
 
 
-def _qcd_scorecards(query):
-    """Return scorecard weights and per-service scores."""
+def _load_scorecards():
+    """Return (weights, {serviceId: scores}) from the scorecards table."""
     table = dynamodb.Table(SCORECARDS_TABLE)
 
     # Weights
     weights_item = table.get_item(
         Key={"pk": "WEIGHTS", "sk": "CURRENT"}
     ).get("Item", {})
-    weights = {k: v for k, v in weights_item.items() if k not in ("pk", "sk")}
+    weights = strip_keys(weights_item)
 
-    # Per-service scorecards
+    # Per-service scorecards (sparse itemType-index: scores only)
     scorecards = {}
-    items = _scan_all(
-        table,
-        FilterExpression=Attr("pk").begins_with("SERVICE#") & Attr("sk").eq("CURRENT"),
+    items = _query_all(
+        table, IndexName="itemType-index",
+        KeyConditionExpression=Key("itemType").eq("SCORECARD"),
     )
     for item in items:
         svc_id = item.get("serviceId", item["pk"].replace("SERVICE#", ""))
-        scorecards[svc_id] = {k: v for k, v in item.items()
-                              if k not in ("pk", "sk", "serviceId")}
+        scorecards[svc_id] = {k: v for k, v in strip_keys(item).items() if k != "serviceId"}
+    return weights, scorecards
+
 
+def _qcd_scorecards(query):
+    """Return scorecard weights and per-service scores."""
+    weights, scorecards = _load_scorecards()
     return _response(200, {
         "scorecardWeights": weights,
         "scorecards": scorecards,
@@ -295,32 +755,33 @@ def _qcd_scorecards(query):
 
 def _qcd_promotions(query):
     """Return promotion records."""
-    table = dynamodb.Table(PLATFORM_TABLE)
-
-    items = _query_all(
-        table, IndexName="itemType-index",
-        KeyConditionExpression=Key("itemType").eq("PROMOTION"),
-    )
-
-    promotions = [_strip_keys(i) for i in items]
+    promotions = [strip_keys(i) for i in _load_item_type("PROMOTION")]
     return _response(200, {"promotions": promotions})
 
 
 def _qcd_jira_tickets(query):
-    """Return jira tickets grouped by service."""
+    """
+    Return jira tickets grouped by service. With fromVersion/toVersion
+    (serviceId required), only that service's tickets released after
+    fromVersion up to and including toVersion, in version order.
+    """
     table = dynamodb.Table(SCORECARDS_TABLE)
     service_id = query.get("serviceId")
 
-    if service_id:
+    if "fromVersion" in query or "toVersion" in query:
+        items = _query_version_range(table, service_id,
+                                     query.get("fromVersion"), query.get("toVersion"))
+    elif service_id:
         items = _query_all(
             table,
             KeyConditionExpression=Key("pk").eq(f"SERVICE#{service_id}")
                                    & Key("sk").begins_with("JIRA#"),
         )
     else:
-        items = _scan_all(
-            table,
-            FilterExpression=Attr("sk").begins_with("JIRA#"),
+        # Sparse itemType-index: tickets only, ordered by service (pk)
+        items = _query_all(
+            table, IndexName="itemType-index",
+            KeyConditionExpression=Key("itemType").eq("JIRA_TICKET"),
         )
 
     # Group by service
@@ -329,41 +790,771 @@ def _qcd_jira_tickets(query):
         svc = item.get("serviceId", item["pk"].replace("SERVICE#", ""))
         if svc not in tickets:
             tickets[svc] = []
-        tickets[svc].append({k: v for k, v in item.items()
-                             if k not in ("pk", "sk", "serviceId")})
+        tickets[svc].append({k: v for k, v in strip_keys(item).items() if k != "serviceId"})
 
     return _response(200, {"jiraTickets": tickets})
 
 
+def _query_version_range(table, service_id, from_version, to_version):
+    """
+    One service's tickets with from_version < version <= to_version, via
+    serviceVersion-index (pk + zero-padded versionSort).
+    """
+    if not service_id or not from_version or not to_version:
+        raise BadRequestError("A version range needs serviceId, fromVersion and toVersion")
+    low, high = _version_sort(from_version), _version_sort(to_version)
+    if low is None or high is None:
+        raise BadRequestError(f"Invalid version range: {from_version}..{to_version}")
+    if low >= high:
+        return []
+    # versionSort values are fixed-width, so low + "~" sorts after low
+    # and before every greater version: an exclusive lower bound.
+    return _query_all(
+        table, IndexName="serviceVersion-index",
+        KeyConditionExpression=Key("pk").eq(f"SERVICE#{service_id}")
+                               & Key("versionSort").between(f"{low}~", high),
+    )
+
+
+def _version_sort(version):
+    """Zero-padded sort key of a semver version (as qcd-processor writes it), or None."""
+    match = SEMVER.match(version)
+    if not match or any(len(str(int(p))) > VERSION_SORT_WIDTH for p in match.groups()):
+        return None
+    return ".".join(f"{int(p):0{VERSION_SORT_WIDTH}d}" for p in match.groups())
+
+
 def _qcd_metadata(query):
     """Return suiteMeta and statusMeta."""
-    table = dynamodb.Table(PLATFORM_TABLE)
+    return _response(200, {
+        "suiteMeta": _load_config("CONFIG#suiteMeta").get("data", {}),
+        "statusMeta": _load_config("CONFIG#statusMeta").get("data", {}),
+    })
 
-    suite_item = table.get_item(
-        Key={"pk": "CONFIG#suiteMeta", "sk": "META"}
-    ).get("Item", {})
 
-    status_item = table.get_item(
-        Key={"pk": "CONFIG#statusMeta", "sk": "META"}
-    ).get("Item", {})
+def _qcd_analytics(query):
+    """
+    Return daily rollups for one (serviceId, clusterId) scope, oldest first.
+    Omitted or "ALL" filters select the all-services / all-clusters rollup.
+    Optional since/until (yyyy-mm-dd, inclusive) bound the day range.
+    """
+    table = dynamodb.Table(ANALYTICS_TABLE)
+    service_id = query.get("serviceId") or "ALL"
+    cluster_id = query.get("clusterId") or "ALL"
+    svc = ROLLUP_ALL if service_id == "ALL" else service_id
+    cluster = ROLLUP_ALL if cluster_id == "ALL" else cluster_id
+
+    key_cond = Key("pk").eq(f"ROLLUP#{svc}#{cluster}")
+    since, until = query.get("since"), query.get("until")
+    if since and until:
+        key_cond &= Key("sk").between(f"DAY#{since[:10]}", f"DAY#{until[:10]}")
+    elif since:
+        key_cond &= Key("sk").gte(f"DAY#{since[:10]}")
+    elif until:
+        key_cond &= Key("sk").lte(f"DAY#{until[:10]}")
+    else:
+        key_cond &= Key("sk").begins_with("DAY#")
+
+    days = []
+    for item in _query_all(table, KeyConditionExpression=key_cond):
+        tests = {}
+        for name, value in item.items():
+            if name.startswith("testTotal_"):
+                suite = name[len("testTotal_"):]
+                tests[suite] = {
+                    "passed": item.get(f"testPassed_{suite}", 0),
+                    "total": value,
+                }
+        days.append({
+            "day": item["day"],
+            "attempts": item.get("attempts", 0),
+            "success": item.get("success", 0),
+            "failed": item.get("failed", 0),
+            "rollback": item.get("rollback", 0),
+            "leadTimeSumSec": item.get("leadTimeSumSec", 0),
+            "leadTimeCount": item.get("leadTimeCount", 0),
+            "tests": tests,
+        })
 
     return _response(200, {
-        "suiteMeta": suite_item.get("data", {}),
-        "statusMeta": status_item.get("data", {}),
+        "serviceId": service_id,
+        "clusterId": cluster_id,
+        "days": days,
     })
 
 
+def _load_current_state(cluster_id=None):
+    """
+    CURRENT items (maintained by qcd-processor) folded into
+    {clusterId: {serviceId: {"attempt": {...}, "tests": {suiteType: run}}}}.
+    """
+    table = dynamodb.Table(ANALYTICS_TABLE)
+    key_cond = Key("pk").eq("CURRENT")
+    if cluster_id:
+        key_cond &= Key("sk").begins_with(f"{cluster_id}#")
+
+    state = {}
+    for item in _query_all(table, KeyConditionExpression=key_cond):
+        # Rebuilt items may still hold copies taken with storage attributes
+        state.setdefault(item["clusterId"], {})[item["serviceId"]] = {
+            "attempt": strip_keys(item.get("attempt", {})),
+            "tests": {suite: strip_keys(run) for suite, run in item.get("tests", {}).items()},
+        }
+    return state
+
+
+def _qcd_current_state(query):
+    """
+    Return the latest attempt and its newest run per suite for every
+    (cluster-region, service) in one Query. Optional filter: clusterId.
+    """
+    return _response(200, {
+        "currentState": _load_current_state(query.get("clusterId")),
+    })
+
+
+def _query_failures(table_name, kind, since, until, limit, projection):
+    """
+    Newest `limit` items of one kind (DEPLOYMENT / TEST_RUN) from a
+    table's sparse failures-index, optionally within [since, until) on
+    failedAt. Every <kind>#<n> shard is queried in parallel and the
+    (individually newest-first) results are merged.
+    Returns (items, complete) — complete is False if older ones remain.
+    """
+    def query_shard(shard):
+        key_cond = Key("failureType").eq(f"{kind}#{shard}")
+        if since and until:
+            key_cond &= Key("failedAt").between(since, until)
+        elif since:
+            key_cond &= Key("failedAt").gte(since)
+        elif until:
+            key_cond &= Key("failedAt").lt(until)
+        # One extra item per shard tells a full window from a truncated
+        # one, as in _recent_deployments
+        response = dynamodb.Table(table_name).query(
+            IndexName="failures-index",
+            KeyConditionExpression=key_cond,
+            ScanIndexForward=False,
+            Limit=limit + 1,
+            **{k: dict(v) if isinstance(v, dict) else v for k, v in projection.items()},
+        )
+        items = response.get("Items", [])
+        more = len(items) > limit or "LastEvaluatedKey" in response
+        if since and until:
+            # between() includes until; the window does not
+            items = [i for i in items if i.get("failedAt", "") < until]
+        return items, more
+
+    with ThreadPoolExecutor(max_workers=min(FAILURE_SHARDS, BOOTSTRAP_WORKERS)) as pool:
+        shards = list(pool.map(query_shard, range(FAILURE_SHARDS)))
+    items = list(heapq.merge(*(items for items, _ in shards),
+                             key=lambda i: i.get("failedAt", ""), reverse=True))
+    return items[:limit], len(items) <= limit and not any(more for _, more in shards)
+
+
+def _load_failures(since, until, limit, query=None):
+    """
+    FAILED/ROLLBACK attempts and failing test runs, newest first.
+    `query` carries the route's fields/format parameters, if any.
+    """
+    query = query or {}
+    fields = _parse_fields(query)
+    # failedAt drives the shard merge
+    projection = _projection(fields, "failedAt")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        attempts = pool.submit(_query_failures, DEPLOYMENTS_TABLE, "DEPLOYMENT",
+                               since, until, limit, projection)
+        runs = pool.submit(_query_failures, TEST_RESULTS_TABLE, "TEST_RUN",
+                           since, until, limit, projection)
+        attempt_items, attempts_complete = attempts.result()
+        run_items, runs_complete = runs.result()
+    return {
+        "deploymentAttempts": _collection(attempt_items, fields, query),
+        "testRuns": _collection(run_items, fields, query),
+        "complete": attempts_complete and runs_complete,
+    }
+
+
+def _qcd_failures(query):
+    """
+    Return failing deployment attempts (FAILED/ROLLBACK) and test runs
+    (failed > 0) from the sparse failures-index — cost is O(failures).
+    Optional: since/until (ISO-8601 startedAt / executedAt), limit (per kind).
+    """
+    return _response(200, _load_failures(
+        query.get("since"), query.get("until"), _parse_limit(query), query,
+    ))
+
+
+def _qcd_history(query):
+    """
+    Return archived items of one kind (deployments | test-runs |
+    cluster-test-runs, default deployments) for the days since..until
+    (yyyy-mm-dd, inclusive; until defaults to today), newest day first.
+    Only the dt= partitions of those days are read, one object at a time,
+    and reading stops at SCAN_MAX_ITEMS rows. Optional equality filters:
+    clusterId, serviceId, attemptId, suiteType; fields/format as on the
+    collection routes; cursor (from nextCursor) continues a capped page.
+    """
+    kind = query.get("kind") or "deployments"
+    if kind not in HISTORY_KINDS:
+        raise BadRequestError(f"Invalid kind: {kind}")
+    if not ARCHIVE_URI:
+        return _response(503, {"error": "History archive not configured"})
+    if not query.get("since"):
+        raise BadRequestError("since is required")
+    first = _parse_day(query["since"])
+    last = _parse_day(query.get("until") or datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+    span = (last - first).days + 1
+    if span < 1 or span > HISTORY_MAX_DAYS:
+        raise BadRequestError(f"since..until must cover 1 to {HISTORY_MAX_DAYS} days")
+    fields = _parse_fields(query)
+    key, date_attr, identity = HISTORY_KINDS[kind]
+    filters = {name: query[name] for name in HISTORY_FILTERS if query.get(name)}
+
+    resume = _history_cursor(query.get("cursor"), first, last)
+    if resume:
+        last = _parse_day(resume["day"])
+    days = [(last - timedelta(days=i)).strftime("%Y-%m-%d") for i in range((last - first).days + 1)]
+    # Listing is cheap and parallel; the objects themselves are read in
+    # order until the page is full
+    with ThreadPoolExecutor(max_workers=min(BOOTSTRAP_WORKERS, len(days))) as pool:
+        listings = pool.map(lambda day: _partition_objects(kind, day), days)
+
+        # Objects are named by write time — the last copy of a re-archived
+        # record on this page wins
+        rows = {}
+        next_cursor = None
+        for day, names in zip(days, listings):
+            for name in names:
+                skip = 0
+                if resume and day == resume["day"]:
+                    if name < resume["key"]:
+                        continue
+                    if name == resume["key"]:
+                        skip = resume["row"]
+                for n, line in enumerate(_object_lines(kind, day, name)):
+                    if n < skip or not line.strip():
+                        continue
+                    if len(rows) >= SCAN_MAX_ITEMS:
+                        next_cursor = _encode_cursor({"day": day, "key": name, "row": n})
+                        break
+                    row = json.loads(line)
+                    if all(row.get(attr) == value for attr, value in filters.items()):
+                        rows[tuple(row.get(attr) for attr in identity)] = row
+                if next_cursor:
+                    break
+            if next_cursor:
+                break
+
+    # Every row of a dt= partition has its day's date, so this keeps days in order
+    items = sorted(rows.values(), key=lambda r: r.get(date_attr, ""), reverse=True)
+    return _response(200, {
+        key: _collection(items, fields, query),
+        "complete": next_cursor is None,
+        "nextCursor": next_cursor,
+    })
+
+
+def _history_cursor(cursor, first, last):
+    """
+    Decode a /v1/qcd/history cursor — {day, key, row}: the archive object
+    and line the next page starts at. None without a cursor.
+    """
+    if not cursor:
+        return None
+    position = _decode_cursor(cursor)
+    if set(position) != {"day", "key", "row"} or not isinstance(position["day"], str) \
+            or not isinstance(position["key"], str) or type(position["row"]) is not int \
+            or position["row"] < 0:
+        raise BadRequestError("Invalid cursor")
+    try:
+        day = datetime.strptime(position["day"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise BadRequestError("Invalid cursor")
+    if not first <= day <= last:
+        raise BadRequestError("Invalid cursor")
+    return position
+
+
+def _parse_day(value):
+    """yyyy-mm-dd (or a full ISO timestamp) → datetime of that UTC day."""
+    try:
+        return datetime.strptime(value[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise BadRequestError(f"Invalid day: {value}")
+
+
+def _partition_prefix(kind, day):
+    """(bucket, key prefix) of one kind/dt=day partition in the S3 archive."""
+    bucket, _, prefix = ARCHIVE_URI[len("s3://"):].partition("/")
+    return bucket, "/".join(p for p in (prefix.strip("/"), kind, f"dt={day}") if p) + "/"
+
+
+def _partition_objects(kind, day):
+    """Object names of one kind/dt=day archive partition, in write order."""
+    if ARCHIVE_URI.startswith("s3://"):
+        bucket, partition = _partition_prefix(kind, day)
+        names = []
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=partition):
+            names.extend(obj["Key"][len(partition):] for obj in page.get("Contents", []))
+        return sorted(names)
+    directory = os.path.join(ARCHIVE_URI.removeprefix("file://"), kind, f"dt={day}")
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def _object_lines(kind, day, name):
+    """The JSONL lines of one archive object, decompressed as they are read."""
+    if ARCHIVE_URI.startswith("s3://"):
+        bucket, partition = _partition_prefix(kind, day)
+        body = s3.get_object(Bucket=bucket, Key=partition + name)["Body"]
+        with gzip.GzipFile(fileobj=body) as f:
+            yield from f
+    else:
+        directory = os.path.join(ARCHIVE_URI.removeprefix("file://"), kind, f"dt={day}")
+        with gzip.open(os.path.join(directory, name)) as f:
+            yield from f
+
+
+def _recent_deployments(cluster_id, limit, since):
+    """
+    Newest `limit` attempts for one cluster-region (clusterId-index).
+    Returns (items, complete) — complete is False if older attempts remain.
+    """
+    table = dynamodb.Table(DEPLOYMENTS_TABLE)
+    key_cond = Key("clusterId").eq(cluster_id)
+    if since:
+        key_cond &= Key("sk").gte(since)
+    # One extra item tells a full window from a truncated one: DynamoDB
+    # returns a LastEvaluatedKey whenever Limit is reached, so short of
+    # Limit one only means the 1 MB page cap cut the read
+    response = table.query(
+        IndexName="clusterId-index",
+        KeyConditionExpression=key_cond,
+        ScanIndexForward=False,
+        Limit=limit + 1,
+    )
+    items = response.get("Items", [])
+    return items[:limit], len(items) <= limit and "LastEvaluatedKey" not in response
+
+
+def _qcd_bootstrap(query):
+    """
+    Everything the frontend needs for first render in one invocation.
+    All reads run concurrently; recent deployments are fetched per
+    cluster-region as soon as the region list resolves, and for any
+    other cluster with a CURRENT item (one per cluster and service with
+    attempts) once the current state resolves.
+    Optional: limit (attempts per cluster-region), since (ISO startedAt).
+    deploymentsComplete is False when any cluster-region was truncated —
+    callers then page /v1/qcd/deployments per cluster or service for
+    older attempts.
+    """
+    limit = _parse_limit(query, default=BOOTSTRAP_DEPLOYMENTS_PER_CLUSTER)
+    since = query.get("since")
+    # Taken before any read, so changes made during the load are replayed
+    changes_token = _change_token(_changes_head())
+
+    with ThreadPoolExecutor(max_workers=BOOTSTRAP_WORKERS) as pool:
+        futures = {
+            "clusters": pool.submit(_load_item_type, "CLUSTER"),
+            "clusterRegions": pool.submit(_load_item_type, "CLUSTER_REGION"),
+            "running": pool.submit(_load_item_type, "RUNNING"),
+            "services": pool.submit(_load_item_type, "SERVICE"),
+            "promotions": pool.submit(_load_item_type, "PROMOTION"),
+            "roles": pool.submit(_load_config, "CONFIG#clusterRegionRoles"),
+            "suiteMeta": pool.submit(_load_config, "CONFIG#suiteMeta"),
+            "statusMeta": pool.submit(_load_config, "CONFIG#statusMeta"),
+            "scorecards": pool.submit(_load_scorecards),
+            "currentState": pool.submit(_load_current_state),
+            "failures": pool.submit(_load_failures, since, None, BOOTSTRAP_FAILURES),
+        }
+        cluster_regions = futures["clusterRegions"].result()
+        deployment_futures = {
+            cr["id"]: pool.submit(_recent_deployments, cr["id"], limit, since)
+            for cr in cluster_regions
+        }
+        # Attempts may name clusters the platform config doesn't list (yet)
+        for cluster_id in futures["currentState"].result():
+            if cluster_id not in deployment_futures:
+                deployment_futures[cluster_id] = pool.submit(
+                    _recent_deployments, cluster_id, limit, since)
+
+        attempts = []
+        complete = True
+        for f in deployment_futures.values():
+            items, cluster_complete = f.result()
+            attempts.extend(strip_keys(i) for i in items)
+            complete = complete and cluster_complete
+        weights, scorecards = futures["scorecards"].result()
+
+        body = {
+            "clusters": [strip_keys(i) for i in futures["clusters"].result()],
+            "clusterRegions": [strip_keys(i) for i in cluster_regions],
+            "clusterRegionRoles": futures["roles"].result().get("roles", {}),
+            "currentRunning": _current_running(futures["running"].result()),
+            "services": [strip_keys(i) for i in futures["services"].result()],
+            "promotions": [strip_keys(i) for i in futures["promotions"].result()],
+            "suiteMeta": futures["suiteMeta"].result().get("data", {}),
+            "statusMeta": futures["statusMeta"].result().get("data", {}),
+            "scorecardWeights": weights,
+            "scorecards": scorecards,
+            "currentState": futures["currentState"].result(),
+            "failures": futures["failures"].result(),
+            "deploymentAttempts": attempts,
+            "deploymentsComplete": complete,
+            "changesToken": changes_token,
+        }
+
+    return _response(200, body)
+
+
+# ── Change Feed ──────────────────────────────────────────────
+#
+# qcd-processor appends records (pk: CHANGELOG#<shard>, sk: <updatedAt>#...)
+# naming the keys each handler wrote; reads merge the shards by sk. /v1/qcd/changes returns the
+# records after a token, oldest first, with the current item for each
+# key, so clients apply deltas instead of reloading. Reads stop
+# CHANGES_SETTLE_SECONDS short of now and never issue a token past that
+# point: sks are stamped before the write commits, so a record can land
+# after a newer one, and a token already past it would skip it for good.
+# qcd-processor re-appends (fresh stamp) any record whose commit took
+# more than half the window, so every record is visible before the head
+# passes its sk.
+
+
+def _changes_head():
+    """Newest sk a change read may include (exclusive)."""
+    head = datetime.now(timezone.utc) - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+    return head.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def _change_token(sk):
+    """Opaque token for "everything up to and including sk"."""
+    return _encode_cursor({"sk": sk, "shards": CHANGE_LOG_SHARDS})
+
+
+def _qcd_changes(query):
+    """
+    Return changes after `since` (bootstrap's changesToken, or nextToken
+    from the previous call), oldest first, up to CHANGES_MAX_ITEMS keys.
+    Each change carries the item as it is now (null once it is gone);
+    entity "*" means everything changed and the client should reload.
+    more is True when a further call would return more changes.
+    Without since, returns no changes and a token for the current head.
+    Tokens older than the change log's TTL get 410 — reload instead.
+    """
+    head = _changes_head()
+    if not query.get("since"):
+        return _response(200, {"changes": [], "nextToken": _change_token(head), "more": False})
+
+    token = _decode_cursor(query["since"])
+    after = token.get("sk")
+    if not isinstance(after, str):
+        raise BadRequestError("Invalid since token")
+    if token.get("shards") != CHANGE_LOG_SHARDS:
+        # Issued against another shard layout; its position can't be trusted
+        return _response(410, {"error": "Change token expired; reload"})
+    horizon = datetime.now(timezone.utc) - timedelta(days=CHANGE_LOG_TTL_DAYS)
+    if after.split("#", 1)[0] < horizon.isoformat().replace("+00:00", "Z"):
+        return _response(410, {"error": "Change token expired; reload"})
+    if after >= head:
+        return _response(200, {"changes": [], "nextToken": query["since"], "more": False})
+
+    records, more = _read_change_log(after, head)
+
+    # Latest record wins when a key changed more than once
+    latest = {}
+    for record in records:
+        if record["entity"] == CHANGE_ALL:
+            latest[(CHANGE_ALL, "", "")] = record["updatedAt"]
+        for key in record.get("keys", []):
+            ref = (record["entity"], key["pk"], key["sk"])
+            latest.pop(ref, None)
+            latest[ref] = record["updatedAt"]
+
+    by_table = {}
+    for entity, pk, sk in latest:
+        if entity in CHANGE_ENTITY_TABLES:
+            by_table.setdefault(CHANGE_ENTITY_TABLES[entity], []).append({"pk": pk, "sk": sk})
+    with ThreadPoolExecutor(max_workers=max(1, len(by_table))) as pool:
+        found = {}
+        results = pool.map(lambda t: batch_get(dynamodb, t[0], t[1], DYNAMODB_MAX_ATTEMPTS),
+                           by_table.items())
+        for table, items in zip(by_table, results):
+            found.update({(table, pk, sk): item for (pk, sk), item in items.items()})
+
+    changes = []
+    for (entity, pk, sk), updated_at in latest.items():
+        change = {"entity": entity, "updatedAt": updated_at}
+        if entity != CHANGE_ALL:
+            item = found.get((CHANGE_ENTITY_TABLES.get(entity), pk, sk))
+            change["key"] = {"pk": pk, "sk": sk}
+            change["item"] = strip_keys(item) if item else None
+        changes.append(change)
+
+    return _response(200, {
+        "changes": changes,
+        "nextToken": _change_token(records[-1]["sk"] if more else head),
+        "more": more,
+    })
+
+
+def _read_change_log(after, head):
+    """
+    Change records with after < sk < head from every CHANGELOG#<n> shard,
+    merged in sk order, naming up to CHANGES_MAX_ITEMS keys (at least one
+    record). Returns (records, more); with more, the records end short of
+    head and the next read starts after the last one.
+    """
+    def read_shard(shard):
+        table = dynamodb.Table(ANALYTICS_TABLE)
+        kwargs = {"KeyConditionExpression":
+                  Key("pk").eq(f"CHANGELOG#{shard}") & Key("sk").between(after, head)}
+        records, keys = [], 0
+        while True:
+            response = table.query(**kwargs)
+            for record in response.get("Items", []):
+                if record["sk"] != after:
+                    records.append(record)
+                    keys += len(record.get("keys", []))
+            if "LastEvaluatedKey" not in response:
+                return records, False
+            if keys > CHANGES_MAX_ITEMS:
+                return records, True
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    with ThreadPoolExecutor(max_workers=min(CHANGE_LOG_SHARDS, BOOTSTRAP_WORKERS)) as pool:
+        shards = list(pool.map(read_shard, range(CHANGE_LOG_SHARDS)))
+
+    # A shard whose read stopped early is only complete up to its last record
+    cutoff = min((found[-1]["sk"] for found, truncated in shards if truncated), default=None)
+    records, budget, more = [], CHANGES_MAX_ITEMS, cutoff is not None
+    for record in heapq.merge(*(found for found, _ in shards), key=lambda r: r["sk"]):
+        if cutoff is not None and record["sk"] > cutoff:
+            break
+        if records and len(record.get("keys", [])) > budget:
+            more = True
+            break
+        records.append(record)
+        budget -= len(record.get("keys", []))
+    return records, more
+
+
+# ── Response Cache + ETags ───────────────────────────────────
+#
+# Module-level, so it survives warm invocations. Entries are keyed by
+# (path, query) and stamped with the data-version counters of the
+# categories in ROUTE_DEPENDENCIES; a single get_item of the version
+# item per request decides whether a cached body is still current.
+# CACHE_TTL_SECONDS is a safety net against a lost version bump.
+
+
+class _ResponseCache:
+    """Size-bounded LRU of serialized response bodies."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, stamp):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        entry_stamp, stored_at, response = entry
+        if entry_stamp != stamp or time.monotonic() - stored_at > CACHE_TTL_SECONDS:
+            self._evict(key)
+            return None
+        self.entries.move_to_end(key)
+        return response
+
+    def put(self, key, stamp, response):
+        size = len(response["body"])
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._evict(key)
+        self.entries[key] = (stamp, time.monotonic(), response)
+        self.bytes += size
+        while self.entries and (len(self.entries) > self.max_entries
+                                or self.bytes > self.max_bytes):
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, key):
+        _, _, response = self.entries.pop(key)
+        self.bytes -= len(response["body"])
+
+
+_cache = _ResponseCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+
+def _data_versions():
+    """Current data-version counters ({} if qcd-processor never ran)."""
+    table = dynamodb.Table(PLATFORM_TABLE)
+    return table.get_item(Key=DATA_VERSION_KEY).get("Item", {})
+
+
+def _versioned(path, query, headers, route_fn):
+    """
+    Serve a route whose body is a function of its data-version stamp.
+    The strong ETag hashes (path, query, stamp), so no body is hashed;
+    a matching If-None-Match gets a 304 before any table is read.
+    """
+    versions = _data_versions()
+    stamp = tuple(int(versions.get(c, 0)) for c in ROUTE_DEPENDENCIES[path])
+    query_key = tuple(sorted(query.items()))
+    encoding = _accepted_encoding(headers)
+    # Each content-coding is a distinct representation with its own ETag
+    etag = _etag(path, query_key, stamp, encoding)
+
+    if etag in _if_none_match(headers):
+        _metrics.properties["cache"] = "not-modified"
+        return _not_modified(etag)
+
+    def build():
+        return _compress(route_fn(query), encoding)
+
+    if path in CACHED_ROUTES:
+        response = _cached((path, query_key, encoding), stamp, build)
+    else:
+        response = build()
+
+    if response["statusCode"] == 200:
+        response["headers"]["ETag"] = etag
+    return response
+
+
+def _cached(key, stamp, build):
+    """Return build() through the response cache for (key, stamp)."""
+    response = _cache.get(key, stamp)
+    if response is not None:
+        _cache.hits += 1
+        _metrics.properties["cache"] = "hit"
+        return {**response, "headers": dict(response["headers"])}
+
+    _cache.misses += 1
+    _metrics.properties["cache"] = "miss"
+    response = build()
+    if response["statusCode"] == 200:
+        _cache.put(key, stamp, {**response, "headers": dict(response["headers"])})
+    return response
+
+
+def _etag(path, query_key, stamp, encoding=None):
+    """Strong ETag for a route + query (+ content-coding) at a data-version stamp."""
+    raw = json.dumps([CODE_VERSION, path, query_key, stamp, encoding], separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def _if_none_match(headers):
+    """Parse If-None-Match into a set of entity tags (weak prefixes kept)."""
+    value = headers.get("if-none-match") or headers.get("If-None-Match") or ""
+    return {tag.strip() for tag in value.split(",") if tag.strip()}
+
+
+def _accepted_encoding(headers):
+    """
+    Pick gzip or deflate from Accept-Encoding (q=0 excludes a coding),
+    or None for an uncompressed (identity) response.
+    """
+    value = headers.get("accept-encoding") or headers.get("Accept-Encoding") or ""
+    accepted = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        accepted[coding.strip().lower()] = q
+    wildcard = accepted.get("*", 0)
+    for coding in CONTENT_ENCODINGS:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def _compress(response, encoding):
+    """Encode a 200 response body with `encoding`, base64 for API Gateway."""
+    if response["statusCode"] != 200:
+        return response
+    response["headers"]["Vary"] = "Accept-Encoding"
+    body = response["body"]
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+    started = time.perf_counter()
+    raw = body.encode()
+    if encoding == "gzip":
+        packed = gzip.compress(raw, compresslevel=COMPRESS_LEVEL, mtime=0)
+    else:
+        packed = zlib.compress(raw, COMPRESS_LEVEL)
+    response["headers"]["Content-Encoding"] = encoding
+    response["body"] = base64.b64encode(packed).decode()
+    _metrics.serialize_seconds += time.perf_counter() - started
+    response["isBase64Encoded"] = True
+    return response
+
+
+# ── Telemetry ────────────────────────────────────────────────
+#
+# One CloudWatch Embedded Metric Format line per request, dimensioned by
+# Function + Route (a fixed set, so metric cardinality stays bounded):
+#   Duration        wall time of the invocation (ms)
+#   DynamoDbTime    time inside DynamoDB calls, summed over calls — with
+#                   parallel scan segments or bootstrap workers this can
+#                   exceed Duration
+#   SerializeTime   JSON encoding + compression of the response body
+#   OtherTime       Duration − DynamoDbTime − SerializeTime (floored at 0)
+#   DynamoDbCalls, Pages (Query/Scan pages), Items / ItemsWritten
+#   ReadCapacity, WriteCapacity (ConsumedCapacity totals, RCU/WCU)
+#   ResponseBytes   body as returned (compressed + base64 when encoded)
+# The DynamoDB figures come from botocore hooks on the shared client, so
+# every Table on every thread is counted without touching the callers.
+# METRICS_TRACE_SAMPLE_RATE of requests also log one line per DynamoDB call.
+# Metrics and the hooks live in mcq_common, shared with qcd-processor.
+
+_metrics = Metrics("dashboard-api", "Route")
+_metrics.register(dynamodb.meta.client)
+
+
 # ── Helpers ──────────────────────────────────────────────────
 
 
 def _response(status_code, body):
     """Build HTTP API v2 response."""
+    started = time.perf_counter()
+    encoded = json.dumps(body, cls=DecimalEncoder, separators=(",", ":"))
+    _metrics.serialize_seconds += time.perf_counter() - started
     return {
         "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Content-Type,Authorization",
-        },
-        "body": json.dumps(body, cls=DecimalEncoder),
+        "headers": _headers(),
+        "body": encoded,
+    }
+
+
+def _not_modified(etag):
+    """
+    Build an empty 304 response for a matching If-None-Match. It carries
+    the Vary of the 200 it stands for, so caches keep keying on coding.
+    """
+    headers = _headers()
+    headers["ETag"] = etag
+    headers["Vary"] = "Accept-Encoding"
+    return {"statusCode": 304, "headers": headers, "body": ""}
+
+
+def _headers():
+    """Common response headers."""
+    return {
+        "Content-Type": "application/json",
+        "Cache-Control": "no-cache",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Headers": "Content-Type,Authorization,If-None-Match",
+        "Access-Control-Expose-Headers": "ETag",
     }
@@ -1,6 +1,15 @@
 """
 Ingestion Handler Lambda
 Validates API key + JWT, schema-validates payload, publishes to EventBridge.
+
+Large array payloads (deploymentAttempts, testRuns, clusterTestRuns) are
+split into size-aware chunks — one EventBridge entry each, packed up to
+10 entries per put_events call. Every chunk carries the full envelope
+plus _metadata.chunk = {batchId, seq, count}.
+
+POST /v1/ingest/batch accepts {"envelopes": [{"type": ..., "data": {...}}]}
+— several ingest types in one request, one API-key check, shared
+put_events calls, and a per-envelope status in the response.
 """
 
 import json
@@ -9,8 +18,12 @@ import hashlib
 import time
 import logging
 import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+from collections import OrderedDict
 from datetime import datetime
 
+from mcq_common import METRICS_ENABLED, emf_line
+
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
@@ -29,6 +42,30 @@ INGEST_TYPES = {
     "scorecards": "dashboard.scorecards.updated",
 }
 
+# Array field that may be split across EventBridge entries, per type
+CHUNK_FIELDS = {
+    "deployments": "deploymentAttempts",
+    "test-results": "testRuns",
+    "cluster-test-results": "clusterTestRuns",
+}
+
+# EventBridge limits: 256 KB per entry / request, 10 entries per call.
+# MAX_ENTRY_BYTES leaves headroom for Source, DetailType and bus name.
+MAX_ENTRY_BYTES = int(os.environ.get("MAX_ENTRY_BYTES", str(250 * 1024)))
+MAX_REQUEST_BYTES = 256 * 1024
+MAX_ENTRIES_PER_CALL = 10
+PUT_EVENTS_MAX_ATTEMPTS = 3
+
+# Warm-container API-key cache, keyed by apiKeyHash. Valid keys are
+# cached for API_KEY_CACHE_TTL (never past their expiresAt); unknown or
+# inactive keys are cached for API_KEY_NEGATIVE_TTL to blunt floods.
+API_KEY_CACHE_TTL = float(os.environ.get("API_KEY_CACHE_TTL", "60"))
+API_KEY_NEGATIVE_TTL = float(os.environ.get("API_KEY_NEGATIVE_TTL", "30"))
+API_KEY_CACHE_MAX = int(os.environ.get("API_KEY_CACHE_MAX", "1024"))
+
+_key_cache = OrderedDict()  # apiKeyHash → (cached_until, item | None)
+_key_cache_stats = {"hits": 0, "misses": 0}
+
 REQUIRED_FIELDS = {
     "platform-config": ["accountId"],
     "deployments": ["accountId", "deploymentAttempts"],
@@ -49,15 +86,16 @@ def handler(event, context):
         # Determine ingestion type from path (use last segment to avoid substring issues)
         path = event.get("rawPath", "")
         path_suffix = path.rstrip("/").rsplit("/", 1)[-1]
+        is_batch = path_suffix == "batch"
         ingest_type = INGEST_TYPES.get(path_suffix) and path_suffix or None
-        if not ingest_type:
+        if not ingest_type and not is_batch:
             # Fallback: check if path_suffix is a known type
             for key in INGEST_TYPES:
                 if path.endswith(f"/{key}"):
                     ingest_type = key
                     break
 
-        if not ingest_type:
+        if not ingest_type and not is_batch:
             return _response(400, {"error": f"Unknown ingestion path: {path}"})
 
         # Validate API key
@@ -78,50 +116,26 @@ def handler(event, context):
         else:
             payload = body
 
-        # Validate required fields
-        missing = [f for f in REQUIRED_FIELDS.get(ingest_type, []) if f not in payload]
-        if missing:
-            return _response(400, {"error": f"Missing required fields: {missing}"})
-
-        # Verify accountId matches the API key's registered account
-        payload_account = payload.get("accountId", "")
-        key_account = key_record.get("accountId", "")
-        if payload_account != key_account:
-            logger.warning(
-                f"Account mismatch: payload={payload_account}, key={key_account}"
-            )
-            return _response(403, {"error": "Account ID does not match API key"})
-
-        # Enrich payload
-        payload["_metadata"] = {
-            "receivedAt": datetime.utcnow().isoformat() + "Z",
-            "ingestType": ingest_type,
-            "sourceIp": event.get("requestContext", {})
-            .get("http", {})
-            .get("sourceIp", "unknown"),
-            "requestId": context.aws_request_id,
-        }
+        if is_batch:
+            return _ingest_batch(payload, key_record, event, context)
 
-        # Publish to EventBridge
-        detail_type = INGEST_TYPES[ingest_type]
-        response = eventbridge.put_events(
-            Entries=[
-                {
-                    "Source": "mcq.dashboard.ingestion",
-                    "DetailType": detail_type,
-                    "Detail": json.dumps(payload),
-                    "EventBusName": EVENT_BUS_NAME,
-                }
-            ]
+        status, error, details = _prepare(
+            ingest_type, payload, key_record, event, context, context.aws_request_id
         )
+        if error:
+            return _response(status, {"error": error})
 
-        failed = response.get("FailedEntryCount", 0)
-        if failed > 0:
-            logger.error(f"EventBridge put_events failed: {response}")
-            return _response(500, {"error": "Failed to publish event"})
+        entries = _entries(INGEST_TYPES[ingest_type], details)
+        failed = _publish(entries)
+        if failed:
+            return _response(500, {
+                "error": "Failed to publish event",
+                "failedEntries": len(failed),
+                "totalEntries": len(entries),
+            })
 
         logger.info(
-            f"Ingested {ingest_type} data from account {payload_account}"
+            f"Ingested {ingest_type} data from account {payload.get('accountId', '')}"
         )
 
         return _response(
@@ -130,6 +144,7 @@ def handler(event, context):
                 "message": "Data ingested successfully",
                 "type": ingest_type,
                 "requestId": context.aws_request_id,
+                "events": len(details),
             },
         )
 
@@ -138,27 +153,293 @@ def handler(event, context):
         return _response(500, {"error": "Internal server error"})
 
 
+def _prepare(ingest_type, payload, key_record, event, context, batch_id):
+    """
+    Validate one payload against its type and the API key, enrich it with
+    _metadata, and serialize it into EventBridge Detail strings.
+    Returns (status, error, details); error is None when valid.
+    """
+    if not isinstance(payload, dict):
+        return 400, "Payload must be a JSON object", []
+
+    # Validate required fields
+    missing = [f for f in REQUIRED_FIELDS.get(ingest_type, []) if f not in payload]
+    if missing:
+        return 400, f"Missing required fields: {missing}", []
+
+    # Verify accountId matches the API key's registered account
+    payload_account = payload.get("accountId", "")
+    key_account = key_record.get("accountId", "")
+    if payload_account != key_account:
+        logger.warning(
+            f"Account mismatch: payload={payload_account}, key={key_account}"
+        )
+        return 403, "Account ID does not match API key", []
+
+    # Enrich payload
+    payload["_metadata"] = {
+        "receivedAt": datetime.utcnow().isoformat() + "Z",
+        "ingestType": ingest_type,
+        "sourceIp": event.get("requestContext", {})
+        .get("http", {})
+        .get("sourceIp", "unknown"),
+        "requestId": context.aws_request_id,
+    }
+
+    try:
+        details = _chunk_details(ingest_type, payload, batch_id)
+    except ValueError as e:
+        return 413, str(e), []
+    return 200, None, details
+
+
+def _ingest_batch(body, key_record, event, context):
+    """
+    Validate every envelope, then publish all valid ones together.
+    Responds 200 when every envelope published, 207 with details when
+    only some did, and — when none did — 502 if any publish failed,
+    else 400 (every envelope was rejected).
+    """
+    envelopes = body.get("envelopes") if isinstance(body, dict) else None
+    if not isinstance(envelopes, list) or not envelopes:
+        return _response(400, {"error": "Body must contain a non-empty 'envelopes' list"})
+
+    results = []
+    entries = []
+    owners = []  # entry index → envelope index
+    for i, envelope in enumerate(envelopes):
+        ingest_type = envelope.get("type") if isinstance(envelope, dict) else None
+        if ingest_type not in INGEST_TYPES:
+            results.append({"index": i, "type": ingest_type, "status": 400,
+                            "error": f"Unknown ingestion type: {ingest_type}"})
+            continue
+
+        status, error, details = _prepare(
+            ingest_type, envelope.get("data"), key_record, event, context,
+            f"{context.aws_request_id}:{i}",
+        )
+        result = {"index": i, "type": ingest_type, "status": status}
+        if error:
+            result["error"] = error
+        else:
+            result["events"] = len(details)
+            for entry in _entries(INGEST_TYPES[ingest_type], details):
+                entries.append(entry)
+                owners.append(i)
+        results.append(result)
+
+    for entry_index in _publish(entries):
+        result = results[owners[entry_index]]
+        result["status"] = 500
+        result["error"] = "Failed to publish event"
+
+    ok = sum(1 for r in results if r["status"] == 200)
+    logger.info(
+        f"Batch ingest from account {key_record.get('accountId', '')}: "
+        f"{ok}/{len(results)} envelopes, {len(entries)} events"
+    )
+    if ok == len(results):
+        status = 200
+    elif ok:
+        status = 207
+    elif any(r["status"] == 500 for r in results):
+        status = 502
+    else:
+        status = 400
+    return _response(status, {
+        "message": f"{ok} of {len(results)} envelopes ingested",
+        "requestId": context.aws_request_id,
+        "results": results,
+    })
+
+
+def _chunk_details(ingest_type: str, payload: dict, batch_id: str) -> list[str]:
+    """
+    Serialize payload into one or more EventBridge Detail strings, each
+    under MAX_ENTRY_BYTES. Only the CHUNK_FIELDS array is split; every
+    chunk repeats the rest of the envelope. Raises ValueError if a
+    single record (or a non-chunkable payload) cannot fit in one entry.
+    """
+    detail = json.dumps(payload, separators=(",", ":"))
+    if len(detail.encode()) <= MAX_ENTRY_BYTES:
+        return [detail]
+
+    field = CHUNK_FIELDS.get(ingest_type)
+    if not field:
+        raise ValueError(
+            f"{ingest_type} payload exceeds {MAX_ENTRY_BYTES} bytes; "
+            "split it into smaller pushes"
+        )
+
+    # Serialize each record once and pack greedily by encoded size
+    records = [json.dumps(r, separators=(",", ":")) for r in payload[field]]
+    envelope = {k: v for k, v in payload.items() if k != field}
+    envelope["_metadata"] = {
+        **payload.get("_metadata", {}),
+        "chunk": {"batchId": batch_id, "seq": 999999, "count": 999999},
+    }
+    base = len(json.dumps({**envelope, field: []}, separators=(",", ":")).encode())
+
+    chunks, current, size = [], [], base
+    for record in records:
+        record_size = len(record.encode()) + 1  # trailing comma
+        if base + record_size > MAX_ENTRY_BYTES:
+            raise ValueError(f"A single {field} record exceeds {MAX_ENTRY_BYTES} bytes")
+        if current and size + record_size > MAX_ENTRY_BYTES:
+            chunks.append(current)
+            current, size = [], base
+        current.append(record)
+        size += record_size
+    if current:
+        chunks.append(current)
+
+    details = []
+    for seq, chunk in enumerate(chunks):
+        envelope["_metadata"]["chunk"] = {
+            "batchId": batch_id, "seq": seq, "count": len(chunks),
+        }
+        # field is the last key, so the JSON ends in '[]}' — splice the
+        # pre-serialized records into that empty array
+        head = json.dumps({**envelope, field: []}, separators=(",", ":"))
+        details.append(head[:-3] + "[" + ",".join(chunk) + "]}")
+    return details
+
+
+def _entries(detail_type: str, details: list[str]) -> list[dict]:
+    """Wrap Detail strings as put_events entries for one detail-type."""
+    return [
+        {
+            "Source": "mcq.dashboard.ingestion",
+            "DetailType": detail_type,
+            "Detail": detail,
+            "EventBusName": EVENT_BUS_NAME,
+        }
+        for detail in details
+    ]
+
+
+def _publish(entries: list[dict]) -> list[int]:
+    """
+    put_events in calls of up to 10 entries / MAX_REQUEST_BYTES, retrying
+    failed entries. A call that raises (throttled, network) fails every
+    entry in it, without affecting calls already made. Returns indexes
+    (into `entries`) that never published.
+    """
+    failed = []
+    for batch in _pack_entries(list(enumerate(entries))):
+        for attempt in range(PUT_EVENTS_MAX_ATTEMPTS):
+            try:
+                response = eventbridge.put_events(Entries=[entry for _, entry in batch])
+            except (BotoCoreError, ClientError) as e:
+                logger.warning(
+                    f"put_events attempt {attempt + 1}: call for {len(batch)} entries failed: {e}"
+                )
+            else:
+                if response.get("FailedEntryCount", 0) == 0:
+                    batch = []
+                    break
+                # Results are positional; keep only entries that errored
+                batch = [item for item, result in zip(batch, response["Entries"])
+                         if result.get("ErrorCode")]
+                logger.warning(
+                    f"put_events attempt {attempt + 1}: {len(batch)} entries failed"
+                )
+            if attempt < PUT_EVENTS_MAX_ATTEMPTS - 1:
+                time.sleep(0.1 * 2 ** attempt)
+        if batch:
+            logger.error(f"EventBridge put_events failed for {len(batch)} entries")
+            failed.extend(index for index, _ in batch)
+    return failed
+
+
+def _pack_entries(entries: list[tuple[int, dict]]) -> list[list[tuple[int, dict]]]:
+    """Group (index, entry) pairs into put_events calls by count and size."""
+    calls, current, size = [], [], 0
+    for index, entry in entries:
+        entry_size = (len(entry["Source"]) + len(entry["DetailType"])
+                      + len(entry["Detail"].encode()))
+        if current and (len(current) == MAX_ENTRIES_PER_CALL
+                        or size + entry_size > MAX_REQUEST_BYTES):
+            calls.append(current)
+            current, size = [], 0
+        current.append((index, entry))
+        size += entry_size
+    if current:
+        calls.append(current)
+    return calls
+
+
 def _validate_api_key(api_key: str) -> dict | None:
-    """Validate API key against DynamoDB."""
+    """Validate API key against DynamoDB (via the warm-container cache)."""
+    started = time.perf_counter()
     api_key_hash = hashlib.sha256(api_key.encode()).hexdigest()
-    table = dynamodb.Table(API_KEYS_TABLE)
+    now = time.time()
 
+    cached = _key_cache.get(api_key_hash)
+    if cached and cached[0] > now:
+        _key_cache.move_to_end(api_key_hash)
+        _key_cache_stats["hits"] += 1
+        _log_key_lookup("hit", started)
+        return cached[1]
+
+    _key_cache_stats["misses"] += 1
+    table = dynamodb.Table(API_KEYS_TABLE)
     try:
         result = table.get_item(Key={"apiKeyHash": api_key_hash})
-        item = result.get("Item")
-        if not item:
-            return None
-        if item.get("status") != "active":
-            return None
-        # Check expiry
-        expires_at = item.get("expiresAt", 0)
-        if expires_at and time.time() > float(expires_at):
-            return None
-        return item
     except Exception as e:
+        # Not cached — a transient error must not lock out a valid key
         logger.error(f"Error validating API key: {e}")
+        _log_key_lookup("error", started)
         return None
 
+    item = result.get("Item")
+    valid = bool(item) and item.get("status") == "active"
+    # Check expiry
+    expires_at = float(item.get("expiresAt", 0) or 0) if item else 0
+    if valid and expires_at and now > expires_at:
+        valid = False
+
+    if valid:
+        cached_until = now + API_KEY_CACHE_TTL
+        if expires_at:
+            cached_until = min(cached_until, expires_at)
+        _cache_key(api_key_hash, cached_until, item)
+    else:
+        item = None
+        _cache_key(api_key_hash, now + API_KEY_NEGATIVE_TTL, None)
+
+    _log_key_lookup("miss", started)
+    return item
+
+
+def _cache_key(api_key_hash: str, cached_until: float, item: dict | None):
+    """Insert into the LRU key cache, evicting the oldest past the bound."""
+    _key_cache[api_key_hash] = (cached_until, item)
+    _key_cache.move_to_end(api_key_hash)
+    while len(_key_cache) > API_KEY_CACHE_MAX:
+        _key_cache.popitem(last=False)
+
+
+def _log_key_lookup(outcome: str, started: float):
+    """
+    One EMF line per lookup, dimensioned by Function: ApiKeyLookupTime (ms)
+    and ApiKeyCacheHit (1 on a hit, else 0 — its Average is the hit rate).
+    The outcome (hit / miss / error) and this container's running counts
+    ride along as properties.
+    """
+    if not METRICS_ENABLED:
+        return
+    hits, misses = _key_cache_stats["hits"], _key_cache_stats["misses"]
+    print(emf_line(
+        {"Function": "ingestion-handler"},
+        {
+            "ApiKeyLookupTime": (round((time.perf_counter() - started) * 1000, 3), "Milliseconds"),
+            "ApiKeyCacheHit": (int(outcome == "hit"), "Count"),
+        },
+        outcome=outcome, containerHits=hits, containerMisses=misses,
+        cacheEntries=len(_key_cache),
+    ), flush=True)
+
 
 def _response(status_code: int, body: dict) -> dict:
     """Build HTTP API v2 response."""
@@ -2,55 +2,207 @@
 QCD Processor Lambda
 Processes Quality Center Dashboard events from EventBridge and writes to DynamoDB.
 Handles: deployments, test-results, cluster-test-results, scorecards, platform-config
+
+Deployments and test results also maintain daily analytics rollups in the
+analytics table (see "Analytics Rollups" below). Every handler appends the
+keys it wrote to the change log read by /v1/qcd/changes (see "Change Log").
+
+Also consumes the deployments/test-results DynamoDB streams, archiving
+items removed by TTL to date-partitioned JSONL (see "Cold Archive"), and
+the qcd-events SQS queue, which buffers bursty pushes so one invocation
+handles a batch of events (see "Queue Batches").
 """
 
+import functools
+import gzip
+import hashlib
 import json
 import os
 import logging
-from datetime import datetime
+import random
+import re
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from decimal import Decimal
 
 import boto3
+from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from mcq_common import (
+    SCAN_MAX_SEGMENTS, Metrics, backoff, batch_get, scan_all, strip_keys, with_backoff,
+)
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-dynamodb = boto3.resource("dynamodb")
+# Bulk upserts run on a bounded thread pool; each task builds its own
+# Table from this resource, so all threads share one (thread-safe) client.
+UPSERT_WORKERS = int(os.environ.get("UPSERT_WORKERS", "16"))
+UPSERT_MAX_ATTEMPTS = int(os.environ.get("UPSERT_MAX_ATTEMPTS", "6"))
+
+dynamodb = boto3.resource(
+    "dynamodb", config=Config(max_pool_connections=UPSERT_WORKERS + SCAN_MAX_SEGMENTS)
+)
+s3 = boto3.client("s3")
 
 PLATFORM_TABLE = os.environ.get("PLATFORM_TABLE", "mcq-platform")
 DEPLOYMENTS_TABLE = os.environ.get("DEPLOYMENTS_TABLE", "mcq-deployments")
 TEST_RESULTS_TABLE = os.environ.get("TEST_RESULTS_TABLE", "mcq-test-results")
 SCORECARDS_TABLE = os.environ.get("SCORECARDS_TABLE", "mcq-scorecards")
+ANALYTICS_TABLE = os.environ.get("ANALYTICS_TABLE", "mcq-analytics")
+
+# Wildcard used in rollup keys for "all services" / "all clusters"
+ROLLUP_ALL = "*"
+
+# Per-attempt test runs are spread over TEST_RUN_SHARDS partitions of
+# suiteShard-index (suiteShard = <suiteType>#<n>). dashboard-api reads
+# the same setting, so change both together and rerun the rebuild.
+TEST_RUN_SHARDS = int(os.environ.get("TEST_RUN_SHARDS", "8"))
+
+# Failures are spread the same way over FAILURE_SHARDS partitions of
+# failures-index per kind (failureType = <DEPLOYMENT|TEST_RUN>#<n>), so a
+# burst of failures does not land on one partition. dashboard-api reads
+# the same setting; change both together and rerun the rebuild.
+FAILURE_SHARDS = int(os.environ.get("FAILURE_SHARDS", "4"))
+
+# Run fields copied into a deployment item's testSummary[suiteType]
+TEST_SUMMARY_FIELDS = ("passed", "failed", "total", "durationSec", "executedAt")
+
+# Change log records expire (TTL) after CHANGE_LOG_TTL_DAYS; dashboard-api
+# reads the same setting to reject older change tokens
+CHANGE_LOG_TTL_DAYS = int(os.environ.get("CHANGE_LOG_TTL_DAYS", "7"))
+CHANGE_LOG_KEYS_PER_RECORD = 500
+# Records spread over CHANGELOG#<n> partitions (must match dashboard-api,
+# which merges them on read) so appends never pile onto one partition
+CHANGE_LOG_SHARDS = int(os.environ.get("CHANGE_LOG_SHARDS", "8"))
+# dashboard-api reads the change log CHANGES_SETTLE_SECONDS behind the clock
+# (must match). An append that commits more than half that after its sk
+# stamp is re-appended with a fresh stamp, at most CHANGE_LOG_MAX_APPENDS times.
+CHANGES_SETTLE_SECONDS = int(os.environ.get("CHANGES_SETTLE_SECONDS", "5"))
+CHANGE_LOG_MAX_APPENDS = 3
+# Entity of a change record meaning "everything may have changed"
+CHANGE_ALL = "*"
+
+# Hot/cold tiering: deployments and test runs carry expiresAt (TTL) this
+# many days after their startedAt/executedAt (0 keeps them forever).
+# Items removed by TTL are archived to ARCHIVE_URI — s3://bucket/prefix,
+# or a local directory (file:///path) for tests.
+HOT_RETENTION_DAYS = int(os.environ.get("HOT_RETENTION_DAYS", "0"))
+ARCHIVE_URI = os.environ.get("ARCHIVE_URI", "")
+
+# Jira tickets carry versionSort — their version with each semver part
+# zero-padded to VERSION_SORT_WIDTH digits, so string order is version
+# order — the range key of serviceVersion-index. dashboard-api pads its
+# bounds the same way. Non-semver versions get no versionSort.
+SEMVER = re.compile(r"^(\d+)\.(\d+)\.(\d+)$")
+VERSION_SORT_WIDTH = 6
+
+# Delta ingestion: skip items whose content hash matches the last push.
+# A payload can bypass it with "forceWrite": true.
+DELTA_INGESTION = os.environ.get("DELTA_INGESTION", "true").lower() == "true"
 
 # Map detail-type → handler function
 HANDLERS = {}
 
+# detail-type → (collection, item key fields) for handlers whose detail is
+# one list of items; queued events of these types are coalesced
+COALESCE = {}
+
+# Data-version counters read by dashboard-api to invalidate its cache.
+# One item in the platform table, one Number attribute per category.
+DATA_VERSION_KEY = {"pk": "CONFIG#dataVersion", "sk": "META"}
 
-def handles(detail_type):
-    """Decorator to register a handler for a detail-type."""
+
+def handles(detail_type, bumps=(), coalesce=None):
+    """
+    Decorator to register a handler for a detail-type.
+    `bumps` lists the data-version categories the handler writes to;
+    they are incremented after the handler completes successfully,
+    unless it reports {"unchanged": True} (a no-op delta push).
+    `coalesce` is (collection, key fields): queued events of this type
+    may be merged into one detail, deduplicating items by those fields.
+    """
     def decorator(fn):
-        HANDLERS[detail_type] = fn
-        return fn
+        @functools.wraps(fn)
+        def wrapper(detail):
+            result = fn(detail)
+            if bumps and not result.get("unchanged"):
+                _bump_data_version(bumps)
+            return result
+        HANDLERS[detail_type] = wrapper
+        if coalesce:
+            COALESCE[detail_type] = coalesce
+        return wrapper
     return decorator
 
 
+def _bump_data_version(categories):
+    """Atomically increment the data-version counter of each category."""
+    table = dynamodb.Table(PLATFORM_TABLE)
+    expr_names = {"#updatedAt": "updatedAt"}
+    expr_values = {
+        ":one": 1,
+        ":now": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+    add_parts = []
+    for i, category in enumerate(categories):
+        expr_names[f"#c{i}"] = category
+        add_parts.append(f"#c{i} :one")
+    table.update_item(
+        Key=DATA_VERSION_KEY,
+        UpdateExpression="SET #updatedAt = :now ADD " + ", ".join(add_parts),
+        ExpressionAttributeNames=expr_names,
+        ExpressionAttributeValues=expr_values,
+    )
+
+
 def handler(event, context):
-    """Main Lambda handler — dispatch based on EventBridge detail-type."""
+    """
+    Main Lambda handler — dispatch based on EventBridge detail-type.
+    DynamoDB stream batches go to the archiver; errors there propagate
+    so Lambda retries the batch instead of dropping expired items.
+    SQS batches report per-message failures (see _process_queue).
+    """
+    records = event.get("Records") or []
+    if records and records[0].get("eventSource") == "aws:dynamodb":
+        _metrics.start("archive")
+        try:
+            return _archive_expired(records)
+        finally:
+            _metrics.emit(context, {"Events": (len(records), "Count")})
+    if records and records[0].get("eventSource") == "aws:sqs":
+        return _process_queue(records, context)
+
+    detail_type = event.get("detail-type", "")
+    _metrics.start(detail_type if detail_type in HANDLERS else "unknown")
+    response = None
     try:
-        detail_type = event.get("detail-type", "")
-        detail = event.get("detail", {})
+        response = _handle_event(detail_type, event.get("detail", {}))
+        return response
+    finally:
+        _metrics.emit(context, {"Events": (1, "Count")},
+                      statusCode=response["statusCode"] if response else 500)
 
-        if isinstance(detail, str):
-            detail = json.loads(detail)
 
-        handler_fn = HANDLERS.get(detail_type)
-        if not handler_fn:
+def _handle_event(detail_type, detail):
+    """Handle one directly invoked EventBridge event."""
+    try:
+        # The runtime has already parsed the event (floats and all); one
+        # walk converts it, and handlers build items without converting
+        started = time.perf_counter()
+        detail = _decode(detail) if isinstance(detail, str) else _to_dynamo(detail)
+        _metrics.serialize_seconds += time.perf_counter() - started
+
+        if detail_type not in HANDLERS:
             logger.warning(f"No handler for detail-type: {detail_type}")
             return {"statusCode": 400, "body": f"Unknown detail-type: {detail_type}"}
 
-        logger.info(f"Processing {detail_type}")
-        result = handler_fn(detail)
-        logger.info(f"Completed {detail_type}: {result}")
+        result = _run(detail_type, detail)
         return {"statusCode": 200, "body": json.dumps(result)}
 
     except Exception as e:
@@ -58,31 +210,70 @@ def handler(event, context):
         return {"statusCode": 500, "body": str(e)}
 
 
+def _run(detail_type, detail, label=None):
+    """Run the handler for one detail, logging its label and result."""
+    # Chunked pushes: every chunk is a self-contained, idempotent write
+    # (keyed puts, rollups diffed against each attempt ref's rolledUp in
+    # the same transaction — see _roll_up), so redelivery is harmless
+    chunk = detail.get("_metadata", {}).get("chunk")
+    label = label or detail_type
+    if chunk:
+        label += f" [batch {chunk['batchId']} chunk {chunk['seq'] + 1}/{chunk['count']}]"
+
+    logger.info(f"Processing {label}")
+    result = HANDLERS[detail_type](detail)
+    if chunk:
+        result["chunk"] = chunk
+    logger.info(f"Completed {label}: {result}")
+    return result
+
+
+def _decode(text):
+    """
+    Parse a JSON event or detail with floats decoded straight to Decimal
+    (ints stay int, which boto3 stores as-is): the result is ready for
+    DynamoDB in the same pass, with no _to_dynamo walk afterwards.
+    """
+    return json.loads(text, parse_float=Decimal)
+
+
 def _to_dynamo(obj):
-    """Convert floats/ints for DynamoDB (Decimal)."""
+    """Convert floats to Decimal for DynamoDB, for already-parsed events."""
     if isinstance(obj, dict):
-        return {k: _to_dynamo(v) for k, v in obj.items()}
+        return {k: _to_dynamo(v) if isinstance(v, _CONVERTED) else v for k, v in obj.items()}
     if isinstance(obj, list):
-        return [_to_dynamo(i) for i in obj]
+        return [_to_dynamo(i) if isinstance(i, _CONVERTED) else i for i in obj]
     if isinstance(obj, float):
         return Decimal(str(obj))
-    if isinstance(obj, int) and not isinstance(obj, bool):
-        return Decimal(str(obj))
     return obj
 
 
+# Values _to_dynamo recurses into or converts (other leaves are kept as-is)
+_CONVERTED = (dict, list, float)
+
+
+def _item(record, **attributes):
+    """
+    DynamoDB item in one pass: the record's non-null fields, then
+    `attributes` (keys and derived fields, which win).
+    """
+    item = {k: v for k, v in record.items() if v is not None}
+    item.update(attributes)
+    return item
+
+
 def _upsert_item(table, key: dict, attributes: dict):
     """
     Merge attributes into an existing item (or create it).
     Uses update_item so only the supplied fields are touched —
-    fields not in `attributes` are left unchanged.
+    fields not in `attributes` are left unchanged. Values must already
+    be DynamoDB-ready (no floats), as event details are after handler().
     """
-    attrs = _to_dynamo(attributes)
     # Build SET expression dynamically
     expr_names = {}
     expr_values = {}
     set_parts = []
-    for i, (k, v) in enumerate(attrs.items()):
+    for i, (k, v) in enumerate(attributes.items()):
         if k in key:
             continue  # skip key attributes
         alias = f"#a{i}"
@@ -95,143 +286,428 @@ def _upsert_item(table, key: dict, attributes: dict):
         return
 
     table.update_item(
-        Key=_to_dynamo(key),
+        Key=key,
         UpdateExpression="SET " + ", ".join(set_parts),
         ExpressionAttributeNames=expr_names,
         ExpressionAttributeValues=expr_values,
     )
 
 
+def _bulk_upsert(table_name, groups):
+    """
+    Run _upsert_item for every (key, attributes) in `groups`
+    ({category: [(key, attributes), ...]}) concurrently on a bounded
+    thread pool. Throttled items are retried with jittered backoff.
+    Returns {category: elapsed_ms} measured from the start of the batch
+    to the completion of that category's last item.
+    """
+    started = time.monotonic()
+    finished = {category: started for category in groups}
+
+    def run(category, key, attributes):
+        with_backoff(lambda: _upsert_item(dynamodb.Table(table_name), key, attributes),
+                     UPSERT_MAX_ATTEMPTS)
+        return category, time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=UPSERT_WORKERS) as pool:
+        futures = [pool.submit(run, category, key, attributes)
+                   for category, items in groups.items()
+                   for key, attributes in items]
+        for f in futures:
+            category, done_at = f.result()
+            finished[category] = max(finished[category], done_at)
+
+    return {category: round((done_at - started) * 1000, 1)
+            for category, done_at in finished.items()}
+
+
+class _ContentHashes:
+    """
+    Per-item content hashes for delta ingestion. Each item carries the
+    hash of the attributes it was last written with (contentHash), so the
+    hash lands in the same write as the content and concurrent pushes
+    cannot leave the two out of step. When disabled, every item counts as
+    changed (and is still stamped).
+    """
+
+    def __init__(self, table_name, keys, enabled=True):
+        self.enabled = enabled
+        self.stored = {}
+        self.written = {}
+        self.skipped = {}
+        if enabled and keys:
+            found = batch_get(dynamodb, table_name, keys, UPSERT_MAX_ATTEMPTS,
+                              projection="pk, sk, contentHash")
+            self.stored = {k: item.get("contentHash") for k, item in found.items()}
+
+    def changed(self, category, key, attributes):
+        """True if `attributes` differ from the last write of the item at key."""
+        if self.enabled and self.stored.get((key["pk"], key["sk"])) == _content_hash(attributes):
+            self.skipped[category] = self.skipped.get(category, 0) + 1
+            return False
+        self.written[category] = self.written.get(category, 0) + 1
+        return True
+
+    @property
+    def unchanged(self):
+        return not self.written
+
+
+def _stamped(attributes):
+    """attributes plus the contentHash that _ContentHashes compares against."""
+    return {**attributes, "contentHash": _content_hash(attributes)}
+
+
+def _content_hash(attributes):
+    """Stable short hash of an item's incoming attributes."""
+    # Details only hold Decimal where the payload had a float, so hashing
+    # it as that float keeps hashes stable across the decode paths
+    raw = json.dumps(attributes, sort_keys=True, separators=(",", ":"),
+                     default=lambda o: float(o) if isinstance(o, Decimal) else str(o))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _delta_enabled(detail):
+    return DELTA_INGESTION and not detail.get("forceWrite")
+
+
 # ── Platform Config ──────────────────────────────────────────
 
-@handles("dashboard.platform.config.updated")
+@handles("dashboard.platform.config.updated", bumps=("platform",))
 def handle_platform_config(detail):
     """
     Upsert clusters, clusterRegions, clusterRegionRoles, services,
     currentRunning, promotions, metadata into the platform table.
     Uses update_item so partial pushes merge with existing data
     (e.g. adding a new cluster without resending all existing ones).
+    Items are independent merges, so they run concurrently via
+    _bulk_upsert rather than in an all-or-nothing transaction.
+    Items whose content hash matches the previous push are skipped.
     """
-    table = dynamodb.Table(PLATFORM_TABLE)
-    counts = {}
+    groups = {}
+    config_sizes = {}
 
     # Clusters
-    for c in detail.get("clusters", []):
-        _upsert_item(table,
-                      key={"pk": f"CLUSTER#{c['id']}", "sk": "META"},
-                      attributes={"itemType": "CLUSTER", **c})
-    counts["clusters"] = len(detail.get("clusters", []))
+    groups["clusters"] = [
+        ({"pk": f"CLUSTER#{c['id']}", "sk": "META"},
+         {"itemType": "CLUSTER", **c})
+        for c in detail.get("clusters", [])
+    ]
 
     # Cluster regions
-    for cr in detail.get("clusterRegions", []):
-        _upsert_item(table,
-                      key={"pk": f"REGION#{cr['id']}", "sk": "META"},
-                      attributes={"itemType": "CLUSTER_REGION", **cr})
-    counts["clusterRegions"] = len(detail.get("clusterRegions", []))
+    groups["clusterRegions"] = [
+        ({"pk": f"REGION#{cr['id']}", "sk": "META"},
+         {"itemType": "CLUSTER_REGION", **cr})
+        for cr in detail.get("clusterRegions", [])
+    ]
 
     # Cluster region roles
     roles = detail.get("clusterRegionRoles", {})
     if roles:
-        _upsert_item(table,
-                      key={"pk": "CONFIG#clusterRegionRoles", "sk": "META"},
-                      attributes={"itemType": "CONFIG", "roles": roles})
-        counts["clusterRegionRoles"] = len(roles)
+        groups["clusterRegionRoles"] = [
+            ({"pk": "CONFIG#clusterRegionRoles", "sk": "META"},
+             {"itemType": "CONFIG", "roles": roles})
+        ]
+        config_sizes["clusterRegionRoles"] = len(roles)
 
     # Services
-    for s in detail.get("services", []):
-        _upsert_item(table,
-                      key={"pk": f"SERVICE#{s['id']}", "sk": "META"},
-                      attributes={"itemType": "SERVICE", **s})
-    counts["services"] = len(detail.get("services", []))
+    groups["services"] = [
+        ({"pk": f"SERVICE#{s['id']}", "sk": "META"},
+         {"itemType": "SERVICE", **s})
+        for s in detail.get("services", [])
+    ]
 
     # Current running versions
     current = detail.get("currentRunning", {})
-    for cluster_region_id, svc_versions in current.items():
-        _upsert_item(table,
-                      key={"pk": f"RUNNING#{cluster_region_id}", "sk": "META"},
-                      attributes={"itemType": "RUNNING",
-                                  "clusterRegionId": cluster_region_id,
-                                  "versions": svc_versions})
-    counts["currentRunning"] = len(current)
+    groups["currentRunning"] = [
+        ({"pk": f"RUNNING#{cluster_region_id}", "sk": "META"},
+         {"itemType": "RUNNING",
+          "clusterRegionId": cluster_region_id,
+          "versions": svc_versions})
+        for cluster_region_id, svc_versions in current.items()
+    ]
 
     # Promotions
-    for p in detail.get("promotions", []):
-        _upsert_item(table,
-                      key={"pk": f"PROMOTION#{p['id']}", "sk": "META"},
-                      attributes={"itemType": "PROMOTION", **p})
-    counts["promotions"] = len(detail.get("promotions", []))
+    groups["promotions"] = [
+        ({"pk": f"PROMOTION#{p['id']}", "sk": "META"},
+         {"itemType": "PROMOTION", **p})
+        for p in detail.get("promotions", [])
+    ]
 
     # Suite metadata
     suite_meta = detail.get("suiteMeta", {})
     if suite_meta:
-        _upsert_item(table,
-                      key={"pk": "CONFIG#suiteMeta", "sk": "META"},
-                      attributes={"itemType": "CONFIG", "data": suite_meta})
-        counts["suiteMeta"] = len(suite_meta)
+        groups["suiteMeta"] = [
+            ({"pk": "CONFIG#suiteMeta", "sk": "META"},
+             {"itemType": "CONFIG", "data": suite_meta})
+        ]
+        config_sizes["suiteMeta"] = len(suite_meta)
 
     # Status metadata
     status_meta = detail.get("statusMeta", {})
     if status_meta:
-        _upsert_item(table,
-                      key={"pk": "CONFIG#statusMeta", "sk": "META"},
-                      attributes={"itemType": "CONFIG", "data": status_meta})
-        counts["statusMeta"] = len(status_meta)
+        groups["statusMeta"] = [
+            ({"pk": "CONFIG#statusMeta", "sk": "META"},
+             {"itemType": "CONFIG", "data": status_meta})
+        ]
+        config_sizes["statusMeta"] = len(status_meta)
 
-    return {"processed": counts}
+    # Config items report their entry count, like the other categories
+    counts = {category: config_sizes.get(category, len(items))
+              for category, items in groups.items()}
+
+    keys = [key for items in groups.values() for key, _ in items]
+    hashes = _ContentHashes(PLATFORM_TABLE, keys, enabled=_delta_enabled(detail))
+    changed = {
+        category: [(key, _stamped(attributes)) for key, attributes in items
+                   if hashes.changed(category, key, attributes)]
+        for category, items in groups.items()
+    }
+
+    timings = _bulk_upsert(PLATFORM_TABLE, changed)
+    for category, items in changed.items():
+        _log_changes(category, [key for key, _ in items])
+    return {
+        "processed": counts,
+        "written": hashes.written,
+        "skipped": hashes.skipped,
+        "unchanged": hashes.unchanged,
+        "timings_ms": timings,
+    }
 
 
 # ── Deployments ──────────────────────────────────────────────
 
-@handles("dashboard.deployments.reported")
+@handles("dashboard.deployments.reported", bumps=("deployments", "analytics"),
+         coalesce=("deploymentAttempts", ("clusterId", "serviceId", "startedAt", "id")))
 def handle_deployments(detail):
     """
     Write deployment attempts into the deployments table.
     pk: <clusterId>#<serviceId>   sk: <startedAt>#<attemptId>
+    Also records each attempt's ref, brings the per-day rollups in line
+    with the attempt and its stored runs (see _roll_up), and advances
+    the per-(cluster, service) CURRENT item.
+    Each item keeps the testSummary maintained by handle_test_results;
+    attempts without one get it built from any runs already stored.
+    Runs stored while this push was in flight are re-read at the end.
     """
-    table = dynamodb.Table(DEPLOYMENTS_TABLE)
     attempts = detail.get("deploymentAttempts", [])
 
-    with table.batch_writer() as batch:
-        for a in attempts:
-            item = _to_dynamo({
-                "pk": f"{a['clusterId']}#{a['serviceId']}",
-                "sk": f"{a['startedAt']}#{a['id']}",
-                "clusterId": a["clusterId"],
-                "serviceId": a["serviceId"],
-                **{k: v for k, v in a.items() if v is not None},
-            })
-            batch.put_item(Item=item)
+    # Last occurrence wins for duplicate attempts within one push
+    latest = {}
+    for a in attempts:
+        latest[(f"{a['clusterId']}#{a['serviceId']}", f"{a['startedAt']}#{a['id']}")] = a
+    previous = batch_get(
+        dynamodb, DEPLOYMENTS_TABLE, [{"pk": pk, "sk": sk} for pk, sk in latest],
+        UPSERT_MAX_ATTEMPTS,
+    )
+    stored_runs = _stored_runs([
+        a["id"] for key, a in latest.items()
+        if "testSummary" not in previous.get(key, {})
+    ])
+
+    def write(key, a):
+        item = _deployment_item(key, a, _test_summaries(stored_runs.get(a["id"], [])))
+        with_backoff(lambda: dynamodb.Table(DEPLOYMENTS_TABLE).update_item(
+            **_attempt_update(item, previous.get(key, {}))), UPSERT_MAX_ATTEMPTS)
 
-    return {"deployments_written": len(attempts)}
+    with ThreadPoolExecutor(max_workers=UPSERT_WORKERS) as pool:
+        list(pool.map(write, latest, latest.values()))
+    _log_changes("deploymentAttempts", [{"pk": pk, "sk": sk} for pk, sk in latest])
+
+    by_id = {a["id"]: a for a in latest.values()}
+    counted = {}
+
+    def plan(refs):
+        # Runs of attempts already rolled up stay as handle_test_results
+        # counted them; new attempts count their stored runs, so runs that
+        # arrived first (and were left unattributed) are folded in now
+        runs = _stored_runs([i for i in by_id if "rolledUp" not in refs.get(i, {})])
+        counted.update(runs)
+        planned = {}
+        for attempt_id, a in by_id.items():
+            ref = {"clusterId": a["clusterId"], "serviceId": a["serviceId"],
+                   "startedAt": a["startedAt"], "attemptCounters": _attempt_counters(a)}
+            stored = refs.get(attempt_id, {})
+            if "rolledUp" in stored:
+                tests = [stored["rolledUp"]["counters"],
+                         {n: -v for n, v in stored.get("attemptCounters", {}).items()}]
+            else:
+                tests = [_test_counters(r) for r in runs[attempt_id]]
+            planned[attempt_id] = (ref, _rolled_up(ref, ref["attemptCounters"], *tests))
+        return planned
+
+    result = {
+        "deployments_written": len(latest),
+        "rollups_updated": _roll_up(by_id, plan),
+        "current_state_updated": _advance_current_state(latest.values(), stored_runs),
+    }
+    # handle_test_results stores runs before it reads REFs, so a run stored
+    # after the reads above either saw this push's REF or is found here
+    late = _late_runs(stored_runs, counted)
+    result["late_runs_attributed"] = len(late)
+    if late:
+        _attribute_runs(late)
+    return result
 
 
 # ── Test Results (per-attempt) ───────────────────────────────
 
-@handles("dashboard.test-results.reported")
+@handles("dashboard.test-results.reported", bumps=("testResults", "deployments", "analytics"),
+         coalesce=("testRuns", ("attemptId", "suiteType", "executedAt")))
 def handle_test_results(detail):
     """
     Write test runs into the test-results table.
     pk: ATTEMPT#<attemptId>   sk: <suiteType>#<executedAt>
+    suiteShard: <suiteType>#<crc32(attemptId) % TEST_RUN_SHARDS>
+    Test counters are rolled up under the owning attempt's startedAt day;
+    runs whose attempt has not been reported yet are rolled up when it is.
+    The newest run per suite is merged into the attempt's testSummary
+    and, while the attempt is current, its CURRENT item (runs that
+    arrive first are picked up when the attempt is reported).
     """
     table = dynamodb.Table(TEST_RESULTS_TABLE)
     runs = detail.get("testRuns", [])
 
+    latest = {}
+    for r in runs:
+        latest[(f"ATTEMPT#{r['attemptId']}", f"{r['suiteType']}#{r['executedAt']}")] = r
+
+    # Runs are stored before the REFs are read: an attempt whose REF is
+    # not there yet finds them when handle_deployments re-reads its runs
     with table.batch_writer() as batch:
-        for r in runs:
-            item = _to_dynamo({
-                "pk": f"ATTEMPT#{r['attemptId']}",
-                "sk": f"{r['suiteType']}#{r['executedAt']}",
-                "suiteType": r["suiteType"],
-                **{k: v for k, v in r.items() if v is not None},
-            })
-            batch.put_item(Item=item)
+        for r in latest.values():
+            batch.put_item(Item=_test_run_item(r))
+    _log_changes("testRuns", [{"pk": pk, "sk": sk} for pk, sk in latest])
+
+    return {"test_runs_written": len(latest), **_attribute_runs(list(latest.values()))}
+
+
+def _attribute_runs(runs):
+    """
+    Recount the rollups of the attempts of stored `runs` and merge the
+    runs into their testSummary and CURRENT item. Runs of attempts with
+    no REF (not reported yet) are left for handle_deployments.
+    """
+    refs = _get_attempt_refs({r["attemptId"] for r in runs}, consistent=True)
+
+    def plan(refs):
+        stored = _stored_runs(list(refs))
+        return {
+            attempt_id: ({}, _rolled_up(ref, ref.get("attemptCounters", {}),
+                                        *[_test_counters(r) for r in stored[attempt_id]]))
+            for attempt_id, ref in refs.items()
+        }
+
+    return {
+        "rollups_updated": _roll_up(refs, plan),
+        "rollups_unattributed": sum(1 for r in runs if r["attemptId"] not in refs),
+        "test_summaries_updated": _merge_test_summaries(runs, refs),
+        "current_state_updated": _merge_current_tests(runs, refs),
+    }
+
+
+def _deployment_item(key, a, summary):
+    """Deployments table item for attempt `a` at `key` ((pk, sk))."""
+    return _item(
+        a, pk=key[0], sk=key[1], testSummary=summary,
+        **_attempt_failure(a), **_expires_at(a.get("startedAt")),
+    )
+
+
+def _attempt_update(item, previous):
+    """
+    update_item arguments that write deployment `item` over `previous`
+    (the stored item, or {}) as a put would, except for testSummary:
+    that is only set where the item has none, so suites merged by
+    handle_test_results since `previous` was read are never lost.
+    """
+    names, values, sets = {}, {}, []
+    for i, (k, v) in enumerate(item.items()):
+        if k in ("pk", "sk"):
+            continue
+        names[f"#a{i}"] = k
+        values[f":v{i}"] = v
+        if k == "testSummary":
+            sets.append(f"#a{i} = if_not_exists(#a{i}, :v{i})")
+        else:
+            sets.append(f"#a{i} = :v{i}")
+    # Attributes the attempt no longer has (e.g. failures-index keys of a
+    # re-report that is no longer failing) go, as they would with a put
+    removed = [k for k in previous if k not in item and k != "testSummary"]
+    for i, k in enumerate(removed):
+        names[f"#r{i}"] = k
+    expression = "SET " + ", ".join(sets)
+    if removed:
+        expression += " REMOVE " + ", ".join(f"#r{i}" for i in range(len(removed)))
+    return {
+        "Key": {"pk": item["pk"], "sk": item["sk"]},
+        "UpdateExpression": expression,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def _test_run_item(r):
+    """Test-results table item for per-attempt run `r`."""
+    return _item(
+        r,
+        pk=f"ATTEMPT#{r['attemptId']}",
+        sk=f"{r['suiteType']}#{r['executedAt']}",
+        suiteShard=_suite_shard(r["attemptId"], r["suiteType"]),
+        **_run_failure(r), **_expires_at(r.get("executedAt")),
+    )
+
+
+def _cluster_run_item(r):
+    """Test-results table item for cluster-level run `r`."""
+    return _item(
+        r,
+        pk=f"CLUSTER#{r['clusterId']}",
+        sk=f"{r['suiteType']}#{r['executedAt']}",
+        **_expires_at(r.get("executedAt")),
+    )
+
+
+def _suite_shard(attempt_id, suite_type):
+    """suiteShard-index key: the suite plus a stable shard of the attempt."""
+    return f"{suite_type}#{zlib.crc32(attempt_id.encode()) % TEST_RUN_SHARDS}"
+
 
-    return {"test_runs_written": len(runs)}
+# ── Failures ─────────────────────────────────────────────────
+#
+# Sparse failures-index on the deployments and test-results tables:
+# only FAILED/ROLLBACK attempts and runs with failed > 0 carry
+# failureType (hash, <kind>#<shard>) + failedAt (range), so the "what's
+# broken" query reads O(failures). Items are written whole, so a
+# re-report that is no longer failing drops out of the index.
+
+
+def _attempt_failure(a):
+    """failures-index attributes for a FAILED/ROLLBACK attempt, else {}."""
+    if a.get("status") in ("FAILED", "ROLLBACK"):
+        return {"failureType": _failure_shard("DEPLOYMENT", a["id"]),
+                "failedAt": a["startedAt"]}
+    return {}
+
+
+def _run_failure(r):
+    """failures-index attributes for a test run with failures, else {}."""
+    if (r.get("failed") or 0) > 0:
+        return {"failureType": _failure_shard("TEST_RUN", r["attemptId"]),
+                "failedAt": r["executedAt"]}
+    return {}
+
+
+def _failure_shard(kind, attempt_id):
+    """failures-index key: the kind plus a stable shard of the attempt."""
+    return f"{kind}#{zlib.crc32(attempt_id.encode()) % FAILURE_SHARDS}"
 
 
 # ── Cluster Test Results ─────────────────────────────────────
 
-@handles("dashboard.cluster-test-results.reported")
+@handles("dashboard.cluster-test-results.reported", bumps=("testResults",),
+         coalesce=("clusterTestRuns", ("clusterId", "suiteType", "executedAt")))
 def handle_cluster_test_results(detail):
     """
     Write cluster-level test runs into the test-results table.
@@ -242,62 +718,1029 @@ def handle_cluster_test_results(detail):
 
     with table.batch_writer() as batch:
         for r in runs:
-            item = _to_dynamo({
-                "pk": f"CLUSTER#{r['clusterId']}",
-                "sk": f"{r['suiteType']}#{r['executedAt']}",
-                "suiteType": r["suiteType"],
-                **{k: v for k, v in r.items() if v is not None},
-            })
-            batch.put_item(Item=item)
+            batch.put_item(Item=_cluster_run_item(r))
+    _log_changes("clusterTestRuns", [
+        {"pk": f"CLUSTER#{r['clusterId']}", "sk": f"{r['suiteType']}#{r['executedAt']}"}
+        for r in runs
+    ])
 
     return {"cluster_test_runs_written": len(runs)}
 
 
 # ── Scorecards ───────────────────────────────────────────────
 
-@handles("dashboard.scorecards.updated")
+@handles("dashboard.scorecards.updated", bumps=("scorecards",))
 def handle_scorecards(detail):
     """
     Write scorecard weights, per-service scores, and jira tickets
-    into the scorecards table.
+    into the scorecards table. Scores and tickets carry an itemType
+    (SCORECARD / JIRA_TICKET) that keys the sparse itemType-index;
+    tickets also carry versionSort for serviceVersion-index.
+    Items whose content hash matches the previous push are skipped.
     """
     table = dynamodb.Table(SCORECARDS_TABLE)
     counts = {}
 
-    # Weights
     weights = detail.get("scorecardWeights", {})
-    if weights:
-        table.put_item(Item=_to_dynamo({
-            "pk": "WEIGHTS",
-            "sk": "CURRENT",
-            **weights,
-        }))
-        counts["weights"] = 1
-
-    # Per-service scorecards
     scorecards = detail.get("scorecards", {})
-    for svc_id, scores in scorecards.items():
-        table.put_item(Item=_to_dynamo({
-            "pk": f"SERVICE#{svc_id}",
-            "sk": "CURRENT",
-            "serviceId": svc_id,
-            **scores,
-        }))
-    counts["scorecards"] = len(scorecards)
-
-    # Jira tickets
     jira = detail.get("jiraTickets", {})
-    jira_count = 0
+
+    keys = [{"pk": "WEIGHTS", "sk": "CURRENT"}] if weights else []
+    keys += [{"pk": f"SERVICE#{svc}", "sk": "CURRENT"} for svc in scorecards]
+    keys += [{"pk": f"SERVICE#{svc}", "sk": f"JIRA#{t['key']}"}
+             for svc, tickets in jira.items() for t in tickets]
+    hashes = _ContentHashes(SCORECARDS_TABLE, keys, enabled=_delta_enabled(detail))
+    written = {"scorecardWeights": [], "scorecards": [], "jiraTickets": []}
+
     with table.batch_writer() as batch:
+        # Weights
+        if weights:
+            key = {"pk": "WEIGHTS", "sk": "CURRENT"}
+            if hashes.changed("weights", key, weights):
+                batch.put_item(Item={**key, **_stamped(weights)})
+                written["scorecardWeights"].append(key)
+            counts["weights"] = 1
+
+        # Per-service scorecards
+        for svc_id, scores in scorecards.items():
+            key = {"pk": f"SERVICE#{svc_id}", "sk": "CURRENT"}
+            if hashes.changed("scorecards", key, scores):
+                batch.put_item(Item={
+                    **key,
+                    "itemType": "SCORECARD",
+                    "serviceId": svc_id,
+                    **_stamped(scores),
+                })
+                written["scorecards"].append(key)
+        counts["scorecards"] = len(scorecards)
+
+        # Jira tickets
+        jira_count = 0
         for svc_id, tickets in jira.items():
             for ticket in tickets:
-                batch.put_item(Item=_to_dynamo({
-                    "pk": f"SERVICE#{svc_id}",
-                    "sk": f"JIRA#{ticket['key']}",
-                    "serviceId": svc_id,
-                    **ticket,
-                }))
+                key = {"pk": f"SERVICE#{svc_id}", "sk": f"JIRA#{ticket['key']}"}
+                if hashes.changed("jiraTickets", key, ticket):
+                    batch.put_item(Item={
+                        **key,
+                        "itemType": "JIRA_TICKET",
+                        "serviceId": svc_id,
+                        **_stamped(ticket),
+                        **_version_sort(ticket.get("version")),
+                    })
+                    written["jiraTickets"].append(key)
                 jira_count += 1
-    counts["jiraTickets"] = jira_count
+        counts["jiraTickets"] = jira_count
+
+    for entity, keys in written.items():
+        _log_changes(entity, keys)
+    return {
+        "processed": counts,
+        "written": hashes.written,
+        "skipped": hashes.skipped,
+        "unchanged": hashes.unchanged,
+    }
+
+
+@handles("dashboard.scorecards.reindex", bumps=("scorecards",))
+def handle_scorecards_reindex(detail):
+    """
+    Backfill itemType on score and jira items, and versionSort on jira
+    items, written before the itemType-index / serviceVersion-index
+    existed (delta ingestion skips unchanged items, so a normal push
+    never rewrites them). Invoke directly with
+    {"detail-type": "dashboard.scorecards.reindex"}; safe to rerun.
+    """
+    table = dynamodb.Table(SCORECARDS_TABLE)
+    groups = {"scorecards": [], "jiraTickets": []}
+    for item in scan_all(
+        dynamodb, table,
+        FilterExpression=Attr("pk").begins_with("SERVICE#") & (
+            Attr("itemType").not_exists()
+            | (Attr("sk").begins_with("JIRA#") & Attr("versionSort").not_exists())
+        ),
+        ProjectionExpression="pk, sk, itemType, #version",
+        ExpressionAttributeNames={"#version": "version"},
+    ):
+        key = {"pk": item["pk"], "sk": item["sk"]}
+        if item["sk"] == "CURRENT":
+            groups["scorecards"].append((key, {"itemType": "SCORECARD"}))
+        elif item["sk"].startswith("JIRA#"):
+            attrs = {"itemType": "JIRA_TICKET", **_version_sort(item.get("version"))}
+            if attrs != {k: item.get(k) for k in attrs}:
+                groups["jiraTickets"].append((key, attrs))
+
+    timings = _bulk_upsert(SCORECARDS_TABLE, groups)
+    return {
+        "reindexed": {category: len(items) for category, items in groups.items()},
+        "timings_ms": timings,
+    }
+
+
+def _version_sort(version):
+    """
+    {"versionSort": "000003.000004.000002"} for semver "3.4.2"; {} when
+    the version is not plain semver or a part overflows the padding.
+    """
+    match = SEMVER.match(str(version or ""))
+    if not match or any(len(str(int(p))) > VERSION_SORT_WIDTH for p in match.groups()):
+        return {}
+    return {"versionSort": ".".join(f"{int(p):0{VERSION_SORT_WIDTH}d}" for p in match.groups())}
+
+
+# ── Analytics Rollups ────────────────────────────────────────
+#
+# Analytics table layout:
+#   pk: ROLLUP#<serviceId|*>#<clusterId|*>   sk: DAY#<yyyy-mm-dd>
+#       attempts, success, failed, rollback, leadTimeSumSec, leadTimeCount,
+#       testPassed_<suiteType>, testTotal_<suiteType>
+#   pk: ATTEMPT#<attemptId>                  sk: REF
+#       clusterId, serviceId, startedAt  (resolves test runs to a rollup)
+#       attemptCounters  the attempt's own counters
+#       rolledUp         {serviceId, clusterId, startedAt, counters}: what
+#                        the attempt and its runs have added to the rollups
+#       rollupVersion    bumped on every rolledUp change
+#
+# Every attempt/test delta is applied to all four (service, cluster)
+# scopes so each analytics filter combination is a single Query.
+#
+# Handlers never add a push's raw counters. They recount what each touched
+# attempt should contribute and _roll_up applies the difference from
+# rolledUp in the same transaction that moves rolledUp, so a retried or
+# redelivered push adds nothing twice.
+
+# TransactWriteItems item limit
+TRANSACT_MAX_ITEMS = 100
+
+# Cancellation reasons that mean "replan and retry", not "this is wrong"
+TRANSACT_RETRY_REASONS = {
+    "None", "ConditionalCheckFailed", "TransactionConflict",
+    "ThrottlingError", "ProvisionedThroughputExceeded",
+}
+
+
+class _RollupBatch:
+    """Accumulates counter deltas per rollup item ((scope, day) → counters)."""
+
+    def __init__(self):
+        self.deltas = {}
+
+    def add(self, attempt, counters, sign=1):
+        day = (attempt.get("startedAt") or "")[:10]
+        if not day:
+            return
+        svc, cluster = attempt["serviceId"], attempt["clusterId"]
+        for scope in ((svc, cluster), (svc, ROLLUP_ALL),
+                      (ROLLUP_ALL, cluster), (ROLLUP_ALL, ROLLUP_ALL)):
+            bucket = self.deltas.setdefault((scope, day), {})
+            for name, value in counters.items():
+                bucket[name] = bucket.get(name, 0) + sign * value
+
+    def nonzero(self):
+        """[(rollup key, counters)] with zero counters and empty items dropped."""
+        result = []
+        for key, counters in self.deltas.items():
+            counters = {name: value for name, value in counters.items() if value}
+            if counters:
+                result.append((key, counters))
+        return result
+
+
+def _rollup_update(svc, cluster, day, counters):
+    """update_item arguments that ADD `counters` to one rollup item."""
+    expr_names = {"#svc": "serviceId", "#cl": "clusterId", "#day": "day"}
+    expr_values = {":svc": svc, ":cl": cluster, ":day": day}
+    add_parts = []
+    for i, (name, value) in enumerate(counters.items()):
+        expr_names[f"#c{i}"] = name
+        expr_values[f":c{i}"] = value
+        add_parts.append(f"#c{i} :c{i}")
+    return {
+        "Key": {"pk": f"ROLLUP#{svc}#{cluster}", "sk": f"DAY#{day}"},
+        "UpdateExpression": "SET #svc = :svc, #cl = :cl, #day = :day "
+                            "ADD " + ", ".join(add_parts),
+        "ExpressionAttributeNames": expr_names,
+        "ExpressionAttributeValues": expr_values,
+    }
+
+
+def _rolled_up(ref, *counters):
+    """A REF's rolledUp map: the scope of `ref` and the summed `counters`."""
+    total = {}
+    for part in counters:
+        for name, value in part.items():
+            total[name] = total.get(name, 0) + value
+    return {
+        "serviceId": ref["serviceId"], "clusterId": ref["clusterId"],
+        "startedAt": ref["startedAt"],
+        "counters": {name: value for name, value in total.items() if value},
+    }
+
+
+def _roll_up(attempt_ids, plan):
+    """
+    Bring the rollups in line with what each attempt should contribute.
+    plan(refs) gets the stored REFs ({attemptId: item}, read consistently)
+    of `attempt_ids` and returns {attemptId: (ref_attributes, rolled_up)}
+    for the attempts it covers: the REF attributes to set and the new
+    rolledUp (see _rolled_up). Each chunk of attempts moves their REFs,
+    conditioned on rollupVersion, and ADDs the differences from the old
+    rolledUp in one transaction. A chunk cancelled by a concurrent writer
+    is re-read and replanned. Returns rollup items updated.
+    """
+    pending = set(attempt_ids)
+    updated = 0
+    for attempt in range(UPSERT_MAX_ATTEMPTS):
+        refs = _get_attempt_refs(pending, consistent=True)
+        planned = plan(refs)
+        pending &= set(planned)
+        for chunk, rollups in _rollup_chunks(planned, refs):
+            items = [{"Update": {"TableName": ANALYTICS_TABLE, **update}}
+                     for update in chunk.values()]
+            items += [{"Update": {"TableName": ANALYTICS_TABLE,
+                                  **_rollup_update(svc, cluster, day, counters)}}
+                      for ((svc, cluster), day), counters in rollups]
+            try:
+                with_backoff(lambda: dynamodb.meta.client.transact_write_items(TransactItems=items),
+                             UPSERT_MAX_ATTEMPTS)
+            except ClientError as e:
+                reasons = {r.get("Code") for r in e.response.get("CancellationReasons", [])}
+                if e.response.get("Error", {}).get("Code") != "TransactionCanceledException" \
+                        or reasons - TRANSACT_RETRY_REASONS:
+                    raise
+                continue
+            updated += len(rollups)
+            pending -= set(chunk)
+        # Attempts whose REF and rolledUp are already current need no write
+        pending = {a for a in pending if not _rollup_current(refs.get(a), *planned[a])}
+        if not pending:
+            return updated
+        backoff(attempt)
+    raise RuntimeError(f"Rollups for {len(pending)} attempts still contended "
+                       f"after {UPSERT_MAX_ATTEMPTS} attempts")
+
+
+def _rollup_current(stored, ref, rolled):
+    """True if the stored REF already holds `ref` and `rolled`."""
+    return bool(stored) and stored.get("rolledUp") == rolled \
+        and all(stored.get(k) == v for k, v in ref.items())
+
+
+def _rollup_chunks(planned, refs):
+    """
+    Yield ({attemptId: REF update}, [(rollup key, counters)]) transactions
+    for every planned attempt whose REF or rollups must change, each
+    within TRANSACT_MAX_ITEMS items.
+    """
+    chunk, rollups = {}, _RollupBatch()
+    # Attempts of one day and scope share rollup items: keep them together
+    ordered = sorted(planned.items(), key=lambda p: (
+        p[1][1]["startedAt"][:10], p[1][1]["serviceId"], p[1][1]["clusterId"]))
+    for attempt_id, (ref, rolled) in ordered:
+        stored = refs.get(attempt_id)
+        if _rollup_current(stored, ref, rolled):
+            continue
+        delta = _RollupBatch()
+        if stored and stored.get("rolledUp"):
+            delta.add(stored["rolledUp"], stored["rolledUp"]["counters"], sign=-1)
+        delta.add(rolled, rolled["counters"])
+        keys = set(rollups.deltas) | set(delta.deltas)
+        if chunk and len(chunk) + 1 + len(keys) > TRANSACT_MAX_ITEMS:
+            yield chunk, rollups.nonzero()
+            chunk, rollups = {}, _RollupBatch()
+        chunk[attempt_id] = _ref_update(attempt_id, stored, ref, rolled)
+        for key, counters in delta.deltas.items():
+            bucket = rollups.deltas.setdefault(key, {})
+            for name, value in counters.items():
+                bucket[name] = bucket.get(name, 0) + value
+    if chunk:
+        yield chunk, rollups.nonzero()
+
+
+def _ref_update(attempt_id, stored, ref, rolled):
+    """update_item arguments that move one REF to `ref` + `rolled`, if unchanged since read."""
+    version = (stored or {}).get("rollupVersion")
+    names = {"#ru": "rolledUp", "#v": "rollupVersion"}
+    values = {":ru": rolled, ":v": int(version or 0) + 1}
+    sets = ["#ru = :ru", "#v = :v"]
+    for i, (name, value) in enumerate(ref.items()):
+        names[f"#r{i}"] = name
+        values[f":r{i}"] = value
+        sets.append(f"#r{i} = :r{i}")
+    if version is None:
+        condition = "attribute_not_exists(#v)"
+    else:
+        condition = "#v = :old"
+        values[":old"] = version
+    return {
+        "Key": {"pk": f"ATTEMPT#{attempt_id}", "sk": "REF"},
+        "UpdateExpression": "SET " + ", ".join(sets),
+        "ConditionExpression": condition,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def _attempt_counters(a):
+    """Rollup counters contributed by one deployment attempt."""
+    counters = {"attempts": 1}
+    status = a.get("status")
+    if status in ("SUCCESS", "LIVE"):
+        counters["success"] = 1
+    elif status == "FAILED":
+        counters["failed"] = 1
+    elif status == "ROLLBACK":
+        counters["rollback"] = 1
+
+    started, ended = a.get("startedAt"), a.get("endedAt")
+    if started and ended:
+        try:
+            seconds = (_parse_ts(ended) - _parse_ts(started)).total_seconds()
+        except ValueError:
+            seconds = None
+        if seconds is not None:
+            counters["leadTimeSumSec"] = int(seconds)
+            counters["leadTimeCount"] = 1
+    return counters
+
+
+def _test_counters(r):
+    """Rollup counters contributed by one test run."""
+    suite = r["suiteType"]
+    return {
+        f"testPassed_{suite}": int(r.get("passed") or 0),
+        f"testTotal_{suite}": int(r.get("total") or 0),
+    }
+
+
+def _parse_ts(value):
+    """Parse an ISO-8601 timestamp with a trailing Z."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _get_attempt_refs(attempt_ids, consistent=False):
+    """Look up attempt refs; returns {attemptId: ref} for known attempts."""
+    found = batch_get(
+        dynamodb, ANALYTICS_TABLE,
+        [{"pk": f"ATTEMPT#{a}", "sk": "REF"} for a in attempt_ids],
+        UPSERT_MAX_ATTEMPTS, consistent=consistent,
+    )
+    return {pk.split("#", 1)[1]: item for (pk, _), item in found.items()}
+
+
+# ── Current State ────────────────────────────────────────────
+#
+# Analytics table, one item per (cluster-region, service):
+#   pk: CURRENT   sk: <clusterId>#<serviceId>
+#       clusterId, serviceId, attemptId, startedAt,
+#       attempt (the latest attempt), tests (suiteType → latest run)
+#
+# The pointer only moves forward in startedAt, so replayed or late
+# pushes of older attempts never displace a newer one. The whole
+# matrix is a single Query on pk = CURRENT.
+
+
+def _advance_current_state(attempts, stored_runs):
+    """
+    Point each (cluster, service) CURRENT item at its newest attempt.
+    Re-reports of the current attempt refresh it in place and keep its
+    test summary; a newer attempt replaces it and starts from whatever
+    runs are already stored for that attempt (`stored_runs` caches
+    those by attemptId; runs queried here are added). Returns items changed.
+    """
+    newest = {}
+    for a in attempts:
+        key = (a["clusterId"], a["serviceId"])
+        if key not in newest or a["startedAt"] >= newest[key]["startedAt"]:
+            newest[key] = a
+
+    table = dynamodb.Table(ANALYTICS_TABLE)
+    changed = []
+    for (cluster_id, service_id), a in newest.items():
+        key = {"pk": "CURRENT", "sk": f"{cluster_id}#{service_id}"}
+        attempt = {k: v for k, v in a.items() if v is not None}
+
+        # Same attempt re-reported (e.g. IN_PROGRESS → LIVE)
+        if _conditional_update(
+            table, Key=key,
+            UpdateExpression="SET #attempt = :attempt",
+            ConditionExpression="#attemptId = :id",
+            ExpressionAttributeNames={"#attempt": "attempt", "#attemptId": "attemptId"},
+            ExpressionAttributeValues={":attempt": attempt, ":id": a["id"]},
+        ):
+            changed.append(key)
+            continue
+
+        # Newer attempt — runs may have landed before the attempt itself
+        runs = stored_runs.get(a["id"])
+        if runs is None:
+            runs = stored_runs[a["id"]] = _query_attempt_runs(a["id"])
+        tests = _latest_runs_by_suite(runs)
+        if _conditional_update(
+            table, Key=key,
+            UpdateExpression="SET clusterId = :cl, serviceId = :svc, "
+                             "#attemptId = :id, #startedAt = :started, "
+                             "#attempt = :attempt, #tests = :tests",
+            ConditionExpression="attribute_not_exists(#startedAt) OR #startedAt < :started",
+            ExpressionAttributeNames={
+                "#attempt": "attempt", "#attemptId": "attemptId",
+                "#startedAt": "startedAt", "#tests": "tests",
+            },
+            ExpressionAttributeValues={
+                ":cl": cluster_id, ":svc": service_id, ":id": a["id"],
+                ":started": a["startedAt"], ":attempt": attempt, ":tests": tests,
+            },
+        ):
+            changed.append(key)
+    _log_changes("currentState", changed)
+    return len(changed)
+
+
+def _merge_current_tests(runs, refs):
+    """
+    Fold test runs into the CURRENT item of their attempt, per suite,
+    if that attempt is still current and the run is the newest of its
+    suite. Runs for superseded or unknown attempts are ignored.
+    Returns items changed.
+    """
+    by_attempt = {}
+    for r in runs:
+        if r["attemptId"] in refs:
+            by_attempt.setdefault(r["attemptId"], []).append(r)
+
+    table = dynamodb.Table(ANALYTICS_TABLE)
+    changed = 0
+    changed_keys = []
+    for attempt_id, attempt_runs in by_attempt.items():
+        ref = refs[attempt_id]
+        key = {"pk": "CURRENT", "sk": f"{ref['clusterId']}#{ref['serviceId']}"}
+        for suite, run in _latest_runs_by_suite(attempt_runs).items():
+            if _conditional_update(
+                table, Key=key,
+                UpdateExpression="SET #tests.#suite = :run",
+                ConditionExpression="#attemptId = :id AND "
+                                    "(attribute_not_exists(#tests.#suite) "
+                                    "OR #tests.#suite.#executedAt <= :executed)",
+                ExpressionAttributeNames={
+                    "#tests": "tests", "#suite": suite,
+                    "#attemptId": "attemptId", "#executedAt": "executedAt",
+                },
+                ExpressionAttributeValues={
+                    ":run": run, ":id": attempt_id,
+                    ":executed": run.get("executedAt", ""),
+                },
+            ):
+                changed += 1
+                if key not in changed_keys:
+                    changed_keys.append(key)
+    _log_changes("currentState", changed_keys)
+    return changed
+
+
+def _latest_runs_by_suite(runs):
+    """{suiteType: run} keeping the newest executedAt per suite."""
+    latest = {}
+    for r in runs:
+        prev = latest.get(r["suiteType"])
+        if prev is None or r.get("executedAt", "") >= prev.get("executedAt", ""):
+            latest[r["suiteType"]] = {k: v for k, v in strip_keys(r).items()
+                                      if v is not None}
+    return latest
+
+
+# ── Test Summaries ───────────────────────────────────────────
+#
+# Deployment items carry testSummary: {suiteType: {passed, failed, total,
+# durationSec, executedAt}} for the newest run of each suite, so list
+# views render gates from /v1/qcd/deployments alone.
+
+
+def _merge_test_summaries(runs, refs):
+    """
+    Merge the newest run per suite into each attempt's testSummary with
+    one conditional update_item per (attempt, suite), so concurrent
+    pushes for different suites never overwrite each other and an older
+    run never replaces a newer one. Returns summaries written.
+    """
+    by_attempt = {}
+    for r in runs:
+        if r["attemptId"] in refs:
+            by_attempt.setdefault(r["attemptId"], []).append(r)
+
+    table = dynamodb.Table(DEPLOYMENTS_TABLE)
+    written = 0
+    changed_keys = []
+    for attempt_id, attempt_runs in by_attempt.items():
+        ref = refs[attempt_id]
+        key = {
+            "pk": f"{ref['clusterId']}#{ref['serviceId']}",
+            "sk": f"{ref['startedAt']}#{attempt_id}",
+        }
+        for suite, summary in _test_summaries(attempt_runs).items():
+            if _merge_test_summary(table, key, suite, summary):
+                written += 1
+                if key not in changed_keys:
+                    changed_keys.append(key)
+    _log_changes("deploymentAttempts", changed_keys)
+    return written
+
+
+def _merge_test_summary(table, key, suite, summary, retry=True):
+    """
+    SET testSummary.<suite>, creating the map on items that predate it.
+    After losing the race to create the map the merge is retried once;
+    a testSummary that is still not a map (e.g. written as null) gives False.
+    """
+    names = {"#ts": "testSummary", "#suite": suite, "#executedAt": "executedAt"}
+    try:
+        return _conditional_update(
+            table, Key=key,
+            UpdateExpression="SET #ts.#suite = :summary",
+            ConditionExpression="attribute_exists(pk) AND "
+                                "(attribute_not_exists(#ts.#suite) "
+                                "OR #ts.#suite.#executedAt <= :executed)",
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues={
+                ":summary": summary, ":executed": summary.get("executedAt", ""),
+            },
+        )
+    except ClientError as e:
+        # The document path is invalid until the testSummary map exists
+        if e.response.get("Error", {}).get("Code") != "ValidationException":
+            raise
+    if _conditional_update(
+        table, Key=key,
+        UpdateExpression="SET #ts = :map",
+        ConditionExpression="attribute_exists(pk) AND attribute_not_exists(#ts)",
+        ExpressionAttributeNames={"#ts": "testSummary"},
+        ExpressionAttributeValues={":map": {suite: summary}},
+    ):
+        return True
+    if not retry:
+        logger.warning(f"testSummary on {key} is not a map; skipped {suite}")
+        return False
+    # Lost a race to create the map — merge into the winner's
+    return _merge_test_summary(table, key, suite, summary, retry=False)
+
+
+def _test_summaries(runs):
+    """{suiteType: compact summary} of the newest run per suite."""
+    return {
+        suite: {f: run[f] for f in TEST_SUMMARY_FIELDS if f in run}
+        for suite, run in _latest_runs_by_suite(runs).items()
+    }
+
+
+def _late_runs(*reads):
+    """
+    Runs stored now for the attempts of `reads` (earlier {attemptId:
+    [runs]} results of _stored_runs) that one of those reads missed.
+    """
+    attempt_ids = sorted(set().union(*reads))
+    late = []
+    for attempt_id, runs in _stored_runs(attempt_ids).items():
+        seen = [{r["sk"] for r in read[attempt_id]} for read in reads if attempt_id in read]
+        late.extend(r for r in runs if not all(r["sk"] in keys for keys in seen))
+    return late
+
+
+def _stored_runs(attempt_ids):
+    """{attemptId: [runs]} for attempts whose runs are already stored."""
+    if not attempt_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=UPSERT_WORKERS) as pool:
+        results = pool.map(_query_attempt_runs, attempt_ids)
+        return {a: runs for a, runs in zip(attempt_ids, results)}
+
+
+def _query_attempt_runs(attempt_id):
+    """All stored test runs of one attempt (read consistently: rollups recount them)."""
+    table = dynamodb.Table(TEST_RESULTS_TABLE)
+    kwargs = {"KeyConditionExpression": Key("pk").eq(f"ATTEMPT#{attempt_id}"),
+              "ConsistentRead": True}
+    items = []
+    while True:
+        response = table.query(**kwargs)
+        items.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            return items
+        kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _conditional_update(table, **kwargs):
+    """update_item that returns False instead of raising on a failed condition."""
+    try:
+        table.update_item(**kwargs)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+            return False
+        raise
+
+
+@handles("dashboard.analytics.rebuild", bumps=("analytics", "deployments", "testResults"))
+def handle_analytics_rebuild(detail):
+    """
+    Recompute every rollup, attempt ref and CURRENT item, and every
+    deployment's testSummary and every test run's suiteShard,
+    failures-index and expiresAt attributes, from the raw tables.
+    With HOT_RETENTION_DAYS set, rollup days the hot tables may no
+    longer fully cover are left as they are.
+    Used to backfill after the analytics table is created; invoke
+    directly with {"detail-type": "dashboard.analytics.rebuild"}.
+    Rollups are overwritten, not incremented, so this is safe to rerun.
+    """
+    deployments = dynamodb.Table(DEPLOYMENTS_TABLE)
+    test_results = dynamodb.Table(TEST_RESULTS_TABLE)
+    analytics = dynamodb.Table(ANALYTICS_TABLE)
+
+    rollups = _RollupBatch()
+    refs = {}
+    current = {}
+    for a in scan_all(dynamodb, deployments):
+        refs[a["id"]] = a
+        rollups.add(a, _attempt_counters(a))
+        key = (a["clusterId"], a["serviceId"])
+        if key not in current or a["startedAt"] > current[key]["startedAt"]:
+            current[key] = a
+
+    runs_by_attempt = {}
+    run_indexes = []
+    for r in scan_all(dynamodb, test_results,
+                      FilterExpression=Attr("pk").begins_with("ATTEMPT#")):
+        run_indexes.append((
+            {"pk": r["pk"], "sk": r["sk"]},
+            {"suiteShard": _suite_shard(r["attemptId"], r["suiteType"]),
+             **_run_failure(r),
+             **_expires_at(r.get("executedAt"))},
+        ))
+        ref = refs.get(r.get("attemptId"))
+        if ref:
+            rollups.add(ref, _test_counters(r))
+            runs_by_attempt.setdefault(r["attemptId"], []).append(r)
+
+    cutoff = _hot_cutoff_day()
+    rollups_written = 0
+    with analytics.batch_writer() as batch:
+        for ((svc, cluster), day), counters in rollups.deltas.items():
+            if day < cutoff:
+                continue
+            rollups_written += 1
+            batch.put_item(Item={
+                "pk": f"ROLLUP#{svc}#{cluster}",
+                "sk": f"DAY#{day}",
+                "serviceId": svc,
+                "clusterId": cluster,
+                "day": day,
+                **counters,
+            })
+        for a in refs.values():
+            counters = _attempt_counters(a)
+            tests = [_test_counters(r) for r in runs_by_attempt.get(a["id"], [])]
+            batch.put_item(Item={
+                "pk": f"ATTEMPT#{a['id']}",
+                "sk": "REF",
+                "clusterId": a["clusterId"],
+                "serviceId": a["serviceId"],
+                "startedAt": a["startedAt"],
+                "attemptCounters": counters,
+                "rolledUp": _rolled_up(a, counters, *tests),
+                "rollupVersion": 0,
+            })
+        for (cluster_id, service_id), a in current.items():
+            batch.put_item(Item={
+                "pk": "CURRENT",
+                "sk": f"{cluster_id}#{service_id}",
+                "clusterId": cluster_id,
+                "serviceId": service_id,
+                "attemptId": a["id"],
+                "startedAt": a["startedAt"],
+                "attempt": strip_keys(a),
+                "tests": _latest_runs_by_suite(runs_by_attempt.get(a["id"], [])),
+            })
+
+    timings = _bulk_upsert(DEPLOYMENTS_TABLE, {"testSummary": [
+        ({"pk": a["pk"], "sk": a["sk"]},
+         {"testSummary": _test_summaries(runs_by_attempt.get(a["id"], [])),
+          **_attempt_failure(a),
+          **_expires_at(a.get("startedAt"))})
+        for a in refs.values()
+    ]})
+    cluster_runs = []
+    if HOT_RETENTION_DAYS:
+        cluster_runs = [
+            ({"pk": r["pk"], "sk": r["sk"]}, _expires_at(r.get("executedAt")))
+            for r in scan_all(dynamodb, test_results,
+                              FilterExpression=Attr("pk").begins_with("CLUSTER#"),
+                              ProjectionExpression="pk, sk, executedAt")
+        ]
+    timings.update(_bulk_upsert(TEST_RESULTS_TABLE, {
+        "testRunIndexes": run_indexes,
+        "clusterTestRunExpiry": cluster_runs,
+    }))
+    # Derived state was rewritten wholesale — clients reload
+    _log_changes(CHANGE_ALL, [])
+
+    return {
+        "rollups_written": rollups_written,
+        "attempt_refs_written": len(refs),
+        "current_state_written": len(current),
+        "test_summaries_written": len(refs),
+        "test_runs_indexed": len(run_indexes),
+        "timings_ms": timings,
+    }
+
+
+# ── Change Log ───────────────────────────────────────────────
+#
+# Analytics table, CHANGE_LOG_SHARDS time-ordered partitions:
+#   pk: CHANGELOG#<shard>   sk: <updatedAt>#<writer>#<n>
+#       entity (data.js collection name), keys [{pk, sk}], updatedAt,
+#       expiresAt (TTL)
+# Each call appends one record per CHANGE_LOG_KEYS_PER_RECORD keys,
+# after the items it names are written, so a push adds a handful of
+# writes rather than one per item. Each append goes to a random shard;
+# updatedAt carries microseconds so records sort by time across shards.
+#
+# The sk is stamped before batch_writer commits, so a reader could hand
+# out a token past a record that is not yet visible and skip it for good.
+# dashboard-api therefore never reads (or issues tokens) closer than
+# CHANGES_SETTLE_SECONDS to now, and the writer keeps its side of that
+# bargain: if stamp → commit took longer than half the window (throttling,
+# retries), the records are appended again under a fresh stamp. Duplicate
+# records are harmless — readers collapse keys and return current items.
+
+
+def _log_changes(entity, keys):
+    """
+    Append change records naming the item `keys` of `entity`.
+    CHANGE_ALL with no keys records a single "reload everything".
+    """
+    chunks = [keys[i:i + CHANGE_LOG_KEYS_PER_RECORD]
+              for i in range(0, len(keys), CHANGE_LOG_KEYS_PER_RECORD)]
+    if not chunks and entity == CHANGE_ALL:
+        chunks = [[]]
+    if not chunks:
+        return
+
+    for _ in range(CHANGE_LOG_MAX_APPENDS):
+        started = time.monotonic()
+        _append_changes(entity, chunks)
+        lag = time.monotonic() - started
+        # With no settle window (local runs) there is nothing to stay inside
+        if lag < CHANGES_SETTLE_SECONDS / 2 or not CHANGES_SETTLE_SECONDS:
+            return
+        logger.warning(f"Change log append for {entity} took {lag:.1f}s; re-appending")
+    logger.error(f"Change log append for {entity} kept exceeding the settle window; "
+                 f"incremental clients may miss it until they reload")
+
+
+def _append_changes(entity, chunks):
+    """Write one change record per key chunk, all under one fresh sk stamp."""
+    now = datetime.now(timezone.utc)
+    updated_at = now.isoformat(timespec="microseconds").replace("+00:00", "Z")
+    writer = os.urandom(4).hex()
+    shard = random.randrange(CHANGE_LOG_SHARDS)
+    expires_at = int(now.timestamp()) + CHANGE_LOG_TTL_DAYS * 86400
+    table = dynamodb.Table(ANALYTICS_TABLE)
+    with table.batch_writer() as batch:
+        for n, chunk in enumerate(chunks):
+            batch.put_item(Item={
+                "pk": f"CHANGELOG#{shard}",
+                "sk": f"{updated_at}#{writer}#{n:04d}",
+                "entity": entity,
+                "keys": [{"pk": k["pk"], "sk": k["sk"]} for k in chunk],
+                "updatedAt": updated_at,
+                "expiresAt": expires_at,
+            })
+
+
+# ── Queue Batches ────────────────────────────────────────────
+#
+# EventBridge rules for the bursty detail-types target the qcd-events SQS
+# queue; its event source mapping delivers up to batch_size events per
+# invocation, each record body being the EventBridge event.
+
+def _process_queue(records, context=None):
+    """
+    Dispatch a batch of queued EventBridge events through HANDLERS.
+    Events of a COALESCE detail-type whose details match apart from their
+    collection are merged into one detail (duplicate items: last record
+    wins) and handled once, so their writes share batch_writer batches,
+    rollup transactions and data-version bumps. Returns the failed messages as
+    batchItemFailures, so SQS redelivers only those. Each group gets its
+    own telemetry record, charged with the decoding of its messages.
+    """
+    groups = {}
+    decode_seconds = {}
+    failed = []
+    for record in records:
+        message_id = record["messageId"]
+        started = time.perf_counter()
+        try:
+            event = _decode(record["body"])
+            detail_type = event.get("detail-type", "")
+            detail = event.get("detail", {})
+            if isinstance(detail, str):
+                detail = _decode(detail)
+            if detail_type not in HANDLERS:
+                raise ValueError(f"No handler for detail-type: {detail_type}")
+        except Exception as e:
+            logger.exception(f"Unreadable queue message {message_id}: {e}")
+            failed.append(message_id)
+            continue
+        group = (detail_type, _coalesce_key(detail_type, detail, message_id))
+        groups.setdefault(group, []).append((message_id, detail))
+        decode_seconds[group] = decode_seconds.get(group, 0.0) + time.perf_counter() - started
+
+    for group, entries in groups.items():
+        detail_type = group[0]
+        _metrics.start(detail_type, decode_seconds[group])
+        group_failed = _run_group(detail_type, entries)
+        _metrics.emit(context, {"Events": (len(entries), "Count")}, failed=len(group_failed))
+        failed.extend(group_failed)
+
+    logger.info(f"Queue batch: {len(records)} messages in {len(groups)} groups, "
+                f"{len(failed)} failed")
+    return {"batchItemFailures": [{"itemIdentifier": m} for m in failed]}
+
+
+def _coalesce_key(detail_type, detail, message_id):
+    """
+    Events that may be merged share a key: the detail minus its item
+    collection and _metadata. Other detail-types are never merged.
+    """
+    if detail_type not in COALESCE:
+        return message_id
+    collection = COALESCE[detail_type][0]
+    rest = {k: v for k, v in detail.items() if k not in (collection, "_metadata")}
+    return json.dumps(rest, sort_keys=True, default=str)
+
+
+def _run_group(detail_type, entries):
+    """
+    Handle [(message_id, detail)] of one group; returns failed message ids.
+    If the coalesced write fails, the events are rerun one by one (writes
+    are idempotent, see _run, and tests/test_qcd_redelivery.py checks it)
+    so only the bad ones are redelivered.
+    """
+    if len(entries) > 1:
+        try:
+            _run(detail_type, _coalesce([d for _, d in entries], *COALESCE[detail_type]),
+                 label=f"{detail_type} [coalesced {len(entries)} events]")
+            return []
+        except Exception as e:
+            logger.exception(f"Coalesced {detail_type} failed, retrying events singly: {e}")
+
+    failed = []
+    for message_id, detail in entries:
+        try:
+            _run(detail_type, detail)
+        except Exception as e:
+            logger.exception(f"Error processing queue message {message_id}: {e}")
+            failed.append(message_id)
+    return failed
+
+
+def _coalesce(details, collection, key_fields):
+    """One detail holding every item of `details`, deduplicated last-writer-wins."""
+    items = {}
+    for detail in details:
+        for item in detail.get(collection, []):
+            items[tuple(item.get(f) for f in key_fields)] = item
+    rest = {k: v for k, v in details[-1].items() if k != "_metadata"}
+    return {**rest, collection: list(items.values())}
+
+
+# ── Telemetry ────────────────────────────────────────────────
+#
+# One CloudWatch Embedded Metric Format line per handled detail-type —
+# per invocation for direct events and per group for queue batches (see
+# "Queue Batches") — dimensioned by Function + DetailType:
+#   Duration        wall time of the invocation (ms)
+#   DynamoDbTime    time inside DynamoDB calls, summed over calls — with
+#                   the UPSERT_WORKERS pool this can exceed Duration
+#   SerializeTime   decoding the event (JSON + Decimal conversion)
+#   OtherTime       Duration − DynamoDbTime − SerializeTime (floored at 0)
+#   DynamoDbCalls, Pages (Query/Scan pages), Items / ItemsWritten
+#   ReadCapacity, WriteCapacity (ConsumedCapacity totals, RCU/WCU)
+#   Events          events handled (> 1 when queued events coalesce)
+# The DynamoDB figures come from botocore hooks on the shared client, so
+# every Table on every thread is counted without touching the callers.
+# METRICS_TRACE_SAMPLE_RATE of records also log one line per DynamoDB call.
+# Metrics and the hooks live in mcq_common, shared with dashboard-api.
+
+_metrics = Metrics("qcd-processor", "DetailType")
+_metrics.register(dynamodb.meta.client)
+
+
+# ── Cold Archive ─────────────────────────────────────────────
+#
+# With HOT_RETENTION_DAYS set, TTL removes deployments and test runs
+# from the hot tables; their REMOVE stream records (userIdentity
+# dynamodb.amazonaws.com) carry the old image, which is written to
+#   <ARCHIVE_URI>/<kind>/dt=<yyyy-mm-dd>/<written-at>-<rand>.jsonl.gz
+# kind: deployments | test-runs | cluster-test-runs, dt: the item's
+# startedAt/executedAt day. dashboard-api /v1/qcd/history reads only
+# the dt= partitions in a requested window. A retried stream batch may
+# write an item twice; readers keep the last copy per id.
+
+# Archive kind → (change-log entity, data-version category) of its hot items
+ARCHIVE_KINDS = {
+    "deployments": ("deploymentAttempts", "deployments"),
+    "test-runs": ("testRuns", "testResults"),
+    "cluster-test-runs": ("clusterTestRuns", "testResults"),
+}
+
+
+def _expires_at(timestamp):
+    """TTL attribute for an item dated `timestamp`, or {} when disabled."""
+    if not HOT_RETENTION_DAYS or not timestamp:
+        return {}
+    try:
+        dated = _parse_ts(timestamp)
+    except ValueError:
+        return {}
+    return {"expiresAt": int(dated.timestamp()) + HOT_RETENTION_DAYS * 86400}
+
+
+def _hot_cutoff_day():
+    """Oldest day the hot tables still fully cover ("" when nothing expires)."""
+    if not HOT_RETENTION_DAYS:
+        return ""
+    cutoff = datetime.now(timezone.utc).timestamp() - (HOT_RETENTION_DAYS - 1) * 86400
+    return datetime.fromtimestamp(cutoff, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _archive_expired(records):
+    """
+    Archive the old images of TTL deletions in one stream batch, then
+    tell readers they are gone: the removed keys go to the change log
+    (clients see item null and drop them) and the deployments/testResults
+    data versions are bumped, so cached bodies and ETags stop serving them.
+    """
+    deserializer = TypeDeserializer()
+    partitions = {}
+    removed = {}
+    for record in records:
+        identity = record.get("userIdentity") or {}
+        if record.get("eventName") != "REMOVE" or identity.get("principalId") != "dynamodb.amazonaws.com":
+            continue
+        image = record.get("dynamodb", {}).get("OldImage")
+        if not image:
+            continue
+        item = {k: deserializer.deserialize(v) for k, v in image.items()}
+        table_name = record.get("eventSourceARN", "").split(":table/", 1)[-1].split("/", 1)[0]
+        if table_name == DEPLOYMENTS_TABLE:
+            kind, dated = "deployments", item.get("startedAt", "")
+        elif item["pk"].startswith("CLUSTER#"):
+            kind, dated = "cluster-test-runs", item.get("executedAt", "")
+        else:
+            kind, dated = "test-runs", item.get("executedAt", "")
+        # Keys, index and TTL attributes are storage-only (INTERNAL_ATTRIBUTES)
+        row = strip_keys(item)
+        partitions.setdefault((kind, dated[:10] or "unknown"), []).append(row)
+        removed.setdefault(kind, []).append({"pk": item["pk"], "sk": item["sk"]})
+
+    archived = {}
+    for (kind, day), rows in partitions.items():
+        _archive_write(kind, day, rows)
+        archived[kind] = archived.get(kind, 0) + len(rows)
+
+    # After the archive write, so a retried batch re-announces the removal
+    for kind, keys in removed.items():
+        _log_changes(ARCHIVE_KINDS[kind][0], keys)
+    if removed:
+        _bump_data_version(sorted({ARCHIVE_KINDS[kind][1] for kind in removed}))
+    logger.info(f"Archived expired items: {archived}")
+    return {"archived": archived, "partitions": len(partitions)}
+
+
+def _archive_write(kind, day, rows):
+    """Write one gzipped JSONL object into the kind/dt=day partition."""
+    body = "".join(json.dumps(row, default=_json_number, separators=(",", ":")) + "\n"
+                   for row in rows)
+    name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%fZ}-{os.urandom(4).hex()}.jsonl.gz"
+    data = gzip.compress(body.encode(), mtime=0)
+
+    if not ARCHIVE_URI:
+        raise RuntimeError("ARCHIVE_URI is not set; cannot archive expired items")
+    if ARCHIVE_URI.startswith("s3://"):
+        bucket, _, prefix = ARCHIVE_URI[len("s3://"):].partition("/")
+        key = "/".join(p for p in (prefix.strip("/"), kind, f"dt={day}", name) if p)
+        s3.put_object(
+            Bucket=bucket, Key=key, Body=data,
+            ContentType="application/x-ndjson", ContentEncoding="gzip",
+        )
+    else:
+        root = ARCHIVE_URI.removeprefix("file://")
+        directory = os.path.join(root, kind, f"dt={day}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name), "wb") as f:
+            f.write(data)
+
 
-    return {"processed": counts}
+def _json_number(obj):
+    """json.dumps default: Decimal → int/float."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError(f"Not JSON serializable: {type(obj).__name__}")
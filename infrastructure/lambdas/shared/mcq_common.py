@@ -0,0 +1,380 @@
+"""
+Code shared by the dashboard Lambdas: storage-attribute stripping,
+DynamoDB retry and parallel-scan helpers and the per-invocation EMF
+telemetry record.
+
+The lambda Terraform module copies this directory into the root of each
+function's zip (shared_source_dirs), next to index.py, so handlers
+import it as a top-level module. Local scripts that load an index.py by
+path put this directory on sys.path first.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger()
+
+# Per-invocation telemetry (see Metrics): one CloudWatch EMF line per
+# record; METRICS_TRACE_SAMPLE_RATE of records also log every DynamoDB call
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "MCQDashboard")
+METRICS_TRACE_SAMPLE_RATE = float(os.environ.get("METRICS_TRACE_SAMPLE_RATE", "0"))
+
+# Full-table scans split into Segment/TotalSegments and run concurrently.
+# SCAN_SEGMENTS=0 derives the count from TableSizeBytes (one segment per
+# SCAN_BYTES_PER_SEGMENT, capped at SCAN_MAX_SEGMENTS). Clients that scan
+# need SCAN_MAX_SEGMENTS extra pool connections.
+SCAN_SEGMENTS = int(os.environ.get("SCAN_SEGMENTS", "0"))
+SCAN_MAX_SEGMENTS = int(os.environ.get("SCAN_MAX_SEGMENTS", "16"))
+SCAN_BYTES_PER_SEGMENT = int(
+    os.environ.get("SCAN_BYTES_PER_SEGMENT", str(16 * 1024 * 1024))
+)
+
+# Storage-only attributes (keys, sparse-index and TTL attributes, content
+# hashes): never returned to clients or copied into derived items
+INTERNAL_ATTRIBUTES = ("pk", "sk", "itemType", "failureType", "failedAt", "suiteShard",
+                       "versionSort", "expiresAt", "contentHash")
+
+# DynamoDB error codes that mean "slow down", not "this request is wrong"
+THROTTLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+# Operations that accept ReturnConsumedCapacity, and which side they bill
+CAPACITY_OPERATIONS = {
+    "GetItem": "read", "BatchGetItem": "read", "Query": "read", "Scan": "read",
+    "TransactGetItems": "read",
+    "PutItem": "write", "UpdateItem": "write", "DeleteItem": "write",
+    "BatchWriteItem": "write", "TransactWriteItems": "write",
+}
+
+
+def strip_keys(item):
+    """Remove DynamoDB keys and index attributes from a stored item."""
+    return {k: v for k, v in item.items() if k not in INTERNAL_ATTRIBUTES}
+
+
+# ── DynamoDB retries ─────────────────────────────────────────
+
+def with_backoff(fn, max_attempts):
+    """Call fn(), retrying DynamoDB throttling errors with full jitter."""
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            if code not in THROTTLE_ERRORS or attempt == max_attempts - 1:
+                raise
+            backoff(attempt)
+
+
+def backoff(attempt):
+    """Full-jitter sleep before retry number attempt + 1."""
+    time.sleep(random.uniform(0, min(2.0, 0.05 * 2 ** attempt)))
+
+
+def batch_get(dynamodb, table_name, keys, max_attempts, projection=None, consistent=False):
+    """
+    BatchGetItem on `dynamodb` (a boto3 resource) in chunks of 100,
+    optionally projected (the projection must include pk and sk) and
+    strongly consistent.
+    Throttling errors go through with_backoff; UnprocessedKeys (throttled
+    reads) are retried after the same jittered backoff, up to
+    max_attempts rounds. Returns {(pk, sk): item} for the keys that exist.
+    """
+    found = {}
+    unique = list({(k["pk"], k["sk"]): k for k in keys}.values())
+    for i in range(0, len(unique), 100):
+        request = {table_name: {"Keys": unique[i:i + 100]}}
+        if projection:
+            request[table_name]["ProjectionExpression"] = projection
+        if consistent:
+            request[table_name]["ConsistentRead"] = True
+        for attempt in range(max_attempts):
+            response = with_backoff(lambda: dynamodb.batch_get_item(RequestItems=request),
+                                    max_attempts)
+            for item in response.get("Responses", {}).get(table_name, []):
+                found[(item["pk"], item["sk"])] = item
+            request = response.get("UnprocessedKeys") or None
+            if not request:
+                break
+            backoff(attempt)
+        if request:
+            raise RuntimeError(f"BatchGetItem on {table_name} still throttled "
+                               f"after {max_attempts} attempts")
+    return found
+
+
+# ── Parallel scans ───────────────────────────────────────────
+
+def scan_all(dynamodb, table, **kwargs):
+    """
+    Scan that returns all items of `table`, a Table of the `dynamodb`
+    resource. Large tables are scanned as parallel segments (see scan_iter).
+    """
+    return list(scan_iter(dynamodb, table, **kwargs))
+
+
+def scan_bounded(dynamodb, table, max_items, **kwargs):
+    """
+    scan_all that stops after max_items. Returns (items, complete) —
+    complete is False if the scan had more items than that.
+    """
+    items = []
+    scan = scan_iter(dynamodb, table, **kwargs)
+    try:
+        for item in scan:
+            if len(items) >= max_items:
+                return items, False
+            items.append(item)
+    finally:
+        scan.close()
+    return items, True
+
+
+def scan_iter(dynamodb, table, **kwargs):
+    """
+    Yield scanned items page by page as they arrive.
+    With more than one segment, each segment pages on its own thread
+    (own Table, shared client) and pages are merged through a queue in
+    completion order. Closing the generator early stops the workers
+    after their in-flight page.
+    """
+    segments = scan_segments(table)
+    if segments == 1:
+        while True:
+            response = table.scan(**kwargs)
+            yield from response.get("Items", [])
+            if "LastEvaluatedKey" not in response:
+                return
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    pages = queue.Queue()
+    stop = threading.Event()
+
+    def scan_segment(segment):
+        segment_table = dynamodb.Table(table.name)
+        args = dict(kwargs, Segment=segment, TotalSegments=segments)
+        if "ExpressionAttributeNames" in args:
+            # boto3 merges generated placeholders into this dict in place
+            args["ExpressionAttributeNames"] = dict(args["ExpressionAttributeNames"])
+        try:
+            while not stop.is_set():
+                response = segment_table.scan(**args)
+                pages.put(response.get("Items", []))
+                if "LastEvaluatedKey" not in response:
+                    break
+                args["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(None)
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        try:
+            for segment in range(segments):
+                pool.submit(scan_segment, segment)
+            remaining = segments
+            while remaining:
+                page = pages.get()
+                if page is None:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            stop.set()
+
+
+# TableSizeBytes is refreshed by DynamoDB roughly every six hours, so
+# one DescribeTable per table per container is enough
+_table_sizes = {}
+
+
+def scan_segments(table):
+    """Segment count for a full scan of `table`."""
+    if SCAN_SEGMENTS:
+        return max(1, min(SCAN_SEGMENTS, SCAN_MAX_SEGMENTS))
+    size = _table_sizes.get(table.name)
+    if size is None:
+        try:
+            size = table.meta.client.describe_table(
+                TableName=table.name
+            )["Table"].get("TableSizeBytes", 0)
+        except Exception:
+            logger.warning(f"DescribeTable failed for {table.name}; scanning sequentially")
+            return 1
+        _table_sizes[table.name] = size
+    return max(1, min(SCAN_MAX_SEGMENTS, -(-size // SCAN_BYTES_PER_SEGMENT)))
+
+
+# ── Telemetry ────────────────────────────────────────────────
+#
+# Each Lambda keeps one Metrics record, registered on its DynamoDB
+# client, and emits one CloudWatch Embedded Metric Format line per unit
+# of work (a route, a detail-type), dimensioned by Function + that unit:
+#   Duration        wall time of the record (ms)
+#   DynamoDbTime    time inside DynamoDB calls, summed over calls — with
+#                   thread pools or parallel scans this can exceed Duration
+#   SerializeTime   encode/decode time the handler reports
+#   OtherTime       Duration − DynamoDbTime − SerializeTime (floored at 0)
+#   DynamoDbCalls, Pages (Query/Scan pages), Items / ItemsWritten
+#   ReadCapacity, WriteCapacity (ConsumedCapacity totals, RCU/WCU)
+# plus whatever metrics the handler passes to emit(). The DynamoDB
+# figures come from botocore hooks on the shared client, so every Table
+# on every thread is counted without touching the callers.
+
+
+def emf_line(dimensions, values, **properties):
+    """
+    One EMF record as a JSON line. `dimensions` maps dimension names to
+    values; `values` is {metric name: (value, unit)}; keyword arguments
+    are logged as properties (searchable in Logs Insights, not metrics).
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": n, "Unit": unit} for n, (_, unit) in values.items()],
+            }],
+        },
+        **dimensions,
+        **{n: value for n, (value, _) in values.items()},
+        **properties,
+    }
+    return json.dumps(record, separators=(",", ":"))
+
+
+class Metrics:
+    """Per-invocation telemetry record; see the section comment above."""
+
+    def __init__(self, function, dimension):
+        self.function = function
+        self.dimension = dimension
+        self.lock = threading.Lock()
+        self.start(None)
+        self.active = False
+
+    def register(self, client):
+        """Hook this record into every call made through a DynamoDB client."""
+        client.meta.events.register("before-parameter-build.dynamodb", self.before_call)
+        client.meta.events.register("after-call.dynamodb", self.after_call)
+
+    def start(self, name, serialize_seconds=0.0):
+        """
+        Begin a record for `name` (a Route or DetailType value); decoding
+        already done for it (`serialize_seconds`) is counted in.
+        """
+        self.name = name
+        self.properties = {}
+        self.started = time.perf_counter() - serialize_seconds
+        self.dynamodb_seconds = 0.0
+        self.serialize_seconds = serialize_seconds
+        self.calls = 0
+        self.pages = 0
+        self.items = 0
+        self.items_written = 0
+        self.capacity = {"read": 0.0, "write": 0.0}
+        self.trace = random.random() < METRICS_TRACE_SAMPLE_RATE
+        self.active = METRICS_ENABLED
+
+    def before_call(self, params, model, context, **kwargs):
+        """botocore before-parameter-build: ask for capacity, start the clock."""
+        if not self.active:
+            return
+        if model.name in CAPACITY_OPERATIONS:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+        context["metrics_started"] = time.perf_counter()
+        context["metrics_target"] = params.get("TableName", "") + (
+            f"/{params['IndexName']}" if "IndexName" in params else "")
+        if model.name == "BatchWriteItem":
+            context["metrics_writes"] = sum(len(r) for r in params.get("RequestItems", {}).values())
+        elif model.name == "TransactWriteItems":
+            context["metrics_writes"] = len(params.get("TransactItems", []))
+        elif CAPACITY_OPERATIONS.get(model.name) == "write":
+            context["metrics_writes"] = 1
+
+    def after_call(self, parsed, model, context, **kwargs):
+        """botocore after-call: fold one response into the record."""
+        started = context.get("metrics_started")
+        if not self.active or started is None:
+            return
+        elapsed = time.perf_counter() - started
+        operation = model.name
+        if operation in ("Query", "Scan"):
+            items = parsed.get("Count", 0)
+        elif operation == "GetItem":
+            items = int("Item" in parsed)
+        elif operation == "BatchGetItem":
+            items = sum(len(rows) for rows in parsed.get("Responses", {}).values())
+        else:
+            items = 0
+        written = context.get("metrics_writes", 0)
+        if written and "Error" not in parsed:
+            written -= sum(len(r) for r in parsed.get("UnprocessedItems", {}).values())
+        else:
+            written = 0
+        consumed = parsed.get("ConsumedCapacity") or []
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        units = sum(c.get("CapacityUnits", 0) for c in consumed)
+
+        with self.lock:
+            self.dynamodb_seconds += elapsed
+            self.calls += 1
+            self.pages += operation in ("Query", "Scan")
+            self.items += items
+            self.items_written += written
+            if operation in CAPACITY_OPERATIONS:
+                self.capacity[CAPACITY_OPERATIONS[operation]] += units
+        if self.trace:
+            logger.info(
+                f"DynamoDB {operation} {context.get('metrics_target')}: items={items} "
+                f"scanned={parsed.get('ScannedCount', '-')} capacity={units} "
+                f"more={'LastEvaluatedKey' in parsed} ms={elapsed * 1000:.1f}"
+            )
+
+    def emit(self, context, metrics=None, **properties):
+        """
+        Print the EMF line (stdout, which Lambda ships to CloudWatch Logs).
+        `metrics` adds {name: (value, unit)}; keyword arguments are logged
+        as properties (searchable in Logs Insights, not metrics).
+        """
+        if not self.active:
+            return
+        self.active = False
+        duration = (time.perf_counter() - self.started) * 1000
+        dynamodb_ms = self.dynamodb_seconds * 1000
+        serialize_ms = self.serialize_seconds * 1000
+        values = {
+            "Duration": (round(duration, 2), "Milliseconds"),
+            "DynamoDbTime": (round(dynamodb_ms, 2), "Milliseconds"),
+            "SerializeTime": (round(serialize_ms, 2), "Milliseconds"),
+            "OtherTime": (round(max(0.0, duration - dynamodb_ms - serialize_ms), 2), "Milliseconds"),
+            "DynamoDbCalls": (self.calls, "Count"),
+            "Pages": (self.pages, "Count"),
+            "Items": (self.items, "Count"),
+            "ItemsWritten": (self.items_written, "Count"),
+            "ReadCapacity": (round(self.capacity["read"], 2), "Count"),
+            "WriteCapacity": (round(self.capacity["write"], 2), "Count"),
+            **(metrics or {}),
+        }
+        print(emf_line(
+            {"Function": self.function, self.dimension: self.name}, values,
+            **{**self.properties, **properties},
+            requestId=getattr(context, "aws_request_id", None),
+            traced=self.trace,
+        ), flush=True)
@@ -113,7 +113,7 @@ resource "aws_cloudfront_distribution" "this" {
 
       forwarded_values {
         query_string = true
-        headers      = ["Authorization", "X-Api-Key"]
+        headers      = ["Authorization", "X-Api-Key", "If-None-Match", "Accept-Encoding"]
         cookies { forward = "none" }
       }
 
@@ -2,10 +2,26 @@
 # Lambda Module — Reusable for all Lambda functions
 ###############################################################################
 
+# The function's own files plus the *.py modules of each shared source
+# dir, all at the zip root (the function's files win on a name clash)
+locals {
+  package_files = merge(concat(
+    [for dir in var.shared_source_dirs : { for f in fileset(dir, "*.py") : f => "${dir}/${f}" }],
+    [{ for f in fileset(var.source_dir, "**") : f => "${var.source_dir}/${f}" if !strcontains(f, "__pycache__") }],
+  )...)
+}
+
 data "archive_file" "lambda_zip" {
   type        = "zip"
-  source_dir  = var.source_dir
   output_path = "${path.module}/.build/${var.function_name}.zip"
+
+  dynamic "source" {
+    for_each = local.package_files
+    content {
+      filename = source.key
+      content  = file(source.value)
+    }
+  }
 }
 
 resource "aws_lambda_function" "this" {
@@ -109,5 +125,39 @@ resource "aws_iam_role_policy" "custom" {
   policy = var.custom_policy_json
 }
 
+# Event source mappings (DynamoDB streams, SQS) — optional
+resource "aws_lambda_event_source_mapping" "this" {
+  for_each = var.event_source_mappings
+
+  function_name                      = aws_lambda_function.this.arn
+  event_source_arn                   = each.value.event_source_arn
+  starting_position                  = each.value.starting_position
+  batch_size                         = each.value.batch_size
+  maximum_batching_window_in_seconds = each.value.maximum_batching_window_in_seconds
+  function_response_types            = each.value.function_response_types
+  maximum_retry_attempts             = each.value.maximum_retry_attempts
+  maximum_record_age_in_seconds      = each.value.maximum_record_age_in_seconds
+  bisect_batch_on_function_error     = each.value.bisect_batch_on_function_error
+
+  dynamic "filter_criteria" {
+    for_each = each.value.filter_pattern != null ? [1] : []
+    content {
+      filter {
+        pattern = each.value.filter_pattern
+      }
+    }
+  }
+
+  # Where a stream batch that exhausted its retries is reported (SQS/SNS)
+  dynamic "destination_config" {
+    for_each = each.value.on_failure_destination_arn != null ? [1] : []
+    content {
+      on_failure {
+        destination_arn = each.value.on_failure_destination_arn
+      }
+    }
+  }
+}
+
 # NOTE: Lambda permissions (API Gateway, EventBridge) are managed by the
 # caller modules (api-gateway, eventbridge) to avoid duplicate resources.
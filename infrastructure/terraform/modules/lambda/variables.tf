@@ -14,6 +14,12 @@ variable "source_dir" {
   type        = string
 }
 
+variable "shared_source_dirs" {
+  description = "Directories whose *.py modules are packaged next to the function's own files"
+  type        = list(string)
+  default     = []
+}
+
 variable "handler" {
   description = "Lambda handler (e.g. index.handler)"
   type        = string
@@ -86,6 +92,23 @@ variable "custom_policy_json" {
   default     = null
 }
 
+variable "event_source_mappings" {
+  description = "Event source mappings (DynamoDB streams, SQS) keyed by name; filter_pattern is a JSON event filter. The retry, bisect and on_failure_destination_arn settings apply to stream mappings only"
+  type = map(object({
+    event_source_arn                   = string
+    starting_position                  = optional(string)
+    batch_size                         = optional(number)
+    maximum_batching_window_in_seconds = optional(number)
+    function_response_types            = optional(list(string))
+    filter_pattern                     = optional(string)
+    maximum_retry_attempts             = optional(number)
+    maximum_record_age_in_seconds      = optional(number)
+    bisect_batch_on_function_error     = optional(bool)
+    on_failure_destination_arn         = optional(string)
+  }))
+  default = {}
+}
+
 variable "tags" {
   description = "Resource tags"
   type        = map(string)
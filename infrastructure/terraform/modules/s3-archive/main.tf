@@ -0,0 +1,51 @@
+###############################################################################
+# S3 Archive Module — cold tier for items expired out of DynamoDB
+###############################################################################
+
+resource "aws_s3_bucket" "archive" {
+  bucket        = var.bucket_name
+  force_destroy = var.force_destroy
+
+  tags = merge(var.tags, {
+    Module = "s3-archive"
+  })
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "archive" {
+  bucket = aws_s3_bucket.archive.id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm     = var.kms_key_arn != null ? "aws:kms" : "AES256"
+      kms_master_key_id = var.kms_key_arn
+    }
+    bucket_key_enabled = true
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "archive" {
+  bucket = aws_s3_bucket.archive.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets = true
+}
+
+# Archived partitions are read rarely — move them to a cheaper class
+resource "aws_s3_bucket_lifecycle_configuration" "archive" {
+  count  = var.infrequent_access_after_days > 0 ? 1 : 0
+  bucket = aws_s3_bucket.archive.id
+
+  rule {
+    id     = "infrequent-access"
+    status = "Enabled"
+
+    filter {}
+
+    transition {
+      days          = var.infrequent_access_after_days
+      storage_class = "STANDARD_IA"
+    }
+  }
+}
@@ -0,0 +1,14 @@
+output "bucket_id" {
+  description = "S3 bucket ID"
+  value       = aws_s3_bucket.archive.id
+}
+
+output "bucket_name" {
+  description = "S3 bucket name"
+  value       = aws_s3_bucket.archive.bucket
+}
+
+output "bucket_arn" {
+  description = "S3 bucket ARN"
+  value       = aws_s3_bucket.archive.arn
+}
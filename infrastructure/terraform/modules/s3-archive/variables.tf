@@ -0,0 +1,28 @@
+variable "bucket_name" {
+  description = "S3 bucket name for the archive"
+  type        = string
+}
+
+variable "force_destroy" {
+  description = "Allow force destroy of bucket"
+  type        = bool
+  default     = false
+}
+
+variable "kms_key_arn" {
+  description = "KMS key ARN for encryption"
+  type        = string
+  default     = null
+}
+
+variable "infrequent_access_after_days" {
+  description = "Transition objects to STANDARD_IA after this many days (0 to disable)"
+  type        = number
+  default     = 30
+}
+
+variable "tags" {
+  description = "Resource tags"
+  type        = map(string)
+  default     = {}
+}
@@ -0,0 +1,48 @@
+###############################################################################
+# SQS Module — queue with dead-letter queue, fed by EventBridge rules
+###############################################################################
+
+resource "aws_sqs_queue" "dlq" {
+  name                      = "${var.queue_name}-dlq"
+  message_retention_seconds = var.dlq_retention_seconds
+  sqs_managed_sse_enabled   = true
+
+  tags = merge(var.tags, {
+    Module = "sqs"
+  })
+}
+
+resource "aws_sqs_queue" "this" {
+  name                       = var.queue_name
+  visibility_timeout_seconds = var.visibility_timeout_seconds
+  message_retention_seconds  = var.message_retention_seconds
+  sqs_managed_sse_enabled    = true
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.dlq.arn
+    maxReceiveCount     = var.max_receive_count
+  })
+
+  tags = merge(var.tags, {
+    Module = "sqs"
+  })
+}
+
+# Allow EventBridge rules (matched by ARN pattern) to send to the queue
+resource "aws_sqs_queue_policy" "this" {
+  count     = length(var.allowed_source_arns) > 0 ? 1 : 0
+  queue_url = aws_sqs_queue.this.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [{
+      Effect    = "Allow"
+      Principal = { Service = "events.amazonaws.com" }
+      Action    = "sqs:SendMessage"
+      Resource  = aws_sqs_queue.this.arn
+      Condition = {
+        ArnLike = { "aws:SourceArn" = var.allowed_source_arns }
+      }
+    }]
+  })
+}
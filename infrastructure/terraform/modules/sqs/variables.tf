@@ -0,0 +1,40 @@
+variable "queue_name" {
+  description = "SQS queue name (the dead-letter queue is <queue_name>-dlq)"
+  type        = string
+}
+
+variable "visibility_timeout_seconds" {
+  description = "Visibility timeout — at least 6x the consuming Lambda's timeout"
+  type        = number
+  default     = 1800
+}
+
+variable "message_retention_seconds" {
+  description = "How long undelivered messages are kept"
+  type        = number
+  default     = 345600
+}
+
+variable "max_receive_count" {
+  description = "Receives before a message moves to the dead-letter queue"
+  type        = number
+  default     = 5
+}
+
+variable "dlq_retention_seconds" {
+  description = "How long dead-lettered messages are kept"
+  type        = number
+  default     = 1209600
+}
+
+variable "allowed_source_arns" {
+  description = "EventBridge rule ARNs (ArnLike patterns) allowed to send messages"
+  type        = list(string)
+  default     = []
+}
+
+variable "tags" {
+  description = "Resource tags"
+  type        = map(string)
+  default     = {}
+}
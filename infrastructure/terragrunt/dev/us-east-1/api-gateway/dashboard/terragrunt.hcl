@@ -65,9 +65,35 @@ inputs = {
       lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
       lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
     }
+    "GET /v1/qcd/analytics" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
+    "GET /v1/qcd/current-state" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
+    "GET /v1/qcd/failures" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
+    "GET /v1/qcd/changes" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
+    "GET /v1/qcd/history" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
+    "GET /v1/qcd/bootstrap" = {
+      lambda_invoke_arn   = dependency.lambda_dashboard_api.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_dashboard_api.outputs.function_arn
+    }
   }
 
   cors_allow_origins   = ["https://mcq.infosight.cloud", "https://dev.mcq.infosight.cloud", "http://localhost:5173"]
+  cors_allow_headers   = ["Content-Type", "Authorization", "If-None-Match"]
+  cors_expose_headers  = ["ETag"]
   throttle_burst_limit = 200
   throttle_rate_limit  = 100
 }
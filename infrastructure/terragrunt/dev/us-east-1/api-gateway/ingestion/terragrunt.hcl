@@ -45,6 +45,10 @@ inputs = {
       lambda_invoke_arn   = dependency.lambda_ingestion.outputs.invoke_arn
       lambda_function_arn = dependency.lambda_ingestion.outputs.function_arn
     }
+    "POST /v1/ingest/batch" = {
+      lambda_invoke_arn   = dependency.lambda_ingestion.outputs.invoke_arn
+      lambda_function_arn = dependency.lambda_ingestion.outputs.function_arn
+    }
   }
 
   cors_allow_origins   = ["*"]
@@ -0,0 +1,31 @@
+# DynamoDB — Analytics table (dev/us-east-1)
+# Stores: daily rollups maintained by qcd-processor, attempt refs,
+#         CURRENT items, change log (TTL on expiresAt)
+# pk: ROLLUP#<serviceId|*>#<clusterId|*> | ATTEMPT#<attemptId> | CURRENT | CHANGELOG#<shard>
+# sk: DAY#<yyyy-mm-dd> | REF | <clusterId>#<serviceId> | <updatedAt>#<writer>#<n>
+include "root" {
+  path = find_in_parent_folders("root.hcl")
+}
+
+terraform {
+  source = "${dirname(find_in_parent_folders("root.hcl"))}/../../../terraform/modules/dynamodb"
+}
+
+locals {
+  root = read_terragrunt_config(find_in_parent_folders("root.hcl"))
+  env  = local.root.locals.environment
+}
+
+inputs = {
+  table_name = "${local.env}-mcq-analytics"
+  hash_key   = "pk"
+  range_key  = "sk"
+
+  attributes = [
+    { name = "pk", type = "S" },
+    { name = "sk", type = "S" },
+  ]
+
+  point_in_time_recovery = true
+  ttl_attribute          = "expiresAt"
+}
@@ -1,6 +1,7 @@
 # DynamoDB — Deployments table (dev/us-east-1)
 # Stores: deployment attempts — high-volume, multi-access-pattern
 # pk: <clusterId>#<serviceId>    sk: <startedAt>#<attemptId>
+# failures-index (sparse): failureType = DEPLOYMENT#<0..FAILURE_SHARDS-1> on FAILED/ROLLBACK, failedAt = startedAt
 include "root" {
   path = find_in_parent_folders("root.hcl")
 }
@@ -24,13 +25,20 @@ inputs = {
     { name = "sk", type = "S" },
     { name = "clusterId", type = "S" },
     { name = "serviceId", type = "S" },
+    { name = "failureType", type = "S" },
+    { name = "failedAt", type = "S" },
   ]
 
   global_secondary_indexes = [
     { name = "clusterId-index", hash_key = "clusterId", range_key = "sk" },
     { name = "serviceId-index", hash_key = "serviceId", range_key = "sk" },
+    { name = "failures-index", hash_key = "failureType", range_key = "failedAt" },
   ]
 
   point_in_time_recovery = true
   ttl_attribute          = "expiresAt"
+
+  # TTL removals feed qcd-processor's cold archive
+  stream_enabled   = true
+  stream_view_type = "OLD_IMAGE"
 }
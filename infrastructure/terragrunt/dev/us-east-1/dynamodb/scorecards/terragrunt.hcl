@@ -2,6 +2,8 @@
 # Stores: scorecard weights, per-service scores, jira tickets
 # pk: WEIGHTS | SERVICE#<serviceId>
 # sk: CURRENT | JIRA#<ticketKey>
+# itemType-index (sparse): SCORECARD | JIRA_TICKET → pk
+# serviceVersion-index (sparse): pk → versionSort (zero-padded semver, jira tickets)
 include "root" {
   path = find_in_parent_folders("root.hcl")
 }
@@ -23,6 +25,13 @@ inputs = {
   attributes = [
     { name = "pk", type = "S" },
     { name = "sk", type = "S" },
+    { name = "itemType", type = "S" },
+    { name = "versionSort", type = "S" },
+  ]
+
+  global_secondary_indexes = [
+    { name = "itemType-index", hash_key = "itemType", range_key = "pk" },
+    { name = "serviceVersion-index", hash_key = "pk", range_key = "versionSort" },
   ]
 
   point_in_time_recovery = true
@@ -2,6 +2,8 @@
 # Stores: attempt-level test runs + cluster-level test runs
 # pk: ATTEMPT#<attemptId> or CLUSTER#<clusterRegionId>
 # sk: <suiteType>#<executedAt>
+# suiteShard-index: suiteShard = <suiteType>#<0..TEST_RUN_SHARDS-1> (per-attempt runs), range executedAt
+# failures-index (sparse): failureType = TEST_RUN#<0..FAILURE_SHARDS-1> on runs with failed > 0, failedAt = executedAt
 include "root" {
   path = find_in_parent_folders("root.hcl")
 }
@@ -23,13 +25,21 @@ inputs = {
   attributes = [
     { name = "pk", type = "S" },
     { name = "sk", type = "S" },
-    { name = "suiteType", type = "S" },
+    { name = "suiteShard", type = "S" },
+    { name = "executedAt", type = "S" },
+    { name = "failureType", type = "S" },
+    { name = "failedAt", type = "S" },
   ]
 
   global_secondary_indexes = [
-    { name = "suiteType-index", hash_key = "suiteType", range_key = "sk" }
+    { name = "suiteShard-index", hash_key = "suiteShard", range_key = "executedAt" },
+    { name = "failures-index", hash_key = "failureType", range_key = "failedAt" },
   ]
 
   point_in_time_recovery = true
   ttl_attribute          = "expiresAt"
+
+  # TTL removals feed qcd-processor's cold archive
+  stream_enabled   = true
+  stream_view_type = "OLD_IMAGE"
 }
@@ -19,6 +19,14 @@ dependency "qcd_processor" {
   }
 }
 
+# Bursty pushes go through the qcd-events queue; qcd-processor reads it in batches
+dependency "sqs_qcd_events" {
+  config_path = "../sqs"
+  mock_outputs = {
+    queue_arn = "arn:aws:sqs:us-east-1:111111111111:mock-qcd-events"
+  }
+}
+
 inputs = {
   bus_name = "${local.env}-mcq-dashboard-bus"
 
@@ -33,30 +41,33 @@ inputs = {
     }
 
     "deployments-rule" = {
-      description = "Route deployment events to QCD processor"
+      description = "Route deployment events to the qcd-events queue"
       event_pattern = jsonencode({
         source      = ["mcq.dashboard.ingestion"]
         detail-type = ["dashboard.deployments.reported"]
       })
-      target_arn = dependency.qcd_processor.outputs.function_arn
+      target_arn  = dependency.sqs_qcd_events.outputs.queue_arn
+      target_type = "sqs"
     }
 
     "test-results-rule" = {
-      description = "Route test result events to QCD processor"
+      description = "Route test result events to the qcd-events queue"
       event_pattern = jsonencode({
         source      = ["mcq.dashboard.ingestion"]
         detail-type = ["dashboard.test-results.reported"]
       })
-      target_arn = dependency.qcd_processor.outputs.function_arn
+      target_arn  = dependency.sqs_qcd_events.outputs.queue_arn
+      target_type = "sqs"
     }
 
     "cluster-test-results-rule" = {
-      description = "Route cluster test result events to QCD processor"
+      description = "Route cluster test result events to the qcd-events queue"
       event_pattern = jsonencode({
         source      = ["mcq.dashboard.ingestion"]
         detail-type = ["dashboard.cluster-test-results.reported"]
       })
-      target_arn = dependency.qcd_processor.outputs.function_arn
+      target_arn  = dependency.sqs_qcd_events.outputs.queue_arn
+      target_type = "sqs"
     }
 
     "scorecards-rule" = {
@@ -44,6 +44,22 @@ dependency "dynamodb_scorecards" {
   }
 }
 
+dependency "dynamodb_analytics" {
+  config_path = "../../dynamodb/analytics"
+  mock_outputs = {
+    table_arn  = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-analytics"
+    table_name = "dev-mcq-analytics"
+  }
+}
+
+dependency "s3_archive" {
+  config_path = "../../s3-archive"
+  mock_outputs = {
+    bucket_arn  = "arn:aws:s3:::mock-archive"
+    bucket_name = "dev-mcq-dashboard-archive"
+  }
+}
+
 # NOTE: No dependency on api-gateway-dashboard to avoid circular dep.
 # The API GW module creates the Lambda permission via its own resource.
 
@@ -56,11 +72,18 @@ inputs = {
   timeout       = 30
   memory_size   = 256
 
+  # mcq_common.py (telemetry, BatchGetItem retries) is shared with the other functions
+  shared_source_dirs = ["${dirname(find_in_parent_folders("root.hcl"))}/../../../lambdas/shared"]
+
   environment_variables = {
-    PLATFORM_TABLE     = dependency.dynamodb_platform.outputs.table_name
-    DEPLOYMENTS_TABLE  = dependency.dynamodb_deployments.outputs.table_name
-    TEST_RESULTS_TABLE = dependency.dynamodb_test_results.outputs.table_name
-    SCORECARDS_TABLE   = dependency.dynamodb_scorecards.outputs.table_name
+    PLATFORM_TABLE            = dependency.dynamodb_platform.outputs.table_name
+    DEPLOYMENTS_TABLE         = dependency.dynamodb_deployments.outputs.table_name
+    TEST_RESULTS_TABLE        = dependency.dynamodb_test_results.outputs.table_name
+    SCORECARDS_TABLE          = dependency.dynamodb_scorecards.outputs.table_name
+    ANALYTICS_TABLE           = dependency.dynamodb_analytics.outputs.table_name
+    ARCHIVE_URI               = "s3://${dependency.s3_archive.outputs.bucket_name}"
+    METRICS_NAMESPACE         = "MCQDashboard/${local.env}"
+    METRICS_TRACE_SAMPLE_RATE = "0.01"
   }
 
   custom_policy_json = jsonencode({
@@ -72,7 +95,8 @@ inputs = {
           "dynamodb:GetItem",
           "dynamodb:Query",
           "dynamodb:Scan",
-          "dynamodb:BatchGetItem"
+          "dynamodb:BatchGetItem",
+          "dynamodb:DescribeTable"
         ]
         Resource = [
           dependency.dynamodb_platform.outputs.table_arn,
@@ -83,7 +107,19 @@ inputs = {
           "${dependency.dynamodb_test_results.outputs.table_arn}/index/*",
           dependency.dynamodb_scorecards.outputs.table_arn,
           "${dependency.dynamodb_scorecards.outputs.table_arn}/index/*",
+          dependency.dynamodb_analytics.outputs.table_arn,
+          "${dependency.dynamodb_analytics.outputs.table_arn}/index/*",
         ]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:ListBucket"]
+        Resource = [dependency.s3_archive.outputs.bucket_arn]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject"]
+        Resource = ["${dependency.s3_archive.outputs.bucket_arn}/*"]
       }
     ]
   })
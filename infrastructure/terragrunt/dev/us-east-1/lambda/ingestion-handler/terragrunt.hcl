@@ -41,9 +41,13 @@ inputs = {
   timeout       = 30
   memory_size   = 256
 
+  # mcq_common.py (EMF line builder) is shared with the other functions
+  shared_source_dirs = ["${dirname(find_in_parent_folders("root.hcl"))}/../../../lambdas/shared"]
+
   environment_variables = {
-    API_KEYS_TABLE = dependency.dynamodb_api_keys.outputs.table_name
-    EVENT_BUS_NAME = dependency.eventbridge.outputs.bus_name
+    API_KEYS_TABLE    = dependency.dynamodb_api_keys.outputs.table_name
+    EVENT_BUS_NAME    = dependency.eventbridge.outputs.bus_name
+    METRICS_NAMESPACE = "MCQDashboard/${local.env}"
   }
 
   custom_policy_json = jsonencode({
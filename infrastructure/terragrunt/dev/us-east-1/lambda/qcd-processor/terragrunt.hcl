@@ -10,6 +10,12 @@ terraform {
 locals {
   root = read_terragrunt_config(find_in_parent_folders("root.hcl"))
   env  = local.root.locals.environment
+
+  # Only TTL deletions reach the archiver
+  ttl_removals = jsonencode({
+    eventName    = ["REMOVE"]
+    userIdentity = { type = ["Service"], principalId = ["dynamodb.amazonaws.com"] }
+  })
 }
 
 dependency "dynamodb_platform" {
@@ -25,6 +31,7 @@ dependency "dynamodb_deployments" {
   mock_outputs = {
     table_arn  = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-deployments"
     table_name = "dev-mcq-deployments"
+    stream_arn = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-deployments/stream/mock"
   }
 }
 
@@ -33,6 +40,7 @@ dependency "dynamodb_test_results" {
   mock_outputs = {
     table_arn  = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-test-results"
     table_name = "dev-mcq-test-results"
+    stream_arn = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-test-results/stream/mock"
   }
 }
 
@@ -44,6 +52,37 @@ dependency "dynamodb_scorecards" {
   }
 }
 
+dependency "dynamodb_analytics" {
+  config_path = "../../dynamodb/analytics"
+  mock_outputs = {
+    table_arn  = "arn:aws:dynamodb:us-east-1:111111111111:table/mock-analytics"
+    table_name = "dev-mcq-analytics"
+  }
+}
+
+dependency "s3_archive" {
+  config_path = "../../s3-archive"
+  mock_outputs = {
+    bucket_arn  = "arn:aws:s3:::mock-archive"
+    bucket_name = "dev-mcq-dashboard-archive"
+  }
+}
+
+dependency "sqs_qcd_events" {
+  config_path = "../../sqs"
+  mock_outputs = {
+    queue_arn = "arn:aws:sqs:us-east-1:111111111111:mock-qcd-events"
+  }
+}
+
+# Stream batches that exhaust their retries are reported here
+dependency "sqs_archive_failures" {
+  config_path = "../../sqs-archive-failures"
+  mock_outputs = {
+    queue_arn = "arn:aws:sqs:us-east-1:111111111111:mock-archive-failures"
+  }
+}
+
 inputs = {
   function_name = "${local.env}-mcq-dashboard-qcd-processor"
   description   = "Processes QCD events (deployments, tests, scorecards, platform) into DynamoDB"
@@ -53,11 +92,54 @@ inputs = {
   timeout       = 300
   memory_size   = 512
 
+  # mcq_common.py (telemetry, BatchGetItem retries) is shared with the other functions
+  shared_source_dirs = ["${dirname(find_in_parent_folders("root.hcl"))}/../../../lambdas/shared"]
+
   environment_variables = {
-    PLATFORM_TABLE     = dependency.dynamodb_platform.outputs.table_name
-    DEPLOYMENTS_TABLE  = dependency.dynamodb_deployments.outputs.table_name
-    TEST_RESULTS_TABLE = dependency.dynamodb_test_results.outputs.table_name
-    SCORECARDS_TABLE   = dependency.dynamodb_scorecards.outputs.table_name
+    PLATFORM_TABLE            = dependency.dynamodb_platform.outputs.table_name
+    DEPLOYMENTS_TABLE         = dependency.dynamodb_deployments.outputs.table_name
+    TEST_RESULTS_TABLE        = dependency.dynamodb_test_results.outputs.table_name
+    SCORECARDS_TABLE          = dependency.dynamodb_scorecards.outputs.table_name
+    ANALYTICS_TABLE           = dependency.dynamodb_analytics.outputs.table_name
+    HOT_RETENTION_DAYS        = "180"
+    ARCHIVE_URI               = "s3://${dependency.s3_archive.outputs.bucket_name}"
+    METRICS_NAMESPACE         = "MCQDashboard/${local.env}"
+    METRICS_TRACE_SAMPLE_RATE = "0.01"
+  }
+
+  event_source_mappings = {
+    # Queued EventBridge pushes, coalesced per invocation; failed messages
+    # are reported individually and redelivered (then dead-lettered)
+    qcd-events = {
+      event_source_arn                   = dependency.sqs_qcd_events.outputs.queue_arn
+      batch_size                         = 100
+      maximum_batching_window_in_seconds = 5
+      function_response_types            = ["ReportBatchItemFailures"]
+    }
+    # TTL removals → cold archive. A failing batch is split in half on each
+    # error (isolating a bad record) and given up after 10 retries or 6 h,
+    # well inside the stream's 24 h retention, instead of blocking the
+    # shard; the failure (shard + sequence range) lands in archive-failures.
+    deployments-ttl = {
+      event_source_arn               = dependency.dynamodb_deployments.outputs.stream_arn
+      starting_position              = "LATEST"
+      batch_size                     = 500
+      filter_pattern                 = local.ttl_removals
+      maximum_retry_attempts         = 10
+      maximum_record_age_in_seconds  = 21600
+      bisect_batch_on_function_error = true
+      on_failure_destination_arn     = dependency.sqs_archive_failures.outputs.queue_arn
+    }
+    test-results-ttl = {
+      event_source_arn               = dependency.dynamodb_test_results.outputs.stream_arn
+      starting_position              = "LATEST"
+      batch_size                     = 500
+      filter_pattern                 = local.ttl_removals
+      maximum_retry_attempts         = 10
+      maximum_record_age_in_seconds  = 21600
+      bisect_batch_on_function_error = true
+      on_failure_destination_arn     = dependency.sqs_archive_failures.outputs.queue_arn
+    }
   }
 
   custom_policy_json = jsonencode({
@@ -68,14 +150,51 @@ inputs = {
         Action = [
           "dynamodb:PutItem",
           "dynamodb:BatchWriteItem",
-          "dynamodb:UpdateItem"
+          "dynamodb:UpdateItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:Query",
+          "dynamodb:Scan",
+          "dynamodb:DescribeTable"
         ]
         Resource = [
           dependency.dynamodb_platform.outputs.table_arn,
           dependency.dynamodb_deployments.outputs.table_arn,
           dependency.dynamodb_test_results.outputs.table_arn,
           dependency.dynamodb_scorecards.outputs.table_arn,
+          dependency.dynamodb_analytics.outputs.table_arn,
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
         ]
+        Resource = [
+          dependency.dynamodb_deployments.outputs.stream_arn,
+          dependency.dynamodb_test_results.outputs.stream_arn,
+        ]
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ]
+        Resource = [dependency.sqs_qcd_events.outputs.queue_arn]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["sqs:SendMessage"]
+        Resource = [dependency.sqs_archive_failures.outputs.queue_arn]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["s3:PutObject"]
+        Resource = ["${dependency.s3_archive.outputs.bucket_arn}/*"]
       }
     ]
   })
@@ -0,0 +1,22 @@
+# S3 Archive (dev/us-east-1)
+# Cold tier: deployments and test runs expired out of DynamoDB by TTL,
+# written by qcd-processor as <kind>/dt=<yyyy-mm-dd>/*.jsonl.gz and read
+# by dashboard-api /v1/qcd/history
+include "root" {
+  path = find_in_parent_folders("root.hcl")
+}
+
+terraform {
+  source = "${dirname(find_in_parent_folders("root.hcl"))}/../../../terraform/modules/s3-archive"
+}
+
+locals {
+  root = read_terragrunt_config(find_in_parent_folders("root.hcl"))
+  env  = local.root.locals.environment
+}
+
+inputs = {
+  bucket_name                  = "${local.env}-mcq-dashboard-archive"
+  force_destroy                = true # dev only
+  infrequent_access_after_days = 30
+}
@@ -0,0 +1,23 @@
+# SQS — archive-failures queue (dev/us-east-1)
+# On-failure destination of qcd-processor's TTL stream mappings: one message
+# per stream batch that exhausted its retries, naming the shard and sequence
+# range. Replay from the stream (24 h retention) before the records age out.
+include "root" {
+  path = find_in_parent_folders("root.hcl")
+}
+
+terraform {
+  source = "${dirname(find_in_parent_folders("root.hcl"))}/../../../terraform/modules/sqs"
+}
+
+locals {
+  root = read_terragrunt_config(find_in_parent_folders("root.hcl"))
+  env  = local.root.locals.environment
+}
+
+inputs = {
+  queue_name = "${local.env}-mcq-dashboard-archive-failures"
+
+  # Read by operators, not a consumer; keep messages for the SQS maximum
+  message_retention_seconds = 1209600
+}
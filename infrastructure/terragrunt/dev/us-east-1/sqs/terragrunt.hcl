@@ -0,0 +1,30 @@
+# SQS — qcd-events queue (dev/us-east-1)
+# Buffers the bursty EventBridge pushes (deployments, test results,
+# cluster test results) so qcd-processor handles them in batches
+include "root" {
+  path = find_in_parent_folders("root.hcl")
+}
+
+terraform {
+  source = "${dirname(find_in_parent_folders("root.hcl"))}/../../../terraform/modules/sqs"
+}
+
+locals {
+  root    = read_terragrunt_config(find_in_parent_folders("root.hcl"))
+  env     = local.root.locals.environment
+  region  = local.root.locals.aws_region
+  account = local.root.locals.aws_account_id
+}
+
+inputs = {
+  queue_name = "${local.env}-mcq-dashboard-qcd-events"
+
+  # qcd-processor timeout is 300s
+  visibility_timeout_seconds = 1800
+  max_receive_count          = 5
+
+  # Any rule on the dashboard bus (the eventbridge module's rules)
+  allowed_source_arns = [
+    "arn:aws:events:${local.region}:${local.account}:rule/${local.env}-mcq-dashboard-bus/*",
+  ]
+}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+###############################################################################
+# bench-ingestion.py — Micro-benchmark of qcd-processor event decoding and
+#                      item building on a large synthetic test-results push.
+#
+# The sample test runs are cycled up to RUNS items (unique attempt ids,
+# fractional durationSec so the float path is exercised) and serialized
+# as the EventBridge detail. Each path goes from that text to the list of
+# DynamoDB-ready test-results items:
+#   recursive    — json.loads, then per run a dict-spread item passed
+#                  through the recursive float/int → Decimal walk (the
+#                  path before single-pass decoding, reproduced here)
+#   walk-once    — json.loads, one _to_dynamo walk of the detail, then
+#                  _test_run_item per run (direct EventBridge invocations,
+#                  where the runtime has already parsed the event)
+#   single-pass  — _decode (floats parsed straight to Decimal), then
+#                  _test_run_item per run (SQS batches and string details)
+# Reports items/sec (best of ROUNDS) and peak traced memory (tracemalloc).
+#
+# Usage:
+#   python3 scripts/bench-ingestion.py                # 50000 runs, 5 rounds
+#   RUNS=200000 ROUNDS=3 python3 scripts/bench-ingestion.py
+#
+# Needs boto3 (no AWS credentials or network access).
+###############################################################################
+
+import gc
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("HOT_RETENTION_DAYS", "180")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(SCRIPT_DIR, "..", "sample-data")
+PROCESSOR_SOURCE = os.path.join(SCRIPT_DIR, "..", "infrastructure", "lambdas", "qcd-processor", "index.py")
+SHARED_DIR = os.path.join(SCRIPT_DIR, "..", "infrastructure", "lambdas", "shared")
+RUNS = int(os.environ.get("RUNS", "50000"))
+ROUNDS = int(os.environ.get("ROUNDS", "5"))
+
+
+def load_processor():
+    sys.path.insert(0, SHARED_DIR)  # mcq_common, packaged next to index.py in the zip
+    spec = importlib.util.spec_from_file_location("qcd_processor", PROCESSOR_SOURCE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_detail():
+    with open(os.path.join(SAMPLE_DIR, "service-health", "test-runs.json")) as f:
+        sample = json.load(f)["testRuns"]
+    runs = []
+    for i in range(RUNS):
+        run = dict(sample[i % len(sample)])
+        run["id"] = f"{run['id']}-{i}"
+        run["attemptId"] = f"{run['attemptId']}-{i // len(sample)}"
+        run["durationSec"] = (run.get("durationSec") or 0) + 0.5
+        runs.append(run)
+    return json.dumps({"testRuns": runs}, separators=(",", ":"))
+
+
+def legacy_to_dynamo(obj):
+    """The recursive conversion qcd-processor used before single-pass decoding."""
+    if isinstance(obj, dict):
+        return {k: legacy_to_dynamo(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [legacy_to_dynamo(i) for i in obj]
+    if isinstance(obj, float):
+        return Decimal(str(obj))
+    if isinstance(obj, int) and not isinstance(obj, bool):
+        return Decimal(str(obj))
+    return obj
+
+
+def main():
+    qcd = load_processor()
+    body = synthetic_detail()
+
+    def recursive():
+        return [legacy_to_dynamo({
+            "pk": f"ATTEMPT#{r['attemptId']}",
+            "sk": f"{r['suiteType']}#{r['executedAt']}",
+            "suiteType": r["suiteType"],
+            **{k: v for k, v in r.items() if v is not None},
+            "suiteShard": qcd._suite_shard(r["attemptId"], r["suiteType"]),
+            **qcd._run_failure(r),
+            **qcd._expires_at(r.get("executedAt")),
+        }) for r in json.loads(body)["testRuns"]]
+
+    def walk_once():
+        return [qcd._test_run_item(r) for r in qcd._to_dynamo(json.loads(body))["testRuns"]]
+
+    def single_pass():
+        return [qcd._test_run_item(r) for r in qcd._decode(body)["testRuns"]]
+
+    print(f"{RUNS} runs, {len(body) / 1e6:.1f} MB detail")
+    print(f"{'path':<12} {'items/sec':>10} {'best ms':>9} {'peak MB':>8}")
+    for name, fn in (("recursive", recursive), ("walk-once", walk_once), ("single-pass", single_pass)):
+        best = float("inf")
+        for _ in range(ROUNDS):
+            items = None
+            gc.collect()
+            start = time.perf_counter()
+            items = fn()
+            best = min(best, time.perf_counter() - start)
+        items = None
+        gc.collect()
+
+        tracemalloc.start()
+        items = fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        items = None
+
+        print(f"{name:<12} {RUNS / best:>10.0f} {best * 1000:>9.1f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
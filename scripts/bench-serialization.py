@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+###############################################################################
+# bench-serialization.py — Micro-benchmark of dashboard-api response encoding
+#                          on the sample-data sets.
+#
+# Each collection is round-tripped through the DynamoDB wire format, then
+# encoded two ways:
+#   decimal  — stock TypeDeserializer (Decimal) + json.dumps(cls=DecimalEncoder)
+#   number   — dashboard-api NumberDeserializer (int/float) + json.dumps
+# and the resulting body is compressed with gzip and deflate at COMPRESS_LEVEL.
+#
+# Usage:
+#   python3 scripts/bench-serialization.py            # 20 rounds per case
+#   ROUNDS=100 python3 scripts/bench-serialization.py
+#
+# Needs boto3 (no AWS credentials or network access).
+###############################################################################
+
+import gzip
+import importlib.util
+import json
+import os
+import sys
+import time
+import zlib
+from decimal import Decimal
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_DIR = os.path.join(SCRIPT_DIR, "..", "sample-data")
+API_SOURCE = os.path.join(SCRIPT_DIR, "..", "infrastructure", "lambdas", "dashboard-api", "index.py")
+SHARED_DIR = os.path.join(SCRIPT_DIR, "..", "infrastructure", "lambdas", "shared")
+ROUNDS = int(os.environ.get("ROUNDS", "20"))
+
+# (label, sample file, collection key)
+DATASETS = [
+    ("deployments", "service-health/deployments.json", "deploymentAttempts"),
+    ("test-runs", "service-health/test-runs.json", "testRuns"),
+    ("cluster-test-runs", "service-health/cluster-test-runs.json", "clusterTestRuns"),
+]
+
+
+def load_api():
+    sys.path.insert(0, SHARED_DIR)  # mcq_common, packaged next to index.py in the zip
+    spec = importlib.util.spec_from_file_location("dashboard_api", API_SOURCE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def best_ms(fn):
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    api = load_api()
+    serializer = TypeSerializer()
+    decimal_reader, number_reader = TypeDeserializer(), api.NumberDeserializer()
+
+    print(f"{'dataset':<18} {'items':>6} {'path':<8} {'read ms':>8} {'dumps ms':>9} "
+          f"{'bytes':>9} {'gzip':>8} {'gzip ms':>8} {'deflate':>8}")
+    for label, path, key in DATASETS:
+        with open(os.path.join(SAMPLE_DIR, path)) as f:
+            items = json.load(f, parse_float=Decimal, parse_int=Decimal)[key]
+        wire = [{k: serializer.serialize(v) for k, v in i.items()} for i in items]
+
+        for name, reader, dumps in (
+            ("decimal", decimal_reader,
+             lambda body: json.dumps(body, cls=api.DecimalEncoder)),
+            ("number", number_reader,
+             lambda body: json.dumps(body, cls=api.DecimalEncoder, separators=(",", ":"))),
+        ):
+            def read():
+                return [{k: reader.deserialize(v) for k, v in i.items()} for i in wire]
+
+            rows = read()
+            body = dumps({key: rows})
+            raw = body.encode()
+            packed = gzip.compress(raw, compresslevel=api.COMPRESS_LEVEL, mtime=0)
+            print(f"{label:<18} {len(items):>6} {name:<8} "
+                  f"{best_ms(read):>8.2f} {best_ms(lambda: dumps({key: rows})):>9.2f} "
+                  f"{len(raw):>9} {len(packed):>8} "
+                  f"{best_ms(lambda: gzip.compress(raw, compresslevel=api.COMPRESS_LEVEL, mtime=0)):>8.2f} "
+                  f"{len(zlib.compress(raw, api.COMPRESS_LEVEL)):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+###############################################################################
+# bench-suite.py — Offline load test of ingestion-handler, qcd-processor and
+#                  dashboard-api against a local DynamoDB / EventBridge.
+#
+# Subcommands:
+#   generate  Scale the sample-data/ collections (deployments, test runs,
+#             cluster test runs, jira tickets) up to --items test runs and
+#             write them in the sample-data/ layout.
+#   run       Create the dev tables locally (schemas read from the
+#             terragrunt dynamodb/*/terragrunt.hcl inputs), push the data
+#             through ingestion-handler in --push-size payloads, deliver
+#             the published events to qcd-processor the way the dev bus
+#             rules do (bursty types through the qcd-events queue in
+#             batches of 100, the rest directly), run the rebuild and
+#             reindex handlers, then time every dashboard-api route.
+#             Writes one JSON result file; the Lambdas' EMF telemetry
+#             lines are captured into it (DynamoDB calls, pages, consumed
+#             capacity per handler and route) instead of printed.
+#   compare   Diff two result files; exits 1 if any metric regressed by
+#             more than --threshold.
+#
+# DynamoDB is moto's in-process mock (pip install "moto[dynamodb]"), or
+# DynamoDB Local with --endpoint-url. EventBridge and SQS are stood in by
+# LocalBus below. Absolute numbers include the stand-in's overhead —
+# compare results from the same backend and machine.
+#
+# Usage:
+#   python3 scripts/bench-suite.py run --items 10000 --out base.json
+#   python3 scripts/bench-suite.py run --items 10000 --out new.json
+#   python3 scripts/bench-suite.py compare base.json new.json
+#   python3 scripts/bench-suite.py generate --items 1000000 --out /tmp/qcd-1m
+#   python3 scripts/bench-suite.py run --data /tmp/qcd-1m \
+#       --endpoint-url http://localhost:8000 --out 1m.json
+###############################################################################
+
+import argparse
+import base64
+import contextlib
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+SAMPLE_DIR = os.path.join(REPO_DIR, "sample-data")
+LAMBDA_DIR = os.path.join(REPO_DIR, "infrastructure", "lambdas")
+TABLES_DIR = os.path.join(REPO_DIR, "infrastructure", "terragrunt", "dev", "us-east-1", "dynamodb")
+
+# terragrunt dynamodb/<dir> → environment variable the Lambdas read
+TABLE_ENV = {
+    "api-keys": "API_KEYS_TABLE",
+    "platform": "PLATFORM_TABLE",
+    "deployments": "DEPLOYMENTS_TABLE",
+    "test-results": "TEST_RESULTS_TABLE",
+    "scorecards": "SCORECARDS_TABLE",
+    "analytics": "ANALYTICS_TABLE",
+}
+
+# Detail-types the dev eventbridge rules send through the qcd-events queue,
+# and the queue's event source mapping batch size
+QUEUED_TYPES = {
+    "dashboard.deployments.reported",
+    "dashboard.test-results.reported",
+    "dashboard.cluster-test-results.reported",
+}
+QUEUE_BATCH_SIZE = 100
+
+# Collections scaled by `generate` (file, key); platform files are copied
+PLATFORM_FILES = [
+    "service-health/clusters.json",
+    "service-health/services.json",
+    "service-health/current-running.json",
+    "service-health/promotions.json",
+    "common/metadata.json",
+]
+SCALED_FILES = {
+    "deploymentAttempts": "service-health/deployments.json",
+    "testRuns": "service-health/test-runs.json",
+    "clusterTestRuns": "service-health/cluster-test-runs.json",
+    "jiraTickets": "version-compare/jira-tickets.json",
+}
+SCORECARD_FILE = "scorecard/scorecards.json"
+# Copies of the sample are spread back over this many days
+SPREAD_DAYS = 90
+
+# Summed from the Lambdas' EMF telemetry lines into handler and route results
+TELEMETRY_FIELDS = ("DynamoDbCalls", "Pages", "Items", "ItemsWritten",
+                    "ReadCapacity", "WriteCapacity", "DynamoDbTime", "SerializeTime")
+
+ACCOUNT_ID = "bench"
+API_KEY = "bench-api-key"
+HEADERS = {"accept-encoding": "gzip"}  # as forwarded by CloudFront
+
+
+# ── Synthetic data ───────────────────────────────────────────
+
+def _read(base, path):
+    with open(os.path.join(base, path)) as f:
+        return json.load(f)
+
+
+def _shift(ts, delta):
+    """Move an ISO-8601 Z timestamp back by delta, keeping its precision."""
+    if not ts:
+        return ts
+    moved = datetime.fromisoformat(ts.replace("Z", "+00:00")) - delta
+    spec = "milliseconds" if "." in ts else "seconds"
+    return moved.isoformat(timespec=spec).replace("+00:00", "Z")
+
+
+def _bump_version(version, copy):
+    """Copy n of a semver version: minor + n (non-semver gets a suffix)."""
+    m = re.match(r"^(\d+)\.(\d+)\.(\d+)$", str(version))
+    if not m:
+        return f"{version}-{copy}"
+    return f"{m[1]}.{int(m[2]) + copy}.{m[3]}"
+
+
+def generate(items):
+    """
+    Sample collections scaled so there are `items` test runs; the other
+    collections keep their sample ratio to test runs. Copy n of a record
+    gets "~n" appended to its ids and is moved n % SPREAD_DAYS days back.
+    """
+    data = {key: _read(SAMPLE_DIR, path)[key] for key, path in SCALED_FILES.items()}
+    base_runs = len(data["testRuns"])
+    copies = max(1, math.ceil(items / base_runs))
+    factor = items / base_runs
+
+    out = {"deploymentAttempts": [], "testRuns": [], "clusterTestRuns": [], "jiraTickets": {}}
+    for n in range(copies):
+        delta = timedelta(days=n % SPREAD_DAYS)
+        for a in data["deploymentAttempts"]:
+            out["deploymentAttempts"].append({
+                **a, "id": f"{a['id']}~{n}",
+                "startedAt": _shift(a.get("startedAt"), delta),
+                "endedAt": _shift(a.get("endedAt"), delta),
+            })
+        for r in data["testRuns"]:
+            out["testRuns"].append({
+                **r, "id": f"{r['id']}~{n}", "attemptId": f"{r['attemptId']}~{n}",
+                "executedAt": _shift(r.get("executedAt"), delta),
+            })
+        for r in data["clusterTestRuns"]:
+            out["clusterTestRuns"].append({
+                **r, "id": f"{r['id']}~{n}",
+                "executedAt": _shift(r.get("executedAt"), delta),
+            })
+        for svc, tickets in data["jiraTickets"].items():
+            out["jiraTickets"].setdefault(svc, []).extend(
+                {**t, "key": f"{t['key']}~{n}", "version": _bump_version(t["version"], n)}
+                for t in tickets
+            )
+
+    for key in ("deploymentAttempts", "testRuns", "clusterTestRuns"):
+        out[key] = out[key][:max(1, round(len(data[key]) * factor))]
+    return out
+
+
+def write_data(out_dir, data):
+    """Write scaled collections plus the unscaled files in sample-data/ layout."""
+    for key, path in SCALED_FILES.items():
+        target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump({key: data[key]}, f, separators=(",", ":"))
+    for path in PLATFORM_FILES + [SCORECARD_FILE]:
+        target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w") as f:
+            json.dump(_read(SAMPLE_DIR, path), f)
+
+
+def read_data(base):
+    return {key: _read(base, path)[key] for key, path in SCALED_FILES.items()}
+
+
+# ── Local AWS ────────────────────────────────────────────────
+
+def table_specs():
+    """
+    {dir: (hash_key, range_key, [attribute names], [(gsi, hash, range)])}
+    from the terragrunt dynamodb inputs, so tables match the dev schemas.
+    """
+    specs = {}
+    for name in TABLE_ENV:
+        with open(os.path.join(TABLES_DIR, name, "terragrunt.hcl")) as f:
+            hcl = f.read()
+        hash_key = re.search(r'^\s*hash_key\s*=\s*"([^"]+)"', hcl, re.M)[1]
+        range_key = re.search(r'^\s*range_key\s*=\s*"([^"]+)"', hcl, re.M)
+        attributes = re.findall(r'\{\s*name\s*=\s*"([^"]+)",\s*type\s*=', hcl)
+        indexes = [
+            (m[0], m[1], m[2] or None)
+            for m in re.findall(
+                r'\{\s*name\s*=\s*"([^"]+)",\s*hash_key\s*=\s*"([^"]+)"'
+                r'(?:,\s*range_key\s*=\s*"([^"]+)")?\s*\}', hcl)
+        ]
+        specs[name] = (hash_key, range_key[1] if range_key else None, attributes, indexes)
+    return specs
+
+
+def create_tables(prefix):
+    """Create every table (PAY_PER_REQUEST) and point the Lambdas' env at it."""
+    import boto3
+
+    client = boto3.client("dynamodb")
+    names = []
+    for name, (hash_key, range_key, attributes, indexes) in table_specs().items():
+        table_name = f"{prefix}-{name}"
+        keys = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+        if range_key:
+            keys.append({"AttributeName": range_key, "KeyType": "RANGE"})
+        kwargs = {
+            "TableName": table_name,
+            "KeySchema": keys,
+            "AttributeDefinitions": [{"AttributeName": a, "AttributeType": "S"} for a in attributes],
+            "BillingMode": "PAY_PER_REQUEST",
+        }
+        if indexes:
+            kwargs["GlobalSecondaryIndexes"] = [{
+                "IndexName": index,
+                "KeySchema": [{"AttributeName": h, "KeyType": "HASH"}]
+                             + ([{"AttributeName": r, "KeyType": "RANGE"}] if r else []),
+                "Projection": {"ProjectionType": "ALL"},
+            } for index, h, r in indexes]
+        client.create_table(**kwargs)
+        client.get_waiter("table_exists").wait(TableName=table_name)
+        os.environ[TABLE_ENV[name]] = table_name
+        names.append(table_name)
+
+    boto3.resource("dynamodb").Table(os.environ["API_KEYS_TABLE"]).put_item(Item={
+        "apiKeyHash": hashlib.sha256(API_KEY.encode()).hexdigest(),
+        "accountId": ACCOUNT_ID,
+        "status": "active",
+    })
+    return names
+
+
+def delete_tables(names):
+    import boto3
+
+    client = boto3.client("dynamodb")
+    for name in names:
+        client.delete_table(TableName=name)
+
+
+@contextlib.contextmanager
+def local_aws(endpoint_url):
+    """moto's in-process mock, or DynamoDB Local at endpoint_url."""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    if endpoint_url:
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = endpoint_url
+        yield
+        return
+    from moto import mock_aws
+
+    with mock_aws():
+        yield
+
+
+def load_lambda(name):
+    shared = os.path.join(LAMBDA_DIR, "shared")  # mcq_common, packaged next to index.py
+    if shared not in sys.path:
+        sys.path.insert(0, shared)
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"),
+                                                  os.path.join(LAMBDA_DIR, name, "index.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Context:
+    """The slice of the Lambda context object the handlers read."""
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+
+def invoke(handler, event):
+    """
+    Call a Lambda handler; returns (result, seconds, telemetry), where
+    telemetry sums TELEMETRY_FIELDS over the EMF lines it printed.
+    """
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        start = time.perf_counter()
+        result = handler(event, Context())
+        seconds = time.perf_counter() - start
+    telemetry = {}
+    for line in out.getvalue().splitlines():
+        if line.startswith('{"_aws"'):
+            record = json.loads(line)
+            for field in TELEMETRY_FIELDS:
+                telemetry[field] = round(telemetry.get(field, 0) + record.get(field, 0), 3)
+    return result, seconds, telemetry
+
+
+class LocalBus:
+    """
+    EventBridge + SQS stand-in for ingestion-handler's put_events. Entries
+    are held until deliver(), which invokes qcd-processor like the dev bus
+    rules: QUEUED_TYPES as SQS batches, the rest as direct invocations
+    (the Lambda runtime hands those over already parsed).
+    """
+
+    def __init__(self, processor, delivery):
+        self.processor = processor
+        self.delivery = delivery
+        self.pending = []
+
+    def put_events(self, Entries):
+        self.pending.extend(Entries)
+        return {"FailedEntryCount": 0,
+                "Entries": [{"EventId": str(uuid.uuid4())} for _ in Entries]}
+
+    def deliver(self, stats):
+        """Invoke qcd-processor for every pending entry; timings go to `stats`."""
+        pending, self.pending = self.pending, []
+        queued = [e for e in pending if self.delivery == "queue" and e["DetailType"] in QUEUED_TYPES]
+        for entry in pending:
+            if self.delivery == "queue" and entry["DetailType"] in QUEUED_TYPES:
+                continue
+            detail = json.loads(entry["Detail"])
+            event = {"source": entry["Source"], "detail-type": entry["DetailType"], "detail": detail}
+            result, seconds, telemetry = invoke(self.processor.handler, event)
+            stats.add(entry["DetailType"], seconds, _count_items(detail), 1,
+                      int(result.get("statusCode") != 200), telemetry)
+
+        for i in range(0, len(queued), QUEUE_BATCH_SIZE):
+            batch = queued[i:i + QUEUE_BATCH_SIZE]
+            records = [{
+                "messageId": str(uuid.uuid4()),
+                "eventSource": "aws:sqs",
+                "body": f'{{"source":"{e["Source"]}","detail-type":"{e["DetailType"]}",'
+                        f'"detail":{e["Detail"]}}}',
+            } for e in batch]
+            items = sum(_count_items(json.loads(e["Detail"])) for e in batch)
+            result, seconds, telemetry = invoke(self.processor.handler, {"Records": records})
+            # Batches are drained per push type, so one detail-type each
+            stats.add(batch[0]["DetailType"], seconds, items, len(batch),
+                      len(result["batchItemFailures"]), telemetry)
+
+
+def _count_items(detail):
+    """Records in a detail: list lengths, with {group: [..]} maps flattened."""
+    count = 0
+    for key, value in detail.items():
+        if key.startswith("_") or not isinstance(value, (list, dict)):
+            continue
+        if isinstance(value, dict) and value and all(isinstance(v, list) for v in value.values()):
+            count += sum(len(v) for v in value.values())
+        else:
+            count += len(value)
+    return count
+
+
+class HandlerStats:
+    """Per detail-type invocation time, items and failures."""
+
+    def __init__(self):
+        self.by_type = {}
+
+    def add(self, detail_type, seconds, items, events, failed, telemetry):
+        s = self.by_type.setdefault(detail_type, {
+            "invocations": 0, "events": 0, "items": 0, "failed": 0, "seconds": 0.0,
+            "telemetry": {},
+        })
+        s["invocations"] += 1
+        s["events"] += events
+        s["items"] += items
+        s["failed"] += failed
+        s["seconds"] += seconds
+        for field, value in telemetry.items():
+            s["telemetry"][field] = round(s["telemetry"].get(field, 0) + value, 3)
+
+    def report(self):
+        return {
+            detail_type: {
+                **s, "seconds": round(s["seconds"], 3),
+                "itemsPerSec": round(s["items"] / s["seconds"], 1) if s["seconds"] else None,
+            }
+            for detail_type, s in self.by_type.items()
+        }
+
+
+# ── Scenarios ────────────────────────────────────────────────
+
+def percentile(samples, p):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(samples_ms):
+    return {
+        "n": len(samples_ms),
+        "p50Ms": round(percentile(samples_ms, 50), 3),
+        "p99Ms": round(percentile(samples_ms, 99), 3),
+        "maxMs": round(max(samples_ms), 3),
+    }
+
+
+def payloads(data, push_size):
+    """(ingest type, payload) pushes, in the order push-data.sh sends them."""
+    platform_config = {"accountId": ACCOUNT_ID}
+    for path in PLATFORM_FILES:
+        platform_config.update(_read(SAMPLE_DIR, path))
+    yield "platform-config", platform_config
+
+    for ingest_type, key in (("deployments", "deploymentAttempts"),
+                             ("test-results", "testRuns"),
+                             ("cluster-test-results", "clusterTestRuns")):
+        records = data[key]
+        for i in range(0, len(records), push_size):
+            yield ingest_type, {"accountId": ACCOUNT_ID, key: records[i:i + push_size]}
+
+    yield "scorecards", {"accountId": ACCOUNT_ID, **_read(SAMPLE_DIR, SCORECARD_FILE)}
+    # Tickets are not chunked by ingestion-handler, so push them in slices
+    for svc, tickets in data["jiraTickets"].items():
+        for i in range(0, len(tickets), push_size):
+            yield "scorecards", {"accountId": ACCOUNT_ID, "jiraTickets": {svc: tickets[i:i + push_size]}}
+
+
+def run_ingest(ingestion, bus, data, push_size, handler_stats):
+    """Push everything through ingestion-handler, delivering after each type."""
+    per_type = {}
+    previous = None
+    for ingest_type, payload in payloads(data, push_size):
+        if previous and ingest_type != previous:
+            bus.deliver(handler_stats)
+        previous = ingest_type
+        body = json.dumps(payload)
+        event = {"rawPath": f"/v1/ingest/{ingest_type}", "body": body,
+                 "headers": {"x-api-key": API_KEY}}
+        response, seconds, _ = invoke(ingestion.handler, event)
+        elapsed = seconds * 1000
+        s = per_type.setdefault(ingest_type, {"latencies": [], "bytes": 0, "events": 0, "errors": 0})
+        s["latencies"].append(elapsed)
+        s["bytes"] += len(body.encode())
+        if response["statusCode"] == 200:
+            s["events"] += json.loads(response["body"])["events"]
+        else:
+            s["errors"] += 1
+    bus.deliver(handler_stats)
+
+    return {
+        ingest_type: {
+            "requests": len(s["latencies"]), "requestBytes": s["bytes"],
+            "events": s["events"], "errors": s["errors"], **latency_summary(s["latencies"]),
+        }
+        for ingest_type, s in per_type.items()
+    }
+
+
+def run_maintenance(processor, handler_stats, data):
+    """Time the rebuild and reindex handlers over the loaded tables."""
+    jobs = (
+        ("dashboard.analytics.rebuild",
+         len(data["deploymentAttempts"]) + len(data["testRuns"]) + len(data["clusterTestRuns"])),
+        ("dashboard.scorecards.reindex", sum(len(t) for t in data["jiraTickets"].values())),
+    )
+    for detail_type, items in jobs:
+        result, seconds, telemetry = invoke(processor.handler, {"detail-type": detail_type, "detail": {}})
+        handler_stats.add(detail_type, seconds, items, 1,
+                          int(result.get("statusCode") != 200), telemetry)
+
+
+def routes(data, changes_token):
+    """(name, path, query) for every dashboard-api route worth timing."""
+    attempt_id = data["testRuns"][0]["attemptId"]
+    svc, tickets = max(data["jiraTickets"].items(), key=lambda kv: len(kv[1]))
+    semver = sorted((t["version"] for t in tickets if re.match(r"^\d+\.\d+\.\d+$", t["version"])),
+                    key=lambda v: tuple(map(int, v.split("."))))
+    service_id = data["deploymentAttempts"][0]["serviceId"]
+    return [
+        ("health", "/v1/health", {}),
+        ("clusters", "/v1/qcd/clusters", {}),
+        ("services", "/v1/qcd/services", {}),
+        ("deployments", "/v1/qcd/deployments", {"limit": "100"}),
+        ("deployments-columns", "/v1/qcd/deployments",
+         {"limit": "1000", "fields": "id,clusterId,serviceId,status,startedAt", "format": "columns"}),
+        ("test-runs-attempt", "/v1/qcd/test-runs", {"attemptId": attempt_id}),
+        ("test-runs-suite", "/v1/qcd/test-runs", {"suiteType": "FUNCTIONAL"}),
+        ("cluster-test-runs", "/v1/qcd/cluster-test-runs", {}),
+        ("scorecards", "/v1/qcd/scorecards", {}),
+        ("promotions", "/v1/qcd/promotions", {}),
+        ("jira-tickets", "/v1/qcd/jira-tickets", {}),
+        ("jira-tickets-range", "/v1/qcd/jira-tickets",
+         {"serviceId": svc, "fromVersion": semver[0], "toVersion": semver[-1]}),
+        ("metadata", "/v1/qcd/metadata", {}),
+        ("analytics", "/v1/qcd/analytics", {}),
+        ("analytics-service", "/v1/qcd/analytics", {"serviceId": service_id}),
+        ("current-state", "/v1/qcd/current-state", {}),
+        ("failures", "/v1/qcd/failures", {}),
+        ("changes", "/v1/qcd/changes", {"since": changes_token}),
+        ("bootstrap", "/v1/qcd/bootstrap", {}),
+    ]
+
+
+def response_sizes(response):
+    """(bytes on the wire, uncompressed JSON bytes) of an API response."""
+    body = response.get("body") or ""
+    if not response.get("isBase64Encoded"):
+        size = len(body.encode())
+        return size, size
+    raw = base64.b64decode(body)
+    encoding = response.get("headers", {}).get("Content-Encoding")
+    if encoding == "gzip":
+        return len(raw), len(gzip.decompress(raw))
+    if encoding == "deflate":
+        import zlib
+        return len(raw), len(zlib.decompress(raw))
+    return len(raw), len(raw)
+
+
+def run_routes(api, route_list, requests):
+    """
+    Per route: `requests` calls with the response cache emptied first
+    (DynamoDB + encode every time), then `requests` warm calls. The
+    telemetry is that of the last uncached call.
+    """
+    results = {}
+    for name, path, query in route_list:
+        event = {"rawPath": path, "queryStringParameters": query, "headers": HEADERS}
+        samples = {"uncached": [], "cached": []}
+        for mode in ("uncached", "cached"):
+            for _ in range(requests):
+                if mode == "uncached":
+                    api._cache.entries.clear()
+                    api._cache.bytes = 0
+                response, seconds, telemetry = invoke(api.handler, dict(event))
+                samples[mode].append(seconds * 1000)
+                if mode == "uncached":
+                    uncached_telemetry = telemetry
+        wire, raw = response_sizes(response)
+        results[name] = {
+            "path": path, "query": query, "status": response["statusCode"],
+            "bytes": wire, "jsonBytes": raw,
+            "uncached": latency_summary(samples["uncached"]),
+            "telemetry": uncached_telemetry,
+            "cached": latency_summary(samples["cached"]),
+        }
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "-C", REPO_DIR, "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_generate(args):
+    data = generate(args.items)
+    write_data(args.out, data)
+    print(f"Wrote {len(data['deploymentAttempts'])} deployments, {len(data['testRuns'])} test runs, "
+          f"{len(data['clusterTestRuns'])} cluster test runs, "
+          f"{sum(len(t) for t in data['jiraTickets'].values())} jira tickets to {args.out}")
+
+
+def cmd_run(args):
+    data = read_data(args.data) if args.data else generate(args.items)
+    # Read the change feed right up to the present
+    os.environ.setdefault("CHANGES_SETTLE_SECONDS", "0")
+
+    with local_aws(args.endpoint_url):
+        tables = create_tables(f"bench-{os.getpid()}")
+        try:
+            ingestion = load_lambda("ingestion-handler")
+            processor = load_lambda("qcd-processor")
+            api = load_lambda("dashboard-api")
+            bus = LocalBus(processor, args.delivery)
+            ingestion.eventbridge = bus
+
+            head, _, _ = invoke(api.handler, {"rawPath": "/v1/qcd/changes", "headers": {}})
+            changes_token = json.loads(head["body"])["nextToken"]
+            handler_stats = HandlerStats()
+            started = time.perf_counter()
+            ingest = run_ingest(ingestion, bus, data, args.push_size, handler_stats)
+            run_maintenance(processor, handler_stats, data)
+            load_seconds = time.perf_counter() - started
+            route_results = run_routes(api, routes(data, changes_token), args.requests)
+        finally:
+            if args.endpoint_url:
+                delete_tables(tables)
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z"),
+            "python": platform.python_version(),
+            "backend": args.endpoint_url or "moto",
+            "delivery": args.delivery,
+            "pushSize": args.push_size,
+            "requests": args.requests,
+            "dataset": {
+                "deploymentAttempts": len(data["deploymentAttempts"]),
+                "testRuns": len(data["testRuns"]),
+                "clusterTestRuns": len(data["clusterTestRuns"]),
+                "jiraTickets": sum(len(t) for t in data["jiraTickets"].values()),
+            },
+            "loadSeconds": round(load_seconds, 3),
+        },
+        "ingest": ingest,
+        "handlers": handler_stats.report(),
+        "routes": route_results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+    print_summary(result)
+    print(f"\nWrote {args.out}")
+
+
+def print_summary(result):
+    print(f"{'handler':<42} {'events':>7} {'items':>8} {'items/s':>9} {'failed':>6}")
+    for detail_type, s in result["handlers"].items():
+        print(f"{detail_type:<42} {s['events']:>7} {s['items']:>8} "
+              f"{s['itemsPerSec'] or 0:>9.0f} {s['failed']:>6}")
+    print(f"\n{'route':<22} {'status':>6} {'p50 ms':>8} {'p99 ms':>8} {'warm p50':>9} "
+          f"{'bytes':>9} {'json':>9} {'pages':>6} {'RCU':>8}")
+    for name, r in result["routes"].items():
+        telemetry = r.get("telemetry") or {}
+        print(f"{name:<22} {r['status']:>6} {r['uncached']['p50Ms']:>8.2f} "
+              f"{r['uncached']['p99Ms']:>8.2f} {r['cached']['p50Ms']:>9.2f} "
+              f"{r['bytes']:>9} {r['jsonBytes']:>9} {telemetry.get('Pages', 0):>6} "
+              f"{telemetry.get('ReadCapacity', 0):>8.1f}")
+
+
+# ── compare ──────────────────────────────────────────────────
+
+def metrics(result):
+    """{metric: (value, higher_is_better)} flattened from a result file."""
+    out = {}
+    for detail_type, s in result.get("handlers", {}).items():
+        if s.get("itemsPerSec"):
+            out[f"handler {detail_type} items/s"] = (s["itemsPerSec"], True)
+        for field in ("ReadCapacity", "WriteCapacity"):
+            if s.get("telemetry", {}).get(field):
+                out[f"handler {detail_type} {field}"] = (s["telemetry"][field], False)
+    for ingest_type, s in result.get("ingest", {}).items():
+        out[f"ingest {ingest_type} p50 ms"] = (s["p50Ms"], False)
+    for name, r in result.get("routes", {}).items():
+        out[f"route {name} p50 ms"] = (r["uncached"]["p50Ms"], False)
+        out[f"route {name} p99 ms"] = (r["uncached"]["p99Ms"], False)
+        out[f"route {name} warm p50 ms"] = (r["cached"]["p50Ms"], False)
+        out[f"route {name} bytes"] = (r["bytes"], False)
+        if (r.get("telemetry") or {}).get("ReadCapacity"):
+            out[f"route {name} ReadCapacity"] = (r["telemetry"]["ReadCapacity"], False)
+    return out
+
+
+def cmd_compare(args):
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    if base["meta"].get("dataset") != new["meta"].get("dataset"):
+        print("warning: the two runs used different datasets", file=sys.stderr)
+
+    old_metrics, new_metrics = metrics(base), metrics(new)
+    regressions = 0
+    print(f"{'metric':<58} {'base':>10} {'new':>10} {'change':>8}")
+    for name, (old, higher_is_better) in old_metrics.items():
+        if name not in new_metrics or not old:
+            continue
+        value = new_metrics[name][0]
+        change = (value - old) / old
+        worse = -change if higher_is_better else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<58} {old:>10.2f} {value:>10.2f} {change:>+8.1%}{flag}")
+    print(f"\n{regressions} regression(s) over {args.threshold:.0%} "
+          f"({base['meta'].get('commit')} → {new['meta'].get('commit')})")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__ or "QCD offline benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="write a scaled synthetic dataset")
+    gen.add_argument("--items", type=int, default=10000, help="test runs (others keep the sample ratio)")
+    gen.add_argument("--out", required=True, help="output directory (sample-data/ layout)")
+
+    run = sub.add_parser("run", help="load the tables and time handlers and routes")
+    run.add_argument("--items", type=int, default=10000, help="test runs to generate (without --data)")
+    run.add_argument("--data", help="directory written by generate (instead of --items)")
+    run.add_argument("--endpoint-url", help="DynamoDB Local endpoint (default: moto in-process)")
+    run.add_argument("--delivery", choices=("queue", "direct"), default="queue",
+                     help="queue: bursty types via SQS batches as in dev; direct: all events direct")
+    run.add_argument("--push-size", type=int, default=500, help="records per ingestion push")
+    run.add_argument("--requests", type=int, default=20, help="timed requests per route and mode")
+    run.add_argument("--out", default="bench-results.json", help="result file")
+
+    cmp_ = sub.add_parser("compare", help="diff two result files")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=0.10,
+                      help="relative change counted as a regression (default 0.10)")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        cmd_generate(args)
+    elif args.command == "run":
+        cmd_run(args)
+    else:
+        sys.exit(cmd_compare(args))
+
+
+if __name__ == "__main__":
+    main()
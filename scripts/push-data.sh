@@ -5,6 +5,7 @@
 #
 # Usage:
 #   ./scripts/push-data.sh                        # push all QCD sample data
+#                                                 #   (one /v1/ingest/batch request)
 #   ./scripts/push-data.sh platform-config        # push only platform config
 #   ./scripts/push-data.sh deployments             # push only deployments
 #   ./scripts/push-data.sh test-results            # push only test results
@@ -15,6 +16,8 @@
 #   INGEST_ENDPOINT  — API Gateway ingestion URL (required)
 #   API_KEY          — API key for authentication (required)
 #   ACCOUNT_ID       — AWS account ID (default: 326869539878)
+#   BATCH            — 1 (default) sends all requested types in a single
+#                      /v1/ingest/batch call; 0 sends one call per type
 ###############################################################################
 
 set -euo pipefail
@@ -26,6 +29,7 @@ ACCOUNT_ID="${ACCOUNT_ID:-326869539878}"
 # Defaults — override with env vars
 INGEST_ENDPOINT="${INGEST_ENDPOINT:-}"
 API_KEY="${API_KEY:-}"
+BATCH="${BATCH:-1}"
 
 # Colors
 RED='\033[0;31m'
@@ -174,6 +178,59 @@ push_data() {
   fi
 }
 
+# -------------------------------------------------------------------------
+# Push several data types in one /v1/ingest/batch request
+# -------------------------------------------------------------------------
+push_batch() {
+  local batch_file
+  batch_file=$(mktemp /tmp/mcq-batch-XXXXXX.json)
+
+  local payload_files=()
+  for data_type in "$@"; do
+    local payload_file
+    payload_file=$(build_payload "${data_type}")
+    payload_files+=("${data_type}=${payload_file}")
+  done
+
+  python3 -c "
+import json, sys
+envelopes = []
+for arg in sys.argv[1:]:
+    data_type, path = arg.split('=', 1)
+    with open(path) as fh:
+        envelopes.append({'type': data_type, 'data': json.load(fh)})
+json.dump({'envelopes': envelopes}, sys.stdout)
+" "${payload_files[@]}" > "${batch_file}"
+
+  for entry in "${payload_files[@]}"; do
+    rm -f "${entry#*=}"
+  done
+
+  local url="${INGEST_ENDPOINT}/v1/ingest/batch"
+  log_info "Pushing $* → ${url}"
+
+  local http_code
+  http_code=$(curl -s -o /tmp/mcq-push-response.json -w "%{http_code}" \
+    -X POST \
+    -H "Content-Type: application/json" \
+    -H "x-api-key: ${API_KEY}" \
+    -d @"${batch_file}" \
+    "${url}")
+
+  rm -f "${batch_file}"
+
+  if [[ "${http_code}" == "200" ]]; then
+    log_info "  ✓ batch — HTTP ${http_code}"
+    python3 -m json.tool /tmp/mcq-push-response.json 2>/dev/null || cat /tmp/mcq-push-response.json
+    echo ""
+  else
+    log_error "  ✗ batch — HTTP ${http_code}"
+    cat /tmp/mcq-push-response.json 2>/dev/null
+    echo ""
+    return 1
+  fi
+}
+
 # -------------------------------------------------------------------------
 # Main
 # -------------------------------------------------------------------------
@@ -186,12 +243,18 @@ if [[ $# -gt 0 ]]; then
       log_info "Valid types: ${DATA_TYPES[*]}"
       exit 1
     fi
-    push_data "${dtype}"
   done
+  SELECTED=("$@")
 else
   log_info "Pushing all QCD sample data to ${INGEST_ENDPOINT}"
   echo ""
-  for dtype in "${DATA_TYPES[@]}"; do
+  SELECTED=("${DATA_TYPES[@]}")
+fi
+
+if [[ "${BATCH}" == "1" ]]; then
+  push_batch "${SELECTED[@]}"
+else
+  for dtype in "${SELECTED[@]}"; do
     push_data "${dtype}"
   done
 fi
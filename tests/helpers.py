@@ -0,0 +1,144 @@
+"""
+Shared setup for the Lambda tests: moto's in-process AWS with the
+DynamoDB tables built from the dev terragrunt schemas, the Lambdas loaded
+from infrastructure/lambdas, and invoke() to call a handler with its EMF
+lines kept off stdout.
+
+    pip install boto3 "moto[dynamodb,s3]"
+    python3 -m unittest discover tests
+"""
+
+import contextlib
+import hashlib
+import importlib.util
+import io
+import os
+import re
+import sys
+import unittest
+import uuid
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(REPO_DIR, "infrastructure", "lambdas")
+TABLES_DIR = os.path.join(REPO_DIR, "infrastructure", "terragrunt", "dev", "us-east-1", "dynamodb")
+
+# terragrunt dynamodb/<dir> → environment variable the Lambdas read
+TABLE_ENV = {
+    "api-keys": "API_KEYS_TABLE",
+    "platform": "PLATFORM_TABLE",
+    "deployments": "DEPLOYMENTS_TABLE",
+    "test-results": "TEST_RESULTS_TABLE",
+    "scorecards": "SCORECARDS_TABLE",
+    "analytics": "ANALYTICS_TABLE",
+}
+
+ACCOUNT_ID = "test"
+API_KEY = "test-api-key"
+
+
+def table_specs():
+    """
+    {dir: (hash_key, range_key, [attribute names], [(gsi, hash, range)])}
+    from the terragrunt dynamodb inputs.
+    """
+    specs = {}
+    for name in TABLE_ENV:
+        with open(os.path.join(TABLES_DIR, name, "terragrunt.hcl")) as f:
+            hcl = f.read()
+        hash_key = re.search(r'^\s*hash_key\s*=\s*"([^"]+)"', hcl, re.M)[1]
+        range_key = re.search(r'^\s*range_key\s*=\s*"([^"]+)"', hcl, re.M)
+        attributes = re.findall(r'\{\s*name\s*=\s*"([^"]+)",\s*type\s*=', hcl)
+        indexes = re.findall(r'\{\s*name\s*=\s*"([^"]+)",\s*hash_key\s*=\s*"([^"]+)"'
+                             r'(?:,\s*range_key\s*=\s*"([^"]+)")?\s*\}', hcl)
+        specs[name] = (hash_key, range_key[1] if range_key else None, attributes,
+                       [(index, h, r or None) for index, h, r in indexes])
+    return specs
+
+
+def create_tables(prefix="test"):
+    """Create every table, point the Lambdas' env at it and store API_KEY."""
+    import boto3
+
+    client = boto3.client("dynamodb")
+    for name, (hash_key, range_key, attributes, indexes) in table_specs().items():
+        keys = [{"AttributeName": hash_key, "KeyType": "HASH"}]
+        if range_key:
+            keys.append({"AttributeName": range_key, "KeyType": "RANGE"})
+        kwargs = {
+            "TableName": f"{prefix}-{name}",
+            "KeySchema": keys,
+            "AttributeDefinitions": [{"AttributeName": a, "AttributeType": "S"} for a in attributes],
+            "BillingMode": "PAY_PER_REQUEST",
+        }
+        if indexes:
+            kwargs["GlobalSecondaryIndexes"] = [{
+                "IndexName": index,
+                "KeySchema": [{"AttributeName": h, "KeyType": "HASH"}]
+                             + ([{"AttributeName": r, "KeyType": "RANGE"}] if r else []),
+                "Projection": {"ProjectionType": "ALL"},
+            } for index, h, r in indexes]
+        client.create_table(**kwargs)
+        os.environ[TABLE_ENV[name]] = f"{prefix}-{name}"
+
+    boto3.resource("dynamodb").Table(os.environ["API_KEYS_TABLE"]).put_item(Item={
+        "apiKeyHash": hashlib.sha256(API_KEY.encode()).hexdigest(),
+        "accountId": ACCOUNT_ID,
+        "status": "active",
+    })
+
+
+def load_common():
+    """mcq_common, the module the Lambdas package next to their index.py."""
+    shared = os.path.join(LAMBDA_DIR, "shared")
+    if shared not in sys.path:
+        sys.path.insert(0, shared)
+    return importlib.import_module("mcq_common")
+
+
+def load_lambda(name):
+    """A fresh copy of infrastructure/lambdas/<name>/index.py, reading the current env."""
+    load_common()
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"),
+                                                  os.path.join(LAMBDA_DIR, name, "index.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Context:
+    """The slice of the Lambda context object the handlers read."""
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+
+def invoke(module, event, context=None):
+    """Call module.handler; what it prints (EMF lines) is discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return module.handler(event, context or Context())
+
+
+def api_event(path, query=None, headers=None):
+    """An HTTP API (payload v2) GET event for dashboard-api."""
+    return {"rawPath": path, "queryStringParameters": query or {}, "headers": headers or {}}
+
+
+class LambdaTestCase(unittest.TestCase):
+    """
+    Every test runs in its own moto account with fresh tables. Contexts
+    entered on self.stack are closed after the test.
+    """
+
+    def setUp(self):
+        self.stack = contextlib.ExitStack()
+        self.addCleanup(self.stack.close)
+        self.stack.enter_context(mock.patch.dict(os.environ, {
+            "AWS_DEFAULT_REGION": "us-east-1",
+            "AWS_ACCESS_KEY_ID": "test",
+            "AWS_SECRET_ACCESS_KEY": "test",
+        }))
+        from moto import mock_aws
+
+        self.stack.enter_context(mock_aws())
+        create_tables()
@@ -0,0 +1,75 @@
+"""
+dashboard-api /v1/qcd/bootstrap: the newest `limit` attempts (since
+`since`) of every cluster-region and of every cluster that has attempts
+but no cluster-region item, with deploymentsComplete False only when a
+cluster was cut short.
+"""
+
+import json
+import unittest
+
+import helpers
+
+ATTEMPTS = [
+    {"id": f"a{i}", "clusterId": cluster, "serviceId": "s1",
+     "startedAt": f"2026-01-01T{10 + i:02d}:00:00Z", "status": "LIVE"}
+    for i, cluster in enumerate(["c1", "c1", "c1", "c2"])
+]
+
+
+class BootstrapTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def deliver(self, detail_type, detail):
+        result = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(result["statusCode"], 200, result)
+
+    def regions(self, *cluster_ids):
+        self.deliver("dashboard.platform.config.updated",
+                     {"clusterRegions": [{"id": c, "name": c.upper()} for c in cluster_ids]})
+
+    def report(self, *attempts):
+        self.deliver("dashboard.deployments.reported", {"deploymentAttempts": list(attempts)})
+
+    def bootstrap(self, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/bootstrap", query))
+        self.assertEqual(response["statusCode"], 200, response)
+        body = json.loads(response["body"])
+        return sorted(a["id"] for a in body["deploymentAttempts"]), body["deploymentsComplete"]
+
+    def test_attempts_without_any_cluster_region(self):
+        self.report(ATTEMPTS[0])
+        self.assertEqual(self.bootstrap(), (["a0"], True))
+
+    def test_clusters_missing_from_the_regions(self):
+        self.regions("c1")
+        self.report(*ATTEMPTS)
+        self.assertEqual(self.bootstrap(), (["a0", "a1", "a2", "a3"], True))
+
+    def test_limit_per_cluster(self):
+        self.regions("c1", "c2")
+        self.report(*ATTEMPTS)
+        self.assertEqual(self.bootstrap(limit="2"), (["a1", "a2", "a3"], False))
+        self.assertEqual(self.bootstrap(limit="3"), (["a0", "a1", "a2", "a3"], True))
+
+    def test_since(self):
+        self.regions("c1")
+        self.report(*ATTEMPTS)
+        self.assertEqual(self.bootstrap(since=ATTEMPTS[1]["startedAt"]), (["a1", "a2", "a3"], True))
+        self.assertEqual(self.bootstrap(since=ATTEMPTS[1]["startedAt"], limit="1"),
+                         (["a2", "a3"], False))
+
+    def test_empty(self):
+        self.regions("c1")
+        body = json.loads(helpers.invoke(self.api, helpers.api_event("/v1/qcd/bootstrap"))["body"])
+        self.assertEqual((body["deploymentAttempts"], body["deploymentsComplete"]), ([], True))
+        self.assertEqual([r["id"] for r in body["clusterRegions"]], ["c1"])
+        self.assertIn("changesToken", body)
+
+
+if __name__ == "__main__":
+    unittest.main()
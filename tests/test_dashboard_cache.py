@@ -0,0 +1,137 @@
+"""
+dashboard-api response cache: a size-bounded LRU of serialized bodies,
+stamped with the data-version counters of the route's categories. A bump
+by qcd-processor invalidates only the routes depending on it, and the
+hit/miss counters and the cache property of the telemetry line say which
+way each request went.
+"""
+
+import json
+import unittest
+from unittest import mock
+
+import helpers
+
+SERVICE = {"id": "s1", "name": "Service One"}
+ATTEMPT = {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+           "startedAt": "2026-01-01T10:00:00Z", "status": "LIVE"}
+
+
+def body(text):
+    return {"statusCode": 200, "headers": {}, "body": text}
+
+
+class ResponseCacheTest(unittest.TestCase):
+    """_ResponseCache on its own."""
+
+    def setUp(self):
+        with mock.patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"}):
+            self.api = helpers.load_lambda("dashboard-api")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self.api._ResponseCache(max_entries=2, max_bytes=1000)
+        cache.put("a", (1,), body("a"))
+        cache.put("b", (1,), body("b"))
+        self.assertEqual(cache.get("a", (1,))["body"], "a")  # a is now the newest
+        cache.put("c", (1,), body("c"))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b", (1,)))
+
+    def test_byte_budget(self):
+        cache = self.api._ResponseCache(max_entries=10, max_bytes=10)
+        cache.put("a", (1,), body("x" * 6))
+        cache.put("b", (1,), body("y" * 6))
+        self.assertEqual((list(cache.entries), cache.bytes), (["b"], 6))
+        cache.put("huge", (1,), body("z" * 11))  # larger than the whole cache
+        self.assertEqual((list(cache.entries), cache.bytes), (["b"], 6))
+        cache.put("b", (1,), body("w" * 2))  # replacing releases the old body
+        self.assertEqual(cache.bytes, 2)
+
+    def test_stale_stamp_drops_the_entry(self):
+        cache = self.api._ResponseCache(max_entries=10, max_bytes=1000)
+        cache.put("a", (1, 4), body("old"))
+        self.assertIsNone(cache.get("a", (1, 5)))
+        self.assertEqual((dict(cache.entries), cache.bytes), ({}, 0))
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = self.api._ResponseCache(max_entries=10, max_bytes=1000)
+        with mock.patch.object(self.api.time, "monotonic", return_value=100.0):
+            cache.put("a", (1,), body("a"))
+        later = 100.0 + self.api.CACHE_TTL_SECONDS
+        with mock.patch.object(self.api.time, "monotonic", return_value=later):
+            self.assertIsNotNone(cache.get("a", (1,)))
+        with mock.patch.object(self.api.time, "monotonic", return_value=later + 1):
+            self.assertIsNone(cache.get("a", (1,)))
+
+
+class CachedRoutesTest(helpers.LambdaTestCase):
+    """The cache behind the versioned routes."""
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.deliver("dashboard.platform.config.updated", {"services": [SERVICE]})
+        real = self.api._qcd_services
+        self.built = []
+
+        def services(query):
+            self.built.append(query)
+            return real(query)
+
+        self.stack.enter_context(mock.patch.object(self.api, "_qcd_services", services))
+
+    def deliver(self, detail_type, detail):
+        helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+
+    def get(self, path, query=None, **headers):
+        response = helpers.invoke(self.api, helpers.api_event(path, query, headers))
+        self.assertEqual(response["statusCode"], 200, response)
+        return response
+
+    def counters(self):
+        return self.api._cache.hits, self.api._cache.misses
+
+    def test_hit_after_miss(self):
+        first = self.get("/v1/qcd/services")
+        self.assertEqual(self.api._metrics.properties["cache"], "miss")
+        second = self.get("/v1/qcd/services")
+        self.assertEqual(self.api._metrics.properties["cache"], "hit")
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(len(self.built), 1)
+        self.assertEqual(second["body"], first["body"])
+        self.assertEqual(second["headers"]["ETag"], first["headers"]["ETag"])
+
+    def test_queries_and_codings_are_separate_entries(self):
+        self.get("/v1/qcd/services")
+        self.get("/v1/qcd/services", {"fields": "id"})
+        self.get("/v1/qcd/services", **{"accept-encoding": "gzip"})
+        self.assertEqual(self.counters(), (0, 3))
+        self.assertEqual(len(self.api._cache.entries), 3)
+
+    def test_version_bump_invalidates_dependent_routes(self):
+        self.get("/v1/qcd/services")
+        # deployments are not a dependency of /v1/qcd/services
+        self.deliver("dashboard.deployments.reported", {"deploymentAttempts": [ATTEMPT]})
+        self.get("/v1/qcd/services")
+        self.assertEqual(self.counters(), (1, 1))
+
+        self.deliver("dashboard.platform.config.updated",
+                     {"services": [{**SERVICE, "name": "Renamed"}]})
+        response = self.get("/v1/qcd/services")
+        self.assertEqual(self.counters(), (1, 2))
+        self.assertEqual(json.loads(response["body"])["services"][0]["name"], "Renamed")
+
+    def test_uncached_routes_skip_the_cache(self):
+        self.get("/v1/qcd/deployments")
+        self.get("/v1/qcd/deployments")
+        self.assertEqual(self.counters(), (0, 0))
+        self.assertEqual(len(self.api._cache.entries), 0)
+
+    def test_hits_are_copies(self):
+        self.get("/v1/qcd/services")["headers"]["X-Test"] = "changed"
+        self.assertNotIn("X-Test", self.get("/v1/qcd/services")["headers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
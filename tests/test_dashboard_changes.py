@@ -0,0 +1,121 @@
+"""
+/v1/qcd/changes: a token from one call leads the next call through every
+change record exactly once, across the CHANGELOG#<n> shards and pages of
+CHANGES_MAX_ITEMS keys, never past the settle window — plus 410 for
+tokens the log can no longer answer and qcd-processor's re-append when a
+write outlasts half the window.
+"""
+
+import json
+import time
+import unittest
+from unittest import mock
+
+import helpers
+
+
+def attempt(n, status="LIVE"):
+    return {"id": f"a{n}", "clusterId": "c1", "serviceId": f"s{n}",
+            "startedAt": f"2026-01-01T10:{n:02d}:00Z", "status": status}
+
+
+class ChangesTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        # Read up to the present unless a test narrows the window
+        self.stack.enter_context(mock.patch.object(self.qcd, "CHANGES_SETTLE_SECONDS", 0))
+        self.stack.enter_context(mock.patch.object(self.api, "CHANGES_SETTLE_SECONDS", 0))
+        self.token = self.changes()["nextToken"]
+
+    def report(self, *attempts):
+        helpers.invoke(self.qcd, {"detail-type": "dashboard.deployments.reported",
+                                  "detail": {"deploymentAttempts": list(attempts)}})
+
+    def changes(self, since=None, status=200):
+        query = {"since": since} if since else {}
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/changes", query))
+        self.assertEqual(response["statusCode"], status, response)
+        return json.loads(response["body"])
+
+    def drain(self):
+        """Every change after self.token, following nextToken; advances it."""
+        pages = []
+        while True:
+            page = self.changes(self.token)
+            pages.append(page["changes"])
+            self.token = page["nextToken"]
+            if not page["more"]:
+                return pages
+
+    def attempts(self, pages):
+        return [c["item"]["id"] for page in pages for c in page
+                if c["entity"] == "deploymentAttempts"]
+
+    def test_head_token_has_no_changes(self):
+        self.assertEqual(self.changes()["changes"], [])
+        self.assertEqual(self.drain(), [[]])
+
+    def test_changes_carry_current_items_oldest_first(self):
+        self.report(attempt(1))
+        self.report(attempt(2))
+        self.report(attempt(1, "FAILED"))
+        pages = self.drain()
+        # a1 changed twice: collapsed to its latest record, after a2
+        self.assertEqual(self.attempts(pages), ["a2", "a1"])
+        change = [c for c in pages[0] if c["entity"] == "deploymentAttempts"][-1]
+        self.assertEqual(change["item"]["status"], "FAILED")
+        self.assertEqual(change["key"], {"pk": "c1#s1", "sk": "2026-01-01T10:01:00Z#a1"})
+        self.assertNotIn("pk", change["item"])
+        self.assertEqual(self.drain(), [[]])
+
+    def test_pages_across_shards_lose_nothing(self):
+        for n in range(12):
+            self.report(attempt(n))
+        with mock.patch.object(self.api, "CHANGES_MAX_ITEMS", 5):
+            pages = self.drain()
+        self.assertGreater(len(pages), 2)
+        self.assertEqual(sorted(self.attempts(pages)), sorted(f"a{n}" for n in range(12)))
+        self.assertEqual(len(self.attempts(pages)), 12)
+
+    def test_settle_window_holds_back_fresh_records(self):
+        self.report(attempt(1))
+        with mock.patch.object(self.api, "CHANGES_SETTLE_SECONDS", 60):
+            page = self.changes(self.token)
+        self.assertEqual(page["changes"], [])
+        self.assertEqual(page["nextToken"], self.token)
+        # The held-back record is returned once it has settled
+        self.assertEqual(self.attempts(self.drain()), ["a1"])
+
+    def test_rebuild_asks_for_a_reload(self):
+        helpers.invoke(self.qcd, {"detail-type": "dashboard.analytics.rebuild", "detail": {}})
+        entities = [c["entity"] for page in self.drain() for c in page]
+        self.assertIn("*", entities)
+
+    def test_unusable_tokens(self):
+        self.changes(self.api._change_token("2020-01-01T00:00:00.000000Z"), status=410)
+        other_layout = self.api._encode_cursor({"sk": "2026-01-01T00:00:00Z", "shards": 3})
+        self.changes(other_layout, status=410)
+        self.changes("not-a-token", status=400)
+        self.changes(self.api._encode_cursor({"sk": 5, "shards": 8}), status=400)
+
+    def test_slow_append_is_re_appended(self):
+        real_append = self.qcd._append_changes
+        appends = []
+
+        def slow_append(entity, chunks):
+            real_append(entity, chunks)
+            appends.append(entity)
+            if len(appends) == 1:
+                time.sleep(0.6)
+
+        with mock.patch.object(self.qcd, "CHANGES_SETTLE_SECONDS", 1), \
+                mock.patch.object(self.qcd, "_append_changes", slow_append):
+            self.qcd._log_changes("deploymentAttempts", [{"pk": "c1#s1", "sk": "x"}])
+        self.assertEqual(appends, ["deploymentAttempts"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
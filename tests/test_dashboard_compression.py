@@ -0,0 +1,129 @@
+"""
+dashboard-api response compression: Accept-Encoding picks gzip or
+deflate (q=0 excludes a coding, * stands for the unnamed ones), bodies
+of at least COMPRESS_MIN_BYTES are sent encoded and base64-flagged for
+API Gateway, and every 200 varies on Accept-Encoding.
+"""
+
+import base64
+import gzip
+import json
+import unittest
+import zlib
+from unittest import mock
+
+import helpers
+
+SERVICES = [{"id": f"s{i}", "name": f"Service {i}", "team": "platform"} for i in range(50)]
+
+
+class AcceptedEncodingTest(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"}):
+            self.api = helpers.load_lambda("dashboard-api")
+
+    def test_negotiation(self):
+        cases = {
+            "": None,
+            "gzip": "gzip",
+            "deflate": "deflate",
+            "deflate, gzip": "gzip",  # server preference, not header order
+            "gzip;q=0, deflate": "deflate",
+            "gzip;q=0, deflate;q=0": None,
+            "identity": None,
+            "br": None,
+            "*": "gzip",
+            "*;q=0": None,
+            "*, gzip;q=0": "deflate",
+            "GZIP ; q=0.5": "gzip",
+            "gzip;q=abc": None,  # an unreadable q drops the coding
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(self.api._accepted_encoding({"accept-encoding": value}), expected)
+
+    def test_header_name_case(self):
+        self.assertEqual(self.api._accepted_encoding({"Accept-Encoding": "deflate"}), "deflate")
+        self.assertIsNone(self.api._accepted_encoding({}))
+
+
+class CompressTest(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"}):
+            self.api = helpers.load_lambda("dashboard-api")
+        self.body = json.dumps({"items": ["x" * 10] * 200})
+
+    def compress(self, encoding, status=200, body=None):
+        response = {"statusCode": status, "headers": {}, "body": body or self.body}
+        return self.api._compress(response, encoding)
+
+    def test_gzip(self):
+        response = self.compress("gzip")
+        self.assertEqual(response["headers"]["Content-Encoding"], "gzip")
+        self.assertIs(response["isBase64Encoded"], True)
+        self.assertEqual(gzip.decompress(base64.b64decode(response["body"])).decode(), self.body)
+        self.assertLess(len(response["body"]), len(self.body))
+
+    def test_deflate(self):
+        response = self.compress("deflate")
+        self.assertEqual(response["headers"]["Content-Encoding"], "deflate")
+        self.assertEqual(zlib.decompress(base64.b64decode(response["body"])).decode(), self.body)
+
+    def test_identity(self):
+        response = self.compress(None)
+        self.assertEqual(response["body"], self.body)
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertNotIn("isBase64Encoded", response)
+        self.assertEqual(response["headers"]["Vary"], "Accept-Encoding")
+
+    def test_size_threshold(self):
+        small = "x" * (self.api.COMPRESS_MIN_BYTES - 1)
+        response = self.compress("gzip", body=small)
+        self.assertEqual(response["body"], small)
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(response["headers"]["Vary"], "Accept-Encoding")
+        at_threshold = "x" * self.api.COMPRESS_MIN_BYTES
+        self.assertEqual(self.compress("gzip", body=at_threshold)["headers"]["Content-Encoding"],
+                         "gzip")
+
+    def test_errors_are_left_alone(self):
+        response = self.compress("gzip", status=400)
+        self.assertEqual(response, {"statusCode": 400, "headers": {}, "body": self.body})
+
+
+class CompressedRoutesTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        qcd = helpers.load_lambda("qcd-processor")
+        helpers.invoke(qcd, {"detail-type": "dashboard.platform.config.updated",
+                             "detail": {"services": SERVICES}})
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def get(self, path, **headers):
+        response = helpers.invoke(self.api, helpers.api_event(path, None, headers))
+        self.assertEqual(response["statusCode"], 200, response)
+        return response
+
+    def test_route_body_round_trips(self):
+        plain = self.get("/v1/qcd/services")
+        self.assertGreaterEqual(len(plain["body"]), self.api.COMPRESS_MIN_BYTES)
+        for coding, decompress in (("gzip", gzip.decompress), ("deflate", zlib.decompress)):
+            with self.subTest(coding=coding):
+                response = self.get("/v1/qcd/services", **{"accept-encoding": coding})
+                self.assertEqual(response["headers"]["Content-Encoding"], coding)
+                self.assertEqual(decompress(base64.b64decode(response["body"])).decode(),
+                                 plain["body"])
+
+    def test_small_bodies_are_not_encoded(self):
+        response = self.get("/v1/health", **{"accept-encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response["headers"])
+        response = self.get("/v1/qcd/clusters", **{"accept-encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", response["headers"])
+        self.assertEqual(response["headers"]["Vary"], "Accept-Encoding")
+
+
+if __name__ == "__main__":
+    unittest.main()
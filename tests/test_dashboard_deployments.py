@@ -0,0 +1,115 @@
+"""
+dashboard-api /v1/qcd/deployments: one page per request, newest first
+for a cluster and/or service, with nextCursor leading through every
+attempt exactly once and since (inclusive) / until (exclusive) applied
+on startedAt.
+"""
+
+import json
+import unittest
+
+import helpers
+
+# Seven attempts over three (cluster, service) pairs, one hour apart
+ATTEMPTS = [
+    {"id": f"a{i}", "clusterId": cluster, "serviceId": service,
+     "startedAt": f"2026-01-01T{10 + i:02d}:00:00Z", "status": "LIVE"}
+    for i, (cluster, service) in enumerate([
+        ("c1", "s1"), ("c1", "s2"), ("c2", "s1"), ("c1", "s1"),
+        ("c1", "s2"), ("c2", "s1"), ("c1", "s1"),
+    ])
+]
+
+
+class DeploymentsTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        qcd = helpers.load_lambda("qcd-processor")
+        helpers.invoke(qcd, {"detail-type": "dashboard.deployments.reported",
+                             "detail": {"deploymentAttempts": ATTEMPTS}})
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def get(self, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/deployments", query))
+        return response["statusCode"], json.loads(response["body"])
+
+    def pages(self, **query):
+        """ids of every page, following nextCursor from the first."""
+        pages, cursor = [], None
+        while True:
+            status, body = self.get(**query, **({"cursor": cursor} if cursor else {}))
+            self.assertEqual(status, 200, body)
+            pages.append([a["id"] for a in body["deploymentAttempts"]])
+            cursor = body["nextCursor"]
+            if not cursor:
+                return pages
+
+    def expected(self, since=None, until=None, **match):
+        """ids of the matching attempts, newest first."""
+        return [a["id"] for a in reversed(ATTEMPTS)
+                if all(a[k] == v for k, v in match.items())
+                and (since is None or a["startedAt"] >= since)
+                and (until is None or a["startedAt"] < until)]
+
+    def test_cluster_and_service_newest_first(self):
+        pages = self.pages(clusterId="c1", serviceId="s1", limit="2")
+        self.assertEqual([len(p) for p in pages if p], [2, 1])
+        self.assertEqual(sum(pages, []), self.expected(clusterId="c1", serviceId="s1"))
+
+    def test_cluster_index_newest_first(self):
+        pages = self.pages(clusterId="c1", limit="2")
+        self.assertEqual(sum(pages, []), self.expected(clusterId="c1"))
+
+    def test_service_index_newest_first(self):
+        pages = self.pages(serviceId="s1", limit="3")
+        self.assertEqual(sum(pages, []), self.expected(serviceId="s1"))
+
+    def test_since_inclusive_until_exclusive(self):
+        since, until = ATTEMPTS[1]["startedAt"], ATTEMPTS[5]["startedAt"]
+        for match in ({"clusterId": "c1"}, {"serviceId": "s1"},
+                      {"clusterId": "c1", "serviceId": "s2"}):
+            with self.subTest(**match):
+                pages = self.pages(since=since, until=until, limit="2", **match)
+                self.assertEqual(sum(pages, []), self.expected(since, until, **match))
+
+    def test_unfiltered_pages_cover_every_attempt_once(self):
+        ids = sum(self.pages(limit="3"), [])
+        self.assertEqual(sorted(ids), sorted(a["id"] for a in ATTEMPTS))
+        since = ATTEMPTS[4]["startedAt"]
+        ids = sum(self.pages(since=since, limit="2"), [])
+        self.assertEqual(sorted(ids), sorted(self.expected(since)))
+
+    def test_default_limit_is_one_page(self):
+        status, body = self.get()
+        self.assertEqual(len(body["deploymentAttempts"]), len(ATTEMPTS))
+        self.assertIsNone(body["nextCursor"])
+
+    def test_bad_parameters(self):
+        for query in ({"limit": "0"}, {"limit": "ten"}, {"cursor": "not-a-cursor"},
+                      {"cursor": "WzFd"}):  # a list, not a key
+            with self.subTest(**query):
+                status, body = self.get(**query)
+                self.assertEqual(status, 400, body)
+
+    def test_tampered_cursors(self):
+        sk = f"{ATTEMPTS[0]['startedAt']}#a0"
+        cursors = {
+            "scan": [{"foo": "x"}, {"pk": "c1#s1"}, {"pk": "c1#s1", "sk": 5},
+                     {"pk": "c1#s1", "sk": sk, "clusterId": "c1"}],
+            "pk": [{"foo": "x"}, {"pk": "c2#s1", "sk": sk}, {"pk": ["c1#s1"], "sk": sk}],
+            "index": [{"foo": "x"}, {"pk": "c1#s1", "sk": sk},
+                      {"pk": "c2#s1", "sk": sk, "clusterId": "c2"},
+                      {"pk": "c1#s1", "sk": sk, "clusterId": "c1", "extra": "x"}],
+        }
+        queries = {"scan": {}, "pk": {"clusterId": "c1", "serviceId": "s1"},
+                   "index": {"clusterId": "c1"}}
+        for path, keys in cursors.items():
+            for key in keys:
+                with self.subTest(path=path, key=key):
+                    status, body = self.get(cursor=self.api._encode_cursor(key), **queries[path])
+                    self.assertEqual((status, body), (400, {"error": "Invalid cursor"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+dashboard-api conditional responses: every versioned /v1/qcd route sends
+an ETag, and a request whose If-None-Match carries it gets an empty 304
+without the route reading its tables — until qcd-processor bumps one of
+the data-version categories the route depends on.
+"""
+
+import unittest
+from unittest import mock
+
+import helpers
+
+ATTEMPT = {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+           "startedAt": "2026-01-01T10:00:00Z", "status": "LIVE"}
+
+
+class ETagTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.report(ATTEMPT)
+
+    def report(self, attempt):
+        helpers.invoke(self.qcd, {"detail-type": "dashboard.deployments.reported",
+                                  "detail": {"deploymentAttempts": [attempt]}})
+
+    def get(self, path, query=None, **headers):
+        return helpers.invoke(self.api, helpers.api_event(path, query, headers))
+
+    def test_every_versioned_route(self):
+        for path in self.api.ROUTE_DEPENDENCIES:
+            with self.subTest(path=path):
+                response = self.get(path)
+                self.assertEqual(response["statusCode"], 200, response)
+                etag = response["headers"]["ETag"]
+                again = self.get(path, **{"if-none-match": etag})
+                self.assertEqual(again["statusCode"], 304)
+                self.assertEqual(again["body"], "")
+                self.assertEqual(again["headers"]["ETag"], etag)
+                self.assertEqual(again["headers"]["Vary"], response["headers"]["Vary"])
+
+    def test_not_modified_reads_no_table(self):
+        etag = self.get("/v1/qcd/deployments")["headers"]["ETag"]
+        with mock.patch.object(self.api, "_qcd_deployments",
+                               side_effect=AssertionError("route ran")):
+            response = self.get("/v1/qcd/deployments", **{"If-None-Match": f'"x", {etag}'})
+        self.assertEqual(response["statusCode"], 304)
+
+    def test_write_changes_only_dependent_routes(self):
+        deployments = self.get("/v1/qcd/deployments")["headers"]["ETag"]
+        services = self.get("/v1/qcd/services")["headers"]["ETag"]
+        self.report({**ATTEMPT, "status": "FAILED"})
+
+        response = self.get("/v1/qcd/deployments", **{"if-none-match": deployments})
+        self.assertEqual(response["statusCode"], 200)
+        self.assertIn("FAILED", response["body"])
+        self.assertNotEqual(response["headers"]["ETag"], deployments)
+        self.assertEqual(self.get("/v1/qcd/services", **{"if-none-match": services})["statusCode"],
+                         304)
+
+    def test_representations_have_their_own_etags(self):
+        plain = self.get("/v1/qcd/deployments")["headers"]["ETag"]
+        filtered = self.get("/v1/qcd/deployments", {"clusterId": "c1"})["headers"]["ETag"]
+        gzipped = self.get("/v1/qcd/deployments", **{"accept-encoding": "gzip"})["headers"]["ETag"]
+        self.assertEqual(len({plain, filtered, gzipped}), 3)
+        response = self.get("/v1/qcd/deployments", {"clusterId": "c1"}, **{"if-none-match": plain})
+        self.assertEqual(response["statusCode"], 200)
+
+    def test_errors_and_unversioned_routes_have_no_etag(self):
+        response = self.get("/v1/qcd/deployments", {"limit": "0"})
+        self.assertEqual(response["statusCode"], 400)
+        self.assertNotIn("ETag", response["headers"])
+        for path in ("/v1/health", "/v1/qcd/changes"):
+            with self.subTest(path=path):
+                self.assertNotIn("ETag", self.get(path)["headers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+/v1/qcd/failures from the sparse failures-index: qcd-processor keys
+FAILED/ROLLBACK attempts and runs with failures as <kind>#<shard>, and the
+route queries every shard in parallel and merges them newest first, with
+since/until, a per-kind limit and the complete flag. The rebuild moves
+items indexed under the unsharded keys onto the shards.
+"""
+
+import json
+import unittest
+
+import helpers
+
+STATUSES = ("FAILED", "LIVE", "ROLLBACK", "LIVE")
+ATTEMPTS = [
+    {"id": f"a{i}", "clusterId": f"c{i % 3}", "serviceId": f"s{i % 2}",
+     "startedAt": f"2026-01-{1 + i:02d}T10:00:00Z", "status": STATUSES[i % 4]}
+    for i in range(16)
+]  # a0, a2, a4, ... fail
+FAILING = [a["id"] for a in reversed(ATTEMPTS) if a["status"] != "LIVE"]
+RUNS = [
+    {"attemptId": a["id"], "suiteType": "SANITY", "executedAt": a["startedAt"].replace("10:", "11:"),
+     "passed": 10 - i % 3, "failed": i % 3, "total": 10}
+    for i, a in enumerate(ATTEMPTS)
+]  # runs of a1, a2, a4, a5, ... fail
+FAILING_RUNS = [r["attemptId"] for r in reversed(RUNS) if r["failed"]]
+
+
+class FailuresTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.deliver("dashboard.deployments.reported", {"deploymentAttempts": ATTEMPTS})
+        self.deliver("dashboard.test-results.reported", {"testRuns": RUNS})
+        self.reads = []
+        events = self.api.dynamodb.meta.client.meta.events
+
+        def record(params, model, **kwargs):
+            self.reads.append((model.name, params.get("IndexName")))
+
+        for operation in ("Query", "Scan"):
+            events.register(f"before-parameter-build.dynamodb.{operation}", record)
+            self.addCleanup(events.unregister, f"before-parameter-build.dynamodb.{operation}",
+                            record)
+
+    def deliver(self, detail_type, detail):
+        response = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])
+
+    def failures(self, status=200, **query):
+        self.reads.clear()
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/failures", query))
+        self.assertEqual(response["statusCode"], status, response)
+        return json.loads(response["body"])
+
+    def ids(self, body):
+        return ([a["id"] for a in body["deploymentAttempts"]],
+                [r["attemptId"] for r in body["testRuns"]])
+
+    def test_failures_newest_first(self):
+        body = self.failures()
+        self.assertEqual(self.ids(body), (FAILING, FAILING_RUNS))
+        self.assertIs(body["complete"], True)
+        row = body["deploymentAttempts"][0]
+        self.assertFalse(set(row) & set(self.api.INTERNAL_ATTRIBUTES), row)
+
+    def test_items_are_spread_over_the_shards(self):
+        table = self.qcd.dynamodb.Table(self.qcd.DEPLOYMENTS_TABLE)
+        shards = {i["failureType"] for i in table.scan()["Items"] if "failureType" in i}
+        self.assertGreater(len(shards), 1)
+        self.assertTrue(all(s.startswith("DEPLOYMENT#") for s in shards), shards)
+
+    def test_every_shard_is_queried_and_nothing_scanned(self):
+        self.failures()
+        self.assertEqual(self.reads, [("Query", "failures-index")] * (2 * self.api.FAILURE_SHARDS))
+
+    def test_limit_and_window(self):
+        body = self.failures(limit="3")
+        self.assertEqual(self.ids(body), (FAILING[:3], FAILING_RUNS[:3]))
+        self.assertIs(body["complete"], False)
+        body = self.failures(since="2026-01-05", until="2026-01-09T10:00:00Z")
+        self.assertEqual(self.ids(body)[0], ["a6", "a4"])  # until is exclusive
+        self.assertIs(body["complete"], True)
+        body = self.failures(limit=str(len(FAILING_RUNS)))
+        self.assertIs(body["complete"], True)
+
+    def test_fixed_attempts_drop_out(self):
+        self.deliver("dashboard.deployments.reported",
+                     {"deploymentAttempts": [{**ATTEMPTS[0], "status": "LIVE"}]})
+        self.assertEqual(self.ids(self.failures())[0], FAILING[:-1])
+
+    def test_rebuild_shards_unsharded_items(self):
+        table = self.qcd.dynamodb.Table(self.qcd.DEPLOYMENTS_TABLE)
+        for item in table.scan()["Items"]:
+            if "failureType" in item:
+                table.update_item(Key={"pk": item["pk"], "sk": item["sk"]},
+                                  UpdateExpression="SET failureType = :t",
+                                  ExpressionAttributeValues={":t": "DEPLOYMENT"})
+        self.assertEqual(self.ids(self.failures())[0], [])
+        self.deliver("dashboard.analytics.rebuild", {})
+        self.assertEqual(self.ids(self.failures())[0], FAILING)
+
+    def test_bad_limit(self):
+        self.failures(400, limit="0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+dashboard-api field projection: fields=a,b narrows every record of a
+collection route to those attributes (read by ProjectionExpression),
+and format=columns answers one array per field, with null where a
+record lacks it. Storage attributes are never selectable.
+"""
+
+import json
+import unittest
+
+import helpers
+
+ATTEMPTS = [
+    {"id": "a1", "clusterId": "c1", "serviceId": "s1", "version": "1.0.0",
+     "startedAt": "2026-01-01T10:00:00Z", "status": "LIVE"},
+    {"id": "a2", "clusterId": "c1", "serviceId": "s1",
+     "startedAt": "2026-01-01T11:00:00Z", "status": "FAILED"},
+]
+RUNS = [
+    {"attemptId": "a1", "suiteType": "SANITY", "executedAt": f"2026-01-01T10:{m:02d}:00Z",
+     "passed": m, "failed": 0, "total": 60}
+    for m in (10, 20, 30)
+]
+
+
+class FieldsTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        qcd = helpers.load_lambda("qcd-processor")
+        helpers.invoke(qcd, {"detail-type": "dashboard.deployments.reported",
+                             "detail": {"deploymentAttempts": ATTEMPTS}})
+        helpers.invoke(qcd, {"detail-type": "dashboard.test-results.reported",
+                             "detail": {"testRuns": RUNS}})
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def get(self, path, **query):
+        response = helpers.invoke(self.api, helpers.api_event(path, query))
+        return response["statusCode"], json.loads(response["body"])
+
+    def deployments(self, **query):
+        status, body = self.get("/v1/qcd/deployments", clusterId="c1", serviceId="s1", **query)
+        self.assertEqual(status, 200, body)
+        return body["deploymentAttempts"]
+
+    def test_fields_narrow_rows(self):
+        self.assertEqual(self.deployments(fields="status,id,status"),
+                         [{"status": "FAILED", "id": "a2"}, {"status": "LIVE", "id": "a1"}])
+
+    def test_fields_are_projected(self):
+        queries = []
+        events = self.api.dynamodb.meta.client.meta.events
+
+        def record(params, **kwargs):
+            queries.append(params)
+
+        events.register("before-parameter-build.dynamodb.Query", record)
+        self.addCleanup(events.unregister, "before-parameter-build.dynamodb.Query", record)
+        self.deployments(fields="id,version")
+        (params,) = queries
+        names = {params["ExpressionAttributeNames"][n.strip()]
+                 for n in params["ProjectionExpression"].split(",")}
+        self.assertEqual(names, {"id", "version"})
+
+    def test_columns(self):
+        self.assertEqual(self.deployments(fields="id,version", format="columns"),
+                         {"id": ["a2", "a1"], "version": [None, "1.0.0"]})
+
+    def test_columns_without_fields(self):
+        columns = self.deployments(format="columns")
+        self.assertEqual(columns["id"], ["a2", "a1"])
+        self.assertEqual(columns["version"], [None, "1.0.0"])
+        self.assertFalse(set(columns) & set(self.api.INTERNAL_ATTRIBUTES))
+
+    def test_route_filters_keep_working_without_their_field(self):
+        status, body = self.get("/v1/qcd/test-runs", attemptId="a1", fields="passed",
+                                until="2026-01-01T10:30:00Z")
+        self.assertEqual(status, 200, body)
+        self.assertEqual(body["testRuns"], [{"passed": 10}, {"passed": 20}])
+
+    def test_other_collection_routes(self):
+        status, body = self.get("/v1/qcd/failures", fields="id", format="columns")
+        self.assertEqual((status, body["deploymentAttempts"]), (200, {"id": ["a2"]}))
+        status, body = self.get("/v1/qcd/test-runs", suiteType="SANITY", fields="executedAt",
+                                format="columns")
+        self.assertEqual(body["testRuns"], {"executedAt": [r["executedAt"] for r in RUNS]})
+
+    def test_invalid(self):
+        for query in ({"fields": "pk"}, {"fields": "contentHash"}, {"fields": "a-b"},
+                      {"fields": ","}, {"fields": ",".join(f"f{i}" for i in range(33))},
+                      {"format": "csv"}):
+            with self.subTest(**query):
+                status, body = self.get("/v1/qcd/deployments", **query)
+                self.assertEqual(status, 400, body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Cold archive round trip: qcd-processor writes the old images of TTL
+deletions from the table streams to kind/dt=<day> partitions (a local
+directory or S3), and /v1/qcd/history reads back the days asked for,
+newest first, with its filters and fields/format, one archive object at
+a time up to the cap, with a cursor to continue.
+"""
+
+import contextlib
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import helpers
+
+ATTEMPTS = [
+    {"id": f"a{i}", "clusterId": "c1", "serviceId": f"s{i % 2}",
+     "startedAt": f"2025-06-0{1 + i // 2}T{10 + i}:00:00Z", "status": "LIVE"}
+    for i in range(6)
+]  # two per day, 2025-06-01..03
+RUNS = [
+    {"attemptId": a["id"], "suiteType": "SANITY",
+     "executedAt": a["startedAt"].replace(":00:00Z", ":30:00Z"), "passed": 1, "total": 1}
+    for a in ATTEMPTS
+]
+TTL = {"principalId": "dynamodb.amazonaws.com", "type": "Service"}
+
+
+class HistoryTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.archive = self.stack.enter_context(tempfile.TemporaryDirectory())
+        self.use_archive(self.stack, self.archive)
+        self.stack.enter_context(mock.patch.object(self.qcd, "CHANGES_SETTLE_SECONDS", 0))
+        self.stack.enter_context(mock.patch.object(self.api, "CHANGES_SETTLE_SECONDS", 0))
+        self.deliver({"detail-type": "dashboard.deployments.reported",
+                      "detail": {"deploymentAttempts": ATTEMPTS}})
+        self.deliver({"detail-type": "dashboard.test-results.reported",
+                      "detail": {"testRuns": RUNS}})
+
+    def use_archive(self, stack, uri):
+        stack.enter_context(mock.patch.object(self.qcd, "ARCHIVE_URI", uri))
+        stack.enter_context(mock.patch.object(self.api, "ARCHIVE_URI", uri))
+
+    def deliver(self, event):
+        return helpers.invoke(self.qcd, event)
+
+    def expire(self, table_name, identity=TTL):
+        """Delete every item of a table and deliver its stream records."""
+        from boto3.dynamodb.types import TypeSerializer
+
+        serializer = TypeSerializer()
+        table = self.qcd.dynamodb.Table(table_name)
+        records = []
+        for item in table.scan()["Items"]:
+            table.delete_item(Key={"pk": item["pk"], "sk": item["sk"]})
+            records.append({
+                "eventSource": "aws:dynamodb", "eventName": "REMOVE", "userIdentity": identity,
+                "eventSourceARN": f"arn:aws:dynamodb:us-east-1:1:table/{table_name}/stream/x",
+                "dynamodb": {"OldImage": {k: serializer.serialize(v) for k, v in item.items()}},
+            })
+        return self.deliver({"Records": records})
+
+    def history(self, status=200, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/history", query))
+        self.assertEqual(response["statusCode"], status, response)
+        return json.loads(response["body"])
+
+    def ids(self, body, key="deploymentAttempts"):
+        return [row.get("id") or row["attemptId"] for row in body[key]]
+
+    def test_days_newest_first(self):
+        result = self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        self.assertEqual(result["archived"], {"deployments": 6})
+        body = self.history(since="2025-06-02", until="2025-06-03")
+        self.assertEqual(self.ids(body), ["a5", "a4", "a3", "a2"])
+        self.assertIs(body["complete"], True)
+        row = body["deploymentAttempts"][0]
+        self.assertFalse(set(row) & set(self.api.INTERNAL_ATTRIBUTES), row)
+
+    def test_kinds_and_filters(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        self.expire(self.qcd.TEST_RESULTS_TABLE)
+        body = self.history(since="2025-06-01", until="2025-06-03", serviceId="s1")
+        self.assertEqual(self.ids(body), ["a5", "a3", "a1"])
+        body = self.history(kind="test-runs", since="2025-06-01", until="2025-06-01")
+        self.assertEqual(self.ids(body, "testRuns"), ["a1", "a0"])
+        body = self.history(kind="test-runs", since="2025-06-01", until="2025-06-03",
+                            attemptId="a4", fields="executedAt", format="columns")
+        self.assertEqual(body["testRuns"], {"executedAt": [RUNS[4]["executedAt"]]})
+
+    def test_re_archived_rows_keep_the_last_copy(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        self.deliver({"detail-type": "dashboard.deployments.reported",
+                      "detail": {"deploymentAttempts": [{**ATTEMPTS[0], "status": "ROLLBACK"}]}})
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        rows = self.history(since="2025-06-01", until="2025-06-01")["deploymentAttempts"]
+        self.assertEqual([(r["id"], r["status"]) for r in rows], [("a1", "LIVE"), ("a0", "ROLLBACK")])
+
+    def test_only_ttl_deletions_are_archived(self):
+        result = self.expire(self.qcd.DEPLOYMENTS_TABLE, identity=None)
+        self.assertEqual(result["archived"], {})
+        self.assertEqual(self.history(since="2025-06-01", until="2025-06-03")["deploymentAttempts"],
+                         [])
+
+    def test_removals_reach_the_change_feed(self):
+        token = self.api._change_token("2026-01-01")
+        with mock.patch.object(self.api, "CHANGE_LOG_TTL_DAYS", 100000):
+            self.expire(self.qcd.DEPLOYMENTS_TABLE)
+            response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/changes", {"since": token}))
+        changes = json.loads(response["body"])["changes"]
+        gone = {c["key"]["sk"] for c in changes
+                if c["entity"] == "deploymentAttempts" and c["item"] is None}
+        self.assertEqual(gone, {f"{a['startedAt']}#{a['id']}" for a in ATTEMPTS})
+
+    def test_capped(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        with mock.patch.object(self.api, "SCAN_MAX_ITEMS", 4):
+            body = self.history(since="2025-06-01", until="2025-06-03")
+        self.assertEqual(self.ids(body), ["a5", "a4", "a3", "a2"])
+        self.assertIs(body["complete"], False)
+        self.assertTrue(body["nextCursor"])
+
+    def test_cursor_pages(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        pages = []
+        cursor = None
+        with mock.patch.object(self.api, "SCAN_MAX_ITEMS", 3):
+            while True:
+                query = {"since": "2025-06-01", "until": "2025-06-03"}
+                body = self.history(**query, **({"cursor": cursor} if cursor else {}))
+                pages.append(self.ids(body))
+                cursor = body["nextCursor"]
+                if cursor is None:
+                    break
+                self.assertIs(body["complete"], False)
+        self.assertIs(body["complete"], True)
+        # The cap falls inside 2025-06-02's object: a page ends mid-object
+        self.assertEqual([len(p) for p in pages], [3, 3])
+        self.assertEqual(sorted(pages[0] + pages[1], reverse=True), ["a5", "a4", "a3", "a2", "a1", "a0"])
+        self.assertEqual(pages[0][:2], ["a5", "a4"])
+        self.assertEqual(pages[1][1:], ["a1", "a0"])
+
+    def test_reading_stops_at_the_cap(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        opened = []
+        real = self.api._object_lines
+
+        def lines(kind, day, name):
+            opened.append(day)
+            return real(kind, day, name)
+
+        with mock.patch.object(self.api, "_object_lines", lines), \
+                mock.patch.object(self.api, "SCAN_MAX_ITEMS", 2):
+            body = self.history(since="2025-06-01", until="2025-06-03")
+        self.assertEqual(self.ids(body), ["a5", "a4"])
+        # 2025-06-02 is opened to find the next row; 2025-06-01 never is
+        self.assertEqual(opened, ["2025-06-03", "2025-06-02"])
+
+    def test_bad_cursors(self):
+        self.expire(self.qcd.DEPLOYMENTS_TABLE)
+        query = {"since": "2025-06-02", "until": "2025-06-03"}
+        for position in ({"day": "2025-06-01", "key": "x", "row": 0},
+                         {"day": "2025-06-02", "key": "x"},
+                         {"day": "2025-06-02", "key": "x", "row": -1},
+                         {"day": "2025-06-02", "key": "x", "row": "0"},
+                         {"day": "June 2", "key": "x", "row": 0},
+                         ["2025-06-02", "x", 0]):
+            with self.subTest(position=position):
+                self.history(400, **query, cursor=self.api._encode_cursor(position))
+        self.history(400, **query, cursor="not-a-cursor")
+
+    def test_s3_archive(self):
+        import boto3
+
+        boto3.client("s3").create_bucket(Bucket="qcd-archive")
+        with contextlib.ExitStack() as stack:
+            self.use_archive(stack, "s3://qcd-archive/dev")
+            self.expire(self.qcd.DEPLOYMENTS_TABLE)
+            body = self.history(since="2025-06-03", until="2025-06-03")
+        self.assertEqual(self.ids(body), ["a5", "a4"])
+        keys = [o["Key"] for o in boto3.client("s3").list_objects_v2(Bucket="qcd-archive")["Contents"]]
+        self.assertTrue(all(k.startswith("dev/deployments/dt=2025-06-0") for k in keys), keys)
+
+    def test_bad_requests(self):
+        self.history(400)
+        self.history(400, since="2025-06-01", kind="scorecards")
+        self.history(400, since="June 1")
+        self.history(400, since="2025-06-02", until="2025-06-01")
+        self.history(400, since="2025-01-01", until="2025-06-01")
+        with mock.patch.object(self.api, "ARCHIVE_URI", ""):
+            self.history(503, since="2025-06-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Jira version ranges: qcd-processor gives semver tickets a zero-padded
+versionSort, and /v1/qcd/jira-tickets with serviceId, fromVersion and
+toVersion answers from < version <= to in numeric version order with one
+Query on serviceVersion-index. Non-semver tickets never match; the
+reindex event backfills versionSort on tickets written before it existed.
+"""
+
+import json
+import unittest
+
+import helpers
+
+# Lexically 1.10.0 < 1.9.0 and 10.0.0 < 2.0.0; by version they are not
+VERSIONS = ("1.2.0", "1.9.0", "1.10.0", "2.0.0", "10.0.0", "1.9.0-rc1", "next")
+TICKETS = {
+    "s1": [{"key": f"T-{n}", "version": v, "summary": f"ticket {n}"}
+           for n, v in enumerate(VERSIONS)],
+    "s2": [{"key": "U-1", "version": "1.9.5"}],
+}
+
+
+class JiraRangeTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.deliver("dashboard.scorecards.updated", {"jiraTickets": TICKETS})
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def deliver(self, detail_type, detail):
+        return helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+
+    def tickets(self, status=200, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/jira-tickets", query))
+        self.assertEqual(response["statusCode"], status, response)
+        return json.loads(response["body"]).get("jiraTickets")
+
+    def versions(self, low, high, service="s1"):
+        tickets = self.tickets(serviceId=service, fromVersion=low, toVersion=high)
+        return [t["version"] for t in tickets.get(service, [])]
+
+    def test_range_is_exclusive_below_inclusive_above(self):
+        self.assertEqual(self.versions("1.2.0", "2.0.0"), ["1.9.0", "1.10.0", "2.0.0"])
+        self.assertEqual(self.versions("1.9.0", "1.10.0"), ["1.10.0"])
+        self.assertEqual(self.versions("0.0.0", "99.0.0"),
+                         ["1.2.0", "1.9.0", "1.10.0", "2.0.0", "10.0.0"])
+
+    def test_bounds_need_not_be_ticket_versions(self):
+        self.assertEqual(self.versions("1.9.1", "9.9.9"), ["1.10.0", "2.0.0"])
+        self.assertEqual(self.versions("1.9.0", "1.9.9", service="s2"), ["1.9.5"])
+
+    def test_empty_and_reversed_ranges(self):
+        self.assertEqual(self.versions("2.0.0", "2.0.0"), [])
+        self.assertEqual(self.versions("2.0.0", "1.0.0"), [])
+
+    def test_one_index_query(self):
+        queries = []
+        events = self.api.dynamodb.meta.client.meta.events
+
+        def record(params, **kwargs):
+            queries.append(params)
+
+        events.register("before-parameter-build.dynamodb.Query", record)
+        self.addCleanup(events.unregister, "before-parameter-build.dynamodb.Query", record)
+        self.versions("1.0.0", "2.0.0")
+        (params,) = queries
+        self.assertEqual(params["IndexName"], "serviceVersion-index")
+
+    def test_storage_attributes_are_stripped(self):
+        ticket = self.tickets(serviceId="s1", fromVersion="1.0.0", toVersion="1.2.0")["s1"][0]
+        self.assertEqual(ticket, {"key": "T-0", "version": "1.2.0", "summary": "ticket 0"})
+
+    def test_without_a_range_every_ticket_is_listed(self):
+        self.assertEqual(len(self.tickets(serviceId="s1")["s1"]), len(VERSIONS))
+        self.assertEqual({s: len(t) for s, t in self.tickets().items()},
+                         {"s1": len(VERSIONS), "s2": 1})
+
+    def test_reindex_backfills_version_sort(self):
+        table = self.qcd.dynamodb.Table(self.qcd.SCORECARDS_TABLE)
+        table.put_item(Item={"pk": "SERVICE#s1", "sk": "JIRA#OLD-1", "serviceId": "s1",
+                             "key": "OLD-1", "version": "1.5.0"})
+        self.assertEqual(self.versions("1.2.0", "1.9.0"), ["1.9.0"])
+        result = json.loads(self.deliver("dashboard.scorecards.reindex", {})["body"])
+        self.assertEqual(result["reindexed"]["jiraTickets"], 1)
+        self.assertEqual(self.versions("1.2.0", "1.9.0"), ["1.5.0", "1.9.0"])
+
+    def test_bad_ranges(self):
+        for query in ({"fromVersion": "1.0.0", "toVersion": "2.0.0"},
+                      {"serviceId": "s1", "toVersion": "2.0.0"},
+                      {"serviceId": "s1", "fromVersion": "1.0.0"},
+                      {"serviceId": "s1", "fromVersion": "1.0", "toVersion": "2.0.0"},
+                      {"serviceId": "s1", "fromVersion": "1.0.0", "toVersion": "v2.0.0"},
+                      {"serviceId": "s1", "fromVersion": "1.0.0", "toVersion": "1234567.0.0"}):
+            with self.subTest(**query):
+                self.tickets(400, **query)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+dashboard-api scans: unfiltered test-runs and cluster-test-runs return at
+most SCAN_MAX_ITEMS items and say with complete whether that was all of
+them, with the table scanned sequentially or as parallel segments.
+"""
+
+import json
+import unittest
+from unittest import mock
+
+import helpers
+
+DAY = "2026-01-01"
+CLUSTER_RUNS = [
+    {"id": f"cr{i}", "clusterId": f"c{i % 2}", "suiteType": "SOLUTION",
+     "executedAt": f"{DAY}T0{i}:00:00Z", "passed": 5, "total": 5}
+    for i in range(5)
+]
+RUNS = [
+    {"attemptId": f"a{i}", "suiteType": "SANITY", "executedAt": f"{DAY}T0{i}:00:00Z",
+     "passed": 1, "total": 1}
+    for i in range(5)
+]
+
+
+class ScanTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.deliver("dashboard.cluster-test-results.reported", {"clusterTestRuns": CLUSTER_RUNS})
+        self.deliver("dashboard.test-results.reported", {"testRuns": RUNS})
+
+    def deliver(self, detail_type, detail):
+        helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+
+    def get(self, path, **query):
+        self.api._cache.entries.clear()
+        response = helpers.invoke(self.api, helpers.api_event(path, query))
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])
+
+    def assert_capped(self, path, key, total, **query):
+        for cap, complete in ((total + 1, True), (total, True), (total - 2, False)):
+            with self.subTest(cap=cap), mock.patch.object(self.api, "SCAN_MAX_ITEMS", cap):
+                body = self.get(path, **query)
+                self.assertEqual(len(body[key]), min(cap, total))
+                self.assertIs(body["complete"], complete)
+
+    def test_cluster_test_runs(self):
+        self.assert_capped("/v1/qcd/cluster-test-runs", "clusterTestRuns", len(CLUSTER_RUNS))
+
+    def test_test_runs(self):
+        self.assert_capped("/v1/qcd/test-runs", "testRuns", len(RUNS))
+
+    def test_parallel_segments(self):
+        common = self.api.scan_bounded.__globals__
+        with mock.patch.dict(common, {"SCAN_SEGMENTS": 4}):
+            self.assert_capped("/v1/qcd/cluster-test-runs", "clusterTestRuns", len(CLUSTER_RUNS))
+
+    def test_queries_are_complete(self):
+        with mock.patch.object(self.api, "SCAN_MAX_ITEMS", 1):
+            body = self.get("/v1/qcd/cluster-test-runs", clusterId="c0")
+            self.assertEqual(len(body["clusterTestRuns"]), 3)
+            self.assertIs(body["complete"], True)
+            body = self.get("/v1/qcd/test-runs", attemptId="a1")
+            self.assertEqual(len(body["testRuns"]), 1)
+            self.assertIs(body["complete"], True)
+
+
+if __name__ == "__main__":
+    unittest.main()
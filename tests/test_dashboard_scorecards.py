@@ -0,0 +1,88 @@
+"""
+Scorecards and Jira tickets from the sparse itemType-index: qcd-processor
+tags scores SCORECARD and tickets JIRA_TICKET, /v1/qcd/scorecards and an
+unfiltered /v1/qcd/jira-tickets each read one index partition instead of
+scanning the table, and the reindex event backfills itemType on items
+written before the index existed.
+"""
+
+import json
+import unittest
+
+import helpers
+
+SCORECARDS = {
+    "scorecardWeights": {"quality": 2, "speed": 1},
+    "scorecards": {"s1": {"quality": 90, "speed": 70}, "s2": {"quality": 60, "speed": 95}},
+    "jiraTickets": {"s1": [{"key": "T-1", "version": "1.0.0"}],
+                    "s2": [{"key": "U-1", "version": "2.0.0"}, {"key": "U-2", "version": "2.1.0"}]},
+}
+
+
+class ScorecardsTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+        self.deliver("dashboard.scorecards.updated", SCORECARDS)
+        self.reads = []
+        events = self.api.dynamodb.meta.client.meta.events
+
+        def record(params, model, **kwargs):
+            self.reads.append((model.name, params.get("IndexName")))
+
+        for operation in ("Query", "Scan"):
+            events.register(f"before-parameter-build.dynamodb.{operation}", record)
+            self.addCleanup(events.unregister, f"before-parameter-build.dynamodb.{operation}",
+                            record)
+
+    def deliver(self, detail_type, detail):
+        response = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])
+
+    def get(self, path, query=None):
+        self.reads.clear()
+        response = helpers.invoke(self.api, helpers.api_event(path, query))
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])
+
+    def test_scorecards_read_the_index(self):
+        body = self.get("/v1/qcd/scorecards")
+        self.assertEqual(body, {"scorecardWeights": SCORECARDS["scorecardWeights"],
+                                "scorecards": SCORECARDS["scorecards"]})
+        self.assertEqual(self.reads, [("Query", "itemType-index")])
+
+    def test_unfiltered_tickets_read_the_index(self):
+        tickets = self.get("/v1/qcd/jira-tickets")["jiraTickets"]
+        self.assertEqual({svc: [t["key"] for t in ts] for svc, ts in tickets.items()},
+                         {"s1": ["T-1"], "s2": ["U-1", "U-2"]})
+        self.assertEqual(self.reads, [("Query", "itemType-index")])
+        self.get("/v1/qcd/jira-tickets", {"serviceId": "s2"})
+        self.assertEqual(self.reads, [("Query", None)])
+
+    def test_reindex_backfills_item_type(self):
+        table = self.qcd.dynamodb.Table(self.qcd.SCORECARDS_TABLE)
+        # Written before itemType existed: invisible to the index
+        table.put_item(Item={"pk": "SERVICE#s3", "sk": "CURRENT", "serviceId": "s3",
+                             "quality": 50})
+        table.put_item(Item={"pk": "SERVICE#s3", "sk": "JIRA#V-1", "serviceId": "s3",
+                             "key": "V-1", "version": "3.0.0"})
+        self.assertNotIn("s3", self.get("/v1/qcd/scorecards")["scorecards"])
+        self.assertNotIn("s3", self.get("/v1/qcd/jira-tickets")["jiraTickets"])
+
+        result = self.deliver("dashboard.scorecards.reindex", {})
+        self.assertEqual(result["reindexed"], {"scorecards": 1, "jiraTickets": 1})
+        self.assertEqual(self.get("/v1/qcd/scorecards")["scorecards"]["s3"], {"quality": 50})
+        self.assertEqual([t["key"] for t in self.get("/v1/qcd/jira-tickets")["jiraTickets"]["s3"]],
+                         ["V-1"])
+        # The backfill only adds attributes; a rerun finds nothing to do
+        self.assertEqual(table.get_item(Key={"pk": "SERVICE#s3", "sk": "CURRENT"})["Item"]["quality"],
+                         50)
+        self.assertEqual(self.deliver("dashboard.scorecards.reindex", {})["reindexed"],
+                         {"scorecards": 0, "jiraTickets": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+dashboard-api suite queries: test runs carry suiteShard =
+<suiteType>#<crc32(attemptId) % TEST_RUN_SHARDS>; suiteType alone reads
+every shard and merges them in executedAt order, and since/until ranges
+(one- or two-sided) never reach runs of a neighbouring suite.
+"""
+
+import json
+import unittest
+
+import helpers
+
+# FUNCTIONAL < SANITY < SMOKE in sk order, so a SANITY range that leaks
+# past its prefix picks up runs on either side. Twelve attempts cover
+# every one of the eight shards.
+SUITES = ("FUNCTIONAL", "SANITY", "SMOKE")
+RUNS = [
+    {"attemptId": f"a{i}", "suiteType": suite,
+     "executedAt": f"2026-01-01T{i:02d}:{10 * s:02d}:00Z", "passed": 1, "total": 1}
+    for i in range(12) for s, suite in enumerate(SUITES)
+]
+
+
+class SuiteRangeTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        helpers.invoke(self.qcd, {"detail-type": "dashboard.test-results.reported",
+                                  "detail": {"testRuns": RUNS}})
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def runs(self, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/test-runs", query))
+        self.assertEqual(response["statusCode"], 200, response)
+        return [(r["attemptId"], r["suiteType"], r["executedAt"])
+                for r in json.loads(response["body"])["testRuns"]]
+
+    def expected(self, suite, since=None, until=None, attempt=None):
+        return sorted(
+            ((r["attemptId"], r["suiteType"], r["executedAt"]) for r in RUNS
+             if r["suiteType"] == suite
+             and (attempt is None or r["attemptId"] == attempt)
+             and (since is None or r["executedAt"] >= since)
+             and (until is None or r["executedAt"] < until)),
+            key=lambda run: run[2])
+
+    def test_runs_spread_over_every_shard(self):
+        table = self.qcd.dynamodb.Table(self.qcd.TEST_RESULTS_TABLE)
+        shards = {i["suiteShard"] for i in table.scan()["Items"] if i["suiteType"] == "SANITY"}
+        self.assertEqual(shards, {f"SANITY#{n}" for n in range(self.qcd.TEST_RUN_SHARDS)})
+
+    def test_suite_merges_shards_in_order(self):
+        self.assertEqual(self.runs(suiteType="SANITY"), self.expected("SANITY"))
+
+    def test_suite_ranges(self):
+        since, until = "2026-01-01T03:10:00Z", "2026-01-01T08:10:00Z"
+        for bounds in ({"since": since}, {"until": until}, {"since": since, "until": until}):
+            with self.subTest(**bounds):
+                self.assertEqual(self.runs(suiteType="SANITY", **bounds),
+                                 self.expected("SANITY", **bounds))
+
+    def test_attempt_suite_ranges_stay_in_prefix(self):
+        # a5's runs are at 05:00, 05:10, 05:20 — one per suite
+        for bounds in ({"since": "2026-01-01T05:00:00Z"}, {"until": "2026-01-01T05:30:00Z"},
+                       {"since": "2026-01-01T05:00:00Z", "until": "2026-01-01T05:30:00Z"}):
+            with self.subTest(**bounds):
+                self.assertEqual(self.runs(attemptId="a5", suiteType="SANITY", **bounds),
+                                 self.expected("SANITY", attempt="a5", **bounds))
+
+    def test_until_is_exclusive(self):
+        at = "2026-01-01T05:10:00Z"
+        self.assertNotIn(("a5", "SANITY", at), self.runs(suiteType="SANITY", until=at))
+        self.assertNotIn(("a5", "SANITY", at),
+                         self.runs(attemptId="a5", suiteType="SANITY", until=at))
+        self.assertIn(("a5", "SANITY", at), self.runs(suiteType="SANITY", since=at))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+ingestion-handler API-key cache: valid keys are served from the
+warm-container cache for API_KEY_CACHE_TTL (never past their expiresAt),
+unknown or inactive keys are remembered as invalid for
+API_KEY_NEGATIVE_TTL, and lookup errors are never cached.
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import time
+import unittest
+from unittest import mock
+
+import helpers
+
+NEW_KEY = "new-api-key"
+
+
+class Clock:
+    """Stand-in for the handler's `time` module with a settable time()."""
+
+    def __init__(self):
+        self.now = 1_800_000_000.0
+        self.perf_counter = time.perf_counter
+        self.sleep = lambda seconds: None
+
+    def time(self):
+        return self.now
+
+
+class ApiKeyCacheTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingestion = helpers.load_lambda("ingestion-handler")
+        self.clock = Clock()
+        self.stack.enter_context(mock.patch.object(self.ingestion, "time", self.clock))
+        self.stack.enter_context(contextlib.redirect_stdout(io.StringIO()))  # EMF lines
+        self.keys = self.ingestion.dynamodb.Table(self.ingestion.API_KEYS_TABLE)
+
+    def put_key(self, key, **attributes):
+        self.keys.put_item(Item={"apiKeyHash": hashlib.sha256(key.encode()).hexdigest(),
+                                 "accountId": helpers.ACCOUNT_ID, "status": "active",
+                                 **attributes})
+
+    def valid(self, key):
+        return self.ingestion._validate_api_key(key) is not None
+
+    def misses(self):
+        return self.ingestion._key_cache_stats["misses"]
+
+    def test_valid_key_cached_for_ttl(self):
+        self.assertTrue(self.valid(helpers.API_KEY))
+        self.put_key(helpers.API_KEY, status="revoked")
+        self.clock.now += self.ingestion.API_KEY_CACHE_TTL - 1
+        self.assertTrue(self.valid(helpers.API_KEY))
+        self.assertEqual(self.misses(), 1)
+        self.clock.now += 2
+        self.assertFalse(self.valid(helpers.API_KEY))
+        self.assertEqual(self.misses(), 2)
+
+    def test_valid_key_not_cached_past_expiry(self):
+        self.put_key(NEW_KEY, expiresAt=int(self.clock.now) + 10)
+        self.assertTrue(self.valid(NEW_KEY))
+        self.clock.now += 11
+        self.assertFalse(self.valid(NEW_KEY))
+        self.assertEqual(self.misses(), 2)
+
+    def test_unknown_key_cached_as_invalid(self):
+        self.assertFalse(self.valid(NEW_KEY))
+        self.put_key(NEW_KEY)
+        self.clock.now += self.ingestion.API_KEY_NEGATIVE_TTL - 1
+        self.assertFalse(self.valid(NEW_KEY))
+        self.assertEqual(self.misses(), 1)
+        self.clock.now += 2
+        self.assertTrue(self.valid(NEW_KEY))
+        self.assertEqual(self.misses(), 2)
+
+    def test_inactive_key_cached_as_invalid(self):
+        self.put_key(NEW_KEY, status="revoked")
+        self.assertFalse(self.valid(NEW_KEY))
+        self.put_key(NEW_KEY)
+        self.assertFalse(self.valid(NEW_KEY))
+        self.assertEqual(self.misses(), 1)
+
+    def test_lookup_errors_are_not_cached(self):
+        table = mock.Mock()
+        table.get_item.side_effect = RuntimeError("DynamoDB unavailable")
+        with mock.patch.object(self.ingestion.dynamodb, "Table", return_value=table):
+            self.assertFalse(self.valid(helpers.API_KEY))
+        self.assertTrue(self.valid(helpers.API_KEY))
+        self.assertEqual(self.misses(), 2)
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(self.ingestion, "API_KEY_CACHE_MAX", 2):
+            for key in ("k1", "k2", "k3"):
+                self.valid(key)
+            self.assertEqual(len(self.ingestion._key_cache), 2)
+            self.valid("k1")  # evicted first, so looked up again
+        self.assertEqual(self.misses(), 4)
+
+    def test_rejected_request(self):
+        response = self.ingestion.handler(
+            {"rawPath": "/v1/ingest/deployments", "headers": {"x-api-key": NEW_KEY},
+             "body": json.dumps({"accountId": helpers.ACCOUNT_ID, "deploymentAttempts": []})},
+            helpers.Context())
+        self.assertEqual(response["statusCode"], 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+ingestion-handler batch ingest: POST /v1/ingest/batch answers 200 when
+every envelope published, 207 when only some did, 502 when none did
+because publishing failed and 400 when every envelope was rejected —
+with put_events failing per entry or raising for a whole call.
+"""
+
+import json
+import unittest
+import uuid
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+import helpers
+
+DEPLOYMENTS = {"type": "deployments", "data": {
+    "accountId": helpers.ACCOUNT_ID,
+    "deploymentAttempts": [{"id": "a1", "clusterId": "c1", "serviceId": "s1",
+                            "startedAt": "2026-01-01T10:00:00Z", "status": "LIVE"}],
+}}
+TEST_RESULTS = {"type": "test-results", "data": {
+    "accountId": helpers.ACCOUNT_ID,
+    "testRuns": [{"attemptId": "a1", "suiteType": "SANITY",
+                  "executedAt": "2026-01-01T10:06:00Z", "passed": 1, "total": 1}],
+}}
+UNKNOWN = {"type": "releases", "data": {"accountId": helpers.ACCOUNT_ID}}
+WRONG_ACCOUNT = {"type": "scorecards", "data": {"accountId": "someone-else"}}
+
+
+class FakeEventBridge:
+    """
+    put_events that answers from `script`: per call, "ok", "fail" (every
+    entry comes back with an ErrorCode) or "raise" (a throttling error);
+    calls past the end of the script succeed.
+    """
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+        self.published = []
+
+    def put_events(self, Entries):
+        self.calls.append(len(Entries))
+        outcome = self.script.pop(0) if self.script else "ok"
+        if outcome == "raise":
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}},
+                              "PutEvents")
+        if outcome == "fail":
+            return {"FailedEntryCount": len(Entries),
+                    "Entries": [{"ErrorCode": "InternalFailure"} for _ in Entries]}
+        self.published.extend(Entries)
+        return {"FailedEntryCount": 0, "Entries": [{"EventId": str(uuid.uuid4())} for _ in Entries]}
+
+
+class BatchIngestTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingestion = helpers.load_lambda("ingestion-handler")
+        # One entry per put_events call, so envelopes publish separately
+        self.stack.enter_context(mock.patch.object(self.ingestion, "MAX_ENTRIES_PER_CALL", 1))
+        self.stack.enter_context(mock.patch.object(self.ingestion.time, "sleep"))
+
+    def post(self, path, body, *script):
+        self.bus = FakeEventBridge(*script)
+        self.ingestion.eventbridge = self.bus
+        response = helpers.invoke(self.ingestion, {"rawPath": path, "body": json.dumps(body),
+                                                   "headers": {"x-api-key": helpers.API_KEY}})
+        return response["statusCode"], json.loads(response["body"])
+
+    def batch(self, *envelopes, script=()):
+        status, body = self.post("/v1/ingest/batch", {"envelopes": list(envelopes)}, *script)
+        return status, [r["status"] for r in body["results"]]
+
+    def test_all_published(self):
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS), (200, [200, 200]))
+        self.assertEqual([e["DetailType"] for e in self.bus.published],
+                         ["dashboard.deployments.reported", "dashboard.test-results.reported"])
+
+    def test_some_rejected(self):
+        self.assertEqual(self.batch(DEPLOYMENTS, UNKNOWN, WRONG_ACCOUNT), (207, [200, 400, 403]))
+        self.assertEqual(len(self.bus.published), 1)
+
+    def test_all_rejected(self):
+        self.assertEqual(self.batch(UNKNOWN, WRONG_ACCOUNT), (400, [400, 403]))
+        self.assertEqual(self.bus.calls, [])
+
+    def test_failed_entries_are_retried(self):
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS, script=("ok", "fail", "fail")),
+                         (200, [200, 200]))
+        self.assertEqual(len(self.bus.calls), 4)
+
+    def test_entries_that_never_publish(self):
+        script = ("ok",) + ("fail",) * self.ingestion.PUT_EVENTS_MAX_ATTEMPTS
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS, script=script), (207, [200, 500]))
+
+    def test_call_raising_after_earlier_calls_published(self):
+        script = ("ok",) + ("raise",) * self.ingestion.PUT_EVENTS_MAX_ATTEMPTS
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS, script=script), (207, [200, 500]))
+        self.assertEqual([e["DetailType"] for e in self.bus.published],
+                         ["dashboard.deployments.reported"])
+
+    def test_call_raising_then_recovering(self):
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS, script=("ok", "raise")),
+                         (200, [200, 200]))
+
+    def test_nothing_published(self):
+        script = ("raise",) * (2 * self.ingestion.PUT_EVENTS_MAX_ATTEMPTS)
+        self.assertEqual(self.batch(DEPLOYMENTS, TEST_RESULTS, script=script), (502, [500, 500]))
+        self.assertEqual(self.batch(DEPLOYMENTS, UNKNOWN, script=script), (502, [500, 400]))
+
+    def test_single_type_call_raising(self):
+        script = ("raise",) * self.ingestion.PUT_EVENTS_MAX_ATTEMPTS
+        status, body = self.post("/v1/ingest/deployments", DEPLOYMENTS["data"], *script)
+        self.assertEqual(status, 500)
+        self.assertEqual((body["failedEntries"], body["totalEntries"]), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+ingestion-handler chunking: a push over MAX_ENTRY_BYTES is split into
+EventBridge entries that each fit, repeat the envelope and carry
+_metadata.chunk = {batchId, seq, count}; qcd-processor stores every
+record once whatever order (or how often) the chunks arrive in.
+"""
+
+import json
+import random
+import unittest
+import uuid
+from unittest import mock
+
+import helpers
+
+ENTRY_BYTES = 1024
+ATTEMPTS = [
+    {"id": f"a{i:03d}", "clusterId": f"c{i % 3}", "serviceId": f"s{i % 7}",
+     "startedAt": f"2026-01-01T{i // 60:02d}:{i % 60:02d}:00Z", "status": "LIVE",
+     "version": f"1.{i}.0"}
+    for i in range(80)
+]
+
+
+class RecordingBus:
+    """
+    EventBridge stand-in: put_events keeps the entries of every call and
+    queues them in `pending` until the test delivers them.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.pending = []
+
+    def put_events(self, Entries):
+        self.calls.append(Entries)
+        self.pending.extend(Entries)
+        return {"FailedEntryCount": 0,
+                "Entries": [{"EventId": str(uuid.uuid4())} for _ in Entries]}
+
+
+class ChunkTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.ingestion = helpers.load_lambda("ingestion-handler")
+        self.stack.enter_context(mock.patch.object(self.ingestion, "MAX_ENTRY_BYTES", ENTRY_BYTES))
+        self.bus = RecordingBus()
+        self.ingestion.eventbridge = self.bus
+
+    def push(self, ingest_type, payload):
+        context = helpers.Context()
+        response = helpers.invoke(
+            self.ingestion,
+            {"rawPath": f"/v1/ingest/{ingest_type}", "body": json.dumps(payload),
+             "headers": {"x-api-key": helpers.API_KEY}},
+            context)
+        return response["statusCode"], json.loads(response["body"]), context.aws_request_id
+
+    def deliver(self, entries):
+        """Invoke qcd-processor for each entry, as the bus rule does."""
+        for entry in entries:
+            helpers.invoke(self.qcd, {"source": entry["Source"], "detail-type": entry["DetailType"],
+                                      "detail": json.loads(entry["Detail"])})
+
+    def stored_ids(self):
+        table = self.qcd.dynamodb.Table(self.qcd.DEPLOYMENTS_TABLE)
+        return sorted(i["id"] for i in table.scan()["Items"])
+
+    def test_small_push_is_one_entry(self):
+        status, body, _ = self.push("deployments", {"accountId": helpers.ACCOUNT_ID,
+                                                    "deploymentAttempts": ATTEMPTS[:2]})
+        self.assertEqual((status, body["events"]), (200, 1))
+        detail = json.loads(self.bus.pending[0]["Detail"])
+        self.assertNotIn("chunk", detail["_metadata"])
+
+    def test_chunks_fit_and_cover_the_push(self):
+        payload = {"accountId": helpers.ACCOUNT_ID, "source": "ci", "deploymentAttempts": ATTEMPTS}
+        status, body, request_id = self.push("deployments", payload)
+        entries = self.bus.pending
+        self.assertEqual(status, 200)
+        self.assertEqual(body["events"], len(entries))
+        self.assertGreater(len(entries), self.ingestion.MAX_ENTRIES_PER_CALL)
+
+        records = []
+        for seq, entry in enumerate(entries):
+            self.assertLessEqual(len(entry["Detail"].encode()), ENTRY_BYTES)
+            detail = json.loads(entry["Detail"])
+            self.assertEqual((detail["accountId"], detail["source"]), (helpers.ACCOUNT_ID, "ci"))
+            self.assertEqual(detail["_metadata"]["chunk"],
+                             {"batchId": request_id, "seq": seq, "count": len(entries)})
+            records.extend(detail["deploymentAttempts"])
+        self.assertEqual(records, ATTEMPTS)
+
+        for call in self.bus.calls:
+            self.assertLessEqual(len(call), self.ingestion.MAX_ENTRIES_PER_CALL)
+            self.assertLessEqual(sum(len(e["Detail"].encode()) for e in call),
+                                 self.ingestion.MAX_REQUEST_BYTES)
+
+    def test_chunks_reassemble_in_any_order(self):
+        self.push("deployments", {"accountId": helpers.ACCOUNT_ID, "deploymentAttempts": ATTEMPTS})
+        entries = self.bus.pending
+        shuffled = entries + entries[:3]
+        random.Random(8).shuffle(shuffled)
+        self.deliver(shuffled)
+        self.assertEqual(self.stored_ids(), [a["id"] for a in ATTEMPTS])
+
+    def test_oversize_record_or_unchunkable_push(self):
+        big = {**ATTEMPTS[0], "notes": "x" * ENTRY_BYTES}
+        status, body, _ = self.push("deployments", {"accountId": helpers.ACCOUNT_ID,
+                                                    "deploymentAttempts": [ATTEMPTS[1], big]})
+        self.assertEqual(status, 413, body)
+        status, body, _ = self.push("scorecards", {"accountId": helpers.ACCOUNT_ID,
+                                                   "notes": "x" * ENTRY_BYTES})
+        self.assertEqual(status, 413, body)
+        self.assertEqual(self.bus.pending, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
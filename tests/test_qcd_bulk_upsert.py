@@ -0,0 +1,92 @@
+"""
+qcd-processor platform config writes: _bulk_upsert merges every item on
+a thread pool, and an item whose update_item is throttled is retried by
+with_backoff until it goes through or UPSERT_MAX_ATTEMPTS is spent. Other
+errors are not retried; either way a failed item fails the push.
+"""
+
+import json
+import threading
+import unittest
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+import helpers
+
+SERVICES = [{"id": f"s{i}", "name": f"Service {i}"} for i in range(20)]
+CLUSTERS = [{"id": "c1", "name": "Cluster 1"}]
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "UpdateItem")
+
+
+class BulkUpsertTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        import mcq_common
+
+        # with_backoff sleeps through mcq_common.backoff; count instead
+        self.backoffs = self.stack.enter_context(mock.patch.object(mcq_common, "backoff"))
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def fail(self, pks, code, times):
+        """Make update_item on the items at `pks` raise `code` `times` times each."""
+        real = self.qcd._upsert_item
+
+        def upsert(table, key, attributes):
+            with self.lock:
+                n = self.calls[key["pk"]] = self.calls.get(key["pk"], 0) + 1
+            if key["pk"] in pks and n <= times:
+                raise client_error(code)
+            return real(table, key, attributes)
+
+        self.stack.enter_context(mock.patch.object(self.qcd, "_upsert_item", upsert))
+
+    def push(self):
+        return helpers.invoke(self.qcd, {
+            "detail-type": "dashboard.platform.config.updated",
+            "detail": {"services": SERVICES, "clusters": CLUSTERS},
+        })
+
+    def stored(self):
+        table = self.qcd.dynamodb.Table(self.qcd.PLATFORM_TABLE)
+        return {item["pk"] for item in table.scan()["Items"] if item.get("itemType")}
+
+    def test_every_item_is_written(self):
+        result = json.loads(self.push()["body"])
+        self.assertEqual(result["processed"], {"clusters": 1, "services": 20, "clusterRegions": 0,
+                                               "currentRunning": 0, "promotions": 0})
+        self.assertEqual(set(result["timings_ms"]), set(result["processed"]))
+        self.assertEqual(self.stored(), {"CLUSTER#c1"} | {f"SERVICE#{s['id']}" for s in SERVICES})
+
+    def test_throttled_items_are_retried(self):
+        self.fail({"SERVICE#s3", "SERVICE#s7"}, "ProvisionedThroughputExceededException", 2)
+        response = self.push()
+        self.assertEqual(response["statusCode"], 200, response)
+        self.assertEqual((self.calls["SERVICE#s3"], self.calls["SERVICE#s7"],
+                          self.calls["SERVICE#s0"]), (3, 3, 1))
+        self.assertEqual(self.backoffs.call_count, 4)
+        self.assertIn("SERVICE#s3", self.stored())
+
+    def test_gives_up_after_max_attempts(self):
+        self.fail({"SERVICE#s3"}, "ThrottlingException", 100)
+        response = self.push()
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual(self.calls["SERVICE#s3"], self.qcd.UPSERT_MAX_ATTEMPTS)
+        self.assertNotIn("SERVICE#s3", self.stored())
+
+    def test_other_errors_are_not_retried(self):
+        self.fail({"SERVICE#s3"}, "ValidationException", 1)
+        response = self.push()
+        self.assertEqual(response["statusCode"], 500)
+        self.assertEqual(self.calls["SERVICE#s3"], 1)
+        self.backoffs.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+qcd-processor CURRENT items: one per (cluster, service), pointing at its
+newest attempt with the newest run per suite of that attempt, whatever
+order attempts and runs arrive in — served by /v1/qcd/current-state
+without storage attributes.
+"""
+
+import json
+import unittest
+
+import helpers
+
+DAY = "2026-01-01"
+OLD = {"id": "a1", "clusterId": "c1", "serviceId": "s1", "version": "1.0.0",
+       "startedAt": f"{DAY}T10:00:00Z", "status": "LIVE"}
+NEW = {"id": "a2", "clusterId": "c1", "serviceId": "s1", "version": "1.1.0",
+       "startedAt": f"{DAY}T12:00:00Z", "status": "IN_PROGRESS"}
+OTHER = {"id": "a3", "clusterId": "c2", "serviceId": "s1", "version": "1.0.0",
+         "startedAt": f"{DAY}T11:00:00Z", "status": "LIVE"}
+
+
+def run(attempt, suite, hour, passed):
+    return {"attemptId": attempt["id"], "suiteType": suite,
+            "executedAt": f"{DAY}T{hour:02d}:30:00Z", "passed": passed, "total": 10}
+
+
+class CurrentStateTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.api = helpers.load_lambda("dashboard-api")
+
+    def deliver(self, detail_type, key, records):
+        result = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": {key: records}})
+        self.assertEqual(result["statusCode"], 200, result)
+
+    def report(self, *attempts):
+        self.deliver("dashboard.deployments.reported", "deploymentAttempts", list(attempts))
+
+    def report_runs(self, *runs):
+        self.deliver("dashboard.test-results.reported", "testRuns", list(runs))
+
+    def state(self, **query):
+        response = helpers.invoke(self.api, helpers.api_event("/v1/qcd/current-state", query))
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])["currentState"]
+
+    def current(self):
+        entry = self.state()["c1"]["s1"]
+        return entry["attempt"]["id"], {s: r["passed"] for s, r in entry["tests"].items()}
+
+    def test_newest_attempt_wins_in_any_order(self):
+        self.report(NEW)
+        self.report(OLD)
+        self.assertEqual(self.current(), ("a2", {}))
+
+    def test_re_report_keeps_tests(self):
+        self.report(NEW)
+        self.report_runs(run(NEW, "SANITY", 12, 9))
+        self.report({**NEW, "status": "LIVE"})
+        entry = self.state()["c1"]["s1"]
+        self.assertEqual(entry["attempt"]["status"], "LIVE")
+        self.assertEqual(self.current(), ("a2", {"SANITY": 9}))
+
+    def test_newest_run_per_suite(self):
+        self.report(OLD)
+        self.report_runs(run(OLD, "SANITY", 10, 7), run(OLD, "FUNCTIONAL", 10, 8))
+        self.report_runs(run(OLD, "SANITY", 9, 1))
+        self.report_runs(run(OLD, "SANITY", 11, 9))
+        self.assertEqual(self.current(), ("a1", {"SANITY": 9, "FUNCTIONAL": 8}))
+
+    def test_new_attempt_starts_from_its_stored_runs(self):
+        self.report(OLD)
+        self.report_runs(run(OLD, "SANITY", 10, 7))
+        self.report_runs(run(NEW, "FUNCTIONAL", 12, 10))
+        self.report(NEW)
+        self.assertEqual(self.current(), ("a2", {"FUNCTIONAL": 10}))
+        # Runs of the superseded attempt no longer touch it
+        self.report_runs(run(OLD, "SANITY", 13, 2))
+        self.assertEqual(self.current(), ("a2", {"FUNCTIONAL": 10}))
+
+    def test_cluster_filter_and_no_storage_attributes(self):
+        self.report(OLD, OTHER)
+        self.report_runs(run(OLD, "SANITY", 10, 7))
+        self.assertEqual(set(self.state()), {"c1", "c2"})
+        state = self.state(clusterId="c2")
+        self.assertEqual(list(state), ["c2"])
+        self.assertEqual(state["c2"]["s1"]["attempt"]["id"], "a3")
+
+        entry = self.state()["c1"]["s1"]
+        for record in (entry["attempt"], entry["tests"]["SANITY"]):
+            self.assertFalse(set(record) & set(self.api.INTERNAL_ATTRIBUTES), record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Delta ingestion: platform config and scorecard items carry the
+contentHash of the attributes they were written with, and a push skips
+every item whose hash is unchanged. The result reports written/skipped
+counts per category; a push that writes nothing bumps no data version.
+forceWrite (or DELTA_INGESTION off) writes everything again.
+"""
+
+import json
+import unittest
+from unittest import mock
+
+import helpers
+
+SERVICES = [{"id": f"s{i}", "name": f"Service {i}", "weight": 0.5} for i in range(3)]
+CONFIG = {"services": SERVICES, "clusters": [{"id": "c1", "name": "Cluster 1"}],
+          "suiteMeta": {"SANITY": {"label": "Sanity"}}}
+SCORECARDS = {
+    "scorecardWeights": {"quality": 1},
+    "scorecards": {"s0": {"score": 90}, "s1": {"score": 80}},
+    "jiraTickets": {"s0": [{"key": "T-1", "version": "1.0.0"}]},
+}
+
+
+class DeltaIngestionTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.writes = []
+        events = self.qcd.dynamodb.meta.client.meta.events
+
+        def record(params, model, **kwargs):
+            if params.get("Key") != self.qcd.DATA_VERSION_KEY:
+                self.writes.append(model.name)
+
+        for operation in ("UpdateItem", "PutItem", "BatchWriteItem"):
+            events.register(f"before-parameter-build.dynamodb.{operation}", record)
+            self.addCleanup(events.unregister, f"before-parameter-build.dynamodb.{operation}",
+                            record)
+
+    def deliver(self, detail_type, detail):
+        response = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(response["statusCode"], 200, response)
+        return json.loads(response["body"])
+
+    def push_config(self, detail=CONFIG):
+        self.writes.clear()
+        return self.deliver("dashboard.platform.config.updated", detail)
+
+    def version(self, category):
+        table = self.qcd.dynamodb.Table(self.qcd.PLATFORM_TABLE)
+        item = table.get_item(Key=self.qcd.DATA_VERSION_KEY).get("Item", {})
+        return int(item.get(category, 0))
+
+    def test_items_carry_their_content_hash(self):
+        self.push_config()
+        table = self.qcd.dynamodb.Table(self.qcd.PLATFORM_TABLE)
+        item = table.get_item(Key={"pk": "SERVICE#s1", "sk": "META"})["Item"]
+        self.assertEqual(item["contentHash"],
+                         self.qcd._content_hash({"itemType": "SERVICE", **SERVICES[1]}))
+
+    def test_repeated_push_skips_everything(self):
+        first = self.push_config()
+        self.assertEqual(first["written"], {"clusters": 1, "services": 3, "suiteMeta": 1})
+        self.assertIs(first["unchanged"], False)
+        version = self.version("platform")
+
+        again = self.push_config()
+        self.assertEqual(again["written"], {})
+        self.assertEqual(again["skipped"], {"clusters": 1, "services": 3, "suiteMeta": 1})
+        self.assertIs(again["unchanged"], True)
+        self.assertNotIn("UpdateItem", self.writes)
+        self.assertEqual(self.version("platform"), version)
+
+    def test_only_changed_items_are_written(self):
+        self.push_config()
+        version = self.version("platform")
+        services = [SERVICES[0], {**SERVICES[1], "name": "Renamed"}, SERVICES[2]]
+        result = self.push_config({**CONFIG, "services": services})
+        self.assertEqual(result["written"], {"services": 1})
+        self.assertEqual(result["skipped"], {"clusters": 1, "services": 2, "suiteMeta": 1})
+        self.assertEqual(self.writes.count("UpdateItem"), 1)
+        self.assertEqual(self.version("platform"), version + 1)
+
+    def test_force_write(self):
+        self.push_config()
+        result = self.push_config({**CONFIG, "forceWrite": True})
+        self.assertEqual(result["written"], {"clusters": 1, "services": 3, "suiteMeta": 1})
+        self.assertEqual(result["skipped"], {})
+        with mock.patch.object(self.qcd, "DELTA_INGESTION", False):
+            result = self.push_config()
+        self.assertEqual(result["written"], {"clusters": 1, "services": 3, "suiteMeta": 1})
+
+    def test_scorecards(self):
+        first = self.deliver("dashboard.scorecards.updated", SCORECARDS)
+        self.assertEqual(first["written"], {"weights": 1, "scorecards": 2, "jiraTickets": 1})
+        again = self.deliver("dashboard.scorecards.updated", SCORECARDS)
+        self.assertEqual(again["skipped"], {"weights": 1, "scorecards": 2, "jiraTickets": 1})
+        self.assertIs(again["unchanged"], True)
+        changed = {**SCORECARDS, "scorecards": {**SCORECARDS["scorecards"], "s1": {"score": 81}}}
+        result = self.deliver("dashboard.scorecards.updated", changed)
+        self.assertEqual((result["written"], result["skipped"]),
+                         ({"scorecards": 1}, {"weights": 1, "scorecards": 1, "jiraTickets": 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+qcd-processor pushes that overlap: a test run stored while its attempt's
+deployment push is in flight (or an attempt reported while its runs are
+being stored) still reaches the rollups, the attempt's testSummary and
+its CURRENT item, whichever push reads the other's writes first.
+"""
+
+import os
+import unittest
+from unittest import mock
+
+import helpers
+
+DAY = "2026-01-01"
+ATTEMPT = {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+           "startedAt": f"{DAY}T10:00:00Z", "endedAt": f"{DAY}T10:05:00Z", "status": "LIVE"}
+SANITY = {"attemptId": "a1", "suiteType": "SANITY", "executedAt": f"{DAY}T10:06:00Z",
+          "passed": 9, "failed": 1, "total": 10}
+
+
+class InterleavingTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stack.enter_context(mock.patch.dict(os.environ, {"CHANGES_SETTLE_SECONDS": "0"}))
+        self.qcd = helpers.load_lambda("qcd-processor")
+
+    def deliver(self, detail_type, detail):
+        result = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(result["statusCode"], 200, result)
+
+    def report_attempt(self):
+        self.deliver("dashboard.deployments.reported", {"deploymentAttempts": [ATTEMPT]})
+
+    def report_run(self):
+        self.deliver("dashboard.test-results.reported", {"testRuns": [SANITY]})
+
+    def during_first(self, target, push):
+        """Patch qcd.<target> to run `push` before its first call goes through."""
+        real = getattr(self.qcd, target)
+        calls = []
+
+        def interleaved(*args, **kwargs):
+            if not calls:
+                calls.append(target)
+                push()
+            return real(*args, **kwargs)
+
+        return mock.patch.object(self.qcd, target, interleaved), calls
+
+    def assert_attributed(self):
+        analytics = self.qcd.dynamodb.Table(self.qcd.ANALYTICS_TABLE)
+        rollup = analytics.get_item(Key={"pk": "ROLLUP#*#*", "sk": f"DAY#{DAY}"},
+                                    ConsistentRead=True)["Item"]
+        self.assertEqual((rollup["attempts"], rollup["testPassed_SANITY"],
+                          rollup["testTotal_SANITY"]), (1, 9, 10))
+        current = analytics.get_item(Key={"pk": "CURRENT", "sk": "c1#s1"},
+                                     ConsistentRead=True)["Item"]
+        self.assertEqual(current["tests"]["SANITY"]["passed"], 9)
+        deployments = self.qcd.dynamodb.Table(self.qcd.DEPLOYMENTS_TABLE)
+        item = deployments.get_item(Key={"pk": "c1#s1", "sk": f"{ATTEMPT['startedAt']}#a1"},
+                                    ConsistentRead=True)["Item"]
+        self.assertEqual(item["testSummary"]["SANITY"]["passed"], 9)
+
+    def test_run_stored_while_attempt_is_reported(self):
+        # The run lands after the deployment push counted the attempt's
+        # runs and before it wrote the REF: the run's push finds no REF
+        patch, calls = self.during_first("_rollup_chunks", self.report_run)
+        with patch:
+            self.report_attempt()
+        self.assertEqual(calls, ["_rollup_chunks"])
+        self.assert_attributed()
+
+    def test_attempt_reported_while_run_is_stored(self):
+        # The whole deployment push runs before the run is written
+        patch, calls = self.during_first("_test_run_item", self.report_attempt)
+        with patch:
+            self.report_run()
+        self.assertEqual(calls, ["_test_run_item"])
+        self.assert_attributed()
+
+    def test_attempt_then_run(self):
+        self.report_attempt()
+        self.report_run()
+        self.assert_attributed()
+
+    def test_run_then_attempt(self):
+        self.report_run()
+        self.report_attempt()
+        self.assert_attributed()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+qcd-processor queue redelivery: a group that fails partway (items written,
+rollups or current state not) and is redelivered by SQS must leave the
+analytics rollups and attempt refs exactly as one clean delivery would.
+"""
+
+import json
+import os
+import unittest
+import uuid
+from unittest import mock
+
+import helpers
+
+DAY = "2026-01-01"
+ATTEMPTS = [
+    {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+     "startedAt": f"{DAY}T10:00:00Z", "endedAt": f"{DAY}T10:05:00Z", "status": "LIVE"},
+    {"id": "a2", "clusterId": "c1", "serviceId": "s2",
+     "startedAt": f"{DAY}T11:00:00Z", "endedAt": f"{DAY}T11:01:00Z", "status": "FAILED"},
+]
+RUNS = [
+    {"attemptId": "a1", "suiteType": "SANITY", "executedAt": f"{DAY}T10:06:00Z",
+     "passed": 9, "total": 10},
+    {"attemptId": "a2", "suiteType": "SANITY", "executedAt": f"{DAY}T11:02:00Z",
+     "passed": 0, "total": 4},
+]
+
+# Rollups after one clean delivery of ATTEMPTS and RUNS
+EXPECTED = {
+    ("s1", "c1"): {"attempts": 1, "success": 1, "leadTimeSumSec": 300, "leadTimeCount": 1,
+                   "testPassed_SANITY": 9, "testTotal_SANITY": 10},
+    ("s2", "c1"): {"attempts": 1, "failed": 1, "leadTimeSumSec": 60, "leadTimeCount": 1,
+                   "testTotal_SANITY": 4},
+    ("s1", "*"): {"attempts": 1, "success": 1, "leadTimeSumSec": 300, "leadTimeCount": 1,
+                  "testPassed_SANITY": 9, "testTotal_SANITY": 10},
+    ("s2", "*"): {"attempts": 1, "failed": 1, "leadTimeSumSec": 60, "leadTimeCount": 1,
+                  "testTotal_SANITY": 4},
+    ("*", "c1"): {"attempts": 2, "success": 1, "failed": 1, "leadTimeSumSec": 360,
+                  "leadTimeCount": 2, "testPassed_SANITY": 9, "testTotal_SANITY": 14},
+    ("*", "*"): {"attempts": 2, "success": 1, "failed": 1, "leadTimeSumSec": 360,
+                 "leadTimeCount": 2, "testPassed_SANITY": 9, "testTotal_SANITY": 14},
+}
+
+
+def _message(detail_type, detail):
+    return {
+        "messageId": str(uuid.uuid4()),
+        "eventSource": "aws:sqs",
+        "body": json.dumps({"source": "mcq.dashboard", "detail-type": detail_type,
+                            "detail": detail}),
+    }
+
+
+class RedeliveryTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stack.enter_context(mock.patch.dict(os.environ, {"CHANGES_SETTLE_SECONDS": "0"}))
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.analytics = self.qcd.dynamodb.Table(self.qcd.ANALYTICS_TABLE)
+        self.messages = {
+            "deployments": [_message("dashboard.deployments.reported",
+                                     {"deploymentAttempts": [a]}) for a in ATTEMPTS],
+            "runs": [_message("dashboard.test-results.reported",
+                              {"testRuns": [r]}) for r in RUNS],
+        }
+
+    def deliver(self, records):
+        """One SQS batch; returns the message ids reported as failed."""
+        result = helpers.invoke(self.qcd, {"Records": records})
+        return {f["itemIdentifier"] for f in result["batchItemFailures"]}
+
+    def redeliver_after_failure(self, records, target):
+        """Fail every message of `records` at `target`, then redeliver them."""
+        def fail(*args, **kwargs):
+            raise RuntimeError(f"injected failure in {target}")
+
+        with mock.patch.object(self.qcd, target, fail):
+            failed = self.deliver(records)
+        self.assertEqual(failed, {r["messageId"] for r in records})
+        self.assertEqual(self.deliver(records), set())
+
+    def rollups(self):
+        items = self.analytics.scan()["Items"]
+        return {
+            (i["serviceId"], i["clusterId"]): {
+                k: int(v) for k, v in i.items()
+                if k not in ("pk", "sk", "serviceId", "clusterId", "day") and v
+            }
+            for i in items if i["pk"].startswith("ROLLUP#") and i["sk"] == f"DAY#{DAY}"
+        }
+
+    def ref(self, attempt_id):
+        return self.analytics.get_item(Key={"pk": f"ATTEMPT#{attempt_id}", "sk": "REF"},
+                                       ConsistentRead=True).get("Item")
+
+    def assert_analytics(self):
+        self.assertEqual(self.rollups(), EXPECTED)
+        for a in ATTEMPTS:
+            ref = self.ref(a["id"])
+            self.assertIsNotNone(ref, a["id"])
+            self.assertEqual((ref["clusterId"], ref["serviceId"], ref["startedAt"]),
+                             (a["clusterId"], a["serviceId"], a["startedAt"]))
+            self.assertEqual(ref["rolledUp"]["startedAt"], a["startedAt"])
+        current = self.analytics.get_item(Key={"pk": "CURRENT", "sk": "c1#s1"})["Item"]
+        self.assertEqual(current["tests"]["SANITY"]["passed"], 9)
+
+    def test_deployments_fail_before_rollups(self):
+        self.assertEqual(self.deliver(self.messages["runs"]), set())
+        self.redeliver_after_failure(self.messages["deployments"], "_roll_up")
+        self.assert_analytics()
+
+    def test_deployments_fail_after_rollups(self):
+        self.assertEqual(self.deliver(self.messages["deployments"]), set())
+        self.redeliver_after_failure(self.messages["deployments"], "_advance_current_state")
+        self.assertEqual(self.deliver(self.messages["runs"]), set())
+        self.assert_analytics()
+
+    def test_test_results_fail_after_rollups(self):
+        self.assertEqual(self.deliver(self.messages["deployments"]), set())
+        self.redeliver_after_failure(self.messages["runs"], "_merge_test_summaries")
+        self.assert_analytics()
+
+    def test_rebuild_matches(self):
+        self.deliver(self.messages["runs"])
+        self.deliver(self.messages["deployments"])
+        self.deliver(self.messages["runs"] + self.messages["deployments"])
+        before = {a["id"]: self.ref(a["id"])["rolledUp"] for a in ATTEMPTS}
+        helpers.invoke(self.qcd, {"detail-type": "dashboard.analytics.rebuild", "detail": {}})
+        self.assert_analytics()
+        self.assertEqual({a["id"]: self.ref(a["id"])["rolledUp"] for a in ATTEMPTS}, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+qcd-processor test summaries: deployment items carry the newest run per
+suite in testSummary, whichever of the attempt and its runs arrives first,
+and a deployment re-report never drops a suite merged while it was being
+written.
+"""
+
+import os
+import unittest
+from unittest import mock
+
+import helpers
+
+DAY = "2026-01-01"
+ATTEMPT = {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+           "startedAt": f"{DAY}T10:00:00Z", "endedAt": f"{DAY}T10:05:00Z", "status": "FAILED"}
+SANITY = {"attemptId": "a1", "suiteType": "SANITY", "executedAt": f"{DAY}T10:06:00Z",
+          "passed": 9, "failed": 1, "total": 10}
+FUNCTIONAL = {"attemptId": "a1", "suiteType": "FUNCTIONAL", "executedAt": f"{DAY}T10:08:00Z",
+              "passed": 20, "failed": 0, "total": 20}
+
+
+class TestSummaryTest(helpers.LambdaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.stack.enter_context(mock.patch.dict(os.environ, {"CHANGES_SETTLE_SECONDS": "0"}))
+        self.qcd = helpers.load_lambda("qcd-processor")
+        self.deployments = self.qcd.dynamodb.Table(self.qcd.DEPLOYMENTS_TABLE)
+
+    def deliver(self, detail_type, detail):
+        result = helpers.invoke(self.qcd, {"detail-type": detail_type, "detail": detail})
+        self.assertEqual(result["statusCode"], 200, result)
+
+    def report_attempt(self, attempt):
+        self.deliver("dashboard.deployments.reported", {"deploymentAttempts": [attempt]})
+
+    def report_runs(self, *runs):
+        self.deliver("dashboard.test-results.reported", {"testRuns": list(runs)})
+
+    def item(self):
+        key = {"pk": "c1#s1", "sk": f"{ATTEMPT['startedAt']}#a1"}
+        return self.deployments.get_item(Key=key, ConsistentRead=True)["Item"]
+
+    def test_runs_before_attempt(self):
+        self.report_runs(SANITY, FUNCTIONAL)
+        self.report_attempt(ATTEMPT)
+        summary = self.item()["testSummary"]
+        self.assertEqual(set(summary), {"SANITY", "FUNCTIONAL"})
+        self.assertEqual(summary["SANITY"]["failed"], 1)
+
+    def test_runs_after_attempt(self):
+        self.report_attempt(ATTEMPT)
+        self.report_runs(SANITY)
+        self.report_runs({**SANITY, "executedAt": f"{DAY}T09:00:00Z", "passed": 0})
+        self.assertEqual(self.item()["testSummary"]["SANITY"]["passed"], 9)
+
+    def test_run_merged_while_attempt_is_rewritten(self):
+        self.report_attempt(ATTEMPT)
+        self.report_runs(SANITY)
+
+        # FUNCTIONAL lands between the re-report's read of the stored
+        # item and its write
+        real_batch_get = self.qcd.batch_get
+        interleaved = []
+
+        def batch_get(dynamodb, table_name, *args, **kwargs):
+            found = real_batch_get(dynamodb, table_name, *args, **kwargs)
+            if table_name == self.qcd.DEPLOYMENTS_TABLE and not interleaved:
+                interleaved.append(True)
+                self.report_runs(FUNCTIONAL)
+            return found
+
+        with mock.patch.object(self.qcd, "batch_get", batch_get):
+            self.report_attempt({**ATTEMPT, "status": "LIVE"})
+        self.assertTrue(interleaved)
+
+        item = self.item()
+        self.assertEqual(set(item["testSummary"]), {"SANITY", "FUNCTIONAL"})
+        self.assertEqual(item["status"], "LIVE")
+        # No longer failing, so it drops out of the failures-index
+        self.assertNotIn("failureType", item)
+        self.assertNotIn("failedAt", item)
+
+    def test_rewrite_keeps_fields_in_step(self):
+        self.report_attempt({**ATTEMPT, "rollbackReason": "smoke"})
+        self.report_attempt(ATTEMPT)
+        item = self.item()
+        self.assertNotIn("rollbackReason", item)
+        shard = self.qcd._failure_shard("DEPLOYMENT", ATTEMPT["id"])
+        self.assertEqual((item["failureType"], item["failedAt"]), (shard, ATTEMPT["startedAt"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
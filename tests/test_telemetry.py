@@ -0,0 +1,162 @@
+"""
+EMF telemetry: mcq_common.emf_line's record shape, the Metrics hooks that
+ask DynamoDB for ReturnConsumedCapacity and sum calls, items and capacity
+per record, the one line per request / detail-type the Lambdas print,
+and ingestion-handler's per-lookup API-key line.
+"""
+
+import contextlib
+import io
+import json
+import types
+import unittest
+from unittest import mock
+
+import helpers
+
+ATTEMPT = {"id": "a1", "clusterId": "c1", "serviceId": "s1",
+           "startedAt": "2026-01-01T10:00:00Z", "status": "LIVE"}
+
+
+def emitted(fn, *args):
+    """Run fn(*args) and return (its result, the EMF records it printed)."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = fn(*args)
+    return result, [json.loads(line) for line in out.getvalue().splitlines() if line]
+
+
+def metric_units(record):
+    (directive,) = record["_aws"]["CloudWatchMetrics"]
+    return {m["Name"]: m["Unit"] for m in directive["Metrics"]}
+
+
+class EmfLineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.common = helpers.load_common()
+
+    def test_record_shape(self):
+        record = json.loads(self.common.emf_line(
+            {"Function": "f", "Route": "/r"},
+            {"Duration": (12.5, "Milliseconds"), "Items": (3, "Count")},
+            statusCode=200,
+        ))
+        (directive,) = record["_aws"]["CloudWatchMetrics"]
+        self.assertEqual(directive["Namespace"], self.common.METRICS_NAMESPACE)
+        self.assertEqual(directive["Dimensions"], [["Function", "Route"]])
+        self.assertEqual(metric_units(record), {"Duration": "Milliseconds", "Items": "Count"})
+        self.assertIsInstance(record["_aws"]["Timestamp"], int)
+        self.assertEqual({k: v for k, v in record.items() if k != "_aws"},
+                         {"Function": "f", "Route": "/r", "Duration": 12.5, "Items": 3,
+                          "statusCode": 200})
+
+
+class MetricsHooksTest(unittest.TestCase):
+    """Metrics.before_call / after_call, as botocore calls them."""
+
+    def setUp(self):
+        self.common = helpers.load_common()
+        self.metrics = self.common.Metrics("test", "Route")
+        self.metrics.start("/r")
+
+    def call(self, operation, params, parsed):
+        model = types.SimpleNamespace(name=operation)
+        context = {}
+        self.metrics.before_call(params, model, context)
+        self.metrics.after_call(parsed, model, context)
+        return params
+
+    def test_consumed_capacity_is_requested(self):
+        self.assertEqual(self.call("Query", {"TableName": "t"}, {})["ReturnConsumedCapacity"],
+                         "TOTAL")
+        # A caller's own setting is kept
+        params = self.call("GetItem", {"TableName": "t", "ReturnConsumedCapacity": "INDEXES"}, {})
+        self.assertEqual(params["ReturnConsumedCapacity"], "INDEXES")
+        self.assertNotIn("ReturnConsumedCapacity", self.call("DescribeTable", {"TableName": "t"}, {}))
+
+    def test_capacity_and_counts_accumulate(self):
+        self.call("Query", {"TableName": "t"},
+                  {"Count": 4, "ConsumedCapacity": {"TableName": "t", "CapacityUnits": 2.5}})
+        self.call("BatchGetItem", {}, {
+            "Responses": {"t": [{}, {}], "u": [{}]},
+            "ConsumedCapacity": [{"CapacityUnits": 1.0}, {"CapacityUnits": 0.5}],
+        })
+        self.call("BatchWriteItem", {"RequestItems": {"t": [{}, {}, {}]}}, {
+            "UnprocessedItems": {"t": [{}]},
+            "ConsumedCapacity": [{"CapacityUnits": 2.0}],
+        })
+        self.call("PutItem", {"TableName": "t"}, {"ConsumedCapacity": {"CapacityUnits": 1.0}})
+        m = self.metrics
+        self.assertEqual((m.calls, m.pages, m.items, m.items_written), (4, 1, 7, 3))
+        self.assertEqual(m.capacity, {"read": 4.0, "write": 3.0})
+
+    def test_one_line_per_record(self):
+        self.call("Query", {"TableName": "t"},
+                  {"Count": 1, "ConsumedCapacity": {"CapacityUnits": 0.5}})
+        self.metrics.properties["cache"] = "miss"
+        context = helpers.Context()
+        _, records = emitted(self.metrics.emit, context, {"Events": (1, "Count")})
+        _, again = emitted(self.metrics.emit, context)
+        (record,) = records
+        self.assertEqual(again, [])
+        self.assertEqual((record["Function"], record["Route"]), ("test", "/r"))
+        self.assertEqual((record["DynamoDbCalls"], record["Items"], record["ReadCapacity"],
+                          record["Events"]), (1, 1, 0.5, 1))
+        self.assertEqual((record["cache"], record["requestId"]), ("miss", context.aws_request_id))
+        self.assertEqual(metric_units(record)["Duration"], "Milliseconds")
+
+    def test_disabled(self):
+        with mock.patch.object(self.common, "METRICS_ENABLED", False):
+            self.metrics.start("/r")
+        params = self.call("Query", {"TableName": "t"}, {"Count": 1})
+        self.assertNotIn("ReturnConsumedCapacity", params)
+        self.assertEqual(emitted(self.metrics.emit, helpers.Context())[1], [])
+
+
+class LambdaTelemetryTest(helpers.LambdaTestCase):
+    """The lines the Lambdas print, against moto's DynamoDB."""
+
+    def test_dashboard_api_route(self):
+        api = helpers.load_lambda("dashboard-api")
+        response, (record,) = emitted(api.handler, helpers.api_event("/v1/qcd/deployments"),
+                                      helpers.Context())
+        self.assertEqual((record["Function"], record["Route"], record["statusCode"]),
+                         ("dashboard-api", "/v1/qcd/deployments", 200))
+        self.assertEqual(record["ResponseBytes"], len(response["body"]))
+        self.assertGreaterEqual(record["DynamoDbCalls"], 2)  # data versions + the page
+        self.assertGreater(record["ReadCapacity"], 0)
+        self.assertEqual(record["WriteCapacity"], 0)
+
+        _, (record,) = emitted(api.handler, helpers.api_event("/nope"), helpers.Context())
+        self.assertEqual((record["Route"], record["statusCode"]), ("unmatched", 404))
+
+    def test_qcd_processor_detail_type(self):
+        qcd = helpers.load_lambda("qcd-processor")
+        event = {"detail-type": "dashboard.deployments.reported",
+                 "detail": {"deploymentAttempts": [ATTEMPT]}}
+        _, records = emitted(qcd.handler, event, helpers.Context())
+        (record,) = records
+        self.assertEqual((record["Function"], record["DetailType"], record["Events"]),
+                         ("qcd-processor", "dashboard.deployments.reported", 1))
+        self.assertGreater(record["ItemsWritten"], 0)
+        self.assertGreater(record["WriteCapacity"], 0)
+
+    def test_api_key_lookups(self):
+        ingestion = helpers.load_lambda("ingestion-handler")
+        lines = []
+        for _ in range(2):
+            _, records = emitted(ingestion._validate_api_key, helpers.API_KEY)
+            lines.extend(records)
+        miss, hit = lines
+        self.assertEqual(miss["Function"], "ingestion-handler")
+        self.assertEqual(metric_units(miss), {"ApiKeyLookupTime": "Milliseconds",
+                                              "ApiKeyCacheHit": "Count"})
+        self.assertEqual((miss["outcome"], miss["ApiKeyCacheHit"], miss["containerMisses"]),
+                         ("miss", 0, 1))
+        self.assertEqual((hit["outcome"], hit["ApiKeyCacheHit"], hit["containerHits"],
+                          hit["cacheEntries"]), ("hit", 1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()